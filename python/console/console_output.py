@@ -19,13 +19,24 @@ email                : lrssvtml (at) gmail (dot) com
 Some portions of code were taken from https://code.google.com/p/pydee/
 """
 
-from qgis.PyQt.QtCore import Qt, QCoreApplication
+from qgis.PyQt.QtCore import Qt, QCoreApplication, QTimer
 from qgis.PyQt.QtGui import QColor, QFont, QKeySequence, QFontDatabase
 from qgis.PyQt.QtWidgets import QGridLayout, QSpacerItem, QSizePolicy, QShortcut, QMenu, QApplication
 from qgis.PyQt.Qsci import QsciScintilla, QsciLexerPython
 from qgis.core import Qgis, QgsApplication, QgsSettings
 from qgis.gui import QgsMessageBar
 import sys
+import time
+
+
+# interval (in ms) between refreshes of the output while a command writes
+FLUSH_INTERVAL = 50
+
+# number of pending characters forcing a refresh of the output
+FLUSH_SIZE = 65536
+
+# default number of lines kept in the output
+MAX_OUTPUT_LINES = 10000
 
 
 class writeOut(object):
@@ -40,25 +51,18 @@ class writeOut(object):
         self.fire_keyboard_interrupt = False
 
     def write(self, m):
-        if self.style == "_traceback":
-            # Show errors in red
-            stderrColor = QColor(self.sO.settings.value("pythonConsole/stderrFontColor", QColor(Qt.red)))
-            self.sO.SendScintilla(QsciScintilla.SCI_STYLESETFORE, 0o01, stderrColor)
-            self.sO.SendScintilla(QsciScintilla.SCI_STYLESETITALIC, 0o01, True)
-            self.sO.SendScintilla(QsciScintilla.SCI_STYLESETBOLD, 0o01, True)
-            pos = self.sO.SendScintilla(QsciScintilla.SCI_GETCURRENTPOS)
-            self.sO.SendScintilla(QsciScintilla.SCI_STARTSTYLING, pos, 31)
-            self.sO.append(m)
-            self.sO.SendScintilla(QsciScintilla.SCI_SETSTYLING, len(m), 0o01)
-        else:
-            self.sO.append(m)
+        """
+        Writes are buffered and appended to the output at most every
+        FLUSH_INTERVAL ms, when events are processed as well so that
+        keyboard interrupts are still caught.
+        """
+        self.sO.bufferOutput(m, self.style == "_traceback")
 
         if self.out:
             self.out.write(m)
 
-        self.move_cursor_to_end()
-
-        if self.style != "_traceback":
+        if self.style != "_traceback" and self.sO.flushDue():
+            self.sO.flushOutput()
             QCoreApplication.processEvents()
 
         if self.fire_keyboard_interrupt:
@@ -67,18 +71,14 @@ class writeOut(object):
 
     def move_cursor_to_end(self):
         """Move cursor to end of text"""
-        line, index = self.get_end_pos()
-        self.sO.setCursorPosition(line, index)
-        self.sO.ensureCursorVisible()
-        self.sO.ensureLineVisible(line)
+        self.sO.move_cursor_to_end()
 
     def get_end_pos(self):
         """Return (line, index) position of the last character"""
-        line = self.sO.lines() - 1
-        return (line, len(self.sO.text(line)))
+        return self.sO.get_end_pos()
 
     def flush(self):
-        pass
+        self.sO.flushOutput()
 
     def isatty(self):
         return False
@@ -107,6 +107,15 @@ class ShellOutputScintilla(QsciScintilla):
         # Enable non-ascii chars for editor
         self.setUtf8(True)
 
+        # pending writes, as (text, traceback) tuples
+        self.pendingOutput = []
+        self.pendingSize = 0
+        self.lastFlush = time.monotonic()
+        self.flushTimer = QTimer(self)
+        self.flushTimer.setSingleShot(True)
+        self.flushTimer.setInterval(FLUSH_INTERVAL)
+        self.flushTimer.timeout.connect(self.flushOutput)
+
         sys.stdout = writeOut(self, sys.stdout)
         sys.stderr = writeOut(self, sys.stderr, "_traceback")
 
@@ -161,11 +170,76 @@ class ShellOutputScintilla(QsciScintilla):
     def refreshSettingsOutput(self):
         # Set Python lexer
         self.setLexers()
+        self.maxLines = self.settings.value("pythonConsole/maxOutputLines", MAX_OUTPUT_LINES, type=int)
         caretLineColor = self.settings.value("pythonConsole/caretLineColor", QColor("#fcf3ed"))
         cursorColor = self.settings.value("pythonConsole/cursorColor", QColor(Qt.black))
         self.setCaretLineBackgroundColor(caretLineColor)
         self.setCaretForegroundColor(cursorColor)
 
+    def bufferOutput(self, text, traceback=False):
+        """Queues text to be appended to the output"""
+        if self.pendingOutput and self.pendingOutput[-1][1] == traceback:
+            self.pendingOutput[-1] = (self.pendingOutput[-1][0] + text, traceback)
+        else:
+            self.pendingOutput.append((text, traceback))
+        self.pendingSize += len(text)
+        if self.pendingSize >= FLUSH_SIZE:
+            self.flushOutput()
+        elif not self.flushTimer.isActive():
+            self.flushTimer.start()
+
+    def flushDue(self):
+        return (time.monotonic() - self.lastFlush) * 1000 >= FLUSH_INTERVAL
+
+    def flushOutput(self):
+        """Appends the pending text to the output, in one go for each style"""
+        self.flushTimer.stop()
+        self.lastFlush = time.monotonic()
+        if not self.pendingOutput:
+            return
+        pending = self.pendingOutput
+        self.pendingOutput = []
+        self.pendingSize = 0
+
+        for text, traceback in pending:
+            if traceback:
+                # Show errors in red
+                stderrColor = QColor(self.settings.value("pythonConsole/stderrFontColor", QColor(Qt.red)))
+                self.SendScintilla(QsciScintilla.SCI_STYLESETFORE, 0o01, stderrColor)
+                self.SendScintilla(QsciScintilla.SCI_STYLESETITALIC, 0o01, True)
+                self.SendScintilla(QsciScintilla.SCI_STYLESETBOLD, 0o01, True)
+                pos = self.SendScintilla(QsciScintilla.SCI_GETLENGTH)
+                self.SendScintilla(QsciScintilla.SCI_STARTSTYLING, pos, 31)
+                self.append(text)
+                self.SendScintilla(QsciScintilla.SCI_SETSTYLING, len(text.encode('utf-8')), 0o01)
+            else:
+                self.append(text)
+
+        self.trimOutput()
+        self.move_cursor_to_end()
+
+    def trimOutput(self):
+        """Removes the first lines of the output beyond maxLines lines"""
+        excess = self.lines() - self.maxLines
+        if self.maxLines <= 0 or excess <= 0:
+            return
+        end = self.positionFromLineIndex(excess, 0)
+        self.setReadOnly(False)
+        self.SendScintilla(QsciScintilla.SCI_DELETERANGE, 0, end)
+        self.setReadOnly(True)
+
+    def move_cursor_to_end(self):
+        """Move cursor to end of text"""
+        line, index = self.get_end_pos()
+        self.setCursorPosition(line, index)
+        self.ensureCursorVisible()
+        self.ensureLineVisible(line)
+
+    def get_end_pos(self):
+        """Return (line, index) position of the last character"""
+        line = self.lines() - 1
+        return (line, len(self.text(line)))
+
     def setLexers(self):
         self.lexer = QsciLexerPython()
 
@@ -203,6 +277,8 @@ class ShellOutputScintilla(QsciScintilla):
         self.setLexer(self.lexer)
 
     def clearConsole(self):
+        self.pendingOutput = []
+        self.pendingSize = 0
         self.setText('')
         self.insertInitText()
         self.shell.setFocus()
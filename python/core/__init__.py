@@ -25,7 +25,7 @@ __copyright__ = '(C) 2014, Nathan Woodrow'
 # This will get replaced with a git SHA1 when you do a git archive
 __revision__ = '$Format:%H$'
 
-from qgis.PyQt.QtCore import QCoreApplication, NULL
+from qgis.PyQt.QtCore import QCoreApplication, QVariant, NULL
 
 import inspect
 import string
@@ -73,6 +73,24 @@ def register_function(function, arg_count, group, usesgeometry=False,
 
     Eval errors can be raised using parent.setEvalErrorString("Error message")
 
+    Functions registered with batch=True are called for blocks of features:
+    feature is replaced by the list of features, each argument by the list
+    of its values (one per feature), and they should return the list of
+    results. See evaluate_expression_batch().
+
+    With an explicit arg_count, values holds the list of the value lists of
+    the arguments:
+
+    Example:
+        def myfunc(values, features, parent):
+            return [a + b for a, b in zip(*values)]
+
+    With arg_count="auto", each argument gets its own value list:
+
+    Example:
+        def myfunc(a, b, features, parent):
+            return [x + y for x, y in zip(a, b)]
+
     :param function:
     :param arg_count:
     :param group:
@@ -83,33 +101,42 @@ def register_function(function, arg_count, group, usesgeometry=False,
     class QgsPyExpressionFunction(QgsExpressionFunction):
 
         def __init__(self, func, name, args, group, helptext='', usesGeometry=True,
-                     referencedColumns=QgsFeatureRequest.ALL_ATTRIBUTES, expandargs=False):
+                     referencedColumns=QgsFeatureRequest.ALL_ATTRIBUTES, expandargs=False, usescontext=False,
+                     batch=False):
             QgsExpressionFunction.__init__(self, name, args, group, helptext)
             self.function = func
             self.expandargs = expandargs
+            self.usescontext = usescontext
+            self.batch = batch
             self.uses_geometry = usesGeometry
             self.referenced_columns = referencedColumns
 
+        def arguments(self, values, feature, parent, context):
+            args = values + [feature, parent] if self.expandargs else [values, feature, parent]
+            if self.usescontext:
+                args.append(context)
+            return args
+
         def func(self, values, context, parent, node):
             feature = None
             if context:
                 feature = context.feature()
 
             try:
-                if self.expandargs:
-                    values.append(feature)
-                    values.append(parent)
-                    if inspect.getargspec(self.function).args[-1] == 'context':
-                        values.append(context)
-                    return self.function(*values)
-                else:
-                    if inspect.getargspec(self.function).args[-1] == 'context':
-                        self.function(values, feature, parent, context)
-                    return self.function(values, feature, parent)
+                if self.batch:
+                    return self.function(*self.arguments([[v] for v in values], [feature], parent, context))[0]
+                return self.function(*self.arguments(list(values), feature, parent, context))
             except Exception as ex:
                 parent.setEvalErrorString(str(ex))
                 return None
 
+        def callBatch(self, columns, features, parent, context=None):
+            """
+            Calls a batch function for a block of features, columns holding
+            the list of values of each argument. Returns the list of results.
+            """
+            return self.function(*self.arguments(list(columns), features, parent, context))
+
         def usesGeometry(self, node):
             return self.uses_geometry
 
@@ -122,13 +149,19 @@ def register_function(function, arg_count, group, usesgeometry=False,
     helptext = helptext.strip()
     expandargs = False
 
+    # resolve the signature once rather than on each evaluation
+    try:
+        args = inspect.getfullargspec(function).args
+    except TypeError:
+        args = []
+    usescontext = len(args) > 0 and args[-1] == 'context'
+
     if arg_count == "auto":
         # Work out the number of args we need.
         # Number of function args - 2.  The last two args are always feature, parent.
-        args = inspect.getargspec(function).args
         number = len(args)
         arg_count = number - 2
-        if args[-1] == 'context':
+        if usescontext:
             arg_count -= 1
         expandargs = True
 
@@ -145,7 +178,7 @@ def register_function(function, arg_count, group, usesgeometry=False,
     function.__name__ = name
     helptext = helptemplate.safe_substitute(name=name, doc=helptext)
     f = QgsPyExpressionFunction(function, name, arg_count, group, helptext, usesgeometry, referenced_columns,
-                                expandargs)
+                                expandargs, usescontext, kwargs.get('batch', False))
 
     # This doesn't really make any sense here but does when used from a decorator context
     # so it can stay.
@@ -154,6 +187,77 @@ def register_function(function, arg_count, group, usesgeometry=False,
     return f
 
 
+def expression_batch_function(expression):
+    """
+    Returns the Python function registered with batch=True which is called
+    by an expression, if the expression is only a call to such a function,
+    None otherwise.
+    """
+    node = expression.rootNode()
+    if not isinstance(node, QgsExpressionNodeFunction):
+        return None
+    function = QgsExpression.Functions()[node.fnIndex()]
+    if not getattr(function, 'batch', False):
+        return None
+    return function
+
+
+def _isNull(value):
+    return value is None or (isinstance(value, QVariant) and value.isNull())
+
+
+def evaluate_expression_batch(expression, context, features):
+    """
+    Evaluates a prepared expression for a block of features, returning the
+    list of results.
+
+    If the expression is a call to a Python function registered with
+    batch=True, the arguments are evaluated for each feature and the
+    function is called once for the whole block (except for the features
+    with a NULL argument, which give NULL). Other expressions are evaluated
+    feature by feature.
+
+    The feature of the context is set to each feature in turn, features can
+    be a generator setting other variables of the context. On evaluation
+    errors, expression.hasEvalError() is True and all the results are None.
+    """
+    # hasEvalError() is only False for a null error string, which None gives
+    expression.setEvalErrorString(None)
+    function = expression_batch_function(expression)
+    nodes = expression.rootNode().args().list() if function is not None and expression.rootNode().args() else []
+    rows = []
+    columns = [[] for n in nodes]
+    results = []
+    features = iter(features)
+    for feature in features:
+        context.setFeature(feature)
+        if function is None:
+            results.append(expression.evaluate(context))
+        else:
+            rows.append(feature)
+            for column, node in zip(columns, nodes):
+                column.append(node.eval(expression, context))
+        if expression.hasEvalError():
+            return [None] * (len(rows) + len(results) + sum(1 for f in features))
+    if function is None:
+        return results
+
+    valid = [i for i in range(len(rows)) if not any(_isNull(column[i]) for column in columns)]
+    results = [NULL] * len(rows)
+    if valid:
+        if len(valid) < len(rows):
+            columns = [[column[i] for i in valid] for column in columns]
+            rows = [rows[i] for i in valid]
+        try:
+            values = function.callBatch(columns, rows, expression, context)
+        except Exception as ex:
+            expression.setEvalErrorString(str(ex))
+            return [None] * len(results)
+        for i, value in zip(valid, values):
+            results[i] = value
+    return results
+
+
 def qgsfunction(args='auto', group='custom', **kwargs):
     """
     Decorator function used to define a user expression function.
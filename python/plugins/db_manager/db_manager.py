@@ -138,6 +138,10 @@ class DBManager(QMainWindow):
             self.preview.loadPreview(item)
 
     def refreshActionSlot(self):
+        # read the catalog again rather than the cached metadata
+        db = self.tree.currentDatabase()
+        if db is not None:
+            db.connector.clearMetadataCache()
         self.info.setDirty()
         self.table.setDirty()
         self.preview.setDirty()
@@ -23,12 +23,12 @@ from builtins import str
 from builtins import range
 
 from functools import partial
-from qgis.PyQt.QtCore import Qt, QObject, qDebug, QByteArray, QMimeData, QDataStream, QIODevice, QFileInfo, QAbstractItemModel, QModelIndex, pyqtSignal
+from qgis.PyQt.QtCore import Qt, QObject, QTimer, qDebug, QByteArray, QMimeData, QDataStream, QIODevice, QFileInfo, QAbstractItemModel, QModelIndex, pyqtSignal
 from qgis.PyQt.QtWidgets import QApplication, QMessageBox
 from qgis.PyQt.QtGui import QIcon
 
 from .db_plugins import supportedDbTypes, createDbPlugin
-from .db_plugins.plugin import BaseError, Table, Database
+from .db_plugins.plugin import BaseError, Table, Database, runConnectorTask
 from .dlg_db_error import DlgDbError
 
 from qgis.core import QgsDataSourceUri, QgsVectorLayer, QgsRasterLayer, QgsMimeDataUtils
@@ -80,7 +80,8 @@ class TreeItem(QObject):
 
     def removeChild(self, row):
         if row >= 0 and row < len(self.childItems):
-            self.childItems[row].itemData.deleteLater()
+            if self.childItems[row].itemData is not None:
+                self.childItems[row].itemData.deleteLater()
             self.childItems[row].deleted.disconnect(self.childRemoved)
             del self.childItems[row]
 
@@ -111,6 +112,20 @@ class TreeItem(QObject):
         return pathList
 
 
+class LoadingItem(TreeItem):
+
+    """ placeholder shown while the children of an item are listed in background """
+
+    def __init__(self, parent=None):
+        TreeItem.__init__(self, None, parent)
+        self.populated = True
+
+    def data(self, column):
+        if column == 0:
+            return QApplication.translate("DBManagerPlugin", "Loading…")
+        return None
+
+
 class PluginItem(TreeItem):
 
     def __init__(self, dbplugin, parent=None):
@@ -179,6 +194,10 @@ class ConnectionItem(TreeItem):
         if schemas is not None:
             for s in schemas:
                 SchemaItem(s, self)
+        elif database.connector.hasBackgroundTaskSupport():
+            # tables are listed by DBModel in a background task
+            LoadingItem(self)
+            self.tablesToLoad = (database, None)
         else:
             tables = database.tables()
             for t in tables:
@@ -217,8 +236,14 @@ class SchemaItem(TreeItem):
         if self.populated:
             return True
 
-        for t in self.getItemData().tables():
-            TableItem(t, self)
+        schema = self.getItemData()
+        if schema.database().connector.hasBackgroundTaskSupport():
+            # tables are listed by DBModel in a background task
+            LoadingItem(self)
+            self.tablesToLoad = (schema.database(), schema)
+        else:
+            for t in schema.tables():
+                TableItem(t, self)
 
         self.populated = True
         return True
@@ -287,6 +312,9 @@ class TableItem(TreeItem):
 
 
 class DBModel(QAbstractItemModel):
+    # number of table items added to the tree at once when filled in background
+    TABLES_BATCH_SIZE = 500
+
     importVector = pyqtSignal(QgsVectorLayer, Database, QgsDataSourceUri, QModelIndex)
     notPopulated = pyqtSignal(QModelIndex)
 
@@ -388,6 +416,9 @@ class DBModel(QAbstractItemModel):
         if index.column() == 0:
             item = index.internalPointer()
 
+            if isinstance(item, LoadingItem):
+                return Qt.ItemIsEnabled
+
             if isinstance(item, SchemaItem) or isinstance(item, TableItem):
                 flags |= Qt.ItemIsEditable
 
@@ -491,12 +522,69 @@ class DBModel(QAbstractItemModel):
                         for child in item.childItems:
                             child.changed.connect(partial(self.refreshItem, child))
                         self._onDataChanged(index)
+                        if getattr(item, 'tablesToLoad', None) is not None:
+                            self._loadTables(item)
                     else:
                         self.notPopulated.emit(index)
 
             except BaseError:
                 item.populated = False
 
+    def _loadTables(self, item):
+        """ list the tables of a connection or schema item in a background
+        task, a request still running for the same item is canceled """
+        database, schema = item.tablesToLoad
+        item.tablesToLoad = None
+        # identifies this request, batches of a previous one are then dropped
+        item.tablesLoadId = getattr(item, 'tablesLoadId', 0) + 1
+        loadId = item.tablesLoadId
+
+        def done(task):
+            index = self._itemIndex(item)
+            if index is None:
+                # the item was removed from the tree in the meantime
+                return
+
+            # remove the placeholder
+            if item.childItems:
+                self.removeRows(0, len(item.childItems), index)
+            if task.error is not None or task.result is None:
+                item.populated = False
+                self.notPopulated.emit(index)
+                return
+
+            tables = [database.tablesFactory(row, database, schema) for row in task.result]
+            self._appendTables(item, loadId, tables)
+
+        runConnectorTask(item, 'tables', database.connector, 'getTables',
+                         (schema.name if schema else None,), done)
+
+    def _appendTables(self, item, loadId, tables):
+        """ add table items by batches, leaving the event loop run in between """
+        if item.tablesLoadId != loadId or not tables:
+            return
+        index = self._itemIndex(item)
+        if index is None:
+            return
+
+        batch, tables = tables[:self.TABLES_BATCH_SIZE], tables[self.TABLES_BATCH_SIZE:]
+        first = len(item.childItems)
+        self.beginInsertRows(index, first, first + len(batch) - 1)
+        for t in batch:
+            child = TableItem(t, item)
+            child.changed.connect(partial(self.refreshItem, child))
+        self.endInsertRows()
+
+        if tables:
+            QTimer.singleShot(0, partial(self._appendTables, item, loadId, tables))
+
+    def _itemIndex(self, item):
+        """ return the index of a tree item, or None if it's not in the tree anymore """
+        index = self._rPath2Index(item.path())
+        if not index.isValid() or index.internalPointer() is not item:
+            return None
+        return index
+
     def _onDataChanged(self, indexFrom, indexTo=None):
         if indexTo is None:
             indexTo = indexFrom
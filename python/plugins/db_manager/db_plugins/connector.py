@@ -22,13 +22,19 @@ email                : brush.tyler@gmail.com
 from builtins import str
 from builtins import object
 
+import sqlite3
+
 from qgis.core import QgsDataSourceUri
 
 from .plugin import DbError, ConnectionError
+from .metadata_cache import DBMetadataCache, isMetadataCacheEnabled
 
 
 class DBConnector(object):
 
+    # seconds during which the metadata cache validity token is not queried again
+    metadataCacheTokenMaxAge = 5
+
     def __init__(self, uri):
         self.connection = None
         self._uri = uri
@@ -45,6 +51,47 @@ class DBConnector(object):
     def cancel(self):
         pass
 
+    def metadataCacheToken(self):
+        """ return a cheap to compute value changing whenever the catalog
+        changes, or None if the connector doesn't support metadata caching """
+        return None
+
+    def metadataCacheKey(self):
+        return u"%s:%s" % (self.__class__.__name__, self.publicUri().uri(False))
+
+    def metadataCache(self):
+        """ return the metadata cache of this connection, or None if disabled """
+        if not hasattr(self, '_metadata_cache'):
+            self._metadata_cache = None
+            if isMetadataCacheEnabled():
+                self._metadata_cache = DBMetadataCache(self.metadataCacheKey(), self._safeMetadataCacheToken,
+                                                       self.metadataCacheTokenMaxAge)
+        return self._metadata_cache
+
+    def _safeMetadataCacheToken(self):
+        try:
+            return self.metadataCacheToken()
+        except self.error_types() + (DbError, ConnectionError):
+            return None
+
+    def clearMetadataCache(self):
+        """ forget the cached catalog data, e.g. when the user asks to refresh """
+        cache = self.metadataCache()
+        if cache is not None:
+            try:
+                cache.clear()
+            except sqlite3.Error:
+                pass
+
+    def connectorFactory(self):
+        """ return a callable creating a new connector to the same database,
+        not sharing the connection. This is called on the main thread, the
+        callable is called by background tasks and must not interact with
+        the GUI (e.g. to ask for credentials) """
+        uri = self.uri()
+        connectorClass = self.__class__
+        return lambda: connectorClass(uri)
+
     def publicUri(self):
         publicUri = QgsDataSourceUri.removePassword(self._uri.uri(False))
         return QgsDataSourceUri(publicUri)
@@ -70,6 +117,10 @@ class DBConnector(object):
     def hasCreateSpatialViewSupport(self):
         return False
 
+    def hasBackgroundTaskSupport(self):
+        """ whether connectorFactory() can be called to run queries in a background task """
+        return True
+
     def execution_error_types(self):
         raise Exception("DBConnector.execution_error_types() is an abstract method")
 
@@ -153,6 +204,10 @@ class DBConnector(object):
             raise DbError(e)
 
     def _commit(self):
+        # the catalog may have changed, revalidate the metadata cache
+        if getattr(self, '_metadata_cache', None) is not None:
+            self._metadata_cache.expireToken()
+
         try:
             self.connection.commit()
 
@@ -262,6 +262,12 @@ class GPKGVectorTable(GPKGTable, VectorTable):
         if self.extent != prevExtent:
             self.refresh()
 
+    def refreshTableEstimatedExtentInBackground(self):
+        return
+
+    def refreshTableExtentInBackground(self):
+        self.refreshTableExtent()
+
     def runAction(self, action):
         if GPKGTable.runAction(self, action):
             return True
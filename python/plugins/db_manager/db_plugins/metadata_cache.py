@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+/***************************************************************************
+Name                 : DB Manager
+Description          : Database manager plugin for QGIS
+Date                 : Oct 19, 2026
+copyright            : (C) 2026 by QGIS Development Team
+
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from builtins import str
+from builtins import object
+
+import functools
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from qgis.core import QgsApplication, QgsSettings
+
+
+def metadataCacheFile():
+    """ return the path of the SQLite file holding the cached catalog data """
+    return os.path.join(QgsApplication.qgisSettingsDirPath(), u"db_manager_metadata_cache.db")
+
+
+def isMetadataCacheEnabled():
+    return QgsSettings().value("/DB_Manager/metadataCache/enabled", True, type=bool)
+
+
+def fileMetadataCacheToken(path):
+    """ validity token part for file based databases: mtime and size of the
+    database file and of its write-ahead log, if any """
+    token = []
+    for f in (path, path + u"-wal"):
+        if os.path.exists(f):
+            st = os.stat(f)
+            token.append([st.st_mtime, st.st_size])
+    return token
+
+
+class DBMetadataCache(object):
+
+    """ Connector agnostic, persistent cache of catalog query results.
+
+    Entries are stored per connection, catalog method and arguments along
+    with a validity token provided by the connector (e.g. a catalog change
+    counter or the database file mtime). An entry is only returned while the
+    token it was stored with matches the current one, so revalidating the
+    whole cache costs a single cheap query.
+
+    Results are pickled, so that they are returned with the same types
+    (tuples, numbers, dates...) as the connector returns them.
+    """
+
+    def __init__(self, key, tokenFunc, tokenMaxAge=0, path=None):
+        self.key = key
+        self.tokenFunc = tokenFunc
+        # seconds during which a fetched validity token is trusted
+        self.tokenMaxAge = tokenMaxAge
+        self.path = path if path is not None else metadataCacheFile()
+        self._token = None
+        self._tokenTime = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute(u"""CREATE TABLE IF NOT EXISTS metadata_cache (
+                                conn TEXT NOT NULL,
+                                method TEXT NOT NULL,
+                                args TEXT NOT NULL,
+                                token TEXT NOT NULL,
+                                result BLOB NOT NULL,
+                                updated REAL NOT NULL,
+                                PRIMARY KEY (conn, method, args))""")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def token(self):
+        """ return the current validity token, querying the connector at most
+        once every tokenMaxAge seconds """
+        with self._lock:
+            now = time.time()
+            if self._token is None or now - self._tokenTime >= self.tokenMaxAge:
+                token = self.tokenFunc()
+                self._token = json.dumps(token, default=str) if token is not None else None
+                self._tokenTime = now
+            return self._token
+
+    def expireToken(self):
+        """ force the validity token to be fetched again on next access """
+        with self._lock:
+            self._token = None
+
+    @staticmethod
+    def _argsKey(args, kwargs):
+        return json.dumps([list(args), sorted(kwargs.items())], default=str)
+
+    def get(self, method, args=(), kwargs=None):
+        """ return the cached result or None if missing or stale """
+        token = self.token()
+        if token is None:
+            return None
+
+        conn = self._connect()
+        try:
+            c = conn.execute(u"SELECT result FROM metadata_cache WHERE conn = ? AND method = ? AND args = ? AND token = ?",
+                             (self.key, method, self._argsKey(args, kwargs or {}), token))
+            row = c.fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        # rows are deserialized on every access as callers modify them in place
+        return pickle.loads(row[0])
+
+    def put(self, method, args, kwargs, result):
+        token = self.token()
+        if token is None:
+            return
+
+        data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        conn = self._connect()
+        try:
+            conn.execute(u"INSERT OR REPLACE INTO metadata_cache VALUES (?, ?, ?, ?, ?, ?)",
+                         (self.key, method, self._argsKey(args, kwargs or {}), token,
+                          sqlite3.Binary(data), time.time()))
+            # drop whatever was stored against an outdated catalog state
+            conn.execute(u"DELETE FROM metadata_cache WHERE conn = ? AND token != ?", (self.key, token))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def fetch(self, method, args, kwargs, func):
+        """ return the cached result of a catalog method, calling func
+        to compute and store it if needed """
+        try:
+            result = self.get(method, args, kwargs)
+        except (sqlite3.Error, pickle.UnpicklingError):
+            return func()
+
+        if result is not None:
+            return result
+
+        result = func()
+        if result is not None:
+            try:
+                self.put(method, args, kwargs, result)
+            except (sqlite3.Error, pickle.PicklingError, TypeError):
+                # e.g. results holding values which can't be pickled
+                pass
+        return result
+
+    def clear(self):
+        """ remove every cached entry of this connection """
+        self.expireToken()
+        conn = self._connect()
+        try:
+            conn.execute(u"DELETE FROM metadata_cache WHERE conn = ?", (self.key,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def cachedMetadata(func):
+    """ decorator for DBConnector catalog methods (getTables, getTableFields, ...)
+    serving their result from the connector metadata cache when still valid """
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache = self.metadataCache()
+        if cache is None:
+            return func(self, *args, **kwargs)
+        return cache.fetch(func.__name__, args, kwargs, lambda: func(self, *args, **kwargs))
+
+    return wrapper
+
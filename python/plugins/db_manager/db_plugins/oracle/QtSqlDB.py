@@ -57,6 +57,25 @@ def TimestampFromTicks(ticks):
     return Timestamp(*time.localtime(ticks)[:6])
 
 
+def _dateTimeToString(value):
+    return value.toString() if isinstance(value, (QDate, QTime, QDateTime)) else value
+
+
+def _geometryPlaceholder(value):
+    # geometries are returned as WKB by the driver, they are not displayed
+    return u"GEOMETRY" if isinstance(value, QByteArray) else value
+
+
+def _converter(fieldType):
+    """ return the function converting the values of a field type, None
+    for the values used as returned by the driver """
+    if fieldType in (QVariant.Date, QVariant.Time, QVariant.DateTime):
+        return _dateTimeToString
+    if fieldType == QVariant.ByteArray:
+        return _geometryPlaceholder
+    return None
+
+
 class ConnectionError(Exception):
 
     def __init__(self, *args, **kwargs):
@@ -76,6 +95,13 @@ class QtSqlDBCursor(object):
         self.description = None
         self.rowcount = -1
         self.arraysize = 1
+        # converters of the fetched values, one per column of description
+        self._converters = []
+
+    def setForwardOnly(self, forward):
+        """ a forward only cursor cannot be scrolled back, but the driver
+        streams its rows instead of keeping all of them in memory """
+        self.qry.setForwardOnly(forward)
 
     def close(self):
         self.qry.finish()
@@ -96,8 +122,10 @@ class QtSqlDBCursor(object):
 
         self.rowcount = self.qry.size()
         self.description = []
-        for c in range(self.qry.record().count()):
-            f = self.qry.record().field(c)
+        self._converters = []
+        record = self.qry.record()
+        for c in range(record.count()):
+            f = record.field(c)
 
             if f.type() == QVariant.Date:
                 t = Date
@@ -116,6 +144,8 @@ class QtSqlDBCursor(object):
             else:
                 continue
 
+            self._converters.append((c, _converter(f.type())))
+
             self.description.append([
                 f.name(),                                 # name
                 t,                                        # type_code
@@ -143,42 +173,33 @@ class QtSqlDBCursor(object):
     def scroll(self, row):
         return self.qry.seek(row)
 
+    def _row(self):
+        value = self.qry.value
+        return [convert(value(c)) if convert else value(c)
+                for c, convert in self._converters]
+
     def fetchone(self):
         if not self.qry.next():
             return None
 
-        row = []
-        for i in range(len(self.description)):
-            value = self.qry.value(i)
-            if (isinstance(value, QDate) or
-                    isinstance(value, QTime) or
-                    isinstance(value, QDateTime)):
-                value = value.toString()
-            elif isinstance(value, QByteArray):
-                value = u"GEOMETRY"
-                # value = value.toHex()
-
-            row.append(value)
+        return self._row()
 
-        return row
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
 
-    def fetchmany(self, size=10):
         rows = []
-        while len(rows) < size:
-            row = self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
+        qry = self.qry
+        while len(rows) < size and qry.next():
+            rows.append(self._row())
 
         return rows
 
     def fetchall(self):
         rows = []
-        while True:
-            row = self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
+        qry = self.qry
+        while qry.next():
+            rows.append(self._row())
 
         return rows
 
@@ -192,13 +213,15 @@ class QtSqlDBCursor(object):
 class QtSqlDBConnection(object):
     connections = 0
 
-    def __init__(self, driver, dbname, user, passwd):
+    def __init__(self, driver, dbname, user, passwd, options=None):
         self.conn = QSqlDatabase.addDatabase(
             driver, "qtsql_%d" % QtSqlDBConnection.connections)
         QtSqlDBConnection.connections += 1
         self.conn.setDatabaseName(dbname)
         self.conn.setUserName(user)
         self.conn.setPassword(passwd)
+        if options:
+            self.conn.setConnectOptions(options)
 
         if not self.conn.open():
             raise ConnectionError(self.conn.lastError().databaseText())
@@ -216,5 +239,5 @@ class QtSqlDBConnection(object):
         return QtSqlDBCursor(self.conn)
 
 
-def connect(driver, dbname, user, passwd):
-    return QtSqlDBConnection(driver, dbname, user, passwd)
+def connect(driver, dbname, user, passwd, options=None):
+    return QtSqlDBConnection(driver, dbname, user, passwd, options)
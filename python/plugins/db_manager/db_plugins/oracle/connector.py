@@ -31,13 +31,22 @@ from ..connector import DBConnector
 from ..plugin import ConnectionError, DbError, Table
 
 import os
-from qgis.core import Qgis, QgsApplication, NULL, QgsWkbTypes
+from qgis.core import Qgis, QgsApplication, QgsSettings, NULL, QgsWkbTypes
 from . import QtSqlDB
 import sqlite3
 
 from functools import cmp_to_key
 
 
+def fetchSettings():
+    """ return the (prefetched rows, prefetch memory, fetch window) of
+    the Oracle connections, from the DB Manager settings """
+    settings = QgsSettings()
+    return (settings.value("/DB_Manager/oracle/prefetchRows", 1000, type=int),
+            settings.value("/DB_Manager/oracle/prefetchMemory", 0, type=int),
+            settings.value("/DB_Manager/oracle/fetchWindow", 1000, type=int))
+
+
 def classFactory():
     if QSqlDatabase.isDriverAvailable("QOCISPATIAL"):
         return OracleDBConnector
@@ -93,9 +102,15 @@ class OracleDBConnector(DBConnector):
 
         # For refreshing
         self.populated = False
+
+        # rows fetched from the server at once, instead of one by one
+        # with the OCI default settings
+        prefetchRows, prefetchMemory, self.fetchWindow = fetchSettings()
+        options = u"OCI_ATTR_PREFETCH_ROWS={};OCI_ATTR_PREFETCH_MEMORY={}".format(
+            prefetchRows, prefetchMemory)
         try:
             self.connection = QtSqlDB.connect(
-                "QOCISPATIAL", self.dbname, self.user, self.passwd)
+                "QOCISPATIAL", self.dbname, self.user, self.passwd, options)
 
         except self.connection_error_types() as e:
             raise ConnectionError(e)
@@ -168,6 +183,17 @@ class OracleDBConnector(DBConnector):
         c.close()
         return res
 
+    def connectorFactory(self):
+        uri, connName, populated = self.uri(), self.connName, self.populated
+        # only the first listing of the connection is read from the cache
+        self.populated = True
+
+        def create():
+            connector = OracleDBConnector(uri, connName)
+            connector.populated = populated
+            return connector
+        return create
+
     def hasCache(self):
         """Returns self.cache_connection."""
         if self.cache_connection:
@@ -429,13 +455,15 @@ class OracleDBConnector(DBConnector):
         """Update the SQLite cache of table list for a schema."""
 
         data = []
+        # primary keys candidates of the views, fetched at once
+        viewsPkCols = self.viewsPkCols(
+            schema, [table[1] for table in tableList if int(table[3]) == 1])
+
         # First, we treat the list
         for table in tableList:
             line = ()
             # if the table is a view bring pkCols
-            pkCols = None
-            if int(table[3]) == 1:
-                pkCols = self.pkCols((schema, table[1]))
+            pkCols = viewsPkCols.get(table[1]) if int(table[3]) == 1 else None
             # Deals with non-geographic tables
             if table[0] == Table.TableType:
                 line = (table[1], table[2], int(table[3]),
@@ -611,6 +639,16 @@ class OracleDBConnector(DBConnector):
         lst_tables = self._fetchall(c)
         c.close()
 
+        geomColumns = []
+        for tbl in lst_tables:
+            if schema:
+                table_name = u"{0}.{1}".format(self.quoteId(schema),
+                                               self.quoteId(tbl[0]))
+            else:
+                table_name = self.quoteId(tbl[0])
+            geomColumns.append((table_name, self.quoteId(tbl[3])))
+        tablesGeomTypes = self.getTablesGeomTypes(geomColumns)
+
         for i, tbl in enumerate(lst_tables):
             item = list(tbl)
             detectedSrid = item.pop()
@@ -619,14 +657,7 @@ class OracleDBConnector(DBConnector):
             else:
                 detectedSrid = int(detectedSrid)
 
-            if schema:
-                table_name = u"{0}.{1}".format(self.quoteId(schema),
-                                               self.quoteId(item[0]))
-            else:
-                table_name = self.quoteId(item[0])
-            geocol = self.quoteId(item[3])
-            geomMultiTypes, multiSrids = self.getTableGeomTypes(
-                table_name, geocol)
+            geomMultiTypes, multiSrids = tablesGeomTypes[i]
             geomtypes = list(geomMultiTypes)
             srids = list(multiSrids)
             item.insert(0, Table.VectorType)
@@ -748,24 +779,77 @@ class OracleDBConnector(DBConnector):
 
         return [x[0] for x in res] if res else None
 
-    def getTableGeomTypes(self, table, geomCol):
-        """Return all the wkbTypes for a table by requesting geometry
-        column.
-        """
+    def viewsPkCols(self, schema, views, batchSize=500):
+        """Return a dict of the primary keys candidates of several views
+        of a schema, with a query per batch of views instead of a query
+        per view."""
+        pkCols = {}
+        for start in range(0, len(views), batchSize):
+            sql = u"""
+            SELECT table_name, column_name
+            FROM all_tab_columns
+            WHERE owner={0}
+            AND table_name IN ({1})
+            ORDER BY table_name, column_id
+            """.format(self.quoteString(schema) if schema else u"user",
+                       u",".join(self.quoteString(v) for v in views[start:start + batchSize]))
+            c = self._execute(None, sql)
+            for view, column in self._fetchall(c):
+                pkCols.setdefault(view, []).append(column)
+            c.close()
+
+        return pkCols
 
+    def _geomTypesQuery(self, table, geomCol):
         estimated = u""
         if self.useEstimatedMetadata:
             estimated = u"AND ROWNUM < 100"
 
-        # Grab all of geometry types from the layer
-        query = u"""
+        return u"""
         SELECT DISTINCT a.{0}.SDO_GTYPE As gtype,
-                        a.{0}.SDO_SRID
+                        a.{0}.SDO_SRID As srid
         FROM {1} a
         WHERE a.{0} IS NOT NULL {2}
-        ORDER BY a.{0}.SDO_GTYPE
         """.format(geomCol, table, estimated)
 
+    def getTablesGeomTypes(self, geomColumns, batchSize=50):
+        """Return the wkbTypes and srids of several (table, geometry
+        column), like getTableGeomTypes, with a query per batch of
+        tables instead of a query per table.
+        """
+        rowsByTable = [[] for _ in geomColumns]
+        for start in range(0, len(geomColumns), batchSize):
+            batch = geomColumns[start:start + batchSize]
+            query = u"\nUNION ALL\n".join(
+                u"SELECT {0} As idx, gtype, srid FROM ({1})".format(
+                    start + i, self._geomTypesQuery(table, geomCol))
+                for i, (table, geomCol) in enumerate(batch))
+            query = u"{}\nORDER BY 1, 2".format(query)
+
+            try:
+                c = self._execute(None, query)
+            except DbError:
+                # a broken view in the batch, query the tables one by one
+                for i, (table, geomCol) in enumerate(batch):
+                    rowsByTable[start + i] = None
+                continue
+
+            for row in self._fetchall(c):
+                rowsByTable[int(row[0])].append(row[1:])
+            c.close()
+
+        return [self.getTableGeomTypes(table, geomCol) if rows is None
+                else self._geomTypesFromRows(rows)
+                for (table, geomCol), rows in zip(geomColumns, rowsByTable)]
+
+    def getTableGeomTypes(self, table, geomCol):
+        """Return all the wkbTypes for a table by requesting geometry
+        column.
+        """
+
+        # Grab all of geometry types from the layer
+        query = u"{}\nORDER BY 1".format(self._geomTypesQuery(table, geomCol))
+
         try:
             c = self._execute(None, query)
         except DbError:  # handle error views or other problems
@@ -774,6 +858,9 @@ class OracleDBConnector(DBConnector):
         rows = self._fetchall(c)
         c.close()
 
+        return self._geomTypesFromRows(rows)
+
+    def _geomTypesFromRows(self, rows):
         # Handle results
         if len(rows) == 0:
             return [QgsWkbTypes.Unknown], [-1]
@@ -1086,7 +1173,6 @@ class OracleDBConnector(DBConnector):
 
     def getTableEstimatedExtent(self, table, geom):
         """Find out estimated extent (from metadata view)."""
-        res = []
         schema, tablename = self.getSchemaTableName(table)
         where = u"""
         WHERE TABLE_NAME = {}
@@ -1097,31 +1183,28 @@ class OracleDBConnector(DBConnector):
             where = u"{} AND OWNER = {}".format(
                 where, self.quoteString(schema))
 
-        request = u"""
-        SELECT SDO_LB, SDO_UB
+        # both dimensions in a single query
+        sql = u"""
+        SELECT MAX(CASE WHEN SDO_DIMNAME = 'X' THEN SDO_LB END),
+               MAX(CASE WHEN SDO_DIMNAME = 'Y' THEN SDO_LB END),
+               MAX(CASE WHEN SDO_DIMNAME = 'X' THEN SDO_UB END),
+               MAX(CASE WHEN SDO_DIMNAME = 'Y' THEN SDO_UB END)
         FROM ALL_SDO_GEOM_METADATA m,
              TABLE(m.DIMINFO)
         {0}
-        AND SDO_DIMNAME = '{1}'
-        """
-        for dimension in [u"X", u"Y"]:
-            sql = request.format(where, dimension)
-            try:
-                c = self._execute(None, sql)
-            except DbError:  # no statistics for the current table
-                return None
+        """.format(where)
+        try:
+            c = self._execute(None, sql)
+        except DbError:  # no statistics for the current table
+            return None
 
-            res_d = self._fetchone(c)
-            c.close()
+        res = self._fetchone(c)
+        c.close()
 
-            if not res_d or len(res_d) < 2:
-                return None
-            elif res_d[0] == NULL:
-                return None
-            else:
-                res.extend(res_d)
+        if not res or len(res) < 4 or any(v is None or v == NULL for v in res):
+            return None
 
-        return [res[0], res[2], res[1], res[3]]
+        return res
 
     def getDefinition(self, view, objectType):
         """Returns definition of the view."""
@@ -1648,6 +1731,14 @@ class OracleDBConnector(DBConnector):
 
         return
 
+    def _execute(self, cursor, sql):
+        if cursor is None:
+            # one shot cursors are only read forward: the rows are streamed
+            # by the driver instead of being all kept in memory
+            cursor = self._get_cursor()
+            cursor.setForwardOnly(True)
+        return DBConnector._execute(self, cursor, sql)
+
     # moved into the parent class: DbConnector._execute()
     # def _execute(self, cursor, sql):
     #     pass
@@ -24,7 +24,9 @@ The content of this file is based on
 """
 from builtins import str
 
-from qgis.PyQt.QtCore import QTime
+from collections import OrderedDict
+
+from qgis.PyQt.QtCore import QTime, QTimer
 from qgis.core import QgsMessageLog
 from ..data_model import (TableDataModel,
                           SqlResultModel,
@@ -37,10 +39,19 @@ from ..plugin import BaseError
 
 class ORTableDataModel(TableDataModel):
 
+    # number of fetched windows of rows kept in memory
+    CACHED_WINDOWS = 4
+
     def __init__(self, table, parent=None):
         self.cursor = None
         TableDataModel.__init__(self, table, parent)
 
+        self.fetchedCount = self.db.fetchWindow
+        self.fetchedFrom = -self.fetchedCount - 1
+        # first row -> rows of the recently fetched windows
+        self.windows = OrderedDict()
+        self.prefetchPending = False
+
         if not self.table.rowCount:
             self.table.refreshRowCount()
 
@@ -86,6 +97,7 @@ class ORTableDataModel(TableDataModel):
     def _deleteCursor(self):
         self.db._close_cursor(self.cursor)
         self.cursor = None
+        self.windows.clear()
 
     def __del__(self):
         self.table.aboutToChange.disconnect(self._deleteCursor)
@@ -94,14 +106,8 @@ class ORTableDataModel(TableDataModel):
     def getData(self, row, col):
         if (row < self.fetchedFrom or
                 row >= self.fetchedFrom + self.fetchedCount):
-            margin = self.fetchedCount / 2
-            if row + margin >= self.rowCount():
-                start = int(self.rowCount() - margin)
-            else:
-                start = int(row - margin)
-            if start < 0:
-                start = 0
-            self.fetchMoreData(start)
+            # windows are aligned so that they can be reused
+            self.fetchMoreData(row - row % self.fetchedCount)
 
         # For some improbable cases
         if row - self.fetchedFrom >= len(self.resdata):
@@ -109,15 +115,45 @@ class ORTableDataModel(TableDataModel):
 
         return self.resdata[row - self.fetchedFrom][col]
 
-    def fetchMoreData(self, row_start):
+    def _fetchWindow(self, row_start):
         if not self.cursor:
             self._createCursor()
 
         self.cursor.scroll(row_start - 1)
+        return self.cursor.fetchmany(self.fetchedCount)
 
-        self.resdata = self.cursor.fetchmany(self.fetchedCount)
+    def _cacheWindow(self, row_start, rows):
+        self.windows.pop(row_start, None)
+        self.windows[row_start] = rows
+        while len(self.windows) > self.CACHED_WINDOWS:
+            self.windows.popitem(last=False)
+
+    def fetchMoreData(self, row_start):
+        rows = self.windows.get(row_start)
+        if rows is None:
+            rows = self._fetchWindow(row_start)
+        self._cacheWindow(row_start, rows)
+
+        self.resdata = rows
         self.fetchedFrom = row_start
 
+        # read the next window once the view is idle, so that scrolling
+        # down does not wait for the server
+        if not self.prefetchPending:
+            self.prefetchPending = True
+            QTimer.singleShot(0, self._prefetchNextWindow)
+
+    def _prefetchNextWindow(self):
+        self.prefetchPending = False
+        row_start = self.fetchedFrom + self.fetchedCount
+        if (self.cursor is None or row_start >= self.rowCount() or
+                row_start in self.windows):
+            return
+
+        self._cacheWindow(row_start, self._fetchWindow(row_start))
+        # keep the displayed window as the most recently used one
+        self._cacheWindow(self.fetchedFrom, self.resdata)
+
 
 class ORSqlResultModelTask(SqlResultModelTask):
 
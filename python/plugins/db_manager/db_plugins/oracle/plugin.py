@@ -328,7 +328,7 @@ class ORTable(Table):
 
         if action.startswith("rows/"):
             if action == "rows/recount":
-                self.refreshRowCount()
+                self.refreshRowCountInBackground()
                 return True
         elif action.startswith("index/"):
             parts = action.split('/')
@@ -27,7 +27,7 @@ from qgis.PyQt.QtWidgets import QApplication, QAction, QMenu, QInputDialog, QMes
 from qgis.PyQt.QtGui import QKeySequence, QIcon
 
 from qgis.gui import QgsMessageBar
-from qgis.core import Qgis, QgsSettings
+from qgis.core import Qgis, QgsApplication, QgsSettings, QgsTask
 from ..db_plugins import createDbPlugin
 
 
@@ -78,6 +78,71 @@ class DbError(BaseError):
         return msg
 
 
+class ConnectorTask(QgsTask):
+
+    """ Run a connector method in background.
+
+    The method is called on a new connector created in the task thread, so
+    the connection used by the GUI is never shared. The connector factory is
+    got from the connector on the main thread, where the credentials can be
+    asked. The result (or the error) is available once taskCompleted or
+    taskTerminated has been emitted.
+    """
+
+    def __init__(self, description, connector, method, args=()):
+        super().__init__(description, QgsTask.CanCancel)
+        self.connectorFactory = connector.connectorFactory()
+        self.method = method
+        self.args = args
+        self.result = None
+        self.error = None
+        self._taskConnector = None
+
+    def run(self):
+        try:
+            self._taskConnector = self.connectorFactory()
+            self.result = getattr(self._taskConnector, self.method)(*self.args)
+        except BaseError as e:
+            self.error = e
+            return False
+        finally:
+            self._taskConnector = None
+        return not self.isCanceled()
+
+    def cancel(self):
+        connector = self._taskConnector
+        if connector is not None:
+            connector.cancel()
+        super().cancel()
+
+
+def runConnectorTask(owner, key, connector, method, args, callback):
+    """ start a ConnectorTask calling callback(task) in the main thread
+    when it's done. A previous task started by the same owner with the
+    same key is canceled and its result discarded. """
+    if not hasattr(owner, '_connectorTasks'):
+        owner._connectorTasks = {}
+
+    previous = owner._connectorTasks.get(key)
+    if previous is not None:
+        previous.cancel()
+
+    task = ConnectorTask(QApplication.translate("DBManagerPlugin", "DB Manager: {0}").format(method),
+                         connector, method, args)
+
+    def done():
+        # ignore stale results
+        if owner._connectorTasks.get(key) is task:
+            del owner._connectorTasks[key]
+            callback(task)
+
+    task.taskCompleted.connect(done)
+    task.taskTerminated.connect(done)
+    owner._connectorTasks[key] = task
+    QgsApplication.taskManager().addTask(task)
+    return task
+
+
 class DBPlugin(QObject):
     deleted = pyqtSignal()
     changed = pyqtSignal()
@@ -311,6 +376,9 @@ class Database(DbItemObject):
         action = QAction(QApplication.translate("DBManagerPlugin", "&Re-connect"), self)
         mainWindow.registerAction(action, QApplication.translate("DBManagerPlugin", "&Database"),
                                   self.reconnectActionSlot)
+        action = QAction(QApplication.translate("DBManagerPlugin", "&Transfer Tables…"), self)
+        mainWindow.registerAction(action, QApplication.translate("DBManagerPlugin", "&Database"),
+                                  self.transferTablesActionSlot)
 
         if self.schemas() is not None:
             action = QAction(QApplication.translate("DBManagerPlugin", "&Create Schema…"), self)
@@ -354,6 +422,27 @@ class Database(DbItemObject):
         db.connection().reconnect()
         db.refresh()
 
+    def transferTablesActionSlot(self, item, action, parent):
+        from ..dlg_transfer_schema import DlgTransferSchema
+
+        QApplication.restoreOverrideCursor()
+        try:
+            if not isinstance(item, (DBPlugin, Schema, Table)) or item.database() is None:
+                parent.infoBar.pushMessage(
+                    QApplication.translate("DBManagerPlugin", "No database selected or you are not connected to it."),
+                    Qgis.Info, parent.iface.messageTimeout())
+                return
+
+            schema = None
+            if isinstance(item, Schema):
+                schema = item
+            elif isinstance(item, Table):
+                schema = item.schema()
+
+            DlgTransferSchema(item.database(), schema, parent).exec_()
+        finally:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+
     def deleteActionSlot(self, item, action, parent):
         if isinstance(item, Schema):
             self.deleteSchemaActionSlot(item, action, parent)
@@ -871,12 +960,29 @@ class Table(DbItemObject):
 
     def refreshRowCount(self):
         self.aboutToChange.emit()
-        prevRowCount = self.rowCount
         try:
-            self.rowCount = self.database().connector.getTableRowCount((self.schemaName(), self.name))
-            self.rowCount = int(self.rowCount) if self.rowCount is not None else None
+            rowCount = self.database().connector.getTableRowCount((self.schemaName(), self.name))
         except DbError:
-            self.rowCount = None
+            rowCount = None
+        self._setRowCount(rowCount)
+
+    def refreshRowCountInBackground(self):
+        """ count the rows in a background task, the table is refreshed
+        when done. Falls back to refreshRowCount() if the connector can't
+        run tasks. """
+        connector = self.database().connector
+        if not connector.hasBackgroundTaskSupport():
+            return self.refreshRowCount()
+
+        def done(task):
+            self.aboutToChange.emit()
+            self._setRowCount(task.result if task.error is None else None)
+
+        runConnectorTask(self, 'rowCount', connector, 'getTableRowCount', ((self.schemaName(), self.name),), done)
+
+    def _setRowCount(self, rowCount):
+        prevRowCount = self.rowCount
+        self.rowCount = int(rowCount) if rowCount is not None else None
         if self.rowCount != prevRowCount:
             self.refresh()
 
@@ -885,7 +991,7 @@ class Table(DbItemObject):
 
         if action.startswith("rows/"):
             if action == "rows/count":
-                self.refreshRowCount()
+                self.refreshRowCountInBackground()
                 return True
 
         elif action.startswith("triggers/"):
@@ -1002,6 +1108,38 @@ class VectorTable(Table):
         if self.estimatedExtent != prevEstimatedExtent:
             self.refresh()
 
+    def refreshTableExtentInBackground(self):
+        """ compute the extent in a background task, the table is refreshed
+        when done """
+        connector = self.database().connector
+        if not connector.hasBackgroundTaskSupport():
+            return self.refreshTableExtent()
+
+        def done(task):
+            prevExtent = self.extent
+            self.extent = task.result if task.error is None else None
+            if self.extent != prevExtent:
+                self.refresh()
+
+        runConnectorTask(self, 'extent', connector, 'getTableExtent',
+                         ((self.schemaName(), self.name), self.geomColumn), done)
+
+    def refreshTableEstimatedExtentInBackground(self):
+        """ fetch the estimated extent in a background task, the table is
+        refreshed when done """
+        connector = self.database().connector
+        if not connector.hasBackgroundTaskSupport():
+            return self.refreshTableEstimatedExtent()
+
+        def done(task):
+            prevEstimatedExtent = self.estimatedExtent
+            self.estimatedExtent = task.result if task.error is None else None
+            if self.estimatedExtent != prevEstimatedExtent:
+                self.refresh()
+
+        runConnectorTask(self, 'estimatedExtent', connector, 'getTableEstimatedExtent',
+                         ((self.schemaName(), self.name), self.geomColumn), done)
+
     def runAction(self, action):
         action = str(action)
 
@@ -1028,11 +1166,11 @@ class VectorTable(Table):
 
         if action.startswith("extent/"):
             if action == "extent/get":
-                self.refreshTableExtent()
+                self.refreshTableExtentInBackground()
                 return True
 
             if action == "extent/estimated/get":
-                self.refreshTableEstimatedExtent()
+                self.refreshTableEstimatedExtentInBackground()
                 return True
 
         return Table.runAction(self, action)
@@ -30,6 +30,7 @@ from qgis.PyQt.QtCore import QRegExp
 from qgis.core import Qgis, QgsCredentials, QgsDataSourceUri
 
 from ..connector import DBConnector
+from ..metadata_cache import cachedMetadata
 from ..plugin import ConnectionError, DbError, Table
 
 import os
@@ -46,8 +47,12 @@ def classFactory():
 
 class PostGisDBConnector(DBConnector):
 
-    def __init__(self, uri):
+    def __init__(self, uri, interactive=True):
+        """ interactive tells whether the user can be asked for credentials
+        when the connection fails """
         DBConnector.__init__(self, uri)
+        # credentials entered by the user, if any
+        self._credentials = None
 
         self.host = uri.host() or os.environ.get('PGHOST')
         self.port = uri.port() or os.environ.get('PGPORT')
@@ -66,6 +71,8 @@ class PostGisDBConnector(DBConnector):
         try:
             self.connection = psycopg2.connect(expandedConnInfo)
         except self.connection_error_types() as e:
+            if not interactive:
+                raise ConnectionError(e)
             err = str(e)
             uri = self.uri()
             conninfo = uri.connectionInfo(False)
@@ -85,6 +92,7 @@ class PostGisDBConnector(DBConnector):
                 try:
                     self.connection = psycopg2.connect(newExpandedConnInfo)
                     QgsCredentials.instance().put(conninfo, username, password)
+                    self._credentials = (username, password)
                 except self.connection_error_types() as e:
                     if i == 2:
                         raise ConnectionError(e)
@@ -141,6 +149,17 @@ class PostGisDBConnector(DBConnector):
     def _connectionInfo(self):
         return str(self.uri().connectionInfo(True))
 
+    def connectorFactory(self):
+        uri = self.uri()
+        if self._credentials is not None:
+            # background tasks can't ask for the credentials again
+            username, password = self._credentials
+            if username:
+                uri.setUsername(username)
+            if password:
+                uri.setPassword(password)
+        return lambda: PostGisDBConnector(uri, interactive=False)
+
     def _checkSpatial(self):
         """ check whether postgis_version is present in catalog """
         c = self._execute(None, u"SELECT COUNT(*) FROM pg_proc WHERE proname = 'postgis_version'")
@@ -274,6 +293,15 @@ class PostGisDBConnector(DBConnector):
         self._close_cursor(c)
         return res
 
+    def metadataCacheToken(self):
+        """ catalog change counter: any DDL statement writes a new pg_class row version,
+        while VACUUM and ANALYZE update the row estimates in place """
+        c = self._execute(None, u"SELECT count(*), max(xmin::text::bigint), sum(reltuples::float8) FROM pg_catalog.pg_class")
+        res = self._fetchone(c)
+        self._close_cursor(c)
+        return [self.user, res[0], res[1], res[2]]
+
+    @cachedMetadata
     def getSchemas(self):
         """ get list of schemas in tuples: (oid, name, owner, perms) """
         sql = u"SELECT oid, nspname, pg_get_userbyid(nspowner), nspacl, pg_catalog.obj_description(oid) FROM pg_namespace WHERE nspname !~ '^pg_' AND nspname != 'information_schema' ORDER BY nspname"
@@ -283,6 +311,7 @@ class PostGisDBConnector(DBConnector):
         self._close_cursor(c)
         return res
 
+    @cachedMetadata
     def getTables(self, schema=None, add_sys_tables=False):
         """ get list of tables """
         tablenames = []
@@ -339,6 +368,7 @@ class PostGisDBConnector(DBConnector):
 
         return sorted(items, key=cmp_to_key(lambda x, y: (x[1] > y[1]) - (x[1] < y[1])))
 
+    @cachedMetadata
     def getVectorTables(self, schema=None):
         """ get list of table with a geometry column
                 it returns:
@@ -407,6 +437,7 @@ class PostGisDBConnector(DBConnector):
 
         return items
 
+    @cachedMetadata
     def getRasterTables(self, schema=None):
         """ get list of table with a raster column
                 it returns:
@@ -485,6 +516,7 @@ class PostGisDBConnector(DBConnector):
         self._close_cursor(c)
         return res
 
+    @cachedMetadata
     def getTableFields(self, table):
         """ return list of columns in table """
 
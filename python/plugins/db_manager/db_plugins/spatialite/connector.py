@@ -28,6 +28,7 @@ from qgis.PyQt.QtCore import QFile
 from qgis.PyQt.QtWidgets import QApplication
 
 from ..connector import DBConnector
+from ..metadata_cache import cachedMetadata, fileMetadataCacheToken
 from ..plugin import ConnectionError, DbError, Table
 
 from qgis.utils import spatialite_connect
@@ -40,6 +41,9 @@ def classFactory():
 
 class SpatiaLiteDBConnector(DBConnector):
 
+    # revalidating the metadata cache is cheap enough to be done on every access
+    metadataCacheTokenMaxAge = 0
+
     def __init__(self, uri):
         DBConnector.__init__(self, uri)
 
@@ -163,9 +167,15 @@ class SpatiaLiteDBConnector(DBConnector):
             "date", "datetime"  # date/time
         ]
 
+    def metadataCacheToken(self):
+        """ SQLite increments the schema version on every DDL statement """
+        c = self._execute(None, u"PRAGMA schema_version")
+        return [c.fetchone()[0], fileMetadataCacheToken(self.dbname)]
+
     def getSchemas(self):
         return None
 
+    @cachedMetadata
     def getTables(self, schema=None, add_sys_tables=False):
         """ get list of tables """
         tablenames = []
@@ -232,6 +242,7 @@ class SpatiaLiteDBConnector(DBConnector):
 
         return sorted(items, key=cmp_to_key(lambda x, y: (x[1] > y[1]) - (x[1] < y[1])))
 
+    @cachedMetadata
     def getVectorTables(self, schema=None):
         """ get list of table with a geometry column
                 it returns:
@@ -286,6 +297,7 @@ class SpatiaLiteDBConnector(DBConnector):
 
         return items
 
+    @cachedMetadata
     def getRasterTables(self, schema=None):
         """ get list of table with a geometry column
                 it returns:
@@ -327,6 +339,7 @@ class SpatiaLiteDBConnector(DBConnector):
         ret = c.fetchone()
         return ret[0] if ret is not None else None
 
+    @cachedMetadata
     def getTableFields(self, table):
         """ return list of columns in table """
         c = self._get_cursor()
@@ -250,6 +250,9 @@ class SLVectorTable(SLTable, VectorTable):
     def refreshTableEstimatedExtent(self):
         return
 
+    def refreshTableEstimatedExtentInBackground(self):
+        return
+
     def runAction(self, action):
         if SLTable.runAction(self, action):
             return True
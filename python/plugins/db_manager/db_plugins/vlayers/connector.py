@@ -162,6 +162,10 @@ class VLayerConnector(DBConnector):
     def hasTableColumnEditingSupport(self):
         return False
 
+    def hasBackgroundTaskSupport(self):
+        # virtual layers live in the project, they can't be opened from another thread
+        return False
+
     def fieldTypes(self):
         return [
             "integer", "bigint", "smallint",  # integers
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+"""
+/***************************************************************************
+Name                 : DB Manager
+Description          : Database manager plugin for QGIS
+Date                 : Oct 19, 2026
+copyright            : (C) 2026 by QGIS Development Team
+
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from builtins import str
+from builtins import object
+from builtins import range
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from qgis.PyQt.QtWidgets import QApplication
+from qgis.core import (QgsCoordinateReferenceSystem,
+                       QgsCoordinateTransformContext,
+                       QgsFeature,
+                       QgsFeatureRequest,
+                       QgsFeatureSink,
+                       QgsTask,
+                       QgsVectorDataProvider,
+                       QgsVectorLayer,
+                       QgsVectorLayerExporter,
+                       QgsWkbTypes)
+
+from .db_plugins.plugin import BaseError
+
+# providers of file based databases (GeoPackage, SpatiaLite), which allow a single writer
+SINGLE_WRITER_PROVIDERS = ('ogr', 'spatialite')
+
+
+def tableSource(table):
+    """ return the (uri, providerName) a table is loaded from, i.e. the
+    ones of its "type:provider:name:uri" mime uri. Table names may contain ':' """
+    _, providerName, nameAndUri = table.mimeUri().split(u":", 2)
+    return nameAndUri[len(table.name) + 1:], providerName
+
+
+def layerExportDestination(db, outUri, table, options):
+    """ return the (uri, providerName) to pass to QgsVectorLayerExporter for
+    exporting a layer to table of db, outUri having its data source set.
+    options is updated with the settings the provider requires """
+    typeName = db.dbplugin().typeName()
+    providerName = db.dbplugin().providerName()
+    if typeName == 'gpkg':
+        uri = outUri.database()
+        options['update'] = True
+        options['driverName'] = 'GPKG'
+        options['layerName'] = table
+    else:
+        uri = outUri.uri(False)
+    return uri, providerName
+
+
+class TransferError(BaseError):
+    pass
+
+
+class TableTransfer(object):
+
+    """ Copy of a single table, as run by SchemaTransferTask """
+
+    Pending, Running, Done, Failed, Canceled = list(range(5))
+
+    def __init__(self, name, sourceUri, sourceProvider, destinationUri, providerName, options=None,
+                 destinationCrs=None, transformContext=None, createSpatialIndex=False):
+        self.name = name
+        self.sourceUri = sourceUri
+        self.sourceProvider = sourceProvider
+        self.destinationUri = destinationUri
+        self.providerName = providerName
+        self.options = dict(options) if options else {}
+        self.destinationCrs = destinationCrs if destinationCrs is not None else QgsCoordinateReferenceSystem()
+        self.transformContext = transformContext if transformContext is not None else QgsCoordinateTransformContext()
+        self.createSpatialIndex = createSpatialIndex
+
+        self.status = TableTransfer.Pending
+        self.attempts = 0
+        self.featureCount = -1
+        self.written = 0
+        self.elapsed = 0.0
+        self.error = None
+        # whether the destination table was created by a previous attempt
+        self.created = False
+
+    def throughput(self):
+        """ features written per second """
+        return self.written / self.elapsed if self.elapsed > 0 else 0.0
+
+    def statusString(self):
+        return [QApplication.translate("DBManagerPlugin", "Pending"),
+                QApplication.translate("DBManagerPlugin", "Running"),
+                QApplication.translate("DBManagerPlugin", "Done"),
+                QApplication.translate("DBManagerPlugin", "Failed"),
+                QApplication.translate("DBManagerPlugin", "Canceled")][self.status]
+
+
+class SchemaTransferTask(QgsTask):
+
+    """ Copy many tables with a bounded pool of worker threads.
+
+    Each table is created with QgsVectorLayerExporter (using the same options
+    as exportLayer), then filled by batches of batchSize features, each batch
+    being written by a single addFeatures call, i.e. a single transaction for
+    the database providers. A failed table is dropped and copied again up to
+    retries times. Tables are copied one at a time to file based databases,
+    which allow a single writer.
+    """
+
+    def __init__(self, transfers, maxWorkers=4, batchSize=5000, retries=2):
+        super().__init__(QApplication.translate("DBManagerPlugin", "Transfer {0} tables").format(len(transfers)),
+                         QgsTask.CanCancel)
+        self.transfers = transfers
+        if any(t.providerName in SINGLE_WRITER_PROVIDERS for t in transfers):
+            maxWorkers = 1
+        self.maxWorkers = max(1, maxWorkers)
+        self.batchSize = max(1, batchSize)
+        self.retries = max(0, retries)
+        self._lock = threading.Lock()
+        self._finishedCount = 0
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            for transfer in self.transfers:
+                executor.submit(self._runTransfer, transfer)
+
+        return all(t.status == TableTransfer.Done for t in self.transfers)
+
+    def _runTransfer(self, transfer):
+        while transfer.attempts <= self.retries:
+            if self.isCanceled():
+                transfer.status = TableTransfer.Canceled
+                break
+
+            transfer.attempts += 1
+            transfer.status = TableTransfer.Running
+            transfer.written = 0
+            transfer.elapsed = 0.0
+            transfer.error = None
+            try:
+                self.transferTable(transfer)
+                transfer.status = TableTransfer.Done
+                break
+            except TransferError as e:
+                transfer.error = e.msg
+                transfer.status = TableTransfer.Canceled if self.isCanceled() else TableTransfer.Failed
+            except Exception as e:
+                transfer.error = str(e)
+                transfer.status = TableTransfer.Failed
+
+        with self._lock:
+            self._finishedCount += 1
+            self.setProgress(100.0 * self._finishedCount / len(self.transfers))
+
+    def transferTable(self, transfer):
+        """ copy a single table, raise a TransferError on failure """
+        start = time.time()
+
+        layer = QgsVectorLayer(transfer.sourceUri, transfer.name, transfer.sourceProvider)
+        if not layer.isValid():
+            raise TransferError(QApplication.translate("DBManagerPlugin", "Unable to open the source table"))
+        transfer.featureCount = layer.featureCount()
+
+        options = dict(transfer.options)
+        # a table created by a failed attempt is replaced, never a table which already existed
+        overwrite = options.pop('overwrite', False) or transfer.created
+        forceSinglePart = options.pop('forceSinglePartGeometryType', False)
+
+        wkbType = layer.wkbType()
+        if forceSinglePart:
+            wkbType = QgsWkbTypes.singleType(wkbType)
+        crs = transfer.destinationCrs if transfer.destinationCrs.isValid() else layer.crs()
+
+        # create the destination table
+        exporter = QgsVectorLayerExporter(transfer.destinationUri, transfer.providerName, layer.fields(),
+                                          wkbType, crs, overwrite, options)
+        if exporter.errorCode() != QgsVectorLayerExporter.NoError:
+            raise TransferError(exporter.errorMessage())
+        transfer.created = True
+        del exporter
+
+        destinationUri = transfer.destinationUri
+        if transfer.providerName == 'ogr' and options.get('layerName'):
+            destinationUri += u"|layername=" + options['layerName']
+        destination = QgsVectorLayer(destinationUri, transfer.name, transfer.providerName)
+        if not destination.isValid():
+            raise TransferError(QApplication.translate("DBManagerPlugin", "Unable to open the destination table"))
+        provider = destination.dataProvider()
+
+        # map the source attributes to the destination ones (the provider may add a primary key)
+        destinationFields = destination.fields()
+        lowercase = options.get('lowercaseFieldNames', False)
+        mapping = [destinationFields.lookupField(f.name().lower() if lowercase else f.name()) for f in layer.fields()]
+
+        request = QgsFeatureRequest()
+        if wkbType == QgsWkbTypes.NoGeometry:
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+        if transfer.destinationCrs.isValid():
+            request.setDestinationCrs(transfer.destinationCrs, transfer.transformContext)
+
+        batch = []
+        for f in layer.getFeatures(request):
+            if self.isCanceled():
+                raise TransferError(QApplication.translate("DBManagerPlugin", "Canceled"))
+
+            out = QgsFeature(destinationFields)
+            if f.hasGeometry():
+                geometry = f.geometry()
+                if forceSinglePart:
+                    # as exportLayer does, only the first part of multipart geometries is kept
+                    geometry.convertToSingleType()
+                out.setGeometry(geometry)
+            attrs = f.attributes()
+            for i, idx in enumerate(mapping):
+                if idx >= 0:
+                    out.setAttribute(idx, attrs[i])
+            batch.append(out)
+
+            if len(batch) >= self.batchSize:
+                self._writeBatch(provider, batch, transfer, start)
+                batch = []
+
+        self._writeBatch(provider, batch, transfer, start)
+
+        if transfer.createSpatialIndex and wkbType != QgsWkbTypes.NoGeometry and \
+                provider.capabilities() & QgsVectorDataProvider.CreateSpatialIndex:
+            provider.createSpatialIndex()
+
+        transfer.elapsed = time.time() - start
+
+    def _writeBatch(self, provider, batch, transfer, start):
+        if batch:
+            ok, _ = provider.addFeatures(batch, QgsFeatureSink.FastInsert)
+            if not ok:
+                errors = provider.errors()
+                provider.clearErrors()
+                raise TransferError(u"\n".join(errors))
+            transfer.written += len(batch)
+        transfer.elapsed = time.time() - start
@@ -39,6 +39,7 @@ from qgis.core import (QgsDataSourceUri,
 from qgis.gui import QgsMessageViewer
 from qgis.utils import OverrideCursor
 
+from .db_transfer import layerExportDestination
 from .ui.ui_DlgImportVector import Ui_DbManagerDlgImportVector as Ui_Dialog
 
 
@@ -325,15 +326,7 @@ class DlgImportVector(QDialog, Ui_Dialog):
 
                 # get output params, update output URI
                 self.outUri.setDataSource(schema, table, geom, "", pk)
-                typeName = self.db.dbplugin().typeName()
-                providerName = self.db.dbplugin().providerName()
-                if typeName == 'gpkg':
-                    uri = self.outUri.database()
-                    options['update'] = True
-                    options['driverName'] = 'GPKG'
-                    options['layerName'] = table
-                else:
-                    uri = self.outUri.uri(False)
+                uri, providerName = layerExportDestination(self.db, self.outUri, table, options)
 
                 if self.chkDropTable.isChecked():
                     options['overwrite'] = True
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""
+/***************************************************************************
+Name                 : DB Manager
+Description          : Database manager plugin for QGIS
+Date                 : Oct 19, 2026
+copyright            : (C) 2026 by QGIS Development Team
+
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QTimer
+from qgis.PyQt.QtWidgets import QDialog, QDialogButtonBox, QMessageBox, QTableWidgetItem
+
+from qgis.core import QgsApplication, QgsDataSourceUri, QgsProject, QgsTask
+
+from .db_plugins import supportedDbTypes, createDbPlugin
+from .db_plugins.plugin import BaseError, Table
+from .db_transfer import SchemaTransferTask, TableTransfer, layerExportDestination, tableSource
+from .dlg_db_error import DlgDbError
+
+from .ui.ui_DlgTransferSchema import Ui_DbManagerDlgTransferSchema as Ui_Dialog
+
+
+class DlgTransferSchema(QDialog, Ui_Dialog):
+
+    """ Copy the tables of a schema (or of a schema-less database) to another
+    database, several tables at once """
+
+    def __init__(self, inDb, inSchema=None, parent=None):
+        QDialog.__init__(self, parent)
+        self.db = inDb
+        self.schema = inSchema
+        self.task = None
+        self.transfers = []
+        self.setupUi(self)
+
+        self.default_pk = "id"
+        self.default_geom = "geom"
+
+        self.lblSource.setText(u"%s%s" % (self.db.connection().connectionName(),
+                                          u" / %s" % self.schema.name if self.schema else u""))
+        self.editSchema.setText(self.schema.name if self.schema else u"public")
+
+        for dbtype in supportedDbTypes():
+            dbplugin = createDbPlugin(dbtype)
+            for conn in dbplugin.connections():
+                self.cboConnection.addItem(u"%s: %s" % (dbplugin.typeNameString(), conn.connectionName()), conn)
+
+        self.tblTransfers.setColumnCount(5)
+        self.tblTransfers.setHorizontalHeaderLabels([self.tr("Table"), self.tr("Status"), self.tr("Features"),
+                                                     self.tr("Features/s"), self.tr("Attempts")])
+        self.tables = [t for t in (self.schema.tables() if self.schema else self.db.tables())
+                       if t.type != Table.RasterType]
+        self.tblTransfers.setRowCount(len(self.tables))
+        for row, table in enumerate(self.tables):
+            self.tblTransfers.setItem(row, 0, QTableWidgetItem(table.name))
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.updateTransfers)
+
+        self.buttonBox.button(QDialogButtonBox.Ok).setText(self.tr("Transfer"))
+        self.buttonBox.accepted.connect(self.start)
+
+    def start(self):
+        conn = self.cboConnection.currentData()
+        if conn is None:
+            QMessageBox.critical(self, self.tr("Transfer Tables"), self.tr("Select the destination connection."))
+            return
+
+        try:
+            if conn.database() is None and not conn.connect(self):
+                return
+        except BaseError as e:
+            DlgDbError.showError(e, self)
+            return
+
+        outDb = conn.database()
+        outSchema = self.editSchema.text() if outDb.schemas() is not None else u""
+        transformContext = QgsProject.instance().transformContext()
+
+        self.transfers = []
+        for table in self.tables:
+            sourceUri, sourceProvider = tableSource(table)
+
+            srcUri = QgsDataSourceUri(sourceUri)
+            pk = srcUri.keyColumn() or self.default_pk
+            geom = None
+            if table.type == Table.VectorType:
+                geom = table.geomColumn or srcUri.geometryColumn() or self.default_geom
+
+            options = {}
+            if self.chkLowercaseFieldNames.isChecked():
+                pk = pk.lower()
+                if geom:
+                    geom = geom.lower()
+                options['lowercaseFieldNames'] = True
+            if self.chkDropTable.isChecked():
+                options['overwrite'] = True
+
+            outUri = outDb.uri()
+            outUri.setDataSource(outSchema, table.name, geom, "", pk)
+            uri, providerName = layerExportDestination(outDb, outUri, table.name, options)
+
+            self.transfers.append(TableTransfer(table.name, sourceUri, sourceProvider, uri, providerName, options,
+                                                transformContext=transformContext,
+                                                createSpatialIndex=self.chkSpatialIndex.isChecked()))
+
+        self.outDb = outDb
+        self.task = SchemaTransferTask(self.transfers, self.spinWorkers.value(), self.spinBatchSize.value(),
+                                       self.spinRetries.value())
+        self.task.taskCompleted.connect(self.transferFinished)
+        self.task.taskTerminated.connect(self.transferFinished)
+
+        self.buttonBox.button(QDialogButtonBox.Ok).setEnabled(False)
+        self.buttonBox.button(QDialogButtonBox.Close).setText(self.tr("Cancel"))
+        QgsApplication.taskManager().addTask(self.task)
+        self.timer.start()
+
+    def updateTransfers(self):
+        for row, transfer in enumerate(self.transfers):
+            if transfer.featureCount >= 0:
+                features = u"%d / %d" % (transfer.written, transfer.featureCount)
+            else:
+                features = u"%d" % transfer.written
+            values = [transfer.statusString(), features, u"%.0f" % transfer.throughput(), u"%d" % transfer.attempts]
+            for col, value in enumerate(values):
+                self.tblTransfers.setItem(row, col + 1, QTableWidgetItem(value))
+            if transfer.error:
+                self.tblTransfers.item(row, 1).setToolTip(transfer.error)
+
+    def transferFinished(self):
+        self.timer.stop()
+        self.updateTransfers()
+        self.task = None
+        self.buttonBox.button(QDialogButtonBox.Close).setText(self.tr("Close"))
+        self.outDb.refresh()
+
+        failed = [t.name for t in self.transfers if t.status != TableTransfer.Done]
+        if failed:
+            QMessageBox.warning(self, self.tr("Transfer Tables"),
+                                self.tr("{0} tables were not transferred:\n{1}").format(len(failed), u"\n".join(failed)))
+
+    def reject(self):
+        if self.task is not None and self.task.status() in (QgsTask.Queued, QgsTask.Running):
+            # stop the transfers first, the dialog can be closed once done
+            self.task.cancel()
+            return
+        QDialog.reject(self)
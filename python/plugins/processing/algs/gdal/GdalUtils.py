@@ -44,6 +44,7 @@ from qgis.core import (Qgis,
                        QgsSettings,
                        QgsCredentials,
                        QgsDataSourceUri)
+from processing.core import ProcessingProfiler
 from processing.core.ProcessingConfig import ProcessingConfig
 from processing.tools.system import isWindows, isMac
 
@@ -95,7 +96,7 @@ class GdalUtils:
             loglines = []
             loglines.append('GDAL execution console output')
             try:
-                with subprocess.Popen(
+                with ProcessingProfiler.phase('GDAL'), subprocess.Popen(
                     fused_command,
                     shell=True,
                     stdout=subprocess.PIPE,
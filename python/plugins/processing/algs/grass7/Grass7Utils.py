@@ -36,6 +36,7 @@ from qgis.core import (Qgis,
                        QgsProcessingUtils,
                        QgsMessageLog)
 from qgis.PyQt.QtCore import QCoreApplication
+from processing.core import ProcessingProfiler
 from processing.core.ProcessingConfig import ProcessingConfig
 from processing.tools.system import userFolder, isWindows, isMac, mkdir
 from processing.tests.TestData import points
@@ -356,7 +357,7 @@ class Grass7Utils:
             si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
             si.wShowWindow = subprocess.SW_HIDE
 
-        with subprocess.Popen(
+        with ProcessingProfiler.phase('GRASS'), subprocess.Popen(
                 command,
                 shell=True if isMac() else False,
                 stdout=subprocess.PIPE,
@@ -385,7 +386,7 @@ class Grass7Utils:
         # commands again.
         if not grassOutDone and outputCommands:
             command, grassenv = Grass7Utils.prepareGrassExecution(outputCommands)
-            with subprocess.Popen(
+            with ProcessingProfiler.phase('GRASS'), subprocess.Popen(
                     command,
                     shell=True if isMac() else False,
                     stdout=subprocess.PIPE,
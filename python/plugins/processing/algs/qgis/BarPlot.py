@@ -81,12 +81,10 @@ class BarPlot(QgisAlgorithm):
 
         output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
 
-        values = vector.values(source, valuefieldname)
+        values = vector.columns(source, [namefieldname, valuefieldname], feedback=feedback)
 
-        x_var = [i[namefieldname] for i in source.getFeatures()]
-
-        data = [go.Bar(x=x_var,
-                       y=values[valuefieldname])]
+        data = [go.Bar(x=values[namefieldname].tolist(),
+                       y=values[valuefieldname].tolist())]
         plt.offline.plot(data, filename=output, auto_open=False)
 
         return {self.OUTPUT: output}
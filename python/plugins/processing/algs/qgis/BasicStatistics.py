@@ -31,8 +31,7 @@ import codecs
 from qgis.PyQt.QtCore import QVariant
 from qgis.PyQt.QtGui import QIcon
 
-from qgis.core import (QgsStatisticalSummary,
-                       QgsStringStatisticalSummary,
+from qgis.core import (QgsStringStatisticalSummary,
                        QgsDateTimeStatisticalSummary,
                        QgsFeatureRequest,
                        QgsProcessingException,
@@ -43,6 +42,8 @@ from qgis.core import (QgsStatisticalSummary,
                        QgsProcessingFeatureSource)
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
+from processing.tools import vector
+from processing.tools.statistics import NumericStatistics
 
 pluginPath = os.path.split(os.path.split(os.path.dirname(__file__))[0])[0]
 
@@ -133,12 +134,11 @@ class BasicStatisticsForField(QgisAlgorithm):
             raise QgsProcessingException(self.invalidSourceError(parameters, self.INPUT))
 
         field_name = self.parameterAsString(parameters, self.FIELD_NAME, context)
-        field = source.fields().at(source.fields().lookupField(field_name))
+        field_index = source.fields().lookupField(field_name)
+        field = source.fields().at(field_index)
 
         output_file = self.parameterAsFileOutput(parameters, self.OUTPUT_HTML_FILE, context)
 
-        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes([field_name], source.fields())
-        features = source.getFeatures(request, QgsProcessingFeatureSource.FlagSkipGeometryValidityChecks)
         count = source.featureCount()
 
         data = []
@@ -146,13 +146,15 @@ class BasicStatisticsForField(QgisAlgorithm):
         results = {}
 
         if field.isNumeric():
-            d, results = self.calcNumericStats(features, feedback, field, count)
-            data.extend(d)
-        elif field.type() in (QVariant.Date, QVariant.Time, QVariant.DateTime):
-            d, results = self.calcDateTimeStats(features, feedback, field, count)
+            d, results = self.calcNumericStats(source, feedback, field_index, count)
             data.extend(d)
         else:
-            d, results = self.calcStringStats(features, feedback, field, count)
+            request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes([field_index])
+            features = source.getFeatures(request, QgsProcessingFeatureSource.FlagSkipGeometryValidityChecks)
+            if field.type() in (QVariant.Date, QVariant.Time, QVariant.DateTime):
+                d, results = self.calcDateTimeStats(features, feedback, field, field_index, count)
+            else:
+                d, results = self.calcStringStats(features, feedback, field_index, count)
             data.extend(d)
 
         if output_file:
@@ -161,62 +163,58 @@ class BasicStatisticsForField(QgisAlgorithm):
 
         return results
 
-    def calcNumericStats(self, features, feedback, field, count):
-        total = 100.0 / count if count else 0
-        stat = QgsStatisticalSummary()
-        for current, ft in enumerate(features):
-            if feedback.isCanceled():
-                break
-            stat.addVariant(ft[field.name()])
-            feedback.setProgress(int(current * total))
-        stat.finalize()
-
-        cv = stat.stDev() / stat.mean() if stat.mean() != 0 else 0
-
-        results = {self.COUNT: stat.count(),
-                   self.UNIQUE: stat.variety(),
-                   self.EMPTY: stat.countMissing(),
-                   self.FILLED: count - stat.countMissing(),
-                   self.MIN: stat.min(),
-                   self.MAX: stat.max(),
-                   self.RANGE: stat.range(),
-                   self.SUM: stat.sum(),
-                   self.MEAN: stat.mean(),
-                   self.MEDIAN: stat.median(),
-                   self.STD_DEV: stat.stDev(),
+    def calcNumericStats(self, source, feedback, field_index, count):
+        statistics = NumericStatistics(groups=1)
+        for chunk in vector.columnChunks(source, [field_index], numeric=True, feedback=feedback):
+            statistics.add(chunk[field_index])
+        stat = dict((k, v[0]) for k, v in statistics.results().items())
+
+        cv = stat['stddev'] / stat['mean'] if stat['mean'] != 0 else 0
+
+        results = {self.COUNT: stat['count'],
+                   self.UNIQUE: stat['variety'],
+                   self.EMPTY: stat['missing'],
+                   self.FILLED: count - stat['missing'],
+                   self.MIN: stat['min'],
+                   self.MAX: stat['max'],
+                   self.RANGE: stat['range'],
+                   self.SUM: stat['sum'],
+                   self.MEAN: stat['mean'],
+                   self.MEDIAN: stat['median'],
+                   self.STD_DEV: stat['stddev'],
                    self.CV: cv,
-                   self.MINORITY: stat.minority(),
-                   self.MAJORITY: stat.majority(),
-                   self.FIRSTQUARTILE: stat.firstQuartile(),
-                   self.THIRDQUARTILE: stat.thirdQuartile(),
-                   self.IQR: stat.interQuartileRange()}
+                   self.MINORITY: stat['minority'],
+                   self.MAJORITY: stat['majority'],
+                   self.FIRSTQUARTILE: stat['q1'],
+                   self.THIRDQUARTILE: stat['q3'],
+                   self.IQR: stat['iqr']}
 
         data = []
-        data.append(self.tr('Count: {}').format(stat.count()))
-        data.append(self.tr('Unique values: {}').format(stat.variety()))
-        data.append(self.tr('NULL (missing) values: {}').format(stat.countMissing()))
-        data.append(self.tr('Minimum value: {}').format(stat.min()))
-        data.append(self.tr('Maximum value: {}').format(stat.max()))
-        data.append(self.tr('Range: {}').format(stat.range()))
-        data.append(self.tr('Sum: {}').format(stat.sum()))
-        data.append(self.tr('Mean value: {}').format(stat.mean()))
-        data.append(self.tr('Median value: {}').format(stat.median()))
-        data.append(self.tr('Standard deviation: {}').format(stat.stDev()))
+        data.append(self.tr('Count: {}').format(stat['count']))
+        data.append(self.tr('Unique values: {}').format(stat['variety']))
+        data.append(self.tr('NULL (missing) values: {}').format(stat['missing']))
+        data.append(self.tr('Minimum value: {}').format(stat['min']))
+        data.append(self.tr('Maximum value: {}').format(stat['max']))
+        data.append(self.tr('Range: {}').format(stat['range']))
+        data.append(self.tr('Sum: {}').format(stat['sum']))
+        data.append(self.tr('Mean value: {}').format(stat['mean']))
+        data.append(self.tr('Median value: {}').format(stat['median']))
+        data.append(self.tr('Standard deviation: {}').format(stat['stddev']))
         data.append(self.tr('Coefficient of Variation: {}').format(cv))
-        data.append(self.tr('Minority (rarest occurring value): {}').format(stat.minority()))
-        data.append(self.tr('Majority (most frequently occurring value): {}').format(stat.majority()))
-        data.append(self.tr('First quartile: {}').format(stat.firstQuartile()))
-        data.append(self.tr('Third quartile: {}').format(stat.thirdQuartile()))
-        data.append(self.tr('Interquartile Range (IQR): {}').format(stat.interQuartileRange()))
+        data.append(self.tr('Minority (rarest occurring value): {}').format(stat['minority']))
+        data.append(self.tr('Majority (most frequently occurring value): {}').format(stat['majority']))
+        data.append(self.tr('First quartile: {}').format(stat['q1']))
+        data.append(self.tr('Third quartile: {}').format(stat['q3']))
+        data.append(self.tr('Interquartile Range (IQR): {}').format(stat['iqr']))
         return data, results
 
-    def calcStringStats(self, features, feedback, field, count):
+    def calcStringStats(self, features, feedback, field_index, count):
         total = 100.0 / count if count else 1
         stat = QgsStringStatisticalSummary()
         for current, ft in enumerate(features):
             if feedback.isCanceled():
                 break
-            stat.addValue(ft[field.name()])
+            stat.addValue(ft.attributes()[field_index])
             feedback.setProgress(int(current * total))
         stat.finalize()
 
@@ -242,13 +240,13 @@ class BasicStatisticsForField(QgisAlgorithm):
 
         return data, results
 
-    def calcDateTimeStats(self, features, feedback, field, count):
+    def calcDateTimeStats(self, features, feedback, field, field_index, count):
         total = 100.0 / count if count else 1
         stat = QgsDateTimeStatisticalSummary()
         for current, ft in enumerate(features):
             if feedback.isCanceled():
                 break
-            stat.addValue(ft[field.name()])
+            stat.addValue(ft.attributes()[field_index])
             feedback.setProgress(int(current * total))
         stat.finalize()
 
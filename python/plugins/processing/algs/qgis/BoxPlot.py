@@ -32,8 +32,7 @@ from qgis.core import (QgsProcessingException,
                        QgsProcessingParameterFeatureSource,
                        QgsProcessingParameterField,
                        QgsProcessingParameterEnum,
-                       QgsProcessingParameterFileDestination,
-                       QgsFeatureRequest)
+                       QgsProcessingParameterFileDestination)
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
 from processing.tools import vector
 
@@ -93,10 +92,7 @@ class BoxPlot(QgisAlgorithm):
 
         output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
 
-        values = vector.values(source, valuefieldname)
-
-        x_index = source.fields().lookupField(namefieldname)
-        x_var = [i[namefieldname] for i in source.getFeatures(QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes([x_index]))]
+        values = vector.columns(source, [namefieldname, valuefieldname], feedback=feedback)
 
         msdIndex = self.parameterAsEnum(parameters, self.MSD, context)
         msd = True
@@ -107,8 +103,8 @@ class BoxPlot(QgisAlgorithm):
             msd = False
 
         data = [go.Box(
-                x=x_var,
-                y=values[valuefieldname],
+                x=values[namefieldname].tolist(),
+                y=values[valuefieldname].tolist(),
                 boxmean=msd)]
 
         plt.offline.plot(data, filename=output, auto_open=False)
@@ -40,6 +40,7 @@ from qgis.core import (QgsVirtualLayerDefinition,
                        QgsProcessingException)
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
+from processing.tools.virtuallayer import VirtualLayerQueryPlan
 
 
 class ParameterExecuteSql(QgsProcessingParameterDefinition):
@@ -71,6 +72,9 @@ class ExecuteSQL(QgisAlgorithm):
     INPUT_GEOMETRY_CRS = 'INPUT_GEOMETRY_CRS'
     OUTPUT = 'OUTPUT'
 
+    # number of features written to the sink at once
+    BATCH_SIZE = 1000
+
     def group(self):
         return self.tr('Vector general')
 
@@ -128,8 +132,10 @@ class ExecuteSQL(QgisAlgorithm):
         geometry_crs = self.parameterAsCrs(parameters, self.INPUT_GEOMETRY_CRS, context)
 
         df = QgsVirtualLayerDefinition()
+        sources = []
         for layerIdx, layer in enumerate(layers):
-            df.addSource('input{}'.format(layerIdx + 1), layer.id())
+            sources.append('input{}'.format(layerIdx + 1))
+            df.addSource(sources[-1], layer.id())
 
         if query == '':
             raise QgsProcessingException(
@@ -137,7 +143,12 @@ class ExecuteSQL(QgisAlgorithm):
         else:
             localContext = self.createExpressionContext(parameters, context)
             expandedQuery = QgsExpression.replaceExpressionText(query, localContext)
-            df.setQuery(expandedQuery)
+
+            # let the input providers do the bounding box filtering of the spatial predicates
+            plan = VirtualLayerQueryPlan(expandedQuery, sources)
+            for table, geometry in plan.frames:
+                feedback.pushInfo(self.tr('Using a spatial filter on {0} for {1}').format(table, geometry))
+            df.setQuery(plan.rewrittenQuery())
 
         if uid_field:
             df.setUid(uid_field)
@@ -163,10 +174,17 @@ class ExecuteSQL(QgisAlgorithm):
 
         features = vLayer.getFeatures()
         total = 100.0 / vLayer.featureCount() if vLayer.featureCount() else 0
+        batch = []
         for current, inFeat in enumerate(features):
             if feedback.isCanceled():
                 break
 
-            sink.addFeature(inFeat, QgsFeatureSink.FastInsert)
+            batch.append(inFeat)
+            if len(batch) >= self.BATCH_SIZE:
+                sink.addFeatures(batch, QgsFeatureSink.FastInsert)
+                batch = []
             feedback.setProgress(int(current * total))
+
+        if batch and not feedback.isCanceled():
+            sink.addFeatures(batch, QgsFeatureSink.FastInsert)
         return {self.OUTPUT: dest_id}
@@ -27,16 +27,63 @@ __revision__ = '$Format:%H$'
 
 import sys
 
+import numpy
+
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (QgsProcessingException,
                        QgsField,
                        QgsFeatureSink,
+                       QgsProcessingParameterDefinition,
                        QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterBoolean,
                        QgsProcessingParameterString,
                        QgsProcessingParameterEnum,
                        QgsProcessingParameterNumber,
                        QgsProcessingParameterFeatureSink)
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
+from processing.tools import vector
+
+
+class GeometryColumn(object):
+
+    """
+    Geometries of a block of features, as seen by vectorized formulas
+    through $geom: x and y are the coordinates of the points (or of the
+    centroids of other geometries) as masked arrays, wkb the WKB buffers
+    and geometries the QgsGeometry objects, as object arrays.
+    """
+
+    def __init__(self, features):
+        self.features = features
+        self._coordinates = None
+
+    def __len__(self):
+        return len(self.features)
+
+    def coordinates(self):
+        if self._coordinates is None:
+            self._coordinates = vector.pointCoordinates(self.features)
+        return self._coordinates
+
+    @property
+    def x(self):
+        return self.coordinates()[:, 0]
+
+    @property
+    def y(self):
+        return self.coordinates()[:, 1]
+
+    @property
+    def wkb(self):
+        buffers = numpy.empty(len(self.features), dtype=object)
+        buffers[:] = [bytes(f.geometry().asWkb()) if f.hasGeometry() else None for f in self.features]
+        return buffers
+
+    @property
+    def geometries(self):
+        geometries = numpy.empty(len(self.features), dtype=object)
+        geometries[:] = [f.geometry() for f in self.features]
+        return geometries
 
 
 class FieldsPyculator(QgisAlgorithm):
@@ -48,11 +95,15 @@ class FieldsPyculator(QgisAlgorithm):
     FIELD_PRECISION = 'FIELD_PRECISION'
     GLOBAL = 'GLOBAL'
     FORMULA = 'FORMULA'
+    VECTORIZE = 'VECTORIZE'
     OUTPUT = 'OUTPUT'
     RESULT_VAR_NAME = 'value'
 
     TYPES = [QVariant.LongLong, QVariant.Double, QVariant.String]
 
+    # number of features calculated and written at once
+    BLOCK_SIZE = 10000
+
     def group(self):
         return self.tr('Vector table')
 
@@ -80,6 +131,11 @@ class FieldsPyculator(QgisAlgorithm):
                                                        self.tr('Global expression'), multiLine=True, optional=True))
         self.addParameter(QgsProcessingParameterString(self.FORMULA,
                                                        self.tr('Formula'), defaultValue='value = ', multiLine=True))
+        vectorize = QgsProcessingParameterBoolean(self.VECTORIZE,
+                                                  self.tr('Evaluate the formula on columns of values (NumPy arrays)'),
+                                                  defaultValue=False)
+        vectorize.setFlags(vectorize.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(vectorize)
         self.addParameter(QgsProcessingParameterFeatureSink(self.OUTPUT,
                                                             self.tr('Calculated')))
 
@@ -132,61 +188,137 @@ class FieldsPyculator(QgisAlgorithm):
         # Replace all special vars
         code = code.replace('$id', '__id')
         code = code.replace('$geom', '__geom')
-        need_id = code.find('__id') != -1
-        need_geom = code.find('__geom') != -1
-        need_attrs = code.find('__attr') != -1
+        self.need_id = code.find('__id') != -1
+        self.need_geom = code.find('__geom') != -1
+        self.need_attrs = code.find('__attr') != -1
 
         # Compile
         try:
-            bytecode = compile(code, '<string>', 'exec')
+            self.bytecode = compile(code, '<string>', 'exec')
         except:
             raise QgsProcessingException(
                 self.tr("FieldPyculator code execute error. Field code block can't be executed!\n{0}\n{1}").format(str(sys.exc_info()[0].__name__), str(sys.exc_info()[1])))
 
+        self.namespace = new_ns
+        self.source_fields = fields
+
         # Run
         features = source.getFeatures()
         total = 100.0 / source.featureCount() if source.featureCount() else 0
+        vectorize = self.parameterAsBool(parameters, self.VECTORIZE, context)
 
-        for current, feat in enumerate(features):
+        current = 0
+        block = []
+        for feat in features:
             if feedback.isCanceled():
                 break
+            block.append(feat)
+            if len(block) < self.BLOCK_SIZE:
+                continue
+            vectorize = self.processBlock(block, vectorize, sink, current, total, feedback)
+            current += len(block)
+            block = []
+        if block and not feedback.isCanceled():
+            self.processBlock(block, vectorize, sink, current, total, feedback)
 
-            feedback.setProgress(int(current * total))
+        return {self.OUTPUT: dest_id}
+
+    def processBlock(self, block, vectorize, sink, current, total, feedback):
+        """
+        Calculates the values of a block of features and writes them at once.
+        Returns whether the following blocks should still be vectorized.
+        """
+        values = None
+        if vectorize:
+            values = self.evaluateColumns(block)
+            if values is None:
+                feedback.pushInfo(self.tr('The formula cannot be evaluated on columns of values, '
+                                          'evaluating it feature by feature'))
+                vectorize = False
+            else:
+                feedback.setProgress(int((current + len(block)) * total))
+
+        if values is None:
+            values = []
+            for i, feat in enumerate(block):
+                if feedback.isCanceled():
+                    return vectorize
+                feedback.setProgress(int((current + i) * total))
+                values.append(self.evaluateRow(feat))
+
+        for feat, value in zip(block, values):
             attrs = feat.attributes()
-            feat_id = feat.id()
+            attrs.append(value)
+            feat.setAttributes(attrs)
+        sink.addFeatures(block, QgsFeatureSink.FastInsert)
+        return vectorize
 
-            # Add needed vars
-            if need_id:
-                new_ns['__id'] = feat_id
+    def evaluateRow(self, feat):
+        new_ns = self.namespace
 
-            if need_geom:
-                geom = feat.geometry()
-                new_ns['__geom'] = geom
+        # Add needed vars
+        if self.need_id:
+            new_ns['__id'] = feat.id()
 
-            if need_attrs:
-                pyattrs = [a for a in attrs]
-                new_ns['__attr'] = pyattrs
+        if self.need_geom:
+            new_ns['__geom'] = feat.geometry()
 
-            # Clear old result
-            if self.RESULT_VAR_NAME in new_ns:
-                del new_ns[self.RESULT_VAR_NAME]
+        if self.need_attrs:
+            new_ns['__attr'] = feat.attributes()
 
-            # Exec
-            exec(bytecode, new_ns)
+        # Clear old result
+        if self.RESULT_VAR_NAME in new_ns:
+            del new_ns[self.RESULT_VAR_NAME]
 
-            # Check result
-            if self.RESULT_VAR_NAME not in new_ns:
-                raise QgsProcessingException(
-                    self.tr("FieldPyculator code execute error\n"
-                            "Field code block does not return '{0}' variable! "
-                            "Please declare this variable in your code!").format(self.RESULT_VAR_NAME))
+        # Exec
+        exec(self.bytecode, new_ns)
 
-            # Write feature
-            attrs.append(new_ns[self.RESULT_VAR_NAME])
-            feat.setAttributes(attrs)
-            sink.addFeature(feat, QgsFeatureSink.FastInsert)
+        return self.result()
 
-        return {self.OUTPUT: dest_id}
+    def evaluateColumns(self, block):
+        """
+        Runs the code once for a block of features, with the attributes and
+        ids as NumPy arrays and the geometries as a GeometryColumn. Returns
+        the list of values, or None if the code cannot be evaluated that way.
+        """
+        new_ns = self.namespace
+        if self.need_id:
+            new_ns['__id'] = numpy.array([f.id() for f in block], dtype=numpy.int64)
+
+        if self.need_geom:
+            new_ns['__geom'] = GeometryColumn(block)
+
+        if self.need_attrs:
+            new_ns['__attr'] = vector.attributeColumns(block, self.source_fields)
+
+        if self.RESULT_VAR_NAME in new_ns:
+            del new_ns[self.RESULT_VAR_NAME]
+
+        try:
+            exec(self.bytecode, new_ns)
+        except Exception:
+            return None
+
+        value = self.result()
+        if isinstance(value, numpy.ndarray):
+            if value.ndim != 1 or len(value) != len(block):
+                return None
+            mask = numpy.ma.getmaskarray(value).tolist()
+            return [None if m else v for v, m in zip(numpy.ma.getdata(value).tolist(), mask)]
+        if isinstance(value, (list, tuple)) and len(value) == len(block):
+            return [v.item() if isinstance(v, numpy.generic) else v for v in value]
+        # scalars are not broadcast, code which is not written for columns
+        # would silently give a single value for all the features
+        return None
+
+    def result(self):
+        # Check result
+        if self.RESULT_VAR_NAME not in self.namespace:
+            raise QgsProcessingException(
+                self.tr("FieldPyculator code execute error\n"
+                        "Field code block does not return '{0}' variable! "
+                        "Please declare this variable in your code!").format(self.RESULT_VAR_NAME))
+        return self.namespace[self.RESULT_VAR_NAME]
 
     def checkParameterValues(self, parameters, context):
         # TODO check that formula is correct and fields exist
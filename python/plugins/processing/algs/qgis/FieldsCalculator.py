@@ -39,7 +39,9 @@ from qgis.core import (QgsExpression,
                        QgsProcessingParameterExpression,
                        QgsProcessingParameterString,
                        QgsProcessingParameterFeatureSink,
-                       QgsProcessingException)
+                       QgsProcessingException,
+                       evaluate_expression_batch,
+                       expression_batch_function)
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
 
 from .ui.FieldsCalculatorDialog import FieldsCalculatorDialog
@@ -57,6 +59,9 @@ class FieldsCalculator(QgisAlgorithm):
 
     TYPES = [QVariant.Double, QVariant.Int, QVariant.String, QVariant.Date]
 
+    # number of features passed at once to Python functions registered with batch=True
+    BATCH_SIZE = 1000
+
     def group(self):
         return self.tr('Vector table')
 
@@ -133,28 +138,69 @@ class FieldsCalculator(QgisAlgorithm):
         features = source.getFeatures()
         total = 100.0 / source.featureCount() if source.featureCount() else 0
 
+        def setValue(f, value):
+            attrs = f.attributes()
+            if new_field or field_index < 0:
+                attrs.append(value)
+            else:
+                attrs[field_index] = value
+            f.setAttributes(attrs)
+
+        if expression_batch_function(expression) is not None:
+            # the Python function is called once per block of features
+            current = 0
+            block = []
+            for f in features:
+                block.append(f)
+                if len(block) < self.BATCH_SIZE:
+                    continue
+                if feedback.isCanceled():
+                    break
+                self.calculateBlock(expression, exp_context, block, current + 1, setValue, sink, feedback)
+                current += len(block)
+                block = []
+                feedback.setProgress(int(current * total))
+            if block and not feedback.isCanceled():
+                self.calculateBlock(expression, exp_context, block, current + 1, setValue, sink, feedback)
+
+            return {self.OUTPUT: dest_id}
+
         for current, f in enumerate(features):
             if feedback.isCanceled():
                 break
 
-            rownum = current + 1
-            exp_context.setFeature(f)
-            exp_context.lastScope().setVariable("row_number", rownum)
-            value = expression.evaluate(exp_context)
-            if expression.hasEvalError():
-                feedback.reportError(expression.evalErrorString())
-            else:
-                attrs = f.attributes()
-                if new_field or field_index < 0:
-                    attrs.append(value)
-                else:
-                    attrs[field_index] = value
-                f.setAttributes(attrs)
-                sink.addFeature(f, QgsFeatureSink.FastInsert)
+            self.calculateFeature(expression, exp_context, f, current + 1, setValue, sink, feedback)
             feedback.setProgress(int(current * total))
 
         return {self.OUTPUT: dest_id}
 
+    def calculateBlock(self, expression, context, block, first, setValue, sink, feedback):
+        def rows():
+            for rownum, f in enumerate(block, first):
+                context.lastScope().setVariable("row_number", rownum)
+                yield f
+
+        values = evaluate_expression_batch(expression, context, rows())
+        if expression.hasEvalError():
+            # evaluate the block again feature by feature, so that only the
+            # failing features are dropped and reported
+            for rownum, f in enumerate(block, first):
+                self.calculateFeature(expression, context, f, rownum, setValue, sink, feedback)
+            return
+        for f, value in zip(block, values):
+            setValue(f, value)
+        sink.addFeatures(block, QgsFeatureSink.FastInsert)
+
+    def calculateFeature(self, expression, context, f, rownum, setValue, sink, feedback):
+        context.setFeature(f)
+        context.lastScope().setVariable("row_number", rownum)
+        value = expression.evaluate(context)
+        if expression.hasEvalError():
+            feedback.reportError(expression.evalErrorString())
+        else:
+            setValue(f, value)
+            sink.addFeature(f, QgsFeatureSink.FastInsert)
+
     def checkParameterValues(self, parameters, context):
         newField = self.parameterAsBool(parameters, self.NEW_FIELD, context)
         fieldName = self.parameterAsString(parameters, self.FIELD_NAME, context).strip()
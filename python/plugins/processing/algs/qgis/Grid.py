@@ -28,21 +28,25 @@ __revision__ = '$Format:%H$'
 import os
 import math
 
+import numpy
+
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (QgsApplication,
                        QgsField,
+                       QgsFeatureRequest,
                        QgsFeatureSink,
                        QgsFeature,
                        QgsGeometry,
-                       QgsLineString,
-                       QgsPoint,
-                       QgsPointXY,
+                       QgsRectangle,
+                       QgsSpatialIndex,
                        QgsWkbTypes,
                        QgsProcessing,
                        QgsProcessingException,
+                       QgsProcessingParameterDefinition,
                        QgsProcessingParameterEnum,
                        QgsProcessingParameterExtent,
+                       QgsProcessingParameterFeatureSource,
                        QgsProcessingParameterNumber,
                        QgsProcessingParameterDistance,
                        QgsProcessingParameterCrs,
@@ -50,9 +54,19 @@ from qgis.core import (QgsApplication,
                        QgsFields)
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
+from processing.tools import vector
 
 pluginPath = os.path.split(os.path.split(os.path.dirname(__file__))[0])[0]
 
+# number of cells generated and written at once
+BATCH_SIZE = 10000
+
+
+def _rings(*vertices):
+    """Returns an array of shape (n, len(vertices), 2) from the (x, y)
+    arrays of the vertices"""
+    return numpy.stack([numpy.stack(v, axis=1) for v in vertices], axis=1)
+
 
 class Grid(QgisAlgorithm):
     TYPE = 'TYPE'
@@ -62,6 +76,7 @@ class Grid(QgisAlgorithm):
     HOVERLAY = 'HOVERLAY'
     VOVERLAY = 'VOVERLAY'
     CRS = 'CRS'
+    MASK = 'MASK'
     OUTPUT = 'OUTPUT'
 
     def icon(self):
@@ -106,6 +121,11 @@ class Grid(QgisAlgorithm):
 
         self.addParameter(QgsProcessingParameterCrs(self.CRS, 'Grid CRS', 'ProjectCrs'))
 
+        mask = QgsProcessingParameterFeatureSource(self.MASK, self.tr('Only create cells intersecting'),
+                                                   [QgsProcessing.TypeVectorAnyGeometry], optional=True)
+        mask.setFlags(mask.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(mask)
+
         self.addParameter(QgsProcessingParameterFeatureSink(self.OUTPUT, self.tr('Grid'), type=QgsProcessing.TypeVectorPolygon))
 
     def name(self):
@@ -160,51 +180,101 @@ class Grid(QgisAlgorithm):
             raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
 
         if idx == 0:
-            self._pointGrid(
-                sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback)
+            cells = self._pointGrid(bbox, hSpacing, vSpacing, hOverlay, vOverlay)
         elif idx == 1:
-            self._lineGrid(
-                sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback)
+            cells = self._lineGrid(bbox, hSpacing, vSpacing, hOverlay, vOverlay)
         elif idx == 2:
-            self._rectangleGrid(
-                sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback)
+            cells = self._rectangleGrid(bbox, hSpacing, vSpacing, hOverlay, vOverlay)
         elif idx == 3:
-            self._diamondGrid(
-                sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback)
-        elif idx == 4:
-            self._hexagonGrid(
-                sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback)
+            cells = self._diamondGrid(bbox, hSpacing, vSpacing, hOverlay, vOverlay)
+        else:
+            cells = self._hexagonGrid(bbox, hSpacing, vSpacing, hOverlay, vOverlay)
+
+        mask = self.parameterAsSource(parameters, self.MASK, context)
+        if mask is not None:
+            mask = self._maskIndex(mask, crs, context)
+
+        self._writeCells(sink, cells, mask, feedback)
 
         return {self.OUTPUT: dest_id}
 
-    def _pointGrid(self, sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback):
-        feat = QgsFeature()
+    def _maskIndex(self, source, crs, context):
+        """Returns a spatial index of the mask features and their prepared
+        geometries"""
+        request = QgsFeatureRequest().setSubsetOfAttributes([]).setDestinationCrs(crs, context.transformContext())
+        index = QgsSpatialIndex()
+        geometries = {}
+        for f in source.getFeatures(request):
+            if not f.hasGeometry():
+                continue
+            geometry = f.geometry()
+            engine = QgsGeometry.createGeometryEngine(geometry.constGet())
+            engine.prepareGeometry()
+            geometries[f.id()] = (geometry, engine, geometry.boundingBox())
+            index.insertFeature(f)
+        return index, geometries
+
+    def _intersectingCells(self, mask, wkbs, bounds):
+        """Returns the indices of the cells intersecting the mask. Only the
+        cells within the bounding box of mask features are tested"""
+        index, geometries = mask
+        xMin, yMin, xMax, yMax = bounds
+        keep = numpy.zeros(len(wkbs), dtype=bool)
+        for fid in index.intersects(QgsRectangle(xMin.min(), yMin.min(), xMax.max(), yMax.max())):
+            geometry, engine, box = geometries[fid]
+            candidates = numpy.flatnonzero(~keep &
+                                           (xMax >= box.xMinimum()) & (xMin <= box.xMaximum()) &
+                                           (yMax >= box.yMinimum()) & (yMin <= box.yMaximum()))
+            for i in candidates.tolist():
+                cell = QgsGeometry()
+                cell.fromWkb(wkbs[i])
+                if engine.intersects(cell.constGet()):
+                    keep[i] = True
+        return numpy.flatnonzero(keep)
+
+    def _writeCells(self, sink, cells, mask, feedback):
+        """Writes batches of cells, given as their progress, WKB, attribute
+        columns and bounds arrays (xmin, ymin, xmax, ymax)"""
+        for progress, wkbs, attributes, bounds in cells:
+            if feedback.isCanceled():
+                break
 
+            attributes = list(zip(*[a.tolist() for a in attributes]))
+            if mask is not None:
+                selected = self._intersectingCells(mask, wkbs, bounds).tolist()
+                wkbs = [wkbs[i] for i in selected]
+                attributes = [attributes[i] for i in selected]
+
+            features = []
+            for wkb, attrs in zip(wkbs, attributes):
+                geometry = QgsGeometry()
+                geometry.fromWkb(wkb)
+                feat = QgsFeature()
+                feat.setGeometry(geometry)
+                feat.setAttributes(list(attrs))
+                features.append(feat)
+            sink.addFeatures(features, QgsFeatureSink.FastInsert)
+            feedback.setProgress(int(progress))
+
+    def _cellBatches(self, columns, rows):
+        """Yields the progress, and the columns, rows and ids of the cells of
+        a grid by batches, column after column"""
+        cells = columns * rows
+        for start in range(0, cells, BATCH_SIZE):
+            index = numpy.arange(start, min(start + BATCH_SIZE, cells))
+            yield (start + len(index)) * 100.0 / cells, index // rows, index % rows, index + 1
+
+    def _pointGrid(self, bbox, hSpacing, vSpacing, hOverlay, vOverlay):
         columns = int(math.ceil(float(bbox.width()) / (hSpacing - hOverlay)))
         rows = int(math.ceil(float(bbox.height()) / (vSpacing - vOverlay)))
 
-        cells = rows * columns
-        count_update = cells * 0.05
-
-        id = 1
-        count = 0
-
-        for col in range(columns):
-            for row in range(rows):
-                x = bbox.xMinimum() + (col * hSpacing - col * hOverlay)
-                y = bbox.yMaximum() - (row * vSpacing - row * vOverlay)
-                feat.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
-                feat.setAttributes([x, y, x + hSpacing, y + vSpacing, id])
-                sink.addFeature(feat, QgsFeatureSink.FastInsert)
-
-                id += 1
-                count += 1
-                if int(math.fmod(count, count_update)) == 0:
-                    feedback.setProgress(int(count / cells * 100))
-
-    def _lineGrid(self, sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback):
-        feat = QgsFeature()
+        for progress, col, row, ids in self._cellBatches(columns, rows):
+            x = bbox.xMinimum() + (col * hSpacing - col * hOverlay)
+            y = bbox.yMaximum() - (row * vSpacing - row * vOverlay)
+            yield (progress, vector.pointsWkb(numpy.stack((x, y), axis=1)),
+                   [x, y, x + hSpacing, y + vSpacing, ids], (x, y, x, y))
 
+    def _lineGrid(self, bbox, hSpacing, vSpacing, hOverlay, vOverlay):
         if hOverlay > 0:
             hSpace = [hSpacing - hOverlay, hOverlay]
         else:
@@ -215,105 +285,52 @@ class Grid(QgisAlgorithm):
         else:
             vSpace = [vSpacing, vSpacing]
 
-        count = 0
-        id = 1
-
         # latitude lines
-        count_max = bbox.height() / vSpacing
-        count_update = count_max * 0.10
+        ys = []
         y = bbox.yMaximum()
         while y >= bbox.yMinimum():
-            if feedback.isCanceled():
-                break
-
-            pt1 = QgsPoint(bbox.xMinimum(), y)
-            pt2 = QgsPoint(bbox.xMaximum(), y)
-            line = QgsLineString([pt1, pt2])
-            feat.setGeometry(QgsGeometry(line))
-            feat.setAttributes([bbox.xMinimum(),
-                                y,
-                                bbox.xMaximum(),
-                                y,
-                                id,
-                                y])
-            sink.addFeature(feat, QgsFeatureSink.FastInsert)
-            y = y - vSpace[count % 2]
-            id += 1
-            count += 1
-            if int(math.fmod(count, count_update)) == 0:
-                feedback.setProgress(int(count / count_max * 50))
-
-        feedback.setProgress(50)
+            ys.append(y)
+            y = y - vSpace[(len(ys) - 1) % 2]
 
         # longitude lines
-        # counters for progressbar - update every 5%
-        count = 0
-        count_max = bbox.width() / hSpacing
-        count_update = count_max * 0.10
+        xs = []
         x = bbox.xMinimum()
         while x <= bbox.xMaximum():
-            if feedback.isCanceled():
-                break
-
-            pt1 = QgsPoint(x, bbox.yMaximum())
-            pt2 = QgsPoint(x, bbox.yMinimum())
-            line = QgsLineString([pt1, pt2])
-            feat.setGeometry(QgsGeometry(line))
-            feat.setAttributes([x,
-                                bbox.yMaximum(),
-                                x,
-                                bbox.yMinimum(),
-                                id,
-                                x])
-            sink.addFeature(feat, QgsFeatureSink.FastInsert)
-            x = x + hSpace[count % 2]
-            id += 1
-            count += 1
-            if int(math.fmod(count, count_update)) == 0:
-                feedback.setProgress(50 + int(count / count_max * 50))
-
-    def _rectangleGrid(self, sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback):
-        feat = QgsFeature()
-
+            xs.append(x)
+            x = x + hSpace[(len(xs) - 1) % 2]
+
+        ys = numpy.array(ys)
+        xs = numpy.array(xs)
+        for start in range(0, len(ys), BATCH_SIZE):
+            y = ys[start:start + BATCH_SIZE]
+            xMin = numpy.full(len(y), bbox.xMinimum())
+            xMax = numpy.full(len(y), bbox.xMaximum())
+            ids = numpy.arange(start + 1, start + len(y) + 1)
+            yield ((start + len(y)) * 50.0 / len(ys), vector.lineStringsWkb(_rings((xMin, y), (xMax, y))),
+                   [xMin, y, xMax, y, ids, y], (xMin, y, xMax, y))
+
+        for start in range(0, len(xs), BATCH_SIZE):
+            x = xs[start:start + BATCH_SIZE]
+            yMax = numpy.full(len(x), bbox.yMaximum())
+            yMin = numpy.full(len(x), bbox.yMinimum())
+            ids = numpy.arange(len(ys) + start + 1, len(ys) + start + len(x) + 1)
+            yield (50 + (start + len(x)) * 50.0 / len(xs), vector.lineStringsWkb(_rings((x, yMax), (x, yMin))),
+                   [x, yMax, x, yMin, ids, x], (x, yMin, x, yMax))
+
+    def _rectangleGrid(self, bbox, hSpacing, vSpacing, hOverlay, vOverlay):
         columns = int(math.ceil(float(bbox.width()) / (hSpacing - hOverlay)))
         rows = int(math.ceil(float(bbox.height()) / (vSpacing - vOverlay)))
 
-        cells = rows * columns
-        count_update = cells * 0.05
-
-        id = 1
-        count = 0
-
-        for col in range(columns):
-            if feedback.isCanceled():
-                break
-
+        for progress, col, row, ids in self._cellBatches(columns, rows):
             x1 = bbox.xMinimum() + (col * hSpacing - col * hOverlay)
             x2 = x1 + hSpacing
+            y1 = bbox.yMaximum() - (row * vSpacing - row * vOverlay)
+            y2 = y1 - vSpacing
 
-            for row in range(rows):
-                y1 = bbox.yMaximum() - (row * vSpacing - row * vOverlay)
-                y2 = y1 - vSpacing
-
-                polyline = []
-                polyline.append(QgsPointXY(x1, y1))
-                polyline.append(QgsPointXY(x2, y1))
-                polyline.append(QgsPointXY(x2, y2))
-                polyline.append(QgsPointXY(x1, y2))
-                polyline.append(QgsPointXY(x1, y1))
-
-                feat.setGeometry(QgsGeometry.fromPolygonXY([polyline]))
-                feat.setAttributes([x1, y1, x2, y2, id])
-                sink.addFeature(feat, QgsFeatureSink.FastInsert)
-
-                id += 1
-                count += 1
-                if int(math.fmod(count, count_update)) == 0:
-                    feedback.setProgress(int(count / cells * 100))
-
-    def _diamondGrid(self, sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback):
-        feat = QgsFeature()
+            rings = _rings((x1, y1), (x2, y1), (x2, y2), (x1, y2), (x1, y1))
+            yield progress, vector.polygonsWkb(rings), [x1, y1, x2, y2, ids], (x1, y2, x2, y1)
 
+    def _diamondGrid(self, bbox, hSpacing, vSpacing, hOverlay, vOverlay):
         halfHSpacing = hSpacing / 2
         halfVSpacing = vSpacing / 2
 
@@ -323,50 +340,23 @@ class Grid(QgisAlgorithm):
         columns = int(math.ceil(float(bbox.width()) / (halfHSpacing - halfHOverlay)))
         rows = int(math.ceil(float(bbox.height()) / (vSpacing - halfVOverlay)))
 
-        cells = rows * columns
-        count_update = cells * 0.05
-
-        id = 1
-        count = 0
-
-        for col in range(columns):
-            if feedback.isCanceled():
-                break
-
+        for progress, col, row, ids in self._cellBatches(columns, rows):
             x = bbox.xMinimum() - (col * halfHOverlay)
             x1 = x + ((col + 0) * halfHSpacing)
             x2 = x + ((col + 1) * halfHSpacing)
             x3 = x + ((col + 2) * halfHSpacing)
 
-            for row in range(rows):
-                y = bbox.yMaximum() + (row * halfVOverlay)
-                if (col % 2) == 0:
-                    y1 = y - (((row * 2) + 0) * halfVSpacing)
-                    y2 = y - (((row * 2) + 1) * halfVSpacing)
-                    y3 = y - (((row * 2) + 2) * halfVSpacing)
-                else:
-                    y1 = y - (((row * 2) + 1) * halfVSpacing)
-                    y2 = y - (((row * 2) + 2) * halfVSpacing)
-                    y3 = y - (((row * 2) + 3) * halfVSpacing)
-
-                polyline = []
-                polyline.append(QgsPointXY(x1, y2))
-                polyline.append(QgsPointXY(x2, y1))
-                polyline.append(QgsPointXY(x3, y2))
-                polyline.append(QgsPointXY(x2, y3))
-                polyline.append(QgsPointXY(x1, y2))
-
-                feat.setGeometry(QgsGeometry.fromPolygonXY([polyline]))
-                feat.setAttributes([x1, y1, x3, y3, id])
-                sink.addFeature(feat, QgsFeatureSink.FastInsert)
-                id += 1
-                count += 1
-                if int(math.fmod(count, count_update)) == 0:
-                    feedback.setProgress(int(count / cells * 100))
-
-    def _hexagonGrid(self, sink, bbox, hSpacing, vSpacing, hOverlay, vOverlay, feedback):
-        feat = QgsFeature()
+            # odd columns are shifted down by half a cell
+            y = bbox.yMaximum() + (row * halfVOverlay)
+            odd = col % 2
+            y1 = y - (((row * 2) + odd + 0) * halfVSpacing)
+            y2 = y - (((row * 2) + odd + 1) * halfVSpacing)
+            y3 = y - (((row * 2) + odd + 2) * halfVSpacing)
 
+            rings = _rings((x1, y2), (x2, y1), (x3, y2), (x2, y3), (x1, y2))
+            yield progress, vector.polygonsWkb(rings), [x1, y1, x3, y3, ids], (x1, y3, x3, y1)
+
+    def _hexagonGrid(self, bbox, hSpacing, vSpacing, hOverlay, vOverlay):
         # To preserve symmetry, hspacing is fixed relative to vspacing
         xVertexLo = 0.288675134594813 * vSpacing
         xVertexHi = 0.577350269189626 * vSpacing
@@ -385,16 +375,7 @@ class Grid(QgisAlgorithm):
         columns = int(math.ceil(float(bbox.width()) / hOverlay))
         rows = int(math.ceil(float(bbox.height()) / (vSpacing - vOverlay)))
 
-        cells = rows * columns
-        count_update = cells * 0.05
-
-        id = 1
-        count = 0
-
-        for col in range(columns):
-            if feedback.isCanceled():
-                break
-
+        for progress, col, row, ids in self._cellBatches(columns, rows):
             # (column + 1) and (row + 1) calculation is used to maintain
             # topology between adjacent shapes and avoid overlaps/holes
             # due to rounding errors
@@ -403,29 +384,11 @@ class Grid(QgisAlgorithm):
             x3 = bbox.xMinimum() + (col * hOverlay) + hSpacing     # right
             x4 = x3 + (xVertexHi - xVertexLo)              # far right
 
-            for row in range(rows):
-                if (col % 2) == 0:
-                    y1 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + 0) * halfVSpacing)  # hi
-                    y2 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + 1) * halfVSpacing)  # mid
-                    y3 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + 2) * halfVSpacing)  # lo
-                else:
-                    y1 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + 1) * halfVSpacing)  # hi
-                    y2 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + 2) * halfVSpacing)  # mid
-                    y3 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + 3) * halfVSpacing)  # lo
-
-                polyline = []
-                polyline.append(QgsPointXY(x1, y2))
-                polyline.append(QgsPointXY(x2, y1))
-                polyline.append(QgsPointXY(x3, y1))
-                polyline.append(QgsPointXY(x4, y2))
-                polyline.append(QgsPointXY(x3, y3))
-                polyline.append(QgsPointXY(x2, y3))
-                polyline.append(QgsPointXY(x1, y2))
-
-                feat.setGeometry(QgsGeometry.fromPolygonXY([polyline]))
-                feat.setAttributes([x1, y1, x4, y3, id])
-                sink.addFeature(feat, QgsFeatureSink.FastInsert)
-                id += 1
-                count += 1
-                if int(math.fmod(count, count_update)) == 0:
-                    feedback.setProgress(int(count / cells * 100))
+            # odd columns are shifted down by half a cell
+            odd = col % 2
+            y1 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + odd + 0) * halfVSpacing)  # hi
+            y2 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + odd + 1) * halfVSpacing)  # mid
+            y3 = bbox.yMaximum() + (row * vOverlay) - (((row * 2) + odd + 2) * halfVSpacing)  # lo
+
+            rings = _rings((x1, y2), (x2, y1), (x3, y1), (x4, y2), (x3, y3), (x2, y3), (x1, y2))
+            yield progress, vector.polygonsWkb(rings), [x1, y1, x4, y3, ids], (x1, y3, x4, y1)
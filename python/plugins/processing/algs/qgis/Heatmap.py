@@ -46,6 +46,7 @@ from qgis.core import (QgsApplication,
 from qgis.analysis import QgsKernelDensityEstimation
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
+from processing.tools.kde import TiledKernelDensity
 
 pluginPath = os.path.split(os.path.split(os.path.dirname(__file__))[0])[0]
 
@@ -60,6 +61,7 @@ class Heatmap(QgisAlgorithm):
     KERNEL = 'KERNEL'
     DECAY = 'DECAY'
     OUTPUT_VALUE = 'OUTPUT_VALUE'
+    TILE_SIZE = 'TILE_SIZE'
     OUTPUT = 'OUTPUT'
 
     def icon(self):
@@ -172,6 +174,13 @@ class Heatmap(QgisAlgorithm):
         output_scaling.setFlags(output_scaling.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
         self.addParameter(output_scaling)
 
+        tile_size = QgsProcessingParameterNumber(self.TILE_SIZE,
+                                                 self.tr('Tile size in pixels (0 to disable tiling)'),
+                                                 QgsProcessingParameterNumber.Integer,
+                                                 0, True, 0)
+        tile_size.setFlags(tile_size.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(tile_size)
+
         self.addParameter(QgsProcessingParameterRasterDestination(self.OUTPUT, self.tr('Heatmap')))
 
     def processAlgorithm(self, parameters, context, feedback):
@@ -188,6 +197,7 @@ class Heatmap(QgisAlgorithm):
         output_format = QgsRasterFileWriter.driverForExtension(os.path.splitext(outputFile)[1])
         weight_field = self.parameterAsString(parameters, self.WEIGHT_FIELD, context)
         radius_field = self.parameterAsString(parameters, self.RADIUS_FIELD, context)
+        tile_size = self.parameterAsInt(parameters, self.TILE_SIZE, context)
 
         attrs = []
 
@@ -208,7 +218,10 @@ class Heatmap(QgisAlgorithm):
         kde_params.decayRatio = decay
         kde_params.outputValues = output_values
 
-        kde = QgsKernelDensityEstimation(kde_params, outputFile, output_format)
+        if tile_size > 0:
+            kde = TiledKernelDensity(kde_params, outputFile, output_format, tile_size, feedback)
+        else:
+            kde = QgsKernelDensityEstimation(kde_params, outputFile, output_format)
 
         if kde.prepare() != QgsKernelDensityEstimation.Success:
             raise QgsProcessingException(
@@ -217,7 +230,8 @@ class Heatmap(QgisAlgorithm):
         request = QgsFeatureRequest()
         request.setSubsetOfAttributes(attrs)
         features = source.getFeatures(request)
-        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        # with tiles, the second half of the progress is for the rendering
+        total = (50.0 if tile_size > 0 else 100.0) / source.featureCount() if source.featureCount() else 0
         for current, f in enumerate(features):
             if feedback.isCanceled():
                 break
@@ -81,15 +81,14 @@ class MeanAndStdDevPlot(QgisAlgorithm):
 
         output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
 
-        values = vector.values(source, namefieldname, valuefieldname)
+        values = vector.columns(source, [namefieldname, valuefieldname], feedback=feedback)
 
         d = {}
-        for i in range(len(values[namefieldname])):
-            v = values[namefieldname][i]
-            if v not in d:
-                d[v] = [values[valuefieldname][i]]
+        for name, value in zip(values[namefieldname].tolist(), values[valuefieldname].tolist()):
+            if name not in d:
+                d[name] = [value]
             else:
-                d[v].append(values[valuefieldname][i])
+                d[name].append(value)
 
         data = []
         for k, v in d.items():
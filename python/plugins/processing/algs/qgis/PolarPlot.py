@@ -79,10 +79,10 @@ class PolarPlot(QgisAlgorithm):
 
         output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
 
-        values = vector.values(source, valuefieldname)
+        values = vector.columns(source, [valuefieldname], numeric=True, feedback=feedback)[valuefieldname]
 
-        data = [go.Area(r=values[valuefieldname],
-                        t=np.degrees(np.arange(0.0, 2 * np.pi, 2 * np.pi / len(values[valuefieldname]))))]
+        data = [go.Area(r=values.tolist(),
+                        t=np.degrees(np.arange(0.0, 2 * np.pi, 2 * np.pi / len(values))))]
         plt.offline.plot(data, filename=output, auto_open=False)
 
         return {self.OUTPUT: output}
@@ -25,123 +25,134 @@ __copyright__ = '(C) 2012, Victor Olaya'
 
 __revision__ = '$Format:%H$'
 
+import importlib
+import importlib.util
 import os
 
-try:
-    import plotly  # NOQA
-    hasPlotly = True
-except:
-    hasPlotly = False
+# plotly is slow to import, only check whether it is installed
+hasPlotly = importlib.util.find_spec('plotly') is not None
 
 from qgis.core import (QgsApplication,
                        QgsProcessingProvider)
 
 from PyQt5.QtCore import QCoreApplication
 
+from processing.core.LazyAlgorithm import AlgorithmManifest, LazyAlgorithm
 from processing.script import ScriptUtils
+from processing.tools.system import userFolder
 
 from .QgisAlgorithm import QgisAlgorithm
 
-from .AddTableField import AddTableField
-from .Aggregate import Aggregate
-from .Aspect import Aspect
-from .BasicStatistics import BasicStatisticsForField
-from .CheckValidity import CheckValidity
-from .ConcaveHull import ConcaveHull
-from .CreateAttributeIndex import CreateAttributeIndex
-from .CreateConstantRaster import CreateConstantRaster
-from .Datasources2Vrt import Datasources2Vrt
-from .DefineProjection import DefineProjection
-from .Delaunay import Delaunay
-from .DeleteColumn import DeleteColumn
-from .DeleteDuplicateGeometries import DeleteDuplicateGeometries
-from .DensifyGeometries import DensifyGeometries
-from .DensifyGeometriesInterval import DensifyGeometriesInterval
-from .EliminateSelection import EliminateSelection
-from .ExecuteSQL import ExecuteSQL
-from .ExportGeometryInfo import ExportGeometryInfo
-from .ExtendLines import ExtendLines
-from .ExtentFromLayer import ExtentFromLayer
-from .ExtractSpecificVertices import ExtractSpecificVertices
-from .FieldPyculator import FieldsPyculator
-from .FieldsCalculator import FieldsCalculator
-from .FieldsMapper import FieldsMapper
-from .FindProjection import FindProjection
-from .GeometryConvert import GeometryConvert
-from .GeometryByExpression import GeometryByExpression
-from .Grid import Grid
-from .Heatmap import Heatmap
-from .Hillshade import Hillshade
-from .HubDistanceLines import HubDistanceLines
-from .HubDistancePoints import HubDistancePoints
-from .HypsometricCurves import HypsometricCurves
-from .IdwInterpolation import IdwInterpolation
-from .ImportIntoPostGIS import ImportIntoPostGIS
-from .ImportIntoSpatialite import ImportIntoSpatialite
-from .KeepNBiggestParts import KeepNBiggestParts
-from .LinesToPolygons import LinesToPolygons
-from .MinimumBoundingGeometry import MinimumBoundingGeometry
-from .NearestNeighbourAnalysis import NearestNeighbourAnalysis
-from .OffsetLine import OffsetLine
-from .Orthogonalize import Orthogonalize
-from .PointDistance import PointDistance
-from .PointsAlongGeometry import PointsAlongGeometry
-from .PointsDisplacement import PointsDisplacement
-from .PointsFromLines import PointsFromLines
-from .PointsFromPolygons import PointsFromPolygons
-from .PointsInPolygon import PointsInPolygon
-from .PointsLayerFromTable import PointsLayerFromTable
-from .PointsToPaths import PointsToPaths
-from .PoleOfInaccessibility import PoleOfInaccessibility
-from .Polygonize import Polygonize
-from .PolygonsToLines import PolygonsToLines
-from .PostGISExecuteSQL import PostGISExecuteSQL
-from .RandomExtract import RandomExtract
-from .RandomExtractWithinSubsets import RandomExtractWithinSubsets
-from .RandomPointsAlongLines import RandomPointsAlongLines
-from .RandomPointsExtent import RandomPointsExtent
-from .RandomPointsLayer import RandomPointsLayer
-from .RandomPointsPolygons import RandomPointsPolygons
-from .RandomSelection import RandomSelection
-from .RandomSelectionWithinSubsets import RandomSelectionWithinSubsets
-from .Rasterize import RasterizeAlgorithm
-from .RasterCalculator import RasterCalculator
-from .RasterLayerStatistics import RasterLayerStatistics
-from .RectanglesOvalsDiamondsFixed import RectanglesOvalsDiamondsFixed
-from .RectanglesOvalsDiamondsVariable import RectanglesOvalsDiamondsVariable
-from .RegularPoints import RegularPoints
-from .Relief import Relief
-from .ReverseLineDirection import ReverseLineDirection
-from .Ruggedness import Ruggedness
-from .SelectByAttribute import SelectByAttribute
-from .SelectByExpression import SelectByExpression
-from .ServiceAreaFromLayer import ServiceAreaFromLayer
-from .ServiceAreaFromPoint import ServiceAreaFromPoint
-from .SetMValue import SetMValue
-from .SetRasterStyle import SetRasterStyle
-from .SetVectorStyle import SetVectorStyle
-from .SetZValue import SetZValue
-from .ShortestPathLayerToPoint import ShortestPathLayerToPoint
-from .ShortestPathPointToLayer import ShortestPathPointToLayer
-from .ShortestPathPointToPoint import ShortestPathPointToPoint
-from .SingleSidedBuffer import SingleSidedBuffer
-from .Slope import Slope
-from .SnapGeometries import SnapGeometriesToLayer
-from .SpatialiteExecuteSQL import SpatialiteExecuteSQL
-from .SpatialIndex import SpatialIndex
-from .SpatialJoin import SpatialJoin
-from .SpatialJoinSummary import SpatialJoinSummary
-from .StatisticsByCategories import StatisticsByCategories
-from .SumLines import SumLines
-from .TextToFloat import TextToFloat
-from .TinInterpolation import TinInterpolation
-from .TopoColors import TopoColor
-from .TruncateTable import TruncateTable
-from .UniqueValues import UniqueValues
-from .VariableDistanceBuffer import VariableDistanceBuffer
-from .VectorSplit import VectorSplit
-from .VoronoiPolygons import VoronoiPolygons
-from .ZonalStatistics import ZonalStatistics
+# (module, class) of the algorithms
+ALGORITHMS = [('AddTableField', 'AddTableField'),
+              ('Aggregate', 'Aggregate'),
+              ('Aspect', 'Aspect'),
+              ('BasicStatistics', 'BasicStatisticsForField'),
+              ('CheckValidity', 'CheckValidity'),
+              ('ConcaveHull', 'ConcaveHull'),
+              ('CreateAttributeIndex', 'CreateAttributeIndex'),
+              ('CreateConstantRaster', 'CreateConstantRaster'),
+              ('Datasources2Vrt', 'Datasources2Vrt'),
+              ('DefineProjection', 'DefineProjection'),
+              ('Delaunay', 'Delaunay'),
+              ('DeleteColumn', 'DeleteColumn'),
+              ('DeleteDuplicateGeometries', 'DeleteDuplicateGeometries'),
+              ('DensifyGeometries', 'DensifyGeometries'),
+              ('DensifyGeometriesInterval', 'DensifyGeometriesInterval'),
+              ('EliminateSelection', 'EliminateSelection'),
+              ('ExecuteSQL', 'ExecuteSQL'),
+              ('ExportGeometryInfo', 'ExportGeometryInfo'),
+              ('ExtendLines', 'ExtendLines'),
+              ('ExtentFromLayer', 'ExtentFromLayer'),
+              ('ExtractSpecificVertices', 'ExtractSpecificVertices'),
+              ('FieldPyculator', 'FieldsPyculator'),
+              ('FieldsCalculator', 'FieldsCalculator'),
+              ('FieldsMapper', 'FieldsMapper'),
+              ('FindProjection', 'FindProjection'),
+              ('GeometryConvert', 'GeometryConvert'),
+              ('GeometryByExpression', 'GeometryByExpression'),
+              ('Grid', 'Grid'),
+              ('Heatmap', 'Heatmap'),
+              ('Hillshade', 'Hillshade'),
+              ('HubDistanceLines', 'HubDistanceLines'),
+              ('HubDistancePoints', 'HubDistancePoints'),
+              ('HypsometricCurves', 'HypsometricCurves'),
+              ('IdwInterpolation', 'IdwInterpolation'),
+              ('ImportIntoPostGIS', 'ImportIntoPostGIS'),
+              ('ImportIntoSpatialite', 'ImportIntoSpatialite'),
+              ('KeepNBiggestParts', 'KeepNBiggestParts'),
+              ('LinesToPolygons', 'LinesToPolygons'),
+              ('MinimumBoundingGeometry', 'MinimumBoundingGeometry'),
+              ('NearestNeighbourAnalysis', 'NearestNeighbourAnalysis'),
+              ('OffsetLine', 'OffsetLine'),
+              ('Orthogonalize', 'Orthogonalize'),
+              ('PointDistance', 'PointDistance'),
+              ('PointsAlongGeometry', 'PointsAlongGeometry'),
+              ('PointsDisplacement', 'PointsDisplacement'),
+              ('PointsFromLines', 'PointsFromLines'),
+              ('PointsFromPolygons', 'PointsFromPolygons'),
+              ('PointsInPolygon', 'PointsInPolygon'),
+              ('PointsLayerFromTable', 'PointsLayerFromTable'),
+              ('PointsToPaths', 'PointsToPaths'),
+              ('PoleOfInaccessibility', 'PoleOfInaccessibility'),
+              ('Polygonize', 'Polygonize'),
+              ('PolygonsToLines', 'PolygonsToLines'),
+              ('PostGISExecuteSQL', 'PostGISExecuteSQL'),
+              ('RandomExtract', 'RandomExtract'),
+              ('RandomExtractWithinSubsets', 'RandomExtractWithinSubsets'),
+              ('RandomPointsAlongLines', 'RandomPointsAlongLines'),
+              ('RandomPointsExtent', 'RandomPointsExtent'),
+              ('RandomPointsLayer', 'RandomPointsLayer'),
+              ('RandomPointsPolygons', 'RandomPointsPolygons'),
+              ('RandomSelection', 'RandomSelection'),
+              ('RandomSelectionWithinSubsets', 'RandomSelectionWithinSubsets'),
+              ('Rasterize', 'RasterizeAlgorithm'),
+              ('RasterCalculator', 'RasterCalculator'),
+              ('RasterLayerStatistics', 'RasterLayerStatistics'),
+              ('RectanglesOvalsDiamondsFixed', 'RectanglesOvalsDiamondsFixed'),
+              ('RectanglesOvalsDiamondsVariable', 'RectanglesOvalsDiamondsVariable'),
+              ('RegularPoints', 'RegularPoints'),
+              ('Relief', 'Relief'),
+              ('ReverseLineDirection', 'ReverseLineDirection'),
+              ('Ruggedness', 'Ruggedness'),
+              ('SelectByAttribute', 'SelectByAttribute'),
+              ('SelectByExpression', 'SelectByExpression'),
+              ('ServiceAreaFromLayer', 'ServiceAreaFromLayer'),
+              ('ServiceAreaFromPoint', 'ServiceAreaFromPoint'),
+              ('SetMValue', 'SetMValue'),
+              ('SetRasterStyle', 'SetRasterStyle'),
+              ('SetVectorStyle', 'SetVectorStyle'),
+              ('SetZValue', 'SetZValue'),
+              ('ShortestPathLayerToPoint', 'ShortestPathLayerToPoint'),
+              ('ShortestPathPointToLayer', 'ShortestPathPointToLayer'),
+              ('ShortestPathPointToPoint', 'ShortestPathPointToPoint'),
+              ('SingleSidedBuffer', 'SingleSidedBuffer'),
+              ('Slope', 'Slope'),
+              ('SnapGeometries', 'SnapGeometriesToLayer'),
+              ('SpatialiteExecuteSQL', 'SpatialiteExecuteSQL'),
+              ('SpatialIndex', 'SpatialIndex'),
+              ('SpatialJoin', 'SpatialJoin'),
+              ('SpatialJoinSummary', 'SpatialJoinSummary'),
+              ('StatisticsByCategories', 'StatisticsByCategories'),
+              ('SumLines', 'SumLines'),
+              ('TextToFloat', 'TextToFloat'),
+              ('TinInterpolation', 'TinInterpolation'),
+              ('TopoColors', 'TopoColor'),
+              ('TruncateTable', 'TruncateTable'),
+              ('UniqueValues', 'UniqueValues'),
+              ('VariableDistanceBuffer', 'VariableDistanceBuffer'),
+              ('VectorSplit', 'VectorSplit'),
+              ('VoronoiPolygons', 'VoronoiPolygons'),
+              ('ZonalStatistics', 'ZonalStatistics')]
+
+PLOT_ALGORITHMS = [('BarPlot', 'BarPlot'),
+                   ('BoxPlot', 'BoxPlot'),
+                   ('MeanAndStdDevPlot', 'MeanAndStdDevPlot'),
+                   ('PolarPlot', 'PolarPlot'),
+                   ('RasterLayerHistogram', 'RasterLayerHistogram'),
+                   ('VectorLayerHistogram', 'VectorLayerHistogram'),
+                   ('VectorLayerScatterplot', 'VectorLayerScatterplot'),
+                   ('VectorLayerScatterplot3D', 'VectorLayerScatterplot3D')]
 
 
 pluginPath = os.path.normpath(os.path.join(
@@ -156,127 +167,23 @@ class QgisAlgorithmProvider(QgsProcessingProvider):
         self.algs = []
         self.externalAlgs = []
 
-    def getAlgs(self):
-        algs = [AddTableField(),
-                Aggregate(),
-                Aspect(),
-                BasicStatisticsForField(),
-                CheckValidity(),
-                ConcaveHull(),
-                CreateAttributeIndex(),
-                CreateConstantRaster(),
-                Datasources2Vrt(),
-                DefineProjection(),
-                Delaunay(),
-                DeleteColumn(),
-                DeleteDuplicateGeometries(),
-                DensifyGeometries(),
-                DensifyGeometriesInterval(),
-                EliminateSelection(),
-                ExecuteSQL(),
-                ExportGeometryInfo(),
-                ExtendLines(),
-                ExtentFromLayer(),
-                ExtractSpecificVertices(),
-                FieldsCalculator(),
-                FieldsMapper(),
-                FieldsPyculator(),
-                FindProjection(),
-                GeometryByExpression(),
-                GeometryConvert(),
-                Grid(),
-                Heatmap(),
-                Hillshade(),
-                HubDistanceLines(),
-                HubDistancePoints(),
-                HypsometricCurves(),
-                IdwInterpolation(),
-                ImportIntoPostGIS(),
-                ImportIntoSpatialite(),
-                KeepNBiggestParts(),
-                LinesToPolygons(),
-                MinimumBoundingGeometry(),
-                NearestNeighbourAnalysis(),
-                OffsetLine(),
-                Orthogonalize(),
-                PointDistance(),
-                PointsAlongGeometry(),
-                PointsDisplacement(),
-                PointsFromLines(),
-                PointsFromPolygons(),
-                PointsInPolygon(),
-                PointsLayerFromTable(),
-                PointsToPaths(),
-                PoleOfInaccessibility(),
-                Polygonize(),
-                PolygonsToLines(),
-                PostGISExecuteSQL(),
-                RandomExtract(),
-                RandomExtractWithinSubsets(),
-                RandomPointsAlongLines(),
-                RandomPointsExtent(),
-                RandomPointsLayer(),
-                RandomPointsPolygons(),
-                RandomSelection(),
-                RandomSelectionWithinSubsets(),
-                RasterCalculator(),
-                RasterizeAlgorithm(),
-                RasterLayerStatistics(),
-                RectanglesOvalsDiamondsFixed(),
-                RectanglesOvalsDiamondsVariable(),
-                RegularPoints(),
-                Relief(),
-                ReverseLineDirection(),
-                Ruggedness(),
-                SelectByAttribute(),
-                SelectByExpression(),
-                ServiceAreaFromLayer(),
-                ServiceAreaFromPoint(),
-                SetMValue(),
-                SetRasterStyle(),
-                SetVectorStyle(),
-                SetZValue(),
-                ShortestPathLayerToPoint(),
-                ShortestPathPointToLayer(),
-                ShortestPathPointToPoint(),
-                SingleSidedBuffer(),
-                Slope(),
-                SnapGeometriesToLayer(),
-                SpatialiteExecuteSQL(),
-                SpatialIndex(),
-                SpatialJoin(),
-                SpatialJoinSummary(),
-                StatisticsByCategories(),
-                SumLines(),
-                TextToFloat(),
-                TinInterpolation(),
-                TopoColor(),
-                TruncateTable(),
-                UniqueValues(),
-                VariableDistanceBuffer(),
-                VectorSplit(),
-                VoronoiPolygons(),
-                ZonalStatistics()
-                ]
-
-        if hasPlotly:
-            from .BarPlot import BarPlot
-            from .BoxPlot import BoxPlot
-            from .MeanAndStdDevPlot import MeanAndStdDevPlot
-            from .PolarPlot import PolarPlot
-            from .RasterLayerHistogram import RasterLayerHistogram
-            from .VectorLayerHistogram import VectorLayerHistogram
-            from .VectorLayerScatterplot import VectorLayerScatterplot
-            from .VectorLayerScatterplot3D import VectorLayerScatterplot3D
-
-            algs.extend([BarPlot(),
-                         BoxPlot(),
-                         MeanAndStdDevPlot(),
-                         PolarPlot(),
-                         RasterLayerHistogram(),
-                         VectorLayerHistogram(),
-                         VectorLayerScatterplot(),
-                         VectorLayerScatterplot3D()])
+        algorithms = ALGORITHMS + PLOT_ALGORITHMS if hasPlotly else ALGORITHMS
+        self.manifest = AlgorithmManifest(os.path.join(userFolder(), 'qgis_algorithms.json'),
+                                          [('{}.{}'.format(__package__, module), className)
+                                           for module, className in algorithms],
+                                          [os.path.join(os.path.dirname(__file__), 'QgisAlgorithm.py'),
+                                           os.path.join(pluginPath, 'algs', 'help', 'qgis.yaml')])
+
+    def getAlgs(self, entries=None):
+        """Returns the algorithms of the provider, as stubs importing their
+        module on first use for the algorithms having a manifest entry"""
+        algs = []
+        for module, className in self.manifest.algorithms:
+            entry = entries.get('{}.{}'.format(module, className)) if entries else None
+            if entry is not None:
+                algs.append(LazyAlgorithm(entry))
+            else:
+                algs.append(getattr(importlib.import_module(module), className)())
 
         # to store algs added by 3rd party plugins as scripts
         #folder = os.path.join(os.path.dirname(__file__), 'scripts')
@@ -300,9 +207,13 @@ class QgisAlgorithmProvider(QgsProcessingProvider):
         return QgsApplication.iconPath("providerQgis.svg")
 
     def loadAlgorithms(self):
-        self.algs = self.getAlgs()
+        entries = self.manifest.read()
+        self.algs = self.getAlgs(entries)
         for a in self.algs:
             self.addAlgorithm(a)
+        if entries is None:
+            # all the algorithms were loaded, the next sessions can use stubs
+            self.manifest.write(self.algs)
         for a in self.externalAlgs:
             self.addAlgorithm(a)
 
@@ -310,6 +221,7 @@ class QgisAlgorithmProvider(QgsProcessingProvider):
         success = super().load()
 
         if success:
+            from .FieldsMapper import FieldsMapper
             self.parameterTypeFieldsMapping = FieldsMapper.ParameterFieldsMappingType()
             QgsApplication.instance().processingRegistry().addParameterType(self.parameterTypeFieldsMapping)
 
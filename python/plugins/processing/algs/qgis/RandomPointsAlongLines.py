@@ -25,20 +25,12 @@ __copyright__ = '(C) 2014, Alexander Bruy'
 
 __revision__ = '$Format:%H$'
 
-import random
-
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (QgsField,
                        QgsFeatureSink,
-                       QgsFeature,
                        QgsFields,
-                       QgsGeometry,
-                       QgsPointXY,
                        QgsWkbTypes,
-                       QgsSpatialIndex,
                        QgsFeatureRequest,
-                       QgsDistanceArea,
-                       QgsProject,
                        QgsProcessing,
                        QgsProcessingException,
                        QgsProcessingParameterDistance,
@@ -48,7 +40,7 @@ from qgis.core import (QgsField,
                        QgsProcessingParameterDefinition)
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
-from processing.tools import vector
+from processing.tools.sampling import RandomPointSampler, pointFeatures
 
 
 class RandomPointsAlongLines(QgisAlgorithm):
@@ -56,6 +48,7 @@ class RandomPointsAlongLines(QgisAlgorithm):
     INPUT = 'INPUT'
     POINTS_NUMBER = 'POINTS_NUMBER'
     MIN_DISTANCE = 'MIN_DISTANCE'
+    SEED = 'SEED'
     OUTPUT = 'OUTPUT'
 
     def group(self):
@@ -78,6 +71,12 @@ class RandomPointsAlongLines(QgisAlgorithm):
         self.addParameter(QgsProcessingParameterDistance(self.MIN_DISTANCE,
                                                          self.tr('Minimum distance between points'),
                                                          0, self.INPUT, False, 0, 1000000000))
+        seed = QgsProcessingParameterNumber(self.SEED,
+                                            self.tr('Random seed'),
+                                            QgsProcessingParameterNumber.Integer,
+                                            None, True, 0)
+        seed.setFlags(seed.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(seed)
         self.addParameter(QgsProcessingParameterFeatureSink(self.OUTPUT,
                                                             self.tr('Random points'),
                                                             type=QgsProcessing.TypeVectorPoint))
@@ -95,6 +94,7 @@ class RandomPointsAlongLines(QgisAlgorithm):
 
         pointCount = self.parameterAsDouble(parameters, self.POINTS_NUMBER, context)
         minDistance = self.parameterAsDouble(parameters, self.MIN_DISTANCE, context)
+        seed = self.parameterAsInt(parameters, self.SEED, context) if parameters.get(self.SEED) is not None else None
 
         fields = QgsFields()
         fields.append(QgsField('id', QVariant.Int, '', 10, 0))
@@ -104,72 +104,21 @@ class RandomPointsAlongLines(QgisAlgorithm):
         if sink is None:
             raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
 
+        request = QgsFeatureRequest().setSubsetOfAttributes([])
+        geometries = [f.geometry() for f in source.getFeatures(request) if f.hasGeometry()]
+
         nPoints = 0
-        nIterations = 0
-        maxIterations = pointCount * 200
-        featureCount = source.featureCount()
         total = 100.0 / pointCount if pointCount else 1
 
-        index = QgsSpatialIndex()
-        points = dict()
-
-        da = QgsDistanceArea()
-        da.setSourceCrs(source.sourceCrs(), context.transformContext())
-        da.setEllipsoid(context.project().ellipsoid())
-
-        request = QgsFeatureRequest()
-
-        random.seed()
-
-        while nIterations < maxIterations and nPoints < pointCount:
+        for points in RandomPointSampler(seed).alongLines(geometries, int(pointCount), minDistance):
             if feedback.isCanceled():
                 break
 
-            # pick random feature
-            fid = random.randint(0, featureCount - 1)
-            f = next(source.getFeatures(request.setFilterFid(fid).setSubsetOfAttributes([])))
-            fGeom = f.geometry()
-
-            if fGeom.isMultipart():
-                lines = fGeom.asMultiPolyline()
-                # pick random line
-                lineId = random.randint(0, len(lines) - 1)
-                vertices = lines[lineId]
-            else:
-                vertices = fGeom.asPolyline()
-
-            # pick random segment
-            if len(vertices) == 2:
-                vid = 0
-            else:
-                vid = random.randint(0, len(vertices) - 2)
-            startPoint = vertices[vid]
-            endPoint = vertices[vid + 1]
-            length = da.measureLine(startPoint, endPoint)
-            dist = length * random.random()
-
-            if dist > minDistance:
-                d = dist / (length - dist)
-                rx = (startPoint.x() + d * endPoint.x()) / (1 + d)
-                ry = (startPoint.y() + d * endPoint.y()) / (1 + d)
-
-                # generate random point
-                p = QgsPointXY(rx, ry)
-                geom = QgsGeometry.fromPointXY(p)
-                if vector.checkMinDistance(p, index, minDistance, points):
-                    f = QgsFeature(nPoints)
-                    f.initAttributes(1)
-                    f.setFields(fields)
-                    f.setAttribute('id', nPoints)
-                    f.setGeometry(geom)
-                    sink.addFeature(f, QgsFeatureSink.FastInsert)
-                    index.insertFeature(f)
-                    points[nPoints] = p
-                    nPoints += 1
-                    feedback.setProgress(int(nPoints * total))
-            nIterations += 1
-
-        if nPoints < pointCount:
+            sink.addFeatures(pointFeatures(points, fields, nPoints), QgsFeatureSink.FastInsert)
+            nPoints += len(points)
+            feedback.setProgress(int(nPoints * total))
+
+        if nPoints < pointCount and not feedback.isCanceled():
             feedback.pushInfo(self.tr('Could not generate requested number of random points. '
                                       'Maximum number of attempts exceeded.'))
 
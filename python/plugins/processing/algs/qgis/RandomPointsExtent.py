@@ -26,18 +26,13 @@ __copyright__ = '(C) 2014, Alexander Bruy'
 __revision__ = '$Format:%H$'
 
 import os
-import random
 
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (QgsField,
                        QgsFeatureSink,
-                       QgsFeature,
                        QgsFields,
-                       QgsGeometry,
-                       QgsPointXY,
                        QgsWkbTypes,
-                       QgsSpatialIndex,
                        QgsProcessing,
                        QgsProcessingException,
                        QgsProcessingParameterDistance,
@@ -48,7 +43,7 @@ from qgis.core import (QgsField,
                        QgsProcessingParameterDefinition)
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
-from processing.tools import vector
+from processing.tools.sampling import RandomPointSampler, pointFeatures
 
 pluginPath = os.path.split(os.path.split(os.path.dirname(__file__))[0])[0]
 
@@ -58,6 +53,7 @@ class RandomPointsExtent(QgisAlgorithm):
     EXTENT = 'EXTENT'
     POINTS_NUMBER = 'POINTS_NUMBER'
     MIN_DISTANCE = 'MIN_DISTANCE'
+    SEED = 'SEED'
     TARGET_CRS = 'TARGET_CRS'
     OUTPUT = 'OUTPUT'
 
@@ -82,6 +78,12 @@ class RandomPointsExtent(QgisAlgorithm):
         self.addParameter(QgsProcessingParameterDistance(self.MIN_DISTANCE,
                                                          self.tr('Minimum distance between points'),
                                                          0, self.TARGET_CRS, False, 0, 1000000000))
+        seed = QgsProcessingParameterNumber(self.SEED,
+                                            self.tr('Random seed'),
+                                            QgsProcessingParameterNumber.Integer,
+                                            None, True, 0)
+        seed.setFlags(seed.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(seed)
         self.addParameter(QgsProcessingParameterCrs(self.TARGET_CRS,
                                                     self.tr('Target CRS'),
                                                     'ProjectCrs'))
@@ -98,11 +100,10 @@ class RandomPointsExtent(QgisAlgorithm):
     def processAlgorithm(self, parameters, context, feedback):
         pointCount = self.parameterAsDouble(parameters, self.POINTS_NUMBER, context)
         minDistance = self.parameterAsDouble(parameters, self.MIN_DISTANCE, context)
+        seed = self.parameterAsInt(parameters, self.SEED, context) if parameters.get(self.SEED) is not None else None
         crs = self.parameterAsCrs(parameters, self.TARGET_CRS, context)
         bbox = self.parameterAsExtent(parameters, self.EXTENT, context, crs)
 
-        extent = QgsGeometry().fromRect(bbox)
-
         fields = QgsFields()
         fields.append(QgsField('id', QVariant.Int, '', 10, 0))
 
@@ -112,39 +113,17 @@ class RandomPointsExtent(QgisAlgorithm):
             raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
 
         nPoints = 0
-        nIterations = 0
-        maxIterations = pointCount * 200
         total = 100.0 / pointCount if pointCount else 1
 
-        index = QgsSpatialIndex()
-        points = dict()
-
-        random.seed()
-
-        while nIterations < maxIterations and nPoints < pointCount:
+        for points in RandomPointSampler(seed).inExtent(bbox, int(pointCount), minDistance):
             if feedback.isCanceled():
                 break
 
-            rx = bbox.xMinimum() + bbox.width() * random.random()
-            ry = bbox.yMinimum() + bbox.height() * random.random()
-
-            p = QgsPointXY(rx, ry)
-            geom = QgsGeometry.fromPointXY(p)
-            if geom.within(extent) and \
-                    vector.checkMinDistance(p, index, minDistance, points):
-                f = QgsFeature(nPoints)
-                f.initAttributes(1)
-                f.setFields(fields)
-                f.setAttribute('id', nPoints)
-                f.setGeometry(geom)
-                sink.addFeature(f, QgsFeatureSink.FastInsert)
-                index.insertFeature(f)
-                points[nPoints] = p
-                nPoints += 1
-                feedback.setProgress(int(nPoints * total))
-            nIterations += 1
-
-        if nPoints < pointCount:
+            sink.addFeatures(pointFeatures(points, fields, nPoints), QgsFeatureSink.FastInsert)
+            nPoints += len(points)
+            feedback.setProgress(int(nPoints * total))
+
+        if nPoints < pointCount and not feedback.isCanceled():
             feedback.pushInfo(self.tr('Could not generate requested number of random points. '
                                       'Maximum number of attempts exceeded.'))
 
@@ -26,18 +26,14 @@ __copyright__ = '(C) 2014, Alexander Bruy'
 __revision__ = '$Format:%H$'
 
 import os
-import random
 
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (QgsField,
                        QgsFeatureSink,
-                       QgsFeature,
                        QgsFields,
                        QgsGeometry,
-                       QgsPointXY,
                        QgsWkbTypes,
-                       QgsSpatialIndex,
                        QgsFeatureRequest,
                        QgsProcessing,
                        QgsProcessingException,
@@ -48,7 +44,7 @@ from qgis.core import (QgsField,
                        QgsProcessingParameterDefinition)
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
-from processing.tools import vector
+from processing.tools.sampling import RandomPointSampler, pointFeatures
 
 pluginPath = os.path.split(os.path.split(os.path.dirname(__file__))[0])[0]
 
@@ -58,6 +54,7 @@ class RandomPointsLayer(QgisAlgorithm):
     INPUT = 'INPUT'
     POINTS_NUMBER = 'POINTS_NUMBER'
     MIN_DISTANCE = 'MIN_DISTANCE'
+    SEED = 'SEED'
     OUTPUT = 'OUTPUT'
 
     def icon(self):
@@ -83,6 +80,12 @@ class RandomPointsLayer(QgisAlgorithm):
         self.addParameter(QgsProcessingParameterDistance(self.MIN_DISTANCE,
                                                          self.tr('Minimum distance between points'),
                                                          0, self.INPUT, False, 0, 1000000000))
+        seed = QgsProcessingParameterNumber(self.SEED,
+                                            self.tr('Random seed'),
+                                            QgsProcessingParameterNumber.Integer,
+                                            None, True, 0)
+        seed.setFlags(seed.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(seed)
         self.addParameter(QgsProcessingParameterFeatureSink(self.OUTPUT,
                                                             self.tr('Random points'),
                                                             type=QgsProcessing.TypeVectorPoint))
@@ -100,9 +103,18 @@ class RandomPointsLayer(QgisAlgorithm):
 
         pointCount = self.parameterAsDouble(parameters, self.POINTS_NUMBER, context)
         minDistance = self.parameterAsDouble(parameters, self.MIN_DISTANCE, context)
-
-        bbox = source.sourceExtent()
-        sourceIndex = QgsSpatialIndex(source, feedback)
+        seed = self.parameterAsInt(parameters, self.SEED, context) if parameters.get(self.SEED) is not None else None
+
+        request = QgsFeatureRequest().setSubsetOfAttributes([])
+        geometries = [f.geometry() for f in source.getFeatures(request) if f.hasGeometry()]
+        if len(geometries) > 1:
+            # overlapping polygons would be sampled once per polygon
+            union = QgsGeometry.unaryUnion(geometries)
+            if union.isNull() or union.isEmpty():
+                feedback.reportError(self.tr('Could not dissolve the input polygons, '
+                                             'their overlapping areas get more points.'))
+            else:
+                geometries = [union]
 
         fields = QgsFields()
         fields.append(QgsField('id', QVariant.Int, '', 10, 0))
@@ -113,47 +125,17 @@ class RandomPointsLayer(QgisAlgorithm):
             raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
 
         nPoints = 0
-        nIterations = 0
-        maxIterations = pointCount * 200
         total = 100.0 / pointCount if pointCount else 1
 
-        index = QgsSpatialIndex()
-        points = dict()
-
-        random.seed()
-
-        while nIterations < maxIterations and nPoints < pointCount:
+        for points in RandomPointSampler(seed).inPolygons(geometries, int(pointCount), minDistance):
             if feedback.isCanceled():
                 break
 
-            rx = bbox.xMinimum() + bbox.width() * random.random()
-            ry = bbox.yMinimum() + bbox.height() * random.random()
-
-            p = QgsPointXY(rx, ry)
-            geom = QgsGeometry.fromPointXY(p)
-            ids = sourceIndex.intersects(geom.buffer(5, 5).boundingBox())
-            if len(ids) > 0 and \
-                    vector.checkMinDistance(p, index, minDistance, points):
-                request = QgsFeatureRequest().setFilterFids(ids).setSubsetOfAttributes([])
-                for f in source.getFeatures(request):
-                    if feedback.isCanceled():
-                        break
-
-                    tmpGeom = f.geometry()
-                    if geom.within(tmpGeom):
-                        f = QgsFeature(nPoints)
-                        f.initAttributes(1)
-                        f.setFields(fields)
-                        f.setAttribute('id', nPoints)
-                        f.setGeometry(geom)
-                        sink.addFeature(f, QgsFeatureSink.FastInsert)
-                        index.insertFeature(f)
-                        points[nPoints] = p
-                        nPoints += 1
-                        feedback.setProgress(int(nPoints * total))
-            nIterations += 1
-
-        if nPoints < pointCount:
+            sink.addFeatures(pointFeatures(points, fields, nPoints), QgsFeatureSink.FastInsert)
+            nPoints += len(points)
+            feedback.setProgress(int(nPoints * total))
+
+        if nPoints < pointCount and not feedback.isCanceled():
             feedback.pushInfo(self.tr('Could not generate requested number of random points. '
                                       'Maximum number of attempts exceeded.'))
 
@@ -26,19 +26,13 @@ __copyright__ = '(C) 2014, Alexander Bruy'
 __revision__ = '$Format:%H$'
 
 import os
-import random
 
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (QgsField,
                        QgsFeatureSink,
-                       QgsFeature,
                        QgsFields,
-                       QgsGeometry,
-                       QgsPointXY,
                        QgsWkbTypes,
-                       QgsSpatialIndex,
-                       QgsFeatureRequest,
                        QgsExpression,
                        QgsDistanceArea,
                        QgsProject,
@@ -53,7 +47,7 @@ from qgis.core import (QgsField,
                        QgsProcessingParameterDefinition)
 
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
-from processing.tools import vector
+from processing.tools.sampling import RandomPointSampler, pointFeatures
 
 pluginPath = os.path.split(os.path.split(os.path.dirname(__file__))[0])[0]
 
@@ -64,6 +58,7 @@ class RandomPointsPolygons(QgisAlgorithm):
     EXPRESSION = 'EXPRESSION'
     MIN_DISTANCE = 'MIN_DISTANCE'
     STRATEGY = 'STRATEGY'
+    SEED = 'SEED'
     OUTPUT = 'OUTPUT'
 
     def icon(self):
@@ -96,6 +91,12 @@ class RandomPointsPolygons(QgisAlgorithm):
         self.addParameter(QgsProcessingParameterDistance(self.MIN_DISTANCE,
                                                          self.tr('Minimum distance between points'),
                                                          0, self.INPUT, False, 0, 1000000000))
+        seed = QgsProcessingParameterNumber(self.SEED,
+                                            self.tr('Random seed'),
+                                            QgsProcessingParameterNumber.Integer,
+                                            None, True, 0)
+        seed.setFlags(seed.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(seed)
         self.addParameter(QgsProcessingParameterFeatureSink(self.OUTPUT,
                                                             self.tr('Random points'),
                                                             type=QgsProcessing.TypeVectorPoint))
@@ -113,6 +114,7 @@ class RandomPointsPolygons(QgisAlgorithm):
 
         strategy = self.parameterAsEnum(parameters, self.STRATEGY, context)
         minDistance = self.parameterAsDouble(parameters, self.MIN_DISTANCE, context)
+        seed = self.parameterAsInt(parameters, self.SEED, context) if parameters.get(self.SEED) is not None else None
 
         expression = QgsExpression(self.parameterAsString(parameters, self.EXPRESSION, context))
         if expression.hasParserError():
@@ -133,6 +135,8 @@ class RandomPointsPolygons(QgisAlgorithm):
         da.setSourceCrs(source.sourceCrs(), context.transformContext())
         da.setEllipsoid(context.project().ellipsoid())
 
+        sampler = RandomPointSampler(seed)
+
         total = 100.0 / source.featureCount() if source.featureCount() else 0
         current_progress = 0
         for current, f in enumerate(source.getFeatures()):
@@ -153,10 +157,6 @@ class RandomPointsPolygons(QgisAlgorithm):
                 continue
 
             fGeom = f.geometry()
-            engine = QgsGeometry.createGeometryEngine(fGeom.constGet())
-            engine.prepareGeometry()
-
-            bbox = fGeom.boundingBox()
             if strategy == 0:
                 pointCount = int(value)
             else:
@@ -166,40 +166,18 @@ class RandomPointsPolygons(QgisAlgorithm):
                 feedback.pushInfo("Skip feature {} as number of points for it is 0.".format(f.id()))
                 continue
 
-            index = QgsSpatialIndex()
-            points = dict()
-
             nPoints = 0
-            nIterations = 0
-            maxIterations = pointCount * 200
             feature_total = total / pointCount if pointCount else 1
 
-            random.seed()
-
-            while nIterations < maxIterations and nPoints < pointCount:
+            for points in sampler.inPolygons([fGeom], pointCount, minDistance):
                 if feedback.isCanceled():
                     break
 
-                rx = bbox.xMinimum() + bbox.width() * random.random()
-                ry = bbox.yMinimum() + bbox.height() * random.random()
-
-                p = QgsPointXY(rx, ry)
-                geom = QgsGeometry.fromPointXY(p)
-                if engine.contains(geom.constGet()) and \
-                        vector.checkMinDistance(p, index, minDistance, points):
-                    f = QgsFeature(nPoints)
-                    f.initAttributes(1)
-                    f.setFields(fields)
-                    f.setAttribute('id', nPoints)
-                    f.setGeometry(geom)
-                    sink.addFeature(f, QgsFeatureSink.FastInsert)
-                    index.insertFeature(f)
-                    points[nPoints] = p
-                    nPoints += 1
-                    feedback.setProgress(current_progress + int(nPoints * feature_total))
-                nIterations += 1
-
-            if nPoints < pointCount:
+                sink.addFeatures(pointFeatures(points, fields, nPoints), QgsFeatureSink.FastInsert)
+                nPoints += len(points)
+                feedback.setProgress(current_progress + int(nPoints * feature_total))
+
+            if nPoints < pointCount and not feedback.isCanceled():
                 feedback.pushInfo(self.tr('Could not generate requested number of random '
                                           'points. Maximum number of attempts exceeded.'))
 
@@ -25,11 +25,11 @@ __copyright__ = '(C) 2012, Victor Olaya'
 
 __revision__ = '$Format:%H$'
 
+import numpy
+
 from qgis.core import (QgsProcessingParameterFeatureSource,
-                       QgsStatisticalSummary,
                        QgsDateTimeStatisticalSummary,
                        QgsStringStatisticalSummary,
-                       QgsFeatureRequest,
                        QgsProcessingException,
                        QgsProcessingParameterField,
                        QgsProcessingParameterFeatureSink,
@@ -40,12 +40,13 @@ from qgis.core import (QgsProcessingParameterFeatureSource,
                        QgsFeature,
                        QgsFeatureSink,
                        QgsProcessing,
-                       QgsProcessingFeatureSource,
                        NULL)
 from qgis.PyQt.QtCore import QVariant
 from processing.algs.qgis.QgisAlgorithm import QgisAlgorithm
+from processing.tools import vector
+from processing.tools.statistics import NumericStatistics
 
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 
 class StatisticsByCategories(QgisAlgorithm):
@@ -156,44 +157,43 @@ class StatisticsByCategories(QgisAlgorithm):
             fields.append(QgsField('max_length', QVariant.Int))
             fields.append(QgsField('mean_length', QVariant.Double))
 
-        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
         if value_field is not None:
             attrs = [value_field_index]
         else:
             attrs = []
         attrs.extend(category_field_indexes)
-        request.setSubsetOfAttributes(attrs)
-        features = source.getFeatures(request, QgsProcessingFeatureSource.FlagSkipGeometryValidityChecks)
         total = 50.0 / source.featureCount() if source.featureCount() else 0
+        statistics = None
         if field_type == 'none':
-            values = defaultdict(lambda: 0)
+            values = Counter()
+        elif field_type == 'numeric':
+            # group number of each category with values
+            values = {}
+            statistics = NumericStatistics()
         else:
             values = defaultdict(list)
-        for current, feat in enumerate(features):
+        current = 0
+        for chunk in vector.columnChunks(source, attrs):
             if feedback.isCanceled():
                 break
 
             feedback.setProgress(int(current * total))
-            attrs = feat.attributes()
-            cat = tuple([attrs[c] for c in category_field_indexes])
+            cats = list(zip(*[chunk[c].tolist() for c in category_field_indexes]))
+            current += len(cats)
             if field_type == 'none':
-                values[cat] += 1
+                values.update(cats)
                 continue
+            column = chunk[value_field_index]
             if field_type == 'numeric':
-                if attrs[value_field_index] == NULL:
-                    continue
-                else:
-                    value = float(attrs[value_field_index])
+                valid = ~numpy.ma.getmaskarray(column)
+                groups = [values.setdefault(cat, len(values)) for cat, v in zip(cats, valid) if v]
+                statistics.add(numpy.ma.getdata(column)[valid], groups)
             elif field_type == 'string':
-                if attrs[value_field_index] == NULL:
-                    value = ''
-                else:
-                    value = str(attrs[value_field_index])
-            elif attrs[value_field_index] == NULL:
-                value = NULL
+                for cat, value in zip(cats, column.tolist()):
+                    values[cat].append('' if value is None else str(value))
             else:
-                value = attrs[value_field_index]
-            values[cat].append(value)
+                for cat, value in zip(cats, column.tolist()):
+                    values[cat].append(NULL if value is None else value)
 
         (sink, dest_id) = self.parameterAsSink(parameters, self.OUTPUT, context,
                                                fields, QgsWkbTypes.NoGeometry, QgsCoordinateReferenceSystem())
@@ -203,7 +203,7 @@ class StatisticsByCategories(QgisAlgorithm):
         if field_type == 'none':
             self.saveCounts(values, sink, feedback)
         elif field_type == 'numeric':
-            self.calcNumericStats(values, sink, feedback)
+            self.calcNumericStats(values, statistics, sink, feedback)
         elif field_type == 'datetime':
             self.calcDateTimeStats(values, sink, feedback)
         else:
@@ -224,36 +224,22 @@ class StatisticsByCategories(QgisAlgorithm):
             sink.addFeature(f, QgsFeatureSink.FastInsert)
             current += 1
 
-    def calcNumericStats(self, values, sink, feedback):
-        stat = QgsStatisticalSummary()
+    def calcNumericStats(self, values, statistics, sink, feedback):
+        stats = statistics.results()
 
         total = 50.0 / len(values) if values else 0
-        current = 0
-        for cat, v in values.items():
+        for current, (cat, group) in enumerate(values.items()):
             if feedback.isCanceled():
                 break
 
             feedback.setProgress(int(current * total) + 50)
 
-            stat.calculate(v)
             f = QgsFeature()
-            f.setAttributes(list(cat) + [stat.count(),
-                                         stat.variety(),
-                                         stat.min(),
-                                         stat.max(),
-                                         stat.range(),
-                                         stat.sum(),
-                                         stat.mean(),
-                                         stat.median(),
-                                         stat.stDev(),
-                                         stat.minority(),
-                                         stat.majority(),
-                                         stat.firstQuartile(),
-                                         stat.thirdQuartile(),
-                                         stat.interQuartileRange()])
+            f.setAttributes(list(cat) + [stats[s][group] for s in ('count', 'variety', 'min', 'max', 'range', 'sum',
+                                                                     'mean', 'median', 'stddev', 'minority',
+                                                                     'majority', 'q1', 'q3', 'iqr')])
 
             sink.addFeature(f, QgsFeatureSink.FastInsert)
-            current += 1
 
     def calcDateTimeStats(self, values, sink, feedback):
         stat = QgsDateTimeStatisticalSummary()
@@ -80,10 +80,11 @@ class VectorLayerHistogram(QgisAlgorithm):
 
         output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
 
-        values = vector.values(source, fieldname)
+        counts, edges = vector.histogram(source, fieldname, bins, feedback)
 
-        data = [go.Histogram(x=values[fieldname],
-                             nbinsx=bins)]
+        data = [go.Bar(x=((edges[:-1] + edges[1:]) / 2).tolist(),
+                       y=counts.tolist(),
+                       width=(edges[1:] - edges[:-1]).tolist())]
         plt.offline.plot(data, filename=output, auto_open=False)
 
         return {self.OUTPUT: output}
@@ -83,9 +83,9 @@ class VectorLayerScatterplot(QgisAlgorithm):
 
         output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
 
-        values = vector.values(source, xfieldname, yfieldname)
-        data = [go.Scatter(x=values[xfieldname],
-                           y=values[yfieldname],
+        values = vector.columns(source, [xfieldname, yfieldname], feedback=feedback)
+        data = [go.Scatter(x=values[xfieldname].tolist(),
+                           y=values[yfieldname].tolist(),
                            mode='markers')]
         plt.offline.plot(data, filename=output, auto_open=False)
 
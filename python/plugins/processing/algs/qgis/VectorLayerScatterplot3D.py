@@ -90,12 +90,12 @@ class VectorLayerScatterplot3D(QgisAlgorithm):
 
         output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
 
-        values = vector.values(source, xfieldname, yfieldname, zfieldname)
+        values = vector.columns(source, [xfieldname, yfieldname, zfieldname], feedback=feedback)
 
         data = [go.Scatter3d(
-                x=values[xfieldname],
-                y=values[yfieldname],
-                z=values[zfieldname],
+                x=values[xfieldname].tolist(),
+                y=values[yfieldname].tolist(),
+                z=values[zfieldname].tolist(),
                 mode='markers')]
 
         plt.offline.plot(data, filename=output, auto_open=False)
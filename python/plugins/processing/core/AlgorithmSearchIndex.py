@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    AlgorithmSearchIndex.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import re
+from functools import partial
+
+from qgis.core import QgsApplication, QgsProcessingAlgorithm
+
+# longest n-grams stored in the index
+NGRAM_SIZE = 3
+
+# words shorter than this are not looked up in the help of the algorithms
+MIN_HELP_WORD_LENGTH = 3
+
+_TAG_RE = re.compile(r'<[^>]*>')
+
+
+def _ngrams(text, size):
+    return set(text[i:i + size] for i in range(len(text) - size + 1))
+
+
+class _Document(object):
+
+    def __init__(self, alg, provider):
+        self.algorithmId = alg.id()
+        self.providerId = provider.id()
+        self.hidden = bool(alg.flags() & QgsProcessingAlgorithm.FlagHideFromToolbox)
+        self.displayName = (alg.displayName() or alg.name()).lower()
+        # fields are separated by a character which is never searched for
+        self.text = '\0'.join([self.displayName, alg.name().lower(), self.algorithmId.lower()] +
+                              [t.lower() for t in alg.tags()])
+        self.help = _TAG_RE.sub(' ', alg.shortHelpString() or '').lower()
+
+    def ngrams(self):
+        grams = set()
+        for text in (self.text, self.help):
+            for size in range(1, NGRAM_SIZE + 1):
+                grams |= _ngrams(text, size)
+        return grams
+
+    def score(self, string, words):
+        """Returns the score of a document containing all the words of the
+        search string, None if a word is missing"""
+        scores = []
+        for word in words:
+            if word in self.displayName:
+                scores.append(1.0)
+            elif word in self.text:
+                scores.append(0.5)
+            elif len(word) >= MIN_HELP_WORD_LENGTH and word in self.help:
+                scores.append(0.1)
+            else:
+                return None
+        coverage = min(1.0, float(len(string)) / max(1, len(self.displayName)))
+        return sum(scores) / len(scores) * (0.5 + 0.5 * coverage)
+
+
+class AlgorithmSearchIndex(object):
+
+    """
+    N-gram index of the display names, names, ids, tags and help of the
+    algorithms of the processing registry, shared by the toolbox and the
+    locator filter.
+
+    The algorithms of a provider are indexed again after the provider
+    (re)loads them, when the index is next searched.
+    """
+
+    def __init__(self):
+        self._registry = None
+        self._documents = {}
+        self._providerDocuments = {}
+        self._postings = {}
+        self._nextId = 0
+        self._outdated = set()
+
+    def search(self, string, includeHidden=False):
+        """Returns the (algorithm id, score) pairs of the algorithms matching
+        every word of the search string, best matches first. Every algorithm
+        is returned, with a zero score, for an empty string"""
+        self._update()
+        string = ' '.join(string.lower().split())
+        words = string.split(' ') if string else []
+
+        if not words:
+            return [(d.algorithmId, 0.0) for d in self._documents.values() if includeHidden or not d.hidden]
+
+        candidates = None
+        for word in sorted(words, key=len, reverse=True):
+            ids = self._candidates(word)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+
+        results = []
+        for documentId in candidates:
+            document = self._documents[documentId]
+            if document.hidden and not includeHidden:
+                continue
+            score = document.score(string, words)
+            if score is not None:
+                results.append((document.algorithmId, score))
+        results.sort(key=lambda r: (-r[1], r[0]))
+        return results
+
+    def providerIds(self, string):
+        """Returns the ids of the providers having algorithms matching the
+        search string"""
+        ids = set(algorithmId for algorithmId, _ in self.search(string, True))
+        return set(d.providerId for d in self._documents.values() if d.algorithmId in ids)
+
+    def _candidates(self, word):
+        if len(word) <= NGRAM_SIZE:
+            return set(self._postings.get(word, ()))
+        grams = sorted((self._postings.get(g, set()) for g in _ngrams(word, NGRAM_SIZE)), key=len)
+        return grams[0].intersection(*grams[1:])
+
+    def _update(self):
+        if self._registry is None:
+            self._registry = QgsApplication.processingRegistry()
+            self._registry.providerAdded.connect(self._providerAdded)
+            self._registry.providerRemoved.connect(self._providerRemoved)
+            for provider in self._registry.providers():
+                self._providerAdded(provider.id())
+
+        for providerId in self._outdated:
+            self._removeProvider(providerId)
+            provider = self._registry.providerById(providerId)
+            if provider is not None:
+                self._addProvider(provider)
+        self._outdated.clear()
+
+    def _providerAdded(self, providerId):
+        provider = self._registry.providerById(providerId)
+        if provider is not None:
+            provider.algorithmsLoaded.connect(partial(self._outdated.add, providerId))
+            self._outdated.add(providerId)
+
+    def _providerRemoved(self, providerId):
+        self._outdated.discard(providerId)
+        self._removeProvider(providerId)
+
+    def _addProvider(self, provider):
+        ids = []
+        for alg in provider.algorithms():
+            document = _Document(alg, provider)
+            documentId = self._nextId
+            self._nextId += 1
+            self._documents[documentId] = document
+            for gram in document.ngrams():
+                self._postings.setdefault(gram, set()).add(documentId)
+            ids.append(documentId)
+        self._providerDocuments[provider.id()] = ids
+
+    def _removeProvider(self, providerId):
+        for documentId in self._providerDocuments.pop(providerId, []):
+            document = self._documents.pop(documentId)
+            for gram in document.ngrams():
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(documentId)
+                    if not postings:
+                        del self._postings[gram]
+
+
+searchIndex = AlgorithmSearchIndex()
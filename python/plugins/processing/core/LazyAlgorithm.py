@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    LazyAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import importlib
+import importlib.util
+import json
+import os
+import sys
+
+from qgis.core import (Qgis,
+                       QgsApplication,
+                       QgsMessageLog,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingParameters,
+                       QgsProcessingOutputFile,
+                       QgsProcessingOutputFolder,
+                       QgsProcessingOutputHtml,
+                       QgsProcessingOutputMapLayer,
+                       QgsProcessingOutputMultipleLayers,
+                       QgsProcessingOutputNumber,
+                       QgsProcessingOutputRasterLayer,
+                       QgsProcessingOutputString,
+                       QgsProcessingOutputVectorLayer)
+from qgis.PyQt.QtCore import QBuffer, QByteArray, QIODevice
+from qgis.PyQt.QtGui import QIcon, QPixmap
+
+OUTPUT_CLASSES = {'outputLayer': QgsProcessingOutputMapLayer,
+                  'outputVector': QgsProcessingOutputVectorLayer,
+                  'outputRaster': QgsProcessingOutputRasterLayer,
+                  'outputMultilayer': QgsProcessingOutputMultipleLayers,
+                  'outputHtml': QgsProcessingOutputHtml,
+                  'outputNumber': QgsProcessingOutputNumber,
+                  'outputString': QgsProcessingOutputString,
+                  'outputFolder': QgsProcessingOutputFolder,
+                  'outputFile': QgsProcessingOutputFile}
+
+ICON_SIZE = 32
+
+
+def _overrides(alg, method):
+    """Whether the Python class of alg reimplements method"""
+    return any(method in vars(c) for c in type(alg).__mro__
+               if not c.__module__.startswith('qgis.'))
+
+
+class AlgorithmManifest(object):
+
+    """
+    Metadata of the algorithms of a provider (names, groups, help, parameter
+    and output definitions...), stored as JSON so that the provider can
+    register LazyAlgorithm stubs without importing the algorithm modules.
+
+    algorithms is a list of (module, class name) pairs. The manifest is only
+    valid for the QGIS version and locale it was generated with, and as long
+    as the algorithm modules and dependencies files are unchanged.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, algorithms, dependencies=None):
+        self.path = path
+        self.algorithms = algorithms
+        self.dependencies = dependencies or []
+
+    def key(self):
+        sources = {}
+        for module, className in self.algorithms:
+            spec = importlib.util.find_spec(module)
+            if spec is None or not spec.origin:
+                return None
+            sources[module] = spec.origin
+        for path in self.dependencies:
+            sources[path] = path
+
+        signature = {}
+        for name, path in sources.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            signature[name] = [st.st_mtime, st.st_size]
+
+        return {'version': self.VERSION,
+                'qgis': Qgis.QGIS_VERSION,
+                'locale': QgsApplication.locale(),
+                'sources': signature}
+
+    def read(self):
+        """Returns the manifest entries by algorithm class, None when the
+        manifest is missing or out of date"""
+        key = self.key()
+        if key is None or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('key') != key:
+            return None
+        return manifest.get('algorithms', {})
+
+    def write(self, algorithms):
+        """Stores the metadata of the given (loaded) algorithms"""
+        key = self.key()
+        if key is None:
+            return
+
+        entries = {}
+        for alg in algorithms:
+            entry = self.describe(alg)
+            entries['{}.{}'.format(type(alg).__module__, type(alg).__name__)] = entry
+
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'algorithms': entries}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            QgsMessageLog.logMessage('Could not write algorithm manifest {}: {}'.format(self.path, e), 'Processing')
+
+    @staticmethod
+    def describe(alg):
+        """Returns the manifest entry of an initialized algorithm, None if
+        the algorithm has to be loaded at startup (e.g. its parameters use
+        types defined in Python, which cannot be restored from the manifest)"""
+        parameters = []
+        for definition in alg.parameterDefinitions():
+            if not type(definition).__module__.startswith('qgis.'):
+                return None
+            parameters.append(definition.toVariantMap())
+
+        outputs = []
+        for definition in alg.outputDefinitions():
+            if definition.type() not in OUTPUT_CLASSES:
+                return None
+            output = {'type': definition.type(),
+                      'name': definition.name(),
+                      'description': definition.description()}
+            if isinstance(definition, QgsProcessingOutputVectorLayer):
+                output['dataType'] = definition.dataType()
+            outputs.append(output)
+
+        icon = None
+        if _overrides(alg, 'icon'):
+            data = QByteArray()
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.WriteOnly)
+            alg.icon().pixmap(ICON_SIZE, ICON_SIZE).save(buffer, 'PNG')
+            icon = bytes(data.toBase64()).decode('ascii')
+
+        entry = {'module': type(alg).__module__,
+                 'className': type(alg).__name__,
+                 'name': alg.name(),
+                 'displayName': alg.displayName(),
+                 'group': alg.group(),
+                 'groupId': alg.groupId(),
+                 'tags': alg.tags(),
+                 'shortHelpString': alg.shortHelpString(),
+                 'helpString': alg.helpString(),
+                 'helpUrl': alg.helpUrl(),
+                 'svgIconPath': alg.svgIconPath() if _overrides(alg, 'svgIconPath') else None,
+                 'icon': icon,
+                 'flags': int(alg.flags()),
+                 'parameters': parameters,
+                 'outputs': outputs}
+        try:
+            # default values of some types (e.g. extents) cannot be stored
+            json.dumps(entry)
+        except (TypeError, ValueError):
+            return None
+        return entry
+
+
+class LazyAlgorithm(QgsProcessingAlgorithm):
+
+    """
+    Stand-in for an algorithm, built from its manifest entry. The algorithm
+    module is only imported when an instance is created for running or
+    editing the algorithm.
+    """
+
+    def __init__(self, entry):
+        super().__init__()
+        self._entry = entry
+        self._icon = None
+        self._instance = None
+
+    def algorithmClass(self):
+        module = importlib.import_module(self._entry['module'])
+        return getattr(module, self._entry['className'])
+
+    def isLoaded(self):
+        """Whether the module of the algorithm was imported"""
+        return self._entry['module'] in sys.modules
+
+    def createInstance(self):
+        return self.algorithmClass()()
+
+    def instance(self):
+        """Returns an initialized instance of the real algorithm"""
+        if self._instance is None:
+            self._instance = self.create()
+        return self._instance
+
+    def initAlgorithm(self, config=None):
+        for definition in self._entry['parameters']:
+            self.addParameter(QgsProcessingParameters.parameterFromVariantMap(definition), False)
+        for definition in self._entry['outputs']:
+            outputClass = OUTPUT_CLASSES[definition['type']]
+            if 'dataType' in definition:
+                output = outputClass(definition['name'], definition['description'], definition['dataType'])
+            else:
+                output = outputClass(definition['name'], definition['description'])
+            self.addOutput(output)
+
+    def name(self):
+        return self._entry['name']
+
+    def displayName(self):
+        return self._entry['displayName']
+
+    def group(self):
+        return self._entry['group']
+
+    def groupId(self):
+        return self._entry['groupId']
+
+    def tags(self):
+        return self._entry['tags']
+
+    def shortHelpString(self):
+        return self._entry['shortHelpString']
+
+    def helpString(self):
+        return self._entry['helpString']
+
+    def helpUrl(self):
+        return self._entry['helpUrl']
+
+    def flags(self):
+        return QgsProcessingAlgorithm.Flags(self._entry['flags'])
+
+    def icon(self):
+        if self._entry['icon'] is None:
+            return super().icon()
+        if self._icon is None:
+            pixmap = QPixmap()
+            pixmap.loadFromData(QByteArray.fromBase64(self._entry['icon'].encode('ascii')), 'PNG')
+            self._icon = QIcon(pixmap)
+        return self._icon
+
+    def svgIconPath(self):
+        if self._entry['svgIconPath'] is None:
+            return super().svgIconPath()
+        return self._entry['svgIconPath']
+
+    def canExecute(self):
+        return self.instance().canExecute()
+
+    def checkParameterValues(self, parameters, context):
+        return self.instance().checkParameterValues(parameters, context)
+
+    def createCustomParametersWidget(self, parent=None):
+        return self.instance().createCustomParametersWidget(parent)
+
+    def prepareAlgorithm(self, parameters, context, feedback):
+        return self.instance().prepareAlgorithm(parameters, context, feedback)
+
+    def processAlgorithm(self, parameters, context, feedback):
+        return self.instance().processAlgorithm(parameters, context, feedback)
+
+    def postProcessAlgorithm(self, context, feedback):
+        return self.instance().postProcessAlgorithm(context, feedback)
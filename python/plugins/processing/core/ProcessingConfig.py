@@ -57,6 +57,9 @@ class ProcessingConfig:
     KEEP_DIALOG_OPEN = 'KEEP_DIALOG_OPEN'
     SHOW_DEBUG_IN_DIALOG = 'SHOW_DEBUG_IN_DIALOG'
     RECENT_ALGORITHMS = 'RECENT_ALGORITHMS'
+    MAX_HISTORY_ENTRIES = 'MAX_HISTORY_ENTRIES'
+    PROFILE_ALGORITHMS = 'PROFILE_ALGORITHMS'
+    PROFILE_INPUT_FEATURES = 'PROFILE_INPUT_FEATURES'
     PRE_EXECUTION_SCRIPT = 'PRE_EXECUTION_SCRIPT'
     POST_EXECUTION_SCRIPT = 'POST_EXECUTION_SCRIPT'
     SHOW_CRS_DEF = 'SHOW_CRS_DEF'
@@ -140,6 +143,18 @@ class ProcessingConfig:
             ProcessingConfig.tr('General'),
             ProcessingConfig.RECENT_ALGORITHMS,
             ProcessingConfig.tr('Recent algorithms'), '', hidden=True))
+        ProcessingConfig.addSetting(Setting(
+            ProcessingConfig.tr('General'),
+            ProcessingConfig.MAX_HISTORY_ENTRIES,
+            ProcessingConfig.tr('Maximum number of entries in the history'), 10000))
+        ProcessingConfig.addSetting(Setting(
+            ProcessingConfig.tr('General'),
+            ProcessingConfig.PROFILE_ALGORITHMS,
+            ProcessingConfig.tr('Record execution profiles of algorithms'), False))
+        ProcessingConfig.addSetting(Setting(
+            ProcessingConfig.tr('General'),
+            ProcessingConfig.PROFILE_INPUT_FEATURES,
+            ProcessingConfig.tr('Count the input features of profiled algorithms (may be slow)'), False))
         ProcessingConfig.addSetting(Setting(
             ProcessingConfig.tr('General'),
             ProcessingConfig.MODELS_SCRIPTS_REPO,
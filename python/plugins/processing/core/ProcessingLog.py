@@ -28,41 +28,108 @@ __revision__ = '$Format:%H$'
 import os
 import codecs
 import datetime
+import json
+import sqlite3 as sqlite
 from processing.tools.system import userFolder
 from processing.core.ProcessingConfig import ProcessingConfig
 from qgis.PyQt.QtCore import QCoreApplication
 
 LOG_SEPARATOR = '|~|'
 
+# number of entries read at once from the history
+PAGE_SIZE = 100
+
 
 class ProcessingLog:
 
+    """
+    History of the executed algorithms, stored in an SQLite database of the
+    user folder. Entries are appended in a single insert; the oldest ones are
+    dropped once the history holds more than MAX_HISTORY_ENTRIES entries.
+    The history is read one page of entries at a time, latest entries first.
+    """
+
     DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
     recentAlgs = []
+    connection = None
 
     @staticmethod
     def logFilename():
-        logFilename = userFolder() + os.sep + 'processing.log'
-        if not os.path.isfile(logFilename):
-            with codecs.open(logFilename, 'w', encoding='utf-8') as logfile:
-                logfile.write('Started logging at ' +
-                              datetime.datetime.now().strftime(ProcessingLog.DATE_FORMAT) + '\n')
+        """Returns the plain text log written by older versions, which is
+        imported in the history when the history is created"""
+        return userFolder() + os.sep + 'processing.log'
+
+    @staticmethod
+    def historyFilename():
+        return userFolder() + os.sep + 'processing_history.sqlite'
+
+    @staticmethod
+    def getConnection():
+        if ProcessingLog.connection is None:
+            connection = sqlite.connect(ProcessingLog.historyFilename(), isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            created = connection.execute("SELECT count(*) FROM sqlite_master "
+                                         "WHERE type = 'table' AND name = 'history'").fetchone()[0] == 0
+            if created:
+                connection.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                                   'date TEXT NOT NULL, text TEXT NOT NULL, profile TEXT)')
+                ProcessingLog.importLog(connection, ProcessingLog.logFilename())
+            elif 'profile' not in [c[1] for c in connection.execute('PRAGMA table_info(history)')]:
+                connection.execute('ALTER TABLE history ADD COLUMN profile TEXT')
+            ProcessingLog.connection = connection
+        return ProcessingLog.connection
+
+    @staticmethod
+    def closeConnection():
+        if ProcessingLog.connection is not None:
+            ProcessingLog.connection.close()
+            ProcessingLog.connection = None
+
+    @staticmethod
+    def importLog(connection, fileName):
+        """Moves the entries of a plain text log to the history"""
+        if not os.path.isfile(fileName):
+            return
+
+        def entries(f):
+            for line in f:
+                line = line.strip('\n').strip()
+                if not line.startswith('ALGORITHM'):
+                    continue
+                tokens = line.split(LOG_SEPARATOR)
+                if len(tokens) <= 1:
+                    # try old format log separator
+                    tokens = line.split('|')
+                if len(tokens) > 2:
+                    yield tokens[1], tokens[2]
 
-        return logFilename
+        try:
+            with codecs.open(fileName, encoding='utf-8', errors='replace') as f:
+                with connection:
+                    connection.execute('BEGIN')
+                    connection.executemany('INSERT INTO history (date, text) VALUES (?, ?)', entries(f))
+            os.replace(fileName, fileName + '.old')
+        except (OSError, sqlite.Error):
+            pass
 
     @staticmethod
     def addToLog(msg):
+        """Adds an entry to the history, returns its id or None if it could
+        not be added"""
+        entryId = None
         try:
             # It seems that this fails sometimes depending on the msg
             # added. To avoid it stopping the normal functioning of the
             # algorithm, we catch all errors, assuming that is better
             # to miss some log info than breaking the algorithm.
-            line = 'ALGORITHM' + LOG_SEPARATOR + datetime.datetime.now().strftime(
-                ProcessingLog.DATE_FORMAT) + LOG_SEPARATOR \
-                + msg + '\n'
-            with codecs.open(ProcessingLog.logFilename(), 'a',
-                             encoding='utf-8') as logfile:
-                logfile.write(line)
+            connection = ProcessingLog.getConnection()
+            cursor = connection.execute('INSERT INTO history (date, text) VALUES (?, ?)',
+                                        (datetime.datetime.now().strftime(ProcessingLog.DATE_FORMAT), msg))
+            entryId = cursor.lastrowid
+            maxEntries = ProcessingConfig.getSetting(ProcessingConfig.MAX_HISTORY_ENTRIES)
+            if maxEntries:
+                connection.execute('DELETE FROM history WHERE id <= ?', (cursor.lastrowid - int(maxEntries),))
             algname = msg[len('processing.run("'):]
             algname = algname[:algname.index('"')]
             if algname not in ProcessingLog.recentAlgs:
@@ -73,27 +140,39 @@ class ProcessingLog:
                     recentAlgsString)
         except:
             pass
+        return entryId
+
+    @staticmethod
+    def setProfile(entryId, profile):
+        """Stores the execution profile (see ProcessingProfiler) of an entry"""
+        try:
+            ProcessingLog.getConnection().execute('UPDATE history SET profile = ? WHERE id = ?',
+                                                  (json.dumps(profile), entryId))
+        except (sqlite.Error, TypeError, ValueError):
+            pass
+
+    @staticmethod
+    def _where(filter):
+        if not filter:
+            return '', ()
+        pattern = '%' + filter.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return " WHERE text LIKE ? ESCAPE '\\'", (pattern,)
+
+    @staticmethod
+    def getLogEntries(start=0, count=-1, filter=''):
+        """Returns count entries (all of them if count is negative) of the
+        history, skipping the start latest ones. Only the entries containing
+        filter are returned, if set"""
+        where, args = ProcessingLog._where(filter)
+        rows = ProcessingLog.getConnection().execute(
+            'SELECT date, text, profile FROM history' + where + ' ORDER BY id DESC LIMIT ? OFFSET ?',
+            args + (count, start))
+        return [LogEntry(date, text, json.loads(profile) if profile else None) for date, text, profile in rows]
 
     @staticmethod
-    def getLogEntries():
-        entries = []
-
-        with open(ProcessingLog.logFilename()) as f:
-            lines = f.readlines()
-        for line in lines:
-            line = line.strip('\n').strip()
-            tokens = line.split(LOG_SEPARATOR)
-            if len(tokens) <= 1:
-                # try old format log separator
-                tokens = line.split('|')
-
-            text = ''
-            for i in range(2, len(tokens)):
-                text += tokens[i] + LOG_SEPARATOR
-            if line.startswith('ALGORITHM'):
-                entries.append(LogEntry(tokens[1], tokens[2]))
-
-        return entries
+    def getLogEntriesCount(filter=''):
+        where, args = ProcessingLog._where(filter)
+        return ProcessingLog.getConnection().execute('SELECT count(*) FROM history' + where, args).fetchone()[0]
 
     @staticmethod
     def getRecentAlgorithms():
@@ -107,14 +186,14 @@ class ProcessingLog:
 
     @staticmethod
     def clearLog():
-        os.unlink(ProcessingLog.logFilename())
+        ProcessingLog.getConnection().execute('DELETE FROM history')
 
     @staticmethod
     def saveLog(fileName):
-        entries = ProcessingLog.getLogEntries()
+        rows = ProcessingLog.getConnection().execute('SELECT date, text FROM history ORDER BY id')
         with codecs.open(fileName, 'w', encoding='utf-8') as f:
-            for entry in entries:
-                f.write('ALGORITHM{}{}{}{}\n'.format(LOG_SEPARATOR, entry.date, LOG_SEPARATOR, entry.text))
+            for date, text in rows:
+                f.write('ALGORITHM{}{}{}{}\n'.format(LOG_SEPARATOR, date, LOG_SEPARATOR, text))
 
     @staticmethod
     def tr(string, context=''):
@@ -125,6 +204,7 @@ class ProcessingLog:
 
 class LogEntry:
 
-    def __init__(self, date, text):
+    def __init__(self, date, text, profile=None):
         self.date = date
         self.text = text
+        self.profile = profile
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    ProcessingProfiler.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameters,
+                       QgsProcessingUtils,
+                       QgsVectorLayer)
+
+from processing.core.ProcessingConfig import ProcessingConfig
+
+# key of the profile in the results of a profiled algorithm
+PROFILE_OUTPUT = 'PROCESSING_PROFILE'
+
+_lock = threading.Lock()
+_active = []
+_profiles = weakref.WeakKeyDictionary()
+_CURRENT = object()
+
+# interval in seconds between two samples of the memory used
+MEMORY_SAMPLING_INTERVAL = 0.05
+
+
+def _ioCounters():
+    """Returns the (bytes read, bytes written) by the process, None where
+    they are not available"""
+    try:
+        with open('/proc/self/io') as f:
+            counters = dict(line.split(':') for line in f if ':' in line)
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _residentMemory():
+    """Returns the current resident set size in bytes of the process, None
+    where it is not available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _cpuTime():
+    """Returns the CPU time of the process and of its subprocesses"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class AlgorithmProfile(object):
+
+    """
+    Timings and resource usage of an algorithm execution, split in phases
+    (parameter evaluation, execution, subprocesses, result loading...).
+
+    Times are in seconds (the start time since the epoch, the start times of
+    the phases since the start of the profile), memory and I/O in bytes. CPU
+    times include the CPU time of the subprocesses completed meanwhile.
+
+    The resident memory of the whole QGIS process is sampled in a thread
+    during the execution: the peak memory includes the memory used by other
+    threads and layers meanwhile, and not the memory of subprocesses.
+    """
+
+    def __init__(self, alg):
+        self.algorithmId = alg.id()
+        self.started = time.time()
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter()
+        self.startCpu = _cpuTime()
+        self.startRead, self.startWritten = _ioCounters()
+        self.wall = None
+        self.cpu = None
+        self.bytesRead = None
+        self.bytesWritten = None
+        self.peakMemory = _residentMemory()
+        self.inputFeatures = None
+        self.outputFeatures = None
+        self.phases = []
+        self._stopSampling = threading.Event()
+        self._sampler = None
+        if self.peakMemory is not None:
+            self._sampler = threading.Thread(target=self._sampleMemory)
+            self._sampler.daemon = True
+            self._sampler.start()
+
+    def _sampleMemory(self):
+        while not self._stopSampling.wait(MEMORY_SAMPLING_INTERVAL):
+            self._updatePeakMemory()
+
+    def _updatePeakMemory(self):
+        memory = _residentMemory()
+        if memory is not None and memory > self.peakMemory:
+            self.peakMemory = memory
+
+    @contextmanager
+    def phase(self, name):
+        """Records the time spent in the block as a phase of the profile"""
+        start = time.perf_counter()
+        cpu = _cpuTime()
+        try:
+            yield
+        finally:
+            self.phases.append({'name': name,
+                                'thread': threading.get_ident(),
+                                'start': start - self.start,
+                                'wall': time.perf_counter() - start,
+                                'cpu': _cpuTime() - cpu})
+
+    def finish(self):
+        self.wall = time.perf_counter() - self.start
+        self.cpu = _cpuTime() - self.startCpu
+        read, written = _ioCounters()
+        if read is not None and self.startRead is not None:
+            self.bytesRead = read - self.startRead
+            self.bytesWritten = written - self.startWritten
+        self._stopSampling.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+            self._updatePeakMemory()
+        with _lock:
+            if self in _active:
+                _active.remove(self)
+
+    def countInputFeatures(self, alg, parameters, context):
+        count = 0
+        for definition in alg.parameterDefinitions():
+            if isinstance(definition, QgsProcessingParameterFeatureSource) and definition.name() in parameters:
+                source = QgsProcessingParameters.parameterAsSource(definition, parameters, context)
+                if source is not None and source.featureCount() > 0:
+                    count += source.featureCount()
+        self.inputFeatures = count
+
+    def countOutputFeatures(self, alg, results, context):
+        count = 0
+        for definition in alg.outputDefinitions():
+            value = results.get(definition.name())
+            if isinstance(value, str) and definition.type() in ('outputVector', 'outputLayer'):
+                layer = QgsProcessingUtils.mapLayerFromString(value, context)
+                if isinstance(layer, QgsVectorLayer) and layer.featureCount() > 0:
+                    count += layer.featureCount()
+        self.outputFeatures = count
+
+    def asDict(self):
+        processing = sum(p['wall'] for p in self.phases if p['name'] == 'run') or self.wall
+        features = max(self.inputFeatures or 0, self.outputFeatures or 0)
+        return {'algorithm': self.algorithmId,
+                'started': self.started,
+                'wall': self.wall,
+                'cpu': self.cpu,
+                'peak_memory': self.peakMemory,
+                'bytes_read': self.bytesRead,
+                'bytes_written': self.bytesWritten,
+                'input_features': self.inputFeatures,
+                'output_features': self.outputFeatures,
+                'features_per_second': features / processing if features and processing else None,
+                'phases': list(self.phases)}
+
+
+def isEnabled():
+    return bool(ProcessingConfig.getSetting(ProcessingConfig.PROFILE_ALGORITHMS))
+
+
+def startProfile(alg, parameters, context):
+    """Starts profiling an execution of alg with context, if profiling is
+    enabled. Returns the profile, None otherwise"""
+    if not isEnabled():
+        return None
+    profile = AlgorithmProfile(alg)
+    if ProcessingConfig.getSetting(ProcessingConfig.PROFILE_INPUT_FEATURES):
+        # opening the sources may be slow, e.g. for remote layers
+        with profile.phase('parameters'):
+            profile.countInputFeatures(alg, parameters, context)
+    with _lock:
+        _active.append(profile)
+    _profiles[context] = profile
+    return profile
+
+
+def contextProfile(context):
+    """Returns the latest profile of an execution with context, or None"""
+    return _profiles.get(context)
+
+
+def currentProfile():
+    """Returns the profile of the algorithm being executed by the current
+    thread, or the only algorithm being executed"""
+    thread = threading.get_ident()
+    with _lock:
+        for profile in reversed(_active):
+            if profile.thread == thread:
+                return profile
+        if len(_active) == 1:
+            return _active[0]
+    return None
+
+
+@contextmanager
+def phase(name, profile=_CURRENT):
+    """Records the block as a phase of profile (by default the current
+    profile), unless profile is None"""
+    if profile is _CURRENT:
+        profile = currentProfile()
+    if profile is None:
+        yield
+    else:
+        with profile.phase(name):
+            yield
+
+
+def chromeTrace(profiles):
+    """Converts profiles (as returned by asDict) to the Chrome trace event
+    format, which can be loaded in chrome://tracing or other trace viewers"""
+    events = []
+    for pid, profile in enumerate(profiles, 1):
+        start = profile['started'] * 1e6
+        events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                       'args': {'name': profile['algorithm']}})
+        if profile['wall'] is not None:
+            events.append({'name': profile['algorithm'], 'cat': 'algorithm', 'ph': 'X',
+                           'pid': pid, 'tid': 0, 'ts': start, 'dur': profile['wall'] * 1e6,
+                           'args': dict((k, v) for k, v in profile.items() if k not in ('phases', 'started'))})
+        for p in profile['phases']:
+            events.append({'name': p['name'], 'cat': 'phase', 'ph': 'X', 'pid': pid, 'tid': p['thread'],
+                           'ts': start + p['start'] * 1e6, 'dur': p['wall'] * 1e6,
+                           'args': {'cpu': p['cpu']}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def exportProfiles(profiles, fileName, trace=False):
+    """Writes profiles to a JSON file, in the Chrome trace event format if
+    trace is True"""
+    with open(fileName, 'w', encoding='utf-8') as f:
+        json.dump(chromeTrace(profiles) if trace else profiles, f, indent=1)
+
+
+def summary(profile):
+    """Returns a readable summary of a profile"""
+    def tr(string):
+        return QCoreApplication.translate('ProcessingProfiler', string)
+
+    lines = [tr('Wall time: {0:0.3f} s, CPU time: {1:0.3f} s').format(profile['wall'] or 0, profile['cpu'] or 0)]
+    if profile['features_per_second']:
+        lines.append(tr('Features per second: {0:0.1f}').format(profile['features_per_second']))
+    if profile['bytes_read'] is not None:
+        lines.append(tr('Read: {0} bytes, written: {1} bytes').format(profile['bytes_read'], profile['bytes_written']))
+    if profile['peak_memory']:
+        lines.append(tr('Peak memory of the process: {0:0.1f} MB').format(profile['peak_memory'] / 1048576.0))
+    for p in profile['phases']:
+        lines.append('  {0}: {1:0.3f} s ({2:0.3f} s CPU)'.format(p['name'], p['wall'], p['cpu']))
+    return '\n'.join(lines)
@@ -48,6 +48,7 @@ from qgis.gui import (QgsMessageBar,
                       QgsProcessingAlgorithmDialogBase)
 from qgis.utils import iface
 
+from processing.core import ProcessingProfiler
 from processing.core.ProcessingLog import ProcessingLog
 from processing.core.ProcessingConfig import ProcessingConfig
 from processing.core.ProcessingResults import resultsList
@@ -184,11 +185,19 @@ class AlgorithmDialog(QgsProcessingAlgorithmDialogBase):
                     self.resetGui()
             else:
                 command = self.algorithm().asPythonCommand(parameters, context)
+                self.historyEntry = None
                 if command:
-                    ProcessingLog.addToLog(command)
+                    self.historyEntry = ProcessingLog.addToLog(command)
                 self.cancelButton().setEnabled(self.algorithm().flags() & QgsProcessingAlgorithm.FlagCanCancel)
 
                 def on_complete(ok, results):
+                    profile = ProcessingProfiler.contextProfile(context)
+                    if profile is not None and profile.wall is None:
+                        # executed in a task
+                        profile.finish()
+                        if ok:
+                            profile.countOutputFeatures(self.algorithm(), results, context)
+                            results[ProcessingProfiler.PROFILE_OUTPUT] = profile.asDict()
                     if ok:
                         feedback.pushInfo(self.tr('Execution completed in {0:0.2f} seconds').format(time.time() - start_time))
                         feedback.pushInfo(self.tr('Results:'))
@@ -203,14 +212,13 @@ class AlgorithmDialog(QgsProcessingAlgorithmDialogBase):
                         self.feedback_dialog.deleteLater()
                         self.feedback_dialog = None
 
-                    self.cancelButton().setEnabled(False)
-
                     self.finish(ok, results, context, feedback)
 
                 if not (self.algorithm().flags() & QgsProcessingAlgorithm.FlagNoThreading):
                     # Make sure the Log tab is visible before executing the algorithm
                     self.showLog()
 
+                    ProcessingProfiler.startProfile(self.algorithm(), parameters, context)
                     task = QgsProcessingAlgRunnerTask(self.algorithm(), parameters, context, feedback)
                     task.executed.connect(on_complete)
                     self.setCurrentTask(task)
@@ -244,10 +252,24 @@ class AlgorithmDialog(QgsProcessingAlgorithmDialogBase):
                     resultsList.addResult(icon=self.algorithm().icon(), name=out.description(), timestamp=time.localtime(),
                                           result=result[out.name()])
 
-            if not handleAlgorithmResults(self.algorithm(), context, feedback, not keepOpen):
-                self.resetGui()
-                return
+            def on_loaded(ok):
+                self.cancelButton().setEnabled(False)
+                if not ok:
+                    self.resetGui()
+                    return
+
+                profile = ProcessingProfiler.contextProfile(context)
+                if profile is not None and self.historyEntry is not None:
+                    ProcessingLog.setProfile(self.historyEntry, profile.asDict())
+                self.finishExecution(result, keepOpen)
+
+            # the result layers are loaded in the background, until then Cancel stops the loading
+            self.cancelButton().setEnabled(True)
+            handleAlgorithmResults(self.algorithm(), context, feedback, not keepOpen, onFinished=on_loaded)
+        else:
+            self.finishExecution(result, keepOpen)
 
+    def finishExecution(self, result, keepOpen):
         self.setExecuted(True)
         self.setResults(result)
         self.setInfo(self.tr('Algorithm \'{0}\' finished').format(self.algorithm().displayName()), escapeHtml=False)
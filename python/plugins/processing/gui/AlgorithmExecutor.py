@@ -34,6 +34,7 @@ from qgis.core import (Qgis,
                        QgsMessageLog,
                        QgsProcessingException,
                        QgsProcessingParameters)
+from processing.core import ProcessingProfiler
 from processing.gui.Postprocessing import handleAlgorithmResults
 from processing.tools import dataobjects
 
@@ -51,14 +52,23 @@ def execute(alg, parameters, context=None, feedback=None):
     if context is None:
         context = dataobjects.createContext(feedback)
 
+    profile = ProcessingProfiler.startProfile(alg, parameters, context)
     try:
-        results, ok = alg.run(parameters, context, feedback)
+        with ProcessingProfiler.phase('run', profile):
+            results, ok = alg.run(parameters, context, feedback)
+        if profile is not None:
+            profile.finish()
+            profile.countOutputFeatures(alg, results, context)
+            results[ProcessingProfiler.PROFILE_OUTPUT] = profile.asDict()
         return ok, results
     except QgsProcessingException as e:
         QgsMessageLog.logMessage(str(sys.exc_info()[0]), 'Processing', Qgis.Critical)
         if feedback is not None:
             feedback.reportError(e.msg)
         return False, {}
+    finally:
+        if profile is not None and profile.wall is None:
+            profile.finish()
 
 
 def executeIterating(alg, parameters, paramToIter, context, feedback):
@@ -27,9 +27,9 @@ __revision__ = '$Format:%H$'
 
 
 from qgis.core import (QgsApplication,
-                       QgsProcessingAlgorithm,
                        QgsLocatorFilter,
                        QgsLocatorResult)
+from processing.core.AlgorithmSearchIndex import searchIndex
 from processing.gui.MessageDialog import MessageDialog
 from processing.gui.AlgorithmDialog import AlgorithmDialog
 from qgis.utils import iface
@@ -61,22 +61,22 @@ class AlgorithmLocatorFilter(QgsLocatorFilter):
     def fetchResults(self, string, context, feedback):
         # collect results in main thread, since this method is inexpensive and
         # accessing the processing registry is not thread safe
-        for a in QgsApplication.processingRegistry().algorithms():
-            if a.flags() & QgsProcessingAlgorithm.FlagHideFromToolbox:
+        if not string and not context.usingPrefix:
+            return
+
+        registry = QgsApplication.processingRegistry()
+        for algId, score in searchIndex.search(string):
+            a = registry.algorithmById(algId)
+            if a is None:
                 continue
 
-            if QgsLocatorFilter.stringMatches(a.displayName(), string) or [t for t in a.tags() if QgsLocatorFilter.stringMatches(t, string)] or \
-                    (context.usingPrefix and not string):
-                result = QgsLocatorResult()
-                result.filter = self
-                result.displayString = a.displayName()
-                result.icon = a.icon()
-                result.userData = a.id()
-                if string and QgsLocatorFilter.stringMatches(a.displayName(), string):
-                    result.score = float(len(string)) / len(a.displayName())
-                else:
-                    result.score = 0
-                self.resultFetched.emit(result)
+            result = QgsLocatorResult()
+            result.filter = self
+            result.displayString = a.displayName()
+            result.icon = a.icon()
+            result.userData = algId
+            result.score = score
+            self.resultFetched.emit(result)
 
     def triggerResult(self, result):
         alg = QgsApplication.processingRegistry().createAlgorithmById(result.userData)
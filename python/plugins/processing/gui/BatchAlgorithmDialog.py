@@ -46,7 +46,7 @@ from qgis.utils import OverrideCursor
 
 from processing.gui.BatchPanel import BatchPanel
 from processing.gui.AlgorithmExecutor import execute
-from processing.gui.Postprocessing import handleAlgorithmResults
+from processing.gui.Postprocessing import handleBatchResults
 
 from processing.core.ProcessingResults import resultsList
 
@@ -128,6 +128,9 @@ class BatchAlgorithmDialog(QgsProcessingAlgorithmDialogBase):
             start_time = time.time()
 
             algorithm_results = []
+            # contexts of the executions with layers to load, kept until
+            # the batch is finished to load all the layers at once
+            load_contexts = []
             for count, parameters in enumerate(alg_parameters):
                 if feedback.isCanceled():
                     break
@@ -160,14 +163,23 @@ class BatchAlgorithmDialog(QgsProcessingAlgorithmDialogBase):
                 else:
                     break
 
-                handleAlgorithmResults(self.algorithm(), context, feedback, False)
+                if context.layersToLoadOnCompletion():
+                    load_contexts.append(context)
 
         feedback.pushInfo(self.tr('Batch execution completed in {0:0.2f} seconds'.format(time.time() - start_time)))
 
-        self.finish(algorithm_results)
-        self.cancelButton().setEnabled(False)
+        if not load_contexts:
+            self.finish(algorithm_results)
+            return
+
+        def on_loaded(ok):
+            self.finish(algorithm_results)
+
+        # the cancel button stays enabled to cancel the loading of the layers
+        handleBatchResults(self.algorithm(), load_contexts, feedback, False, onFinished=on_loaded)
 
     def finish(self, algorithm_results):
+        self.cancelButton().setEnabled(False)
         for count, results in enumerate(algorithm_results):
             self.loadHTMLResults(results, count)
 
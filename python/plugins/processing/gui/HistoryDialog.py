@@ -31,8 +31,10 @@ from qgis.PyQt import uic
 from qgis.PyQt.QtCore import Qt, QCoreApplication
 from qgis.PyQt.QtWidgets import QAction, QPushButton, QDialogButtonBox, QStyle, QMessageBox, QFileDialog, QMenu, QTreeWidgetItem
 from qgis.PyQt.QtGui import QIcon
+from qgis.gui import QgsFilterLineEdit
 from processing.gui import TestTools
-from processing.core.ProcessingLog import ProcessingLog
+from processing.core import ProcessingProfiler
+from processing.core.ProcessingLog import ProcessingLog, PAGE_SIZE
 
 pluginPath = os.path.split(os.path.dirname(__file__))[0]
 WIDGET, BASE = uic.loadUiType(
@@ -70,6 +72,16 @@ class HistoryDialog(BASE, WIDGET):
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.showPopupMenu)
 
+        self.searchBox = QgsFilterLineEdit()
+        self.searchBox.setShowSearchIcon(True)
+        self.searchBox.setPlaceholderText(self.tr('Search…'))
+        self.searchBox.textChanged.connect(self.fillTree)
+        self.verticalLayout.insertWidget(0, self.searchBox)
+
+        # entries are loaded a page at a time, when scrolling down the tree
+        self.tree.verticalScrollBar().valueChanged.connect(self.fetchMoreEntries)
+        self.tree.verticalScrollBar().rangeChanged.connect(self.fetchMoreEntries)
+
         self.fillTree()
 
     def clearLog(self):
@@ -97,16 +109,25 @@ class HistoryDialog(BASE, WIDGET):
 
     def fillTree(self):
         self.tree.clear()
-        entries = ProcessingLog.getLogEntries()
-        groupItem = QTreeWidgetItem()
-        groupItem.setText(0, 'ALGORITHM')
-        groupItem.setIcon(0, self.groupIcon)
-        for entry in entries:
+        self.filter = self.searchBox.text()
+        self.entriesCount = ProcessingLog.getLogEntriesCount(self.filter)
+        self.groupItem = QTreeWidgetItem()
+        self.groupItem.setText(0, 'ALGORITHM')
+        self.groupItem.setIcon(0, self.groupIcon)
+        self.tree.addTopLevelItem(self.groupItem)
+        self.groupItem.setExpanded(True)
+        self.fetchMoreEntries()
+
+    def fetchMoreEntries(self):
+        """Loads the next page of entries when the end of the tree is visible"""
+        scrollBar = self.tree.verticalScrollBar()
+        if self.groupItem.childCount() >= self.entriesCount or \
+                scrollBar.value() < scrollBar.maximum() - scrollBar.pageStep():
+            return
+        for entry in ProcessingLog.getLogEntries(self.groupItem.childCount(), PAGE_SIZE, self.filter):
             item = TreeLogEntryItem(entry, True)
             item.setIcon(0, self.keyIcon)
-            groupItem.insertChild(0, item)
-        self.tree.addTopLevelItem(groupItem)
-        groupItem.setExpanded(True)
+            self.groupItem.addChild(item)
 
     def executeAlgorithm(self):
         item = self.tree.currentItem()
@@ -121,7 +142,10 @@ class HistoryDialog(BASE, WIDGET):
     def changeText(self):
         item = self.tree.currentItem()
         if isinstance(item, TreeLogEntryItem):
-            self.text.setText(item.entry.text.replace('|', '\n'))
+            text = item.entry.text.replace('|', '\n')
+            if item.entry.profile:
+                text += '\n\n' + ProcessingProfiler.summary(item.entry.profile)
+            self.text.setText(text)
 
     def createTest(self):
         item = self.tree.currentItem()
@@ -137,8 +161,28 @@ class HistoryDialog(BASE, WIDGET):
                 createTestAction = QAction(QCoreApplication.translate('HistoryDialog', 'Create Test…'), self.tree)
                 createTestAction.triggered.connect(self.createTest)
                 popupmenu.addAction(createTestAction)
+                if item.entry.profile:
+                    exportProfileAction = QAction(QCoreApplication.translate('HistoryDialog', 'Export Profile…'), self.tree)
+                    exportProfileAction.triggered.connect(self.exportProfile)
+                    popupmenu.addAction(exportProfileAction)
                 popupmenu.exec_(self.tree.mapToGlobal(point))
 
+    def exportProfile(self):
+        item = self.tree.currentItem()
+        if not isinstance(item, TreeLogEntryItem) or not item.entry.profile:
+            return
+        jsonFilter = self.tr('JSON files (*.json *.JSON)')
+        traceFilter = self.tr('Chrome trace files (*.json *.JSON)')
+        fileName, filter = QFileDialog.getSaveFileName(self, self.tr('Export Profile'), '.',
+                                                       ';;'.join([jsonFilter, traceFilter]))
+        if fileName == '':
+            return
+
+        if not fileName.lower().endswith('.json'):
+            fileName += '.json'
+
+        ProcessingProfiler.exportProfiles([item.entry.profile], fileName, filter == traceFilter)
+
 
 class TreeLogEntryItem(QTreeWidgetItem):
 
@@ -28,67 +28,275 @@ __revision__ = '$Format:%H$'
 
 import os
 import traceback
+from contextlib import ExitStack
 from qgis.PyQt.QtWidgets import QApplication
-from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt.QtCore import QCoreApplication, QFile
+from qgis.PyQt.QtXml import QDomDocument
 from qgis.core import (Qgis,
+                       QgsApplication,
                        QgsProject,
+                       QgsProcessingContext,
                        QgsProcessingFeedback,
                        QgsProcessingUtils,
                        QgsMapLayer,
+                       QgsTask,
+                       QgsVectorLayer,
                        QgsWkbTypes,
                        QgsMessageLog)
 
+from processing.core import ProcessingProfiler
 from processing.core.ProcessingConfig import ProcessingConfig
 from processing.gui.RenderingStyles import RenderingStyles
 
+# parsed style files, as path: (modification time, document)
+_styles = {}
 
-def handleAlgorithmResults(alg, context, feedback=None, showResults=True):
-    wrongLayers = []
+
+def openLayer(uri, context):
+    """Opens the layer at uri, returns it (owned by the caller) or None"""
+    layer = QgsProcessingUtils.mapLayerFromString(uri, context)
+    if layer is not None:
+        layer = context.temporaryLayerStore().takeMapLayer(layer)
+    return layer
+
+
+class LoadResultLayersTask(QgsTask):
+
+    """
+    Opens and validates result layers in a background thread. The layers
+    are moved to the main thread, so that they can be added to a project
+    once the task is completed. layers and errors are keyed by the index
+    of the uri.
+    """
+
+    def __init__(self, uris):
+        super().__init__(QCoreApplication.translate('Postprocessing', 'Loading resulting layers'), QgsTask.CanCancel)
+        self.uris = uris
+        self.layers = {}
+        self.errors = {}
+
+    def run(self):
+        context = QgsProcessingContext()
+        mainThread = QCoreApplication.instance().thread()
+        for i, uri in enumerate(self.uris):
+            if self.isCanceled():
+                return False
+            try:
+                layer = openLayer(uri, context)
+                if layer is not None:
+                    layer.moveToThread(mainThread)
+                    self.layers[i] = layer
+            except Exception:
+                self.errors[i] = traceback.format_exc()
+            self.setProgress(100 * (i + 1) / float(len(self.uris)))
+        return True
+
+
+def openLayers(uris, feedback):
+    """Opens the layers at uris on the calling thread. Returns the layers
+    and the errors keyed by the index of the uri (without the layers which
+    could not be loaded), or None and the errors if canceled"""
+    context = QgsProcessingContext()
+    layers = {}
+    errors = {}
+    for i, uri in enumerate(uris):
+        if feedback.isCanceled():
+            return None, errors
+        if len(uris) > 2:
+            # only show progress feedback if we're loading a bunch of layers
+            feedback.setProgress(100 * i / float(len(uris)))
+        try:
+            layer = openLayer(uri, context)
+            if layer is not None:
+                layers[i] = layer
+        except Exception:
+            errors[i] = traceback.format_exc()
+    return layers, errors
+
+
+def loadLayers(uris, feedback, onFinished):
+    """Opens the layers at uris in a background task, calls onFinished with
+    the layers and the errors as returned by openLayers once done"""
+    task = LoadResultLayersTask(uris)
+    # keep the results, the task is deleted by the task manager once finished
+    layers, errors = task.layers, task.errors
+    done = []
+
+    def cancel():
+        if not done:
+            task.cancel()
+
+    def finished(completed):
+        done.append(True)
+        feedback.canceled.disconnect(cancel)
+        onFinished(layers if completed and not feedback.isCanceled() else None, errors)
+
+    task.taskCompleted.connect(lambda: finished(True))
+    task.taskTerminated.connect(lambda: finished(False))
+    if len(uris) > 2:
+        task.progressChanged.connect(feedback.setProgress)
+    feedback.canceled.connect(cancel)
+    QgsApplication.taskManager().addTask(task)
+
+
+def styleDocument(style):
+    """Returns the parsed style file, which is cached until the file is
+    modified, or None if style is not a readable file (e.g. the name of a
+    style stored in a database)"""
+    try:
+        modified = os.path.getmtime(style)
+    except OSError:
+        return None
+    cached = _styles.get(style)
+    if cached is None or cached[0] != modified:
+        doc = QDomDocument('qgis')
+        f = QFile(style)
+        if not f.open(QFile.ReadOnly):
+            return None
+        if not doc.setContent(f)[0]:
+            doc = None
+        f.close()
+        cached = (modified, doc)
+        _styles[style] = cached
+    return cached[1]
+
+
+def applyStyle(layer, style):
+    doc = None
+    # layers with styles in their data source load them in priority
+    if not isinstance(layer, QgsVectorLayer) or not layer.dataProvider().isSaveAndLoadStyleToDatabaseSupported():
+        doc = styleDocument(style)
+    if doc is None:
+        layer.loadNamedStyle(style)
+    else:
+        # importing the style may upgrade the document in place
+        layer.importNamedStyle(doc.cloneNode(True).toDocument())
+
+
+def layerStyle(alg, layer, details):
+    style = None
+    if details.outputName:
+        style = RenderingStyles.getStyle(alg.id(), details.outputName)
+    if style is None:
+        if layer.type() == QgsMapLayer.RasterLayer:
+            style = ProcessingConfig.getSetting(ProcessingConfig.RASTER_STYLE)
+        else:
+            if layer.geometryType() == QgsWkbTypes.PointGeometry:
+                style = ProcessingConfig.getSetting(ProcessingConfig.VECTOR_POINT_STYLE)
+            elif layer.geometryType() == QgsWkbTypes.LineGeometry:
+                style = ProcessingConfig.getSetting(ProcessingConfig.VECTOR_LINE_STYLE)
+            else:
+                style = ProcessingConfig.getSetting(ProcessingConfig.VECTOR_POLYGON_STYLE)
+    return style
+
+
+def handleAlgorithmResults(alg, context, feedback=None, showResults=True, onFinished=None):
+    """Adds the result layers of an execution of alg to their projects, see
+    handleBatchResults()"""
+    return handleBatchResults(alg, [context], feedback, showResults, onFinished)
+
+
+def handleBatchResults(alg, contexts, feedback=None, showResults=True, onFinished=None):
+    """
+    Adds the result layers of executions of alg, one per context, to their
+    projects with a single addMapLayers call per project. Returns whether
+    all the layers were loaded.
+
+    The layers which are not loaded yet are opened on the calling thread,
+    or in a LoadResultLayersTask if onFinished is given: the function then
+    returns None at once and onFinished is called with the result once the
+    layers are added.
+    """
     if feedback is None:
         feedback = QgsProcessingFeedback()
     feedback.setProgressText(QCoreApplication.translate('Postprocessing', 'Loading resulting layers'))
-    i = 0
-    for l, details in context.layersToLoadOnCompletion().items():
-        if feedback.isCanceled():
+
+    # layers which are already loaded (e.g. memory layers) are taken from
+    # the contexts, the others are opened
+    layers = {}
+    toOpen = []
+    for i, context in enumerate(contexts):
+        for l in context.layersToLoadOnCompletion().keys():
+            layer = QgsProcessingUtils.mapLayerFromString(l, context, False)
+            if layer is not None:
+                layers[(i, l)] = layer
+            else:
+                toOpen.append((i, l))
+
+    def addLayers(opened, errors):
+        for j, error in errors.items():
+            QgsMessageLog.logMessage(QCoreApplication.translate('Postprocessing', "Error loading result layer:") + "\n" + error, 'Processing', Qgis.Critical)
+        if opened is None:
             return False
+        for j, layer in opened.items():
+            layers[toOpen[j]] = layer
+        return _addLayers(alg, contexts, layers, feedback)
 
-        if len(context.layersToLoadOnCompletion()) > 2:
-            # only show progress feedback if we're loading a bunch of layers
-            feedback.setProgress(100 * i / float(len(context.layersToLoadOnCompletion())))
+    uris = [l for i, l in toOpen]
+    if onFinished is None:
+        with _loadPhase(contexts):
+            opened, errors = openLayers(uris, feedback)
+            return addLayers(opened, errors)
 
-        try:
-            layer = QgsProcessingUtils.mapLayerFromString(l, context)
-            if layer is not None:
+    def loaded(opened, errors):
+        # the layers were opened in the background, only adding them is profiled
+        with _loadPhase(contexts):
+            result = addLayers(opened, errors)
+        onFinished(result)
+
+    if not uris or feedback.isCanceled():
+        loaded({} if not feedback.isCanceled() else None, {})
+    else:
+        loadLayers(uris, feedback, loaded)
+    return None
+
+
+def _loadPhase(contexts):
+    """Records the loading of results as a phase of the profiles of the
+    executions"""
+    stack = ExitStack()
+    for context in contexts:
+        stack.enter_context(ProcessingProfiler.phase('load results', ProcessingProfiler.contextProfile(context)))
+    return stack
+
+
+def _addLayers(alg, contexts, layers, feedback):
+    wrongLayers = []
+    # projects with the layers to add to them, in the order of the results
+    projects = {}
+    for i, context in enumerate(contexts):
+        for l, details in context.layersToLoadOnCompletion().items():
+            if feedback.isCanceled():
+                return False
+
+            layer = layers.get((i, l))
+            if layer is None:
+                wrongLayers.append(str(l))
+                continue
+            try:
                 if not ProcessingConfig.getSetting(ProcessingConfig.USE_FILENAME_AS_LAYER_NAME):
                     layer.setName(details.name)
 
-                style = None
-                if details.outputName:
-                    style = RenderingStyles.getStyle(alg.id(), details.outputName)
-                if style is None:
-                    if layer.type() == QgsMapLayer.RasterLayer:
-                        style = ProcessingConfig.getSetting(ProcessingConfig.RASTER_STYLE)
-                    else:
-                        if layer.geometryType() == QgsWkbTypes.PointGeometry:
-                            style = ProcessingConfig.getSetting(ProcessingConfig.VECTOR_POINT_STYLE)
-                        elif layer.geometryType() == QgsWkbTypes.LineGeometry:
-                            style = ProcessingConfig.getSetting(ProcessingConfig.VECTOR_LINE_STYLE)
-                        else:
-                            style = ProcessingConfig.getSetting(ProcessingConfig.VECTOR_POLYGON_STYLE)
+                style = layerStyle(alg, layer, details)
                 if style:
-                    layer.loadNamedStyle(style)
+                    applyStyle(layer, style)
 
-                details.project.addMapLayer(context.temporaryLayerStore().takeMapLayer(layer))
+                if context.temporaryLayerStore().mapLayer(layer.id()) is not None:
+                    layer = context.temporaryLayerStore().takeMapLayer(layer)
+                projects.setdefault(details.project, []).append((l, layer, details, context))
+            except Exception:
+                QgsMessageLog.logMessage(QCoreApplication.translate('Postprocessing', "Error loading result layer:") + "\n" + traceback.format_exc(), 'Processing', Qgis.Critical)
+                wrongLayers.append(str(l))
 
+    for project, projectLayers in projects.items():
+        project.addMapLayers([layer for l, layer, details, context in projectLayers])
+        for l, layer, details, context in projectLayers:
+            try:
                 if details.postProcessor():
                     details.postProcessor().postProcessLayer(layer, context, feedback)
-
-            else:
+            except Exception:
+                QgsMessageLog.logMessage(QCoreApplication.translate('Postprocessing', "Error loading result layer:") + "\n" + traceback.format_exc(), 'Processing', Qgis.Critical)
                 wrongLayers.append(str(l))
-        except Exception:
-            QgsMessageLog.logMessage(QCoreApplication.translate('Postprocessing', "Error loading result layer:") + "\n" + traceback.format_exc(), 'Processing', Qgis.Critical)
-            wrongLayers.append(str(l))
-        i += 1
 
     feedback.setProgress(100)
 
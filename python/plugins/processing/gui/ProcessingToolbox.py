@@ -37,6 +37,7 @@ from qgis.core import (QgsApplication,
 from qgis.gui import QgsDockWidget
 
 from processing.gui.Postprocessing import handleAlgorithmResults
+from processing.core.AlgorithmSearchIndex import searchIndex
 from processing.core.ProcessingLog import ProcessingLog
 from processing.core.ProcessingConfig import ProcessingConfig, settingsWatcher
 from processing.gui.MessageDialog import MessageDialog
@@ -124,16 +125,15 @@ class ProcessingToolbox(QgsDockWidget, WIDGET):
         text = self.searchBox.text().strip(' ').lower()
         for item in list(self.disabledProviderItems.values()):
             item.setHidden(True)
-        self._filterItem(self.algorithmTree.invisibleRootItem(), [t for t in text.split(' ') if t])
+        matches = set(algId for algId, _ in searchIndex.search(text)) if text else None
+        self._filterItem(self.algorithmTree.invisibleRootItem(), matches)
         if text:
             self.algorithmTree.expandAll()
             self.disabledWithMatchingAlgs = []
+            matchingProviders = searchIndex.providerIds(text)
             for provider in QgsApplication.processingRegistry().providers():
-                if not provider.isActive():
-                    for alg in provider.algorithms():
-                        if text in alg.name():
-                            self.disabledWithMatchingAlgs.append(provider.id())
-                            break
+                if not provider.isActive() and provider.id() in matchingProviders:
+                    self.disabledWithMatchingAlgs.append(provider.id())
             showTip = ProcessingConfig.getSetting(ProcessingConfig.SHOW_PROVIDERS_TOOLTIP)
             if showTip:
                 self.txtDisabled.setVisible(bool(self.disabledWithMatchingAlgs))
@@ -148,24 +148,19 @@ class ProcessingToolbox(QgsDockWidget, WIDGET):
             self.algorithmTree.invisibleRootItem().child(0).setExpanded(True)
             self.txtDisabled.setVisible(False)
 
-    def _filterItem(self, item, text):
+    def _filterItem(self, item, matches):
+        """matches is the set of ids of the algorithms to show, None to show
+        every algorithm"""
         if (item.childCount() > 0):
             show = False
             for i in range(item.childCount()):
                 child = item.child(i)
-                showChild = self._filterItem(child, text)
+                showChild = self._filterItem(child, matches)
                 show = (showChild or show) and item not in list(self.disabledProviderItems.values())
             item.setHidden(not show)
             return show
         elif isinstance(item, TreeAlgorithmItem):
-            # hide if every part of text is not contained somewhere in either the item text or item user role
-            item_text = [item.text(0).lower(), item.data(0, ProcessingToolbox.NAME_ROLE).lower()]
-            item_text.append(item.alg.id())
-            item_text.extend(item.data(0, ProcessingToolbox.TAG_ROLE))
-
-            hide = bool(text) and not all(
-                any(part in t for t in item_text)
-                for part in text)
+            hide = matches is not None and item.alg.id() not in matches
 
             item.setHidden(hide)
             return not hide
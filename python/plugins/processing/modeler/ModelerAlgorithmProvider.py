@@ -27,6 +27,7 @@ __revision__ = '$Format:%H$'
 
 import os
 
+from qgis.PyQt.QtCore import QFile, QTimer
 from qgis.PyQt.QtXml import QDomDocument
 
 from qgis.core import (Qgis,
@@ -34,6 +35,7 @@ from qgis.core import (Qgis,
                        QgsProcessingProvider,
                        QgsMessageLog,
                        QgsProcessingModelAlgorithm,
+                       QgsProcessingModelChildAlgorithm,
                        QgsProcessingUtils,
                        QgsXmlUtils)
 
@@ -52,6 +54,10 @@ from processing.modeler.ModelerUtils import ModelerUtils
 
 pluginPath = os.path.split(os.path.dirname(__file__))[0]
 
+# delay (in ms) before resolving the child algorithms of the models once providers
+# are added, so that a batch of providers being added only triggers it once
+REFRESH_DELAY = 250
+
 
 class ModelerAlgorithmProvider(QgsProcessingProvider):
 
@@ -61,13 +67,53 @@ class ModelerAlgorithmProvider(QgsProcessingProvider):
         self.contextMenuActions = [EditModelAction(), DeleteModelAction()]
         self.algs = []
         self.isLoading = False
+        # model definitions, as path: (modification time, size, definition)
+        self.definitions = {}
+        self.loaded = set()
+        # child algorithms of the loaded models, as (model, child id, algorithm id)
+        self.children = []
+        # ids of the providers added since the child algorithms were resolved
+        self.addedProviders = set()
+
+        self.refreshTimer = QTimer()
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.setInterval(REFRESH_DELAY)
+        self.refreshTimer.timeout.connect(self.reattachChildAlgorithms)
 
         # must reload models if providers list is changed - previously unavailable algorithms
         # which models depend on may now be available
         QgsApplication.processingRegistry().providerAdded.connect(self.onProviderAdded)
 
     def onProviderAdded(self, provider_id):
-        self.refreshAlgorithms()
+        if provider_id != self.id():
+            self.addedProviders.add(provider_id)
+            self.refreshTimer.start()
+
+    def refreshAlgorithms(self):
+        self.refreshTimer.stop()
+        self.addedProviders = set()
+        # the algorithms are deleted by QgsProcessingProvider.refreshAlgorithms()
+        self.algs = []
+        self.children = []
+        super().refreshAlgorithms()
+
+    def reattachChildAlgorithms(self):
+        """Creates again the child algorithms of the loaded models which were
+        not available, or which belong to the providers added since. The models
+        themselves are kept, instead of being read and instantiated again"""
+        providers = self.addedProviders
+        self.addedProviders = set()
+        changed = False
+        for alg, childId, algorithmId in self.children:
+            wasResolved = alg.childAlgorithm(childId).algorithm() is not None
+            if wasResolved and algorithmId.split(':')[0] not in providers:
+                continue
+            # the copy creates its algorithm from the registry
+            alg.setChildAlgorithm(QgsProcessingModelChildAlgorithm(alg.childAlgorithm(childId)))
+            if wasResolved or alg.childAlgorithm(childId).algorithm() is not None:
+                changed = True
+        if changed:
+            self.algorithmsLoaded.emit()
 
     def load(self):
         ProcessingConfig.settingIcons[self.name()] = self.icon()
@@ -107,13 +153,39 @@ class ModelerAlgorithmProvider(QgsProcessingProvider):
             return
         self.isLoading = True
         self.algs = []
+        self.children = []
+        self.loaded = set()
         folders = ModelerUtils.modelsFolders()
         for f in folders:
             self.loadFromFolder(f)
+        # forget the models which were removed
+        for path in set(self.definitions.keys()) - self.loaded:
+            del self.definitions[path]
         for a in self.algs:
             self.addAlgorithm(a)
         self.isLoading = False
 
+    def modelDefinition(self, path):
+        """Returns the definition of the model stored in path, only reading
+        the file if it was modified since the last time it was read"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        cached = self.definitions.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime, st.st_size):
+            return cached[2]
+
+        definition = None
+        doc = QDomDocument()
+        f = QFile(path)
+        if f.open(QFile.ReadOnly):
+            if doc.setContent(f)[0]:
+                definition = QgsXmlUtils.readVariant(doc.firstChildElement())
+            f.close()
+        self.definitions[path] = (st.st_mtime, st.st_size, definition)
+        return definition
+
     def loadFromFolder(self, folder):
         if not os.path.exists(folder):
             return
@@ -122,12 +194,18 @@ class ModelerAlgorithmProvider(QgsProcessingProvider):
                 if descriptionFile.endswith('model3'):
                     try:
                         fullpath = os.path.join(path, descriptionFile)
+                        self.loaded.add(fullpath)
 
+                        # the provider deletes its algorithms on each refresh,
+                        # so models are instantiated again from their definitions
+                        definition = self.modelDefinition(fullpath)
                         alg = QgsProcessingModelAlgorithm()
-                        if alg.fromFile(fullpath):
+                        if definition is not None and alg.loadVariant(definition):
                             if alg.name():
                                 alg.setSourceFilePath(fullpath)
                                 self.algs.append(alg)
+                                for childId, child in definition.get('children', {}).items():
+                                    self.children.append((alg, childId, child.get('alg_id', '')))
                         else:
                             QgsMessageLog.logMessage(self.tr('Could not load model {0}', 'ModelerAlgorithmProvider').format(descriptionFile),
                                                      self.tr('Processing'), Qgis.Critical)
@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    AlgorithmsBenchmark.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Benchmarks of the algorithms of the algorithm test definitions (see
+# README.md). Each algorithm is run several times with the test data or with
+# synthetic layers of a given number of features, which have the geometry
+# type and fields of the test data. Times and memory are written to a JSON
+# file, which can be compared with a baseline from an earlier run:
+#
+#   python AlgorithmsBenchmark.py --filter distancematrix --scale 1000 --scale 100000 \
+#       --output current.json --baseline baseline.json
+
+import qgis  # NOQA switch sip api
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import yaml
+
+from qgis.core import (Qgis,
+                       QgsApplication,
+                       QgsFeature,
+                       QgsFeatureRequest,
+                       QgsGeometry,
+                       QgsPointXY,
+                       QgsProcessingContext,
+                       QgsProcessingException,
+                       QgsProcessingFeedback,
+                       QgsProject,
+                       QgsRectangle,
+                       QgsVectorFileWriter,
+                       QgsVectorLayer,
+                       QgsWkbTypes)
+from qgis.analysis import QgsNativeAlgorithms
+from qgis.testing import start_app
+
+import AlgorithmsTestBase
+from AlgorithmsTestBase import processingTestDataPath
+
+# relative increase of the time or memory of a benchmark reported as a regression
+DEFAULT_THRESHOLD = 0.2
+
+# differences below these are considered noise
+MIN_TIME_DIFFERENCE = 0.005
+MIN_MEMORY_DIFFERENCE = 1 << 20
+
+
+def randomPoints(extent, count, rng):
+    for i in range(count):
+        yield QgsGeometry.fromPointXY(QgsPointXY(rng.uniform(extent.xMinimum(), extent.xMaximum()),
+                                                 rng.uniform(extent.yMinimum(), extent.yMaximum())))
+
+
+def randomLines(extent, count, rng):
+    step = math.sqrt(extent.width() * extent.height() / max(count, 1))
+    for point in randomPoints(extent, count, rng):
+        x, y = point.asPoint().x(), point.asPoint().y()
+        vertices = [QgsPointXY(x, y)]
+        for i in range(rng.randint(1, 4)):
+            x += rng.uniform(-step, step)
+            y += rng.uniform(-step, step)
+            vertices.append(QgsPointXY(x, y))
+        yield QgsGeometry.fromPolylineXY(vertices)
+
+
+def randomPolygons(extent, count, rng):
+    """Generates star-shaped polygons, which overlap each other"""
+    radius = math.sqrt(extent.width() * extent.height() / max(count, 1))
+    for point in randomPoints(extent, count, rng):
+        center = point.asPoint()
+        sides = rng.randint(3, 8)
+        ring = []
+        for i in range(sides):
+            angle = 2 * math.pi * i / sides
+            r = radius * rng.uniform(0.3, 1.0)
+            ring.append(QgsPointXY(center.x() + r * math.cos(angle), center.y() + r * math.sin(angle)))
+        ring.append(ring[0])
+        yield QgsGeometry.fromPolygonXY([ring])
+
+
+def squareGrid(extent, count, rng=None):
+    """Generates a grid of about count adjacent squares covering extent"""
+    columns = max(1, int(round(math.sqrt(count * extent.width() / extent.height()))))
+    rows = max(1, int(math.ceil(count / float(columns))))
+    width = extent.width() / columns
+    height = extent.height() / rows
+    for i in range(count):
+        x = extent.xMinimum() + (i % columns) * width
+        y = extent.yMinimum() + (i // columns) * height
+        yield QgsGeometry.fromRect(QgsRectangle(x, y, x + width, y + height))
+
+
+GEOMETRY_GENERATORS = {QgsWkbTypes.PointGeometry: randomPoints,
+                       QgsWkbTypes.LineGeometry: randomLines,
+                       QgsWkbTypes.PolygonGeometry: randomPolygons}
+
+
+def syntheticLayer(template, count, fileName, polygons=randomPolygons, seed=0):
+    """Writes a GeoPackage of count features, with the fields, geometry type
+    and CRS of the template layer, geometries within its extent and attributes
+    taken from its features. Returns the file name"""
+    rng = random.Random(seed)
+    attributes = [f.attributes() for f in template.getFeatures(QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry))]
+    if not attributes:
+        attributes = [[None] * template.fields().count()]
+
+    extent = QgsRectangle(template.extent())
+    if extent.isEmpty() or extent.width() == 0 or extent.height() == 0:
+        extent = QgsRectangle(0, 0, 100, 100)
+
+    wkbType = template.wkbType()
+    geometryType = QgsWkbTypes.geometryType(wkbType)
+    if geometryType == QgsWkbTypes.PolygonGeometry:
+        geometries = polygons(extent, count, rng)
+    elif geometryType in GEOMETRY_GENERATORS:
+        geometries = GEOMETRY_GENERATORS[geometryType](extent, count, rng)
+    else:
+        geometries = (None for i in range(count))
+
+    # the test data often have a 'fid' field, which would clash with the GeoPackage one
+    writer = QgsVectorFileWriter(fileName, 'UTF-8', template.fields(), wkbType, template.crs(), 'GPKG',
+                                 [], ['FID=synthetic_fid'])
+    for i, geometry in enumerate(geometries):
+        feature = QgsFeature(template.fields())
+        feature.setAttributes(attributes[i % len(attributes)])
+        if geometry is not None:
+            if QgsWkbTypes.isMultiType(wkbType):
+                geometry.convertToMultiType()
+            if QgsWkbTypes.hasZ(wkbType):
+                geometry.get().addZValue(0)
+            if QgsWkbTypes.hasM(wkbType):
+                geometry.get().addMValue(0)
+            feature.setGeometry(geometry)
+        writer.addFeature(feature)
+    del writer
+    return fileName
+
+
+class MemorySampler(object):
+
+    """Samples the resident set size of the process while running, to
+    estimate the peak memory used by an algorithm"""
+
+    INTERVAL = 0.005
+
+    def __init__(self):
+        self.peak = None
+        self.baseline = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def rss():
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+    def __enter__(self):
+        self.baseline = self.rss()
+        self.peak = self.baseline
+        if self.baseline is not None:
+            self._thread = threading.Thread(target=self._sample)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._update()
+
+    def _update(self):
+        rss = self.rss()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def _sample(self):
+        while not self._stop.wait(self.INTERVAL):
+            self._update()
+
+    def used(self):
+        """Returns the peak memory above the memory used when started"""
+        if self.baseline is None:
+            return None
+        return self.peak - self.baseline
+
+
+class AlgorithmsBenchmark(AlgorithmsTestBase.AlgorithmsTest):
+
+    """
+    Runs the algorithms of an algorithm test definition file, reusing the
+    parameter loading of the algorithm tests
+    """
+
+    def __init__(self, definitionFile='qgis_algorithm_tests.yaml', polygons=randomPolygons):
+        self.definitionFile = definitionFile
+        self.polygons = polygons
+        self.scale = None
+        self.cleanup_paths = []
+        self.in_place_layers = {}
+        self.vector_layer_params = {}
+        self.synthetic = {}
+        self.dataDir = tempfile.mkdtemp()
+        self.cleanup_paths.append(self.dataDir)
+
+    def test_definition_file(self):
+        return self.definitionFile
+
+    def assertTrue(self, expr, msg=None):
+        if not expr:
+            raise AssertionError(msg)
+
+    def cleanup(self):
+        QgsProject.instance().removeAllMapLayers()
+        self.vector_layer_params = {}
+        for path in self.cleanup_paths:
+            shutil.rmtree(path, True)
+        self.cleanup_paths = []
+
+    def definitions(self, filter=None):
+        with open(os.path.join(processingTestDataPath(), self.definitionFile), 'r') as stream:
+            tests = yaml.load(stream)['tests'] or []
+        if filter:
+            expression = re.compile(filter, re.I)
+            tests = [t for t in tests if expression.search(t['name']) or expression.search(t['algorithm'])]
+        return tests
+
+    def load_layer(self, id, param):
+        if self.scale is None or param['type'] != 'vector':
+            return super().load_layer(id, param)
+
+        # replace the test layer with a synthetic one
+        key = (param['name'], self.scale)
+        if key not in self.synthetic:
+            template = QgsVectorLayer(self.filepath_from_param(param), param['name'], 'ogr')
+            self.assertTrue(template.isValid(), 'Could not load layer "{}"'.format(param['name']))
+            fileName = os.path.join(self.dataDir, '{}_{}.gpkg'.format(len(self.synthetic), self.scale))
+            self.synthetic[key] = syntheticLayer(template, self.scale, fileName, self.polygons)
+
+        fileName = self.synthetic[key]
+        if fileName not in self.vector_layer_params:
+            options = QgsVectorLayer.LayerOptions()
+            options.loadDefaultStyle = False
+            layer = QgsVectorLayer(fileName, param['name'], 'ogr', options)
+            self.assertTrue(layer.isValid(), 'Could not load layer "{}"'.format(fileName))
+            QgsProject.instance().addMapLayer(layer)
+            self.vector_layer_params[fileName] = layer
+        return self.vector_layer_params[fileName]
+
+    def benchmark(self, defs, scale=None, repeat=5):
+        """Runs the algorithm of a test definition repeat times, returns the
+        times and memory, None if the algorithm cannot be benchmarked. Raises
+        an exception if the algorithm fails"""
+        if 'expectedFailure' in defs or any(isinstance(p, dict) and p.get('in_place')
+                                            for p in (defs['params'].values() if isinstance(defs['params'], dict)
+                                                      else defs['params'])):
+            # failing and in place algorithms can't be run repeatedly
+            return None
+
+        self.scale = scale
+        try:
+            QgsProject.instance().removeAllMapLayers()
+            self.vector_layer_params = {}
+            params = self.load_params(defs['params'])
+            alg = QgsApplication.processingRegistry().createAlgorithmById(defs['algorithm'])
+            if alg is None:
+                raise QgsProcessingException('Algorithm {} not found'.format(defs['algorithm']))
+
+            if isinstance(params, list):
+                parameters = dict((d.name(), p) for d, p in zip(alg.parameterDefinitions(), params))
+            else:
+                parameters = dict(params)
+
+            times = []
+            memory = []
+            for i in range(repeat):
+                for r, p in defs['results'].items():
+                    parameters[r] = self.load_result_param(p)
+
+                context = QgsProcessingContext()
+                context.setProject(QgsProject.instance())
+                if defs.get('skipInvalid'):
+                    context.setInvalidGeometryCheck(QgsFeatureRequest.GeometrySkipInvalid)
+
+                with MemorySampler() as sampler:
+                    start = time.perf_counter()
+                    results, ok = alg.run(parameters, context, QgsProcessingFeedback())
+                    times.append(time.perf_counter() - start)
+                if not ok:
+                    raise QgsProcessingException('Algorithm {} failed'.format(defs['algorithm']))
+                memory.append(sampler.used())
+        finally:
+            self.scale = None
+
+        return {'name': defs['name'],
+                'algorithm': defs['algorithm'],
+                'scale': scale,
+                'repeat': repeat,
+                'times': times,
+                'min': min(times),
+                'median': statistics.median(times),
+                'mean': statistics.mean(times),
+                'peak_memory': max(memory) if None not in memory else None}
+
+    def run(self, filter=None, scales=(None,), repeat=5, log=None):
+        """Runs the benchmarks of the test definitions matching filter,
+        returns the benchmarks report, with the errors of the failing
+        benchmarks"""
+        benchmarks = {}
+        failures = {}
+        for defs in self.definitions(filter):
+            for scale in scales:
+                key = benchmarkKey(defs['name'], scale)
+                try:
+                    result = self.benchmark(defs, scale, repeat)
+                except Exception as e:
+                    result = None
+                    failures[key] = str(e)
+                    if log:
+                        log('{}: {}'.format(key, e))
+                if result is not None:
+                    benchmarks[key] = result
+                    if log:
+                        log('{}: {:.4f}s median, {:.4f}s min'.format(key, result['median'], result['min']))
+        return {'qgis': Qgis.QGIS_VERSION,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'date': datetime.datetime.now().isoformat(),
+                'benchmarks': benchmarks,
+                'failures': failures}
+
+
+def benchmarkKey(name, scale):
+    return '{} [{}]'.format(name, scale if scale is not None else 'test data')
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Compares two benchmark reports. Returns the list of regressions, as
+    (benchmark, measure, baseline value, current value) tuples. Benchmarks
+    of the baseline which failed or are missing from the current report are
+    regressions of their 'failed' or 'missing' measure, with a None current
+    value"""
+    regressions = []
+    failures = current.get('failures', {})
+    for key, base in sorted(baseline['benchmarks'].items()):
+        result = current['benchmarks'].get(key)
+        if result is None:
+            regressions.append((key, 'failed' if key in failures else 'missing', base['median'], None))
+            continue
+        if result['median'] - base['median'] > max(threshold * base['median'], MIN_TIME_DIFFERENCE):
+            regressions.append((key, 'median', base['median'], result['median']))
+        if result['peak_memory'] is not None and base['peak_memory'] is not None and \
+                result['peak_memory'] - base['peak_memory'] > max(threshold * base['peak_memory'], MIN_MEMORY_DIFFERENCE):
+            regressions.append((key, 'peak_memory', base['peak_memory'], result['peak_memory']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of the Processing algorithms')
+    parser.add_argument('--definitions', default='qgis_algorithm_tests.yaml',
+                        help='test definition file of the testdata folder')
+    parser.add_argument('--filter', help='regular expression matching the names or ids of the algorithms')
+    parser.add_argument('--scale', type=int, action='append',
+                        help='number of features of the synthetic input layers, '
+                             'the test data are used if not set (can be repeated)')
+    parser.add_argument('--grid', action='store_true',
+                        help='generate adjacent squares rather than overlapping polygons')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs of each algorithm')
+    parser.add_argument('--output', help='JSON file the results are written to')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative increase reported as a regression')
+    args = parser.parse_args(argv)
+
+    start_app()
+    from processing.core.Processing import Processing
+    Processing.initialize()
+    QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+
+    harness = AlgorithmsBenchmark(args.definitions, squareGrid if args.grid else randomPolygons)
+    try:
+        report = harness.run(args.filter, args.scale or [None], args.repeat, print)
+    finally:
+        harness.cleanup()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for key, measure, base, value in regressions:
+            if value is None:
+                print('REGRESSION {}: {}'.format(key, measure))
+            else:
+                print('REGRESSION {}: {} {:.4g} -> {:.4g}'.format(key, measure, base, value))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    AlgorithmsBenchmarkTest.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+
+from qgis.core import QgsApplication, QgsProcessingException, QgsVectorLayer, QgsWkbTypes
+from qgis.analysis import QgsNativeAlgorithms
+from qgis.testing import start_app, unittest
+
+from AlgorithmsBenchmark import (AlgorithmsBenchmark,
+                                 benchmarkKey,
+                                 compare,
+                                 squareGrid,
+                                 syntheticLayer)
+from AlgorithmsTestBase import processingTestDataPath
+
+start_app()
+
+
+class AlgorithmsBenchmarkTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from processing.core.Processing import Processing
+        Processing.initialize()
+        QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def testSyntheticLayer(self):
+        for name, geometryType in (('points.gml', QgsWkbTypes.PointGeometry),
+                                   ('lines.gml', QgsWkbTypes.LineGeometry),
+                                   ('polys.gml', QgsWkbTypes.PolygonGeometry)):
+            template = QgsVectorLayer(os.path.join(processingTestDataPath(), name), name, 'ogr')
+            fileName = syntheticLayer(template, 500, os.path.join(self.dir, name + '.gpkg'))
+            layer = QgsVectorLayer(fileName, name, 'ogr')
+            self.assertTrue(layer.isValid())
+            self.assertEqual(layer.featureCount(), 500)
+            self.assertEqual(QgsWkbTypes.geometryType(layer.wkbType()), geometryType)
+            self.assertEqual([f.name() for f in layer.fields() if f.name() != 'synthetic_fid'],
+                             [f.name() for f in template.fields()])
+            self.assertTrue(template.extent().contains(layer.extent()) or geometryType != QgsWkbTypes.PointGeometry)
+
+    def testGrid(self):
+        template = QgsVectorLayer(os.path.join(processingTestDataPath(), 'polys.gml'), 'polys', 'ogr')
+        layer = QgsVectorLayer(syntheticLayer(template, 100, os.path.join(self.dir, 'grid.gpkg'), squareGrid),
+                               'grid', 'ogr')
+        areas = set(round(f.geometry().area(), 6) for f in layer.getFeatures())
+        self.assertEqual(len(areas), 1)
+
+    def testBenchmark(self):
+        harness = AlgorithmsBenchmark()
+        try:
+            report = harness.run('^Centroid$', [None, 1000], repeat=2)
+        finally:
+            harness.cleanup()
+        self.assertEqual(sorted(report['benchmarks'].keys()),
+                         [benchmarkKey('Centroid', 1000), benchmarkKey('Centroid', None)])
+        self.assertEqual(report['failures'], {})
+        result = report['benchmarks'][benchmarkKey('Centroid', 1000)]
+        self.assertEqual(result['algorithm'], 'native:centroids')
+        self.assertEqual(len(result['times']), 2)
+        self.assertLessEqual(result['min'], result['median'])
+
+    def testCompare(self):
+        def report(median, memory):
+            return {'benchmarks': {'a [1000]': {'median': median, 'peak_memory': memory}}}
+
+        self.assertEqual(compare(report(1.0, 100 << 20), report(1.1, 110 << 20)), [])
+        self.assertEqual(compare(report(1.0, 100 << 20), report(1.5, 100 << 20)),
+                         [('a [1000]', 'median', 1.0, 1.5)])
+        self.assertEqual(compare(report(1.0, 100 << 20), report(1.0, 200 << 20)),
+                         [('a [1000]', 'peak_memory', 100 << 20, 200 << 20)])
+        # too small to be significant
+        self.assertEqual(compare(report(0.001, 1000), report(0.002, 2000)), [])
+        # benchmarks missing from the baseline are ignored
+        self.assertEqual(compare({'benchmarks': {}}, report(1.0, None)), [])
+        # benchmarks of the baseline which failed or were not run are regressions
+        self.assertEqual(compare(report(1.0, None), {'benchmarks': {}, 'failures': {'a [1000]': 'error'}}),
+                         [('a [1000]', 'failed', 1.0, None)])
+        self.assertEqual(compare(report(1.0, None), {'benchmarks': {}, 'failures': {}}),
+                         [('a [1000]', 'missing', 1.0, None)])
+
+    def testFailure(self):
+        harness = AlgorithmsBenchmark()
+        defs = {'name': 'Missing', 'algorithm': 'native:missing', 'params': {}, 'results': {}}
+        try:
+            with self.assertRaises(QgsProcessingException):
+                harness.benchmark(defs)
+        finally:
+            harness.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -28,10 +28,13 @@ __revision__ = '$Format:%H$'
 from qgis.testing import start_app, unittest
 from qgis.core import (QgsApplication,
                        QgsCoordinateReferenceSystem,
+                       QgsProcessingAlgorithm,
                        QgsProcessingParameterMatrix,
+                       QgsProcessingProvider,
                        QgsVectorLayer)
 from qgis.analysis import QgsNativeAlgorithms
 
+from processing.core.AlgorithmSearchIndex import AlgorithmSearchIndex
 from processing.gui.AlgorithmDialog import AlgorithmDialog
 from processing.gui.BatchAlgorithmDialog import BatchAlgorithmDialog
 from processing.modeler.ModelerParametersDialog import ModelerParametersDialog
@@ -49,6 +52,81 @@ class AlgorithmDialogTest(unittest.TestCase):
         self.assertEqual(a.mainWidget().alg, alg)
 
 
+class SearchTestAlgorithm(QgsProcessingAlgorithm):
+
+    def name(self):
+        return 'zigzaglines'
+
+    def displayName(self):
+        return 'Zigzag lines'
+
+    def tags(self):
+        return ['sawtooth']
+
+    def shortHelpString(self):
+        return 'Replaces the <b>segments</b> of lines by triangles'
+
+    def initAlgorithm(self, config=None):
+        pass
+
+    def processAlgorithm(self, parameters, context, feedback):
+        return {}
+
+    def createInstance(self):
+        return SearchTestAlgorithm()
+
+
+class SearchTestProvider(QgsProcessingProvider):
+
+    def id(self):
+        return 'searchtest'
+
+    def name(self):
+        return 'Search test'
+
+    def loadAlgorithms(self):
+        self.addAlgorithm(SearchTestAlgorithm())
+
+
+class AlgorithmSearchIndexTest(unittest.TestCase):
+
+    def testSearch(self):
+        index = AlgorithmSearchIndex()
+        ids = [r[0] for r in index.search('centroid')]
+        self.assertIn('native:centroids', ids)
+        # every word has to match
+        self.assertIn('native:centroids', [r[0] for r in index.search('native centroids')])
+        self.assertEqual(index.search('centroids zzzzzz'), [])
+        self.assertEqual(len(index.search('')), len([a for a in QgsApplication.processingRegistry().algorithms()
+                                                     if not a.flags() & QgsProcessingAlgorithm.FlagHideFromToolbox]))
+
+        # searches only verify the candidates of the n-gram postings, and
+        # don't index the algorithms again
+        documents = index._nextId
+        candidates = index._candidates('centroid')
+        self.assertIn('native:centroids', [index._documents[i].algorithmId for i in candidates])
+        self.assertLess(len(candidates), len(index._documents) / 2)
+        index.search('centroid')
+        self.assertEqual(index._nextId, documents)
+
+    def testProviderChanges(self):
+        index = AlgorithmSearchIndex()
+        self.assertEqual(index.search('zigzag'), [])
+
+        provider = SearchTestProvider()
+        QgsApplication.processingRegistry().addProvider(provider)
+        self.assertEqual([r[0] for r in index.search('zigzag')], ['searchtest:zigzaglines'])
+        self.assertEqual([r[0] for r in index.search('sawtooth')], ['searchtest:zigzaglines'])
+        self.assertEqual(index.providerIds('zigzag'), {'searchtest'})
+
+        # display name matches rank before help matches
+        name, help = index.search('zig'), index.search('segments')
+        self.assertGreater(name[0][1], help[0][1])
+
+        QgsApplication.processingRegistry().removeProvider(provider)
+        self.assertEqual(index.search('zigzag'), [])
+
+
 class WrappersTest(unittest.TestCase):
 
     def checkConstructWrapper(self, param, expected_wrapper_class):
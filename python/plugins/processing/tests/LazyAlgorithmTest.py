@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    LazyAlgorithmTest.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from qgis.core import QgsProcessingProvider
+from qgis.testing import start_app, unittest
+
+from processing.algs.qgis.ExtentFromLayer import ExtentFromLayer
+from processing.algs.qgis.FieldsMapper import FieldsMapper
+from processing.algs.qgis.Grid import Grid
+from processing.core.LazyAlgorithm import AlgorithmManifest, LazyAlgorithm
+
+start_app()
+
+# loads the QGIS algorithm provider in a new interpreter with the manifest
+# given as first argument, and writes the time spent and the number of
+# algorithm modules imported as JSON to the file given as second argument
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+from qgis.testing import start_app
+start_app()
+start = time.perf_counter()
+from processing.algs.qgis.QgisAlgorithmProvider import QgisAlgorithmProvider
+provider = QgisAlgorithmProvider()
+provider.manifest.path = sys.argv[1]
+provider.loadAlgorithms()
+elapsed = time.perf_counter() - start
+with open(sys.argv[2], 'w') as f:
+    json.dump({'time': elapsed,
+               'modules': len([m for m in sys.modules if m.startswith('processing.algs.qgis.')])}, f)
+"""
+
+
+class TestProvider(QgsProcessingProvider):
+
+    def __init__(self, algs):
+        super().__init__()
+        self.algs = algs
+
+    def id(self):
+        return 'qgis'
+
+    def name(self):
+        return 'test'
+
+    def loadAlgorithms(self):
+        for a in self.algs:
+            self.addAlgorithm(a)
+
+
+class LazyAlgorithmTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # algorithms keep a reference to their provider
+        cls.providers = []
+
+    def register(self, alg):
+        provider = TestProvider([alg])
+        provider.loadAlgorithms()
+        self.providers.append(provider)
+
+    def stub(self, alg):
+        """Returns a stub of alg, both being registered in a provider"""
+        self.register(alg)
+        entry = AlgorithmManifest.describe(alg)
+        if entry is None:
+            return None
+        # the manifest is stored as JSON
+        stub = LazyAlgorithm(json.loads(json.dumps(entry)))
+        self.register(stub)
+        return stub
+
+    def testStubMetadata(self):
+        for alg in (Grid(), ExtentFromLayer()):
+            stub = self.stub(alg)
+            self.assertIsNotNone(stub)
+            for method in ('name', 'displayName', 'group', 'groupId', 'tags', 'shortHelpString',
+                           'helpUrl', 'flags'):
+                self.assertEqual(getattr(stub, method)(), getattr(alg, method)(), method)
+
+            self.assertEqual([(p.name(), p.type(), p.description(), p.defaultValue(), p.flags())
+                              for p in stub.parameterDefinitions()],
+                             [(p.name(), p.type(), p.description(), p.defaultValue(), p.flags())
+                              for p in alg.parameterDefinitions()])
+            self.assertEqual([(o.name(), o.type(), o.description()) for o in stub.outputDefinitions()],
+                             [(o.name(), o.type(), o.description()) for o in alg.outputDefinitions()])
+            self.assertFalse(stub.icon().isNull())
+
+    def testCreateInstance(self):
+        stub = self.stub(Grid())
+        instance = stub.create()
+        self.assertIsInstance(instance, Grid)
+        self.assertEqual(instance.id(), stub.id())
+        self.assertEqual(len(instance.parameterDefinitions()), len(stub.parameterDefinitions()))
+
+    def testPythonParameterTypes(self):
+        # algorithms with parameters of types defined in Python are not stubbed
+        self.assertIsNone(self.stub(FieldsMapper()))
+
+    def testStartupImports(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, True)
+        path = os.path.join(folder, 'qgis_algorithms.json')
+        output = os.path.join(folder, 'startup.json')
+
+        def startup():
+            subprocess.check_call([sys.executable, '-c', STARTUP_SCRIPT, path, output], env=os.environ)
+            with open(output) as f:
+                return json.load(f)
+
+        # the first start generates the manifest, the next one uses it
+        eager = startup()
+        self.assertTrue(os.path.exists(path))
+        lazy = startup()
+        self.assertLess(lazy['modules'], eager['modules'] / 2)
+        # importing the algorithm modules dominates the startup, so skipping
+        # most of them is faster even on a loaded machine
+        self.assertLess(lazy['time'], eager['time'],
+                        'startup took {:.3f}s with the manifest, {:.3f}s without'.format(lazy['time'], eager['time']))
+
+
+if __name__ == '__main__':
+    unittest.main()
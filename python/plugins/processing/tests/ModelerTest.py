@@ -25,19 +25,62 @@ __copyright__ = '(C) 2016, Nyall Dawson'
 
 __revision__ = '$Format:%H$'
 
+import os
+import shutil
+import tempfile
+from unittest import mock
+
 from qgis.testing import start_app, unittest
 
-from qgis.core import (QgsProcessingModelAlgorithm,
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsApplication,
+                       QgsXmlUtils,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingProvider,
+                       QgsProcessingModelAlgorithm,
+                       QgsProcessingModelChildAlgorithm,
                        QgsProcessingModelParameter,
                        QgsProcessingParameterString,
                        QgsProcessingParameterNumber,
                        QgsProcessingParameterDistance,
                        QgsProcessingParameterField,
                        QgsProcessingParameterFile)
+from processing.modeler import ModelerAlgorithmProvider
 from processing.modeler.ModelerParametersDialog import (ModelerParametersDialog)
+from processing.modeler.ModelerUtils import ModelerUtils
 start_app()
 
 
+class TestAlgorithm(QgsProcessingAlgorithm):
+
+    def name(self):
+        return 'alg'
+
+    def displayName(self):
+        return 'alg'
+
+    def createInstance(self):
+        return TestAlgorithm()
+
+    def initAlgorithm(self, config=None):
+        pass
+
+    def processAlgorithm(self, parameters, context, feedback):
+        return {}
+
+
+class TestProvider(QgsProcessingProvider):
+
+    def id(self):
+        return 'modelertest'
+
+    def name(self):
+        return 'modelertest'
+
+    def loadAlgorithms(self):
+        self.addAlgorithm(TestAlgorithm())
+
+
 class ModelerTest(unittest.TestCase):
 
     def testModelerParametersDialogAvailableValuesOfType(self):
@@ -73,6 +116,71 @@ class ModelerTest(unittest.TestCase):
         self.assertEqual(set(p.parameterName() for p in dlg.getAvailableValuesOfType([QgsProcessingParameterString, QgsProcessingParameterNumber, QgsProcessingParameterFile])),
                          set(['string', 'string2', 'number', 'file']))
 
+    def testModelDefinitionsCache(self):
+        folder = tempfile.mkdtemp()
+        fileName = os.path.join(folder, 'model.model3')
+        QgsProcessingModelAlgorithm('model', 'group').toFile(fileName)
+
+        provider = ModelerAlgorithmProvider.ModelerAlgorithmProvider()
+        with mock.patch.object(ModelerUtils, 'modelsFolders', lambda: [folder]), \
+                mock.patch.object(ModelerAlgorithmProvider.QgsXmlUtils, 'readVariant',
+                                  side_effect=QgsXmlUtils.readVariant) as readVariant:
+            provider.refreshAlgorithms()
+            self.assertEqual([a.name() for a in provider.algorithms()], ['model'])
+            self.assertEqual(provider.algorithms()[0].sourceFilePath(), fileName)
+            self.assertEqual(readVariant.call_count, 1)
+
+            # unchanged models are not read again, but are instantiated again
+            provider.refreshAlgorithms()
+            self.assertEqual([a.name() for a in provider.algorithms()], ['model'])
+            self.assertEqual(readVariant.call_count, 1)
+
+            QgsProcessingModelAlgorithm('renamed model', 'group').toFile(fileName)
+            st = os.stat(fileName)
+            os.utime(fileName, (st.st_atime, st.st_mtime + 10))
+            provider.refreshAlgorithms()
+            self.assertEqual([a.name() for a in provider.algorithms()], ['renamed model'])
+            self.assertEqual(readVariant.call_count, 2)
+
+            os.remove(fileName)
+            provider.refreshAlgorithms()
+            self.assertEqual(provider.algorithms(), [])
+            self.assertEqual(provider.definitions, {})
+        shutil.rmtree(folder)
+
+    def testReattachOnProviderAdded(self):
+        folder = tempfile.mkdtemp()
+        model = QgsProcessingModelAlgorithm('model', 'group')
+        child = QgsProcessingModelChildAlgorithm('modelertest:alg')
+        child.setChildId('child')
+        model.addChildAlgorithm(child)
+        model.toFile(os.path.join(folder, 'model.model3'))
+
+        provider = ModelerAlgorithmProvider.ModelerAlgorithmProvider()
+        refreshes = []
+        provider.algorithmsLoaded.connect(lambda: refreshes.append(True))
+        testProvider = TestProvider()
+        with mock.patch.object(ModelerUtils, 'modelsFolders', lambda: [folder]):
+            provider.refreshAlgorithms()
+            self.assertEqual(refreshes, [True])
+            alg = provider.algorithms()[0]
+            self.assertIsNone(alg.childAlgorithm('child').algorithm())
+
+            # the model is kept, with its child algorithm now available
+            with mock.patch.object(provider, 'loadAlgorithms') as loadAlgorithms:
+                for providerId in ('gdal', 'script'):
+                    provider.onProviderAdded(providerId)
+                QgsApplication.processingRegistry().addProvider(testProvider)
+                self.assertEqual(refreshes, [True])
+                while provider.refreshTimer.isActive():
+                    QCoreApplication.processEvents()
+                self.assertFalse(loadAlgorithms.called)
+        self.assertEqual(refreshes, [True, True])
+        self.assertIs(provider.algorithms()[0], alg)
+        self.assertEqual(alg.childAlgorithm('child').algorithm().id(), 'modelertest:alg')
+
+        QgsApplication.processingRegistry().removeProvider(testProvider)
+        shutil.rmtree(folder)
 
 if __name__ == '__main__':
     unittest.main()
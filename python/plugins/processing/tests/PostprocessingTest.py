@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    PostprocessingTest.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt.QtGui import QColor
+from qgis.core import (QgsApplication,
+                       QgsProcessingContext,
+                       QgsProcessingFeedback,
+                       QgsProject,
+                       QgsSingleSymbolRenderer,
+                       QgsVectorLayer)
+from qgis.analysis import QgsNativeAlgorithms
+from qgis.testing import start_app, unittest
+
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.gui import Postprocessing
+from processing.tests.TestData import points
+
+start_app()
+ProcessingConfig.initialize()
+QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+
+
+class PostprocessingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.style = ProcessingConfig.getSetting(ProcessingConfig.VECTOR_POINT_STYLE)
+        self.project = QgsProject()
+        self.alg = QgsApplication.processingRegistry().algorithmById('native:centroids')
+
+    def tearDown(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.VECTOR_POINT_STYLE, self.style)
+        shutil.rmtree(self.dir)
+
+    def createContext(self, count, prefix='points'):
+        context = QgsProcessingContext()
+        for i in range(count):
+            fileName = os.path.join(self.dir, '{}{}.gml'.format(prefix, i))
+            shutil.copy(points(), fileName)
+            context.addLayerToLoadOnCompletion(fileName, QgsProcessingContext.LayerDetails('{} {}'.format(prefix, i),
+                                                                                          self.project))
+        return context
+
+    def testBatchedLoading(self):
+        context = self.createContext(5)
+        memory = QgsVectorLayer('Point', 'memory', 'memory')
+        context.temporaryLayerStore().addMapLayer(memory)
+        context.addLayerToLoadOnCompletion(memory.id(), QgsProcessingContext.LayerDetails('memory', self.project))
+        added = []
+        self.project.layersAdded.connect(added.append)
+
+        self.assertTrue(Postprocessing.handleAlgorithmResults(self.alg, context))
+        self.assertEqual(len(added), 1)
+        self.assertEqual(sorted(l.name() for l in added[0]),
+                         ['memory', 'points 0', 'points 1', 'points 2', 'points 3', 'points 4'])
+        self.assertTrue(all(l.isValid() for l in added[0]))
+        self.assertIsNone(context.temporaryLayerStore().mapLayer(memory.id()))
+
+    def testBatchResults(self):
+        contexts = [self.createContext(2, 'a'), self.createContext(3, 'b')]
+        added = []
+        self.project.layersAdded.connect(added.append)
+
+        self.assertTrue(Postprocessing.handleBatchResults(self.alg, contexts))
+        # the layers of all the executions are added at once
+        self.assertEqual(len(added), 1)
+        self.assertEqual([l.name() for l in added[0]], ['a 0', 'a 1', 'b 0', 'b 1', 'b 2'])
+
+    def testOnFinished(self):
+        context = self.createContext(3)
+        added = []
+        self.project.layersAdded.connect(added.append)
+        finished = []
+
+        self.assertIsNone(Postprocessing.handleAlgorithmResults(self.alg, context, onFinished=finished.append))
+        # the layers are opened in a task, without blocking
+        while not finished:
+            QCoreApplication.processEvents()
+        self.assertEqual(finished, [True])
+        self.assertEqual(len(added), 1)
+        self.assertEqual(sorted(l.name() for l in added[0]), ['points 0', 'points 1', 'points 2'])
+
+        finished = []
+        feedback = QgsProcessingFeedback()
+        feedback.cancel()
+        Postprocessing.handleAlgorithmResults(self.alg, self.createContext(2, 'c'), feedback, onFinished=finished.append)
+        self.assertEqual(finished, [False])
+        self.assertEqual(len(self.project.mapLayers()), 3)
+
+    def testWrongLayers(self):
+        context = self.createContext(3)
+        context.addLayerToLoadOnCompletion(os.path.join(self.dir, 'missing.shp'),
+                                           QgsProcessingContext.LayerDetails('missing', self.project))
+        self.assertFalse(Postprocessing.handleAlgorithmResults(self.alg, context))
+        self.assertEqual(len(self.project.mapLayers()), 3)
+
+    def testStyleCache(self):
+        style = os.path.join(self.dir, 'style.qml')
+        layer = QgsVectorLayer(points(), 'points', 'ogr')
+        layer.renderer().symbol().setColor(QColor(255, 0, 0))
+        layer.saveNamedStyle(style)
+        ProcessingConfig.setSettingValue(ProcessingConfig.VECTOR_POINT_STYLE, style)
+
+        context = self.createContext(4)
+        self.assertTrue(Postprocessing.handleAlgorithmResults(self.alg, context))
+        for layer in self.project.mapLayers().values():
+            self.assertIsInstance(layer.renderer(), QgsSingleSymbolRenderer)
+            self.assertEqual(layer.renderer().symbol().color(), QColor(255, 0, 0))
+        doc = Postprocessing.styleDocument(style)
+        self.assertIsNotNone(doc)
+        self.assertIs(Postprocessing.styleDocument(style), doc)
+        # not a style file
+        self.assertIsNone(Postprocessing.styleDocument(os.path.join(self.dir, 'missing.qml')))
+
+    def testCanceled(self):
+        context = self.createContext(3)
+        feedback = QgsProcessingFeedback()
+        feedback.cancel()
+        self.assertFalse(Postprocessing.handleAlgorithmResults(self.alg, context, feedback))
+        self.assertEqual(self.project.mapLayers(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    ProcessingLogTest.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from qgis.testing import start_app, unittest
+
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.core.ProcessingLog import ProcessingLog, LOG_SEPARATOR
+
+start_app()
+ProcessingConfig.initialize()
+
+
+def command(i):
+    return 'processing.run("native:alg{}", {{\'INPUT\': \'layer_{}.shp\'}})'.format(i % 3, i)
+
+
+class ProcessingLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        ProcessingLog.closeConnection()
+        self.patches = [mock.patch.object(ProcessingLog, 'logFilename',
+                                          staticmethod(lambda: os.path.join(self.dir, 'processing.log'))),
+                        mock.patch.object(ProcessingLog, 'historyFilename',
+                                          staticmethod(lambda: os.path.join(self.dir, 'history.sqlite')))]
+        for p in self.patches:
+            p.start()
+        self.maxEntries = ProcessingConfig.getSetting(ProcessingConfig.MAX_HISTORY_ENTRIES)
+
+    def tearDown(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.MAX_HISTORY_ENTRIES, self.maxEntries)
+        ProcessingLog.closeConnection()
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.dir)
+
+    def testPages(self):
+        for i in range(25):
+            ProcessingLog.addToLog(command(i))
+        self.assertEqual(ProcessingLog.getLogEntriesCount(), 25)
+
+        # latest entries first
+        self.assertEqual([e.text for e in ProcessingLog.getLogEntries(0, 10)],
+                         [command(i) for i in range(24, 14, -1)])
+        self.assertEqual([e.text for e in ProcessingLog.getLogEntries(20, 10)],
+                         [command(i) for i in range(4, -1, -1)])
+        self.assertEqual(len(ProcessingLog.getLogEntries()), 25)
+
+    def testFilter(self):
+        for i in range(25):
+            ProcessingLog.addToLog(command(i))
+        self.assertEqual(ProcessingLog.getLogEntriesCount('ALG1'), 8)
+        self.assertEqual([e.text for e in ProcessingLog.getLogEntries(0, 3, 'alg1')],
+                         [command(22), command(19), command(16)])
+        # wildcards are matched literally
+        self.assertEqual(ProcessingLog.getLogEntriesCount('layer_%'), 0)
+        self.assertEqual(ProcessingLog.getLogEntriesCount('layer__'), 0)
+        self.assertEqual(ProcessingLog.getLogEntriesCount('layer_2'), 6)
+
+    def testRotation(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.MAX_HISTORY_ENTRIES, 10)
+        for i in range(25):
+            ProcessingLog.addToLog(command(i))
+        self.assertEqual(ProcessingLog.getLogEntriesCount(), 10)
+        self.assertEqual(ProcessingLog.getLogEntries(9, 1)[0].text, command(15))
+
+    def testProfile(self):
+        entryId = ProcessingLog.addToLog(command(0))
+        ProcessingLog.addToLog(command(1))
+        profile = {'algorithm': 'native:alg0', 'wall': 1.5, 'phases': []}
+        ProcessingLog.setProfile(entryId, profile)
+        self.assertEqual([e.profile for e in ProcessingLog.getLogEntries()], [None, profile])
+
+    def testClear(self):
+        ProcessingLog.addToLog(command(0))
+        ProcessingLog.clearLog()
+        self.assertEqual(ProcessingLog.getLogEntriesCount(), 0)
+        self.assertEqual(ProcessingLog.getLogEntries(), [])
+
+    def testImportAndSave(self):
+        with open(ProcessingLog.logFilename(), 'w', encoding='utf-8') as f:
+            f.write('Started logging at 2016-01-01 10:00:00\n')
+            f.write('ALGORITHM|2016-01-01 10:00:00|processing.runalg("qgis:old")\n')
+            for i in range(3):
+                f.write('ALGORITHM{0}2017-01-01 10:00:0{1}{0}{2}\n'.format(LOG_SEPARATOR, i, command(i)))
+        ProcessingLog.addToLog(command(3))
+
+        self.assertFalse(os.path.exists(ProcessingLog.logFilename()))
+        entries = ProcessingLog.getLogEntries()
+        self.assertEqual([e.text for e in entries],
+                         [command(3), command(2), command(1), command(0), 'processing.runalg("qgis:old")'])
+        self.assertEqual(entries[1].date, '2017-01-01 10:00:02')
+
+        fileName = os.path.join(self.dir, 'saved.log')
+        ProcessingLog.saveLog(fileName)
+        with open(fileName, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[1], 'ALGORITHM{0}2017-01-01 10:00:00{0}{1}'.format(LOG_SEPARATOR, command(0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
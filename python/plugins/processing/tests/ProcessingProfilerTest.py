@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    ProcessingProfilerTest.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import json
+import os
+import shutil
+import tempfile
+
+from qgis.core import QgsApplication
+from qgis.analysis import QgsNativeAlgorithms
+from qgis.testing import start_app, unittest
+
+from processing.core import ProcessingProfiler
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.gui.AlgorithmExecutor import execute
+from processing.gui.Postprocessing import handleAlgorithmResults
+from processing.tests.TestData import points
+from processing.tools import dataobjects
+
+start_app()
+ProcessingConfig.initialize()
+QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+
+
+class ProcessingProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.enabled = ProcessingConfig.getSetting(ProcessingConfig.PROFILE_ALGORITHMS)
+        self.countInputs = ProcessingConfig.getSetting(ProcessingConfig.PROFILE_INPUT_FEATURES)
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_INPUT_FEATURES, False)
+
+    def tearDown(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_ALGORITHMS, self.enabled)
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_INPUT_FEATURES, self.countInputs)
+        shutil.rmtree(self.dir)
+
+    def run_centroids(self):
+        alg = QgsApplication.processingRegistry().createAlgorithmById('native:centroids')
+        context = dataobjects.createContext()
+        ok, results = execute(alg, {'INPUT': points(), 'OUTPUT': os.path.join(self.dir, 'centroids.shp')}, context)
+        self.assertTrue(ok)
+        return results, context
+
+    def testDisabled(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_ALGORITHMS, False)
+        results, context = self.run_centroids()
+        self.assertNotIn(ProcessingProfiler.PROFILE_OUTPUT, results)
+        self.assertIsNone(ProcessingProfiler.contextProfile(context))
+
+    def testProfile(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_ALGORITHMS, True)
+        results, context = self.run_centroids()
+        profile = results[ProcessingProfiler.PROFILE_OUTPUT]
+
+        self.assertEqual(profile['algorithm'], 'native:centroids')
+        self.assertEqual([p['name'] for p in profile['phases']], ['run'])
+        self.assertGreater(profile['wall'], 0)
+        self.assertGreaterEqual(profile['wall'], sum(p['wall'] for p in profile['phases']))
+        # input features are only counted when enabled
+        self.assertIsNone(profile['input_features'])
+        self.assertEqual(profile['output_features'], 9)
+        self.assertGreater(profile['features_per_second'], 0)
+        # profiles are stored in the history as JSON
+        self.assertEqual(json.loads(json.dumps(profile)), profile)
+
+        # result loading is added to the profile of the execution
+        alg = QgsApplication.processingRegistry().algorithmById('native:centroids')
+        self.assertTrue(handleAlgorithmResults(alg, context))
+        self.assertEqual([p['name'] for p in ProcessingProfiler.contextProfile(context).asDict()['phases']],
+                         ['run', 'load results'])
+
+    def testInputFeatures(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_ALGORITHMS, True)
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_INPUT_FEATURES, True)
+        profile = self.run_centroids()[0][ProcessingProfiler.PROFILE_OUTPUT]
+        self.assertEqual([p['name'] for p in profile['phases']], ['parameters', 'run'])
+        self.assertEqual(profile['input_features'], 9)
+
+    @unittest.skipIf(not os.path.exists('/proc/self/statm'), 'resident memory not available')
+    def testPeakMemory(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_ALGORITHMS, True)
+        alg = QgsApplication.processingRegistry().algorithmById('native:centroids')
+        profile = ProcessingProfiler.startProfile(alg, {}, dataobjects.createContext())
+        start = profile.peakMemory
+        # the memory allocated during the execution is sampled
+        data = b'x' * (64 << 20)
+        profile.finish()
+        self.assertGreater(profile.peakMemory, start + len(data) // 2)
+        # the sampling thread is stopped
+        self.assertIsNone(profile._sampler)
+
+    def testCurrentProfile(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_ALGORITHMS, True)
+        alg = QgsApplication.processingRegistry().algorithmById('native:centroids')
+        context = dataobjects.createContext()
+        profile = ProcessingProfiler.startProfile(alg, {}, context)
+        self.assertIs(ProcessingProfiler.currentProfile(), profile)
+        with ProcessingProfiler.phase('GDAL'):
+            pass
+        with ProcessingProfiler.phase('ignored', None):
+            pass
+        profile.finish()
+        self.assertIsNone(ProcessingProfiler.currentProfile())
+        self.assertEqual([p['name'] for p in profile.phases], ['GDAL'])
+
+    def testChromeTrace(self):
+        ProcessingConfig.setSettingValue(ProcessingConfig.PROFILE_ALGORITHMS, True)
+        profile = self.run_centroids()[0][ProcessingProfiler.PROFILE_OUTPUT]
+        fileName = os.path.join(self.dir, 'trace.json')
+        ProcessingProfiler.exportProfiles([profile, profile], fileName, True)
+        with open(fileName) as f:
+            trace = json.load(f)
+        events = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual(len(events), 6)
+        self.assertEqual(set(e['pid'] for e in events), {1, 2})
+        run = [e for e in events if e['name'] == 'run'][0]
+        self.assertAlmostEqual(run['dur'], profile['phases'][1]['wall'] * 1e6)
+        self.assertGreaterEqual(run['ts'], profile['started'] * 1e6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,16 +30,28 @@ import AlgorithmsTestBase
 import nose2
 import shutil
 import os
+import tempfile
+from unittest import mock
+
+import numpy
+from osgeo import gdal
 
 from qgis.core import (QgsApplication,
+                       QgsExpression,
+                       QgsFeature,
+                       QgsGeometry,
                        QgsProcessingAlgorithm,
                        QgsProcessingFeedback,
-                       QgsProcessingException)
+                       QgsProcessingException,
+                       QgsProcessingUtils,
+                       QgsVectorLayer,
+                       qgsfunction)
 from qgis.analysis import (QgsNativeAlgorithms)
 from qgis.testing import start_app, unittest
 from processing.tools.dataobjects import createContext
 from processing.core.ProcessingConfig import ProcessingConfig
 from processing.modeler.ModelerUtils import ModelerUtils
+from processing.tools import kde
 
 
 class TestAlg(QgsProcessingAlgorithm):
@@ -100,6 +112,120 @@ class TestQgisAlgorithms(unittest.TestCase, AlgorithmsTestBase.AlgorithmsTest):
         results, ok = alg.run({}, context, feedback)
         self.assertFalse(ok)
 
+    def testTiledHeatmap(self):
+        """
+        Test that heatmaps rendered by tiles match heatmaps rendered at once
+        """
+        folder = tempfile.mkdtemp()
+        self.cleanup_paths.append(folder)
+        source = os.path.join(AlgorithmsTestBase.processingTestDataPath(), 'points.gml')
+        for kernel, weight_field, radius_field in ((0, None, None), (1, 'id2', None), (3, None, 'id')):
+            arrays = []
+            # the points are also spilled by chunks of 2
+            for tile_size, chunk_size in ((0, kde.CHUNK_SIZE), (7, kde.CHUNK_SIZE), (7, 2)):
+                output = os.path.join(folder, 'heatmap_{}_{}_{}.tif'.format(kernel, tile_size, chunk_size))
+                parameters = {'INPUT': source, 'RADIUS': 0.5, 'RADIUS_FIELD': radius_field, 'PIXEL_SIZE': 0.1,
+                              'WEIGHT_FIELD': weight_field, 'KERNEL': kernel, 'DECAY': 0.5, 'OUTPUT_VALUE': 1,
+                              'TILE_SIZE': tile_size, 'OUTPUT': output}
+                alg = QgsApplication.processingRegistry().createAlgorithmById('qgis:heatmapkerneldensityestimation')
+                with mock.patch.object(kde, 'CHUNK_SIZE', chunk_size):
+                    results, ok = alg.run(parameters, createContext(), QgsProcessingFeedback())
+                self.assertTrue(ok)
+                arrays.append(gdal.Open(output).GetRasterBand(1).ReadAsArray())
+            for array in arrays[1:]:
+                self.assertEqual(arrays[0].shape, array.shape)
+                numpy.testing.assert_array_equal(arrays[0] == -9999, array == -9999)
+                numpy.testing.assert_allclose(arrays[0], array, rtol=1e-5)
+
+    def testMaskedGrid(self):
+        """
+        Test that a grid created with a mask only contains the cells of the full grid intersecting the mask
+        """
+        mask = os.path.join(AlgorithmsTestBase.processingTestDataPath(), 'polys.gml')
+        maskGeometries = [f.geometry() for f in QgsVectorLayer(mask, 'mask', 'ogr').getFeatures()]
+        for grid_type in range(5):
+            cells = []
+            for parameters in ({}, {'MASK': mask}):
+                parameters.update({'TYPE': grid_type, 'EXTENT': '-1,11,-4,7', 'HSPACING': 1.5, 'VSPACING': 1.2,
+                                   'HOVERLAY': 0.3, 'VOVERLAY': 0.2, 'CRS': 'EPSG:4326', 'OUTPUT': 'memory:'})
+                context = createContext()
+                alg = QgsApplication.processingRegistry().createAlgorithmById('qgis:creategrid')
+                results, ok = alg.run(parameters, context, QgsProcessingFeedback())
+                self.assertTrue(ok)
+                layer = QgsProcessingUtils.mapLayerFromString(results['OUTPUT'], context)
+                cells.append(dict((f['id'], f.geometry()) for f in layer.getFeatures()))
+
+            expected = [id for id, geometry in cells[0].items()
+                        if any(g.intersects(geometry) for g in maskGeometries)]
+            self.assertTrue(expected)
+            self.assertLess(len(expected), len(cells[0]))
+            self.assertEqual(sorted(cells[1]), sorted(expected))
+            for id in expected:
+                self.assertEqual(cells[1][id].asWkt(), cells[0][id].asWkt())
+
+    def testRandomPointsOverlappingPolygons(self):
+        """
+        Test that random points are uniformly distributed in overlapping polygons
+        """
+        layer = QgsVectorLayer('Polygon?crs=epsg:3857', 'polygons', 'memory')
+        features = []
+        for wkt in ('Polygon((0 0, 10 0, 10 10, 0 10, 0 0))', 'Polygon((0 0, 10 0, 10 10, 0 10, 0 0))',
+                    'Polygon((20 0, 30 0, 30 10, 20 10, 20 0))'):
+            f = QgsFeature()
+            f.setGeometry(QgsGeometry.fromWkt(wkt))
+            features.append(f)
+        self.assertTrue(layer.dataProvider().addFeatures(features)[0])
+
+        parameters = {'INPUT': layer, 'POINTS_NUMBER': 2000, 'MIN_DISTANCE': 0, 'SEED': 1, 'OUTPUT': 'memory:'}
+        context = createContext()
+        alg = QgsApplication.processingRegistry().createAlgorithmById('qgis:randompointsinlayerbounds')
+        results, ok = alg.run(parameters, context, QgsProcessingFeedback())
+        self.assertTrue(ok)
+        points = [f.geometry().asPoint() for f in
+                  QgsProcessingUtils.mapLayerFromString(results['OUTPUT'], context).getFeatures()]
+        self.assertEqual(len(points), 2000)
+        # the duplicated square gets as many points as the other one, not twice as many
+        self.assertAlmostEqual(sum(1 for p in points if p.x() >= 20) / 2000.0, 0.5, 1)
+
+    def testFieldCalculatorBatchErrors(self):
+        """
+        Test that an evaluation error in a block of a batch function only drops the failing features
+        """
+        @qgsfunction(args='auto', group='testing', register=False, batch=True)
+        def inverse(value, features, parent):
+            return [1.0 / v for v in value]
+
+        class Feedback(QgsProcessingFeedback):
+
+            def __init__(self):
+                super().__init__()
+                self.errors = []
+
+            def reportError(self, error, fatalError=False):
+                self.errors.append(error)
+
+        QgsExpression.registerFunction(inverse)
+        try:
+            source = os.path.join(AlgorithmsTestBase.processingTestDataPath(), 'points.gml')
+            parameters = {'INPUT': source, 'FIELD_NAME': 'inverse', 'FIELD_TYPE': 0, 'FIELD_LENGTH': 10,
+                          'FIELD_PRECISION': 3, 'NEW_FIELD': True, 'FORMULA': 'inverse("id" - 5)',
+                          'OUTPUT': 'memory:'}
+            context = createContext()
+            feedback = Feedback()
+            alg = QgsApplication.processingRegistry().createAlgorithmById('qgis:fieldcalculator')
+            results, ok = alg.run(parameters, context, feedback)
+            self.assertTrue(ok)
+        finally:
+            QgsExpression.unregisterFunction('inverse')
+
+        layer = QgsProcessingUtils.mapLayerFromString(results['OUTPUT'], context)
+        values = dict((f['id'], f['inverse']) for f in layer.getFeatures())
+        self.assertEqual(sorted(values), [1, 2, 3, 4, 6, 7, 8, 9])
+        for id, value in values.items():
+            self.assertAlmostEqual(value, 1.0 / (id - 5), 3)
+        self.assertEqual(len(feedback.errors), 1)
+        self.assertIn('division by zero', feedback.errors[0])
+
 
 if __name__ == '__main__':
     nose2.main()
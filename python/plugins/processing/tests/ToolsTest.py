@@ -25,14 +25,21 @@ __copyright__ = '(C) 2016, Nyall Dawson'
 
 __revision__ = '$Format:%H$'
 
+import math
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
-from qgis.core import QgsVectorLayer
+import numpy
+
+from qgis.core import NULL, QgsFeature, QgsGeometry, QgsPointXY, QgsRectangle, QgsStatisticalSummary, QgsVectorLayer
 from qgis.testing import start_app, unittest
 
 from processing.tests.TestData import points
 from processing.tools import vector
+from processing.tools.sampling import RandomPointSampler, polygonTriangles
+from processing.tools.statistics import NumericStatistics
+from processing.tools.virtuallayer import VirtualLayerQueryPlan
 
 testDataPath = os.path.join(os.path.dirname(__file__), 'testdata')
 
@@ -77,6 +84,224 @@ class VectorTest(unittest.TestCase):
         self.assertEqual(res['id'], [1, 2, 3, 4, 5, 6, 7, 8, 9])
         self.assertEqual(res[2], [2, 1, 0, 2, 1, 0, 0, 0, 0])
 
+    def testColumns(self):
+        layer = QgsVectorLayer('Point?field=int:integer&field=real:double&field=text:string', 'test', 'memory')
+        features = []
+        for i, attributes in enumerate([[1, 1.5, 'a'], [NULL, NULL, NULL], [3, 3.5, '3']]):
+            f = QgsFeature(layer.fields())
+            f.setAttributes(attributes)
+            f.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(i, 2 * i)))
+            features.append(f)
+        layer.dataProvider().addFeatures(features)
+
+        res = vector.columns(layer, ['int', 'real', 2])
+        self.assertEqual(res['int'].dtype, numpy.int64)
+        self.assertEqual(res['int'].tolist(), [1, None, 3])
+        self.assertEqual(res['real'].tolist(), [1.5, None, 3.5])
+        self.assertEqual(res[2].tolist(), ['a', None, '3'])
+        self.assertEqual(res['real'].mean(), 2.5)
+        self.assertNotIn(vector.GEOMETRY_COLUMN, res)
+
+        res = vector.columns(layer, ['text'], geometry=True, numeric=True)
+        self.assertEqual(res['text'].tolist(), [None, None, 3.0])
+        self.assertEqual(res[vector.GEOMETRY_COLUMN].tolist(), [[0, 0], [1, 2], [2, 4]])
+
+        # chunks
+        chunks = list(vector.columnChunks(QgsVectorLayer(points(), 'test', 'ogr'), ['id'], chunkSize=4))
+        self.assertEqual([c['id'].tolist() for c in chunks], [[1, 2, 3, 4], [5, 6, 7, 8], [9]])
+
+        # from features
+        res = vector.attributeColumns(features, layer.fields())
+        self.assertEqual([c.tolist() for c in res], [[1, None, 3], [1.5, None, 3.5], ['a', None, '3']])
+        self.assertEqual(vector.pointCoordinates(features).tolist(), [[0, 0], [1, 2], [2, 4]])
+
+    def testHistogram(self):
+        test_layer = QgsVectorLayer(points(), 'test', 'ogr')
+        counts, edges = vector.histogram(test_layer, 'id', 4)
+        self.assertEqual(counts.tolist(), [2, 2, 2, 3])
+        self.assertEqual(edges.tolist(), [1, 3, 5, 7, 9])
+
+    def testWkb(self):
+        points = vector.pointsWkb(numpy.array([[1, 2], [-3.5, 4]]))
+        self.assertEqual([QgsGeometry.fromWkt(wkt).asWkb() for wkt in ('Point (1 2)', 'Point (-3.5 4)')], points)
+
+        lines = vector.lineStringsWkb(numpy.array([[[0, 0], [1, 1], [2, 0]]]))
+        self.assertEqual(QgsGeometry.fromWkt('LineString (0 0, 1 1, 2 0)').asWkb(), lines[0])
+
+        polygons = vector.polygonsWkb(numpy.array([[[0, 0], [1, 0], [1, 1], [0, 0]],
+                                                   [[5, 5], [6, 5], [6, 6], [5, 5]]]))
+        self.assertEqual(QgsGeometry.fromWkt('Polygon ((5 5, 6 5, 6 6, 5 5))').asWkb(), polygons[1])
+        geometry = QgsGeometry()
+        geometry.fromWkb(polygons[0])
+        self.assertEqual(geometry.asWkt(), 'Polygon ((0 0, 1 0, 1 1, 0 0))')
+
+
+class VirtualLayerQueryPlanTest(unittest.TestCase):
+
+    def testSpatialJoin(self):
+        plan = VirtualLayerQueryPlan('SELECT * FROM input1 a, input2 b WHERE ST_Intersects(a.geometry, b.geometry)',
+                                     ['input1', 'input2'])
+        self.assertEqual(plan.frames, [('b', 'a.geometry')])
+        self.assertEqual(plan.rewrittenQuery(),
+                         'SELECT * FROM input1 a CROSS JOIN input2 b WHERE (ST_Intersects(a.geometry, b.geometry)) '
+                         'AND b._search_frame_ = a.geometry')
+
+        # ON condition of an inner join, WHERE clause with a OR
+        plan = VirtualLayerQueryPlan('SELECT a.id FROM input1 AS a JOIN input2 AS b ON ST_Contains(a.geometry, b.geometry) '
+                                     'WHERE a.pop > 100 OR b.x = 1 ORDER BY a.id',
+                                     ['input1', 'input2'])
+        self.assertEqual(plan.rewrittenQuery(),
+                         'SELECT a.id FROM input1 AS a CROSS JOIN input2 AS b WHERE (ST_Contains(a.geometry, b.geometry)) '
+                         'AND (a.pop > 100 OR b.x = 1) AND b._search_frame_ = a.geometry ORDER BY a.id')
+
+    def testJoinOrder(self):
+        # the table with the search frame is always joined after the table of its geometry
+        plan = VirtualLayerQueryPlan('SELECT * FROM input3 c, input2 b JOIN input1 a ON st_intersects(a.geometry, b.geometry) '
+                                     'WHERE st_intersects(b.geometry, c.geometry)',
+                                     ['input1', 'input2', 'input3'])
+        self.assertEqual(plan.frames, [('b', 'a.geometry'), ('c', 'b.geometry')])
+        self.assertEqual(plan.rewrittenQuery(),
+                         'SELECT * FROM input1 a CROSS JOIN input2 b CROSS JOIN input3 c '
+                         'WHERE (st_intersects(a.geometry, b.geometry)) AND (st_intersects(b.geometry, c.geometry)) '
+                         'AND b._search_frame_ = a.geometry AND c._search_frame_ = b.geometry')
+
+    def testConstantGeometry(self):
+        plan = VirtualLayerQueryPlan('SELECT * FROM input1 WHERE intersects(geometry, BuildMbr(0, 0, 1, 1, 4326)) LIMIT 10',
+                                     ['input1'])
+        self.assertEqual(plan.rewrittenQuery(),
+                         'SELECT * FROM input1 WHERE (intersects(geometry, BuildMbr(0, 0, 1, 1, 4326))) '
+                         'AND input1._search_frame_ = (BuildMbr(0, 0, 1, 1, 4326)) LIMIT 10')
+
+    def testNoCircularDependencies(self):
+        plan = VirtualLayerQueryPlan('SELECT * FROM input1 a, input2 b, input3 c WHERE st_intersects(a.geometry, b.geometry) '
+                                     'AND st_intersects(b.geometry, c.geometry) AND st_intersects(c.geometry, a.geometry) '
+                                     'AND a.v BETWEEN 1 AND 3',
+                                     ['input1', 'input2', 'input3'])
+        self.assertEqual(plan.frames, [('b', 'a.geometry'), ('c', 'b.geometry')])
+
+    def testUnchangedQueries(self):
+        for query in ('SELECT * FROM input1 a LEFT JOIN input2 b ON st_intersects(a.geometry, b.geometry)',
+                      'SELECT * FROM input1 WHERE st_intersects(geometry, (SELECT geometry FROM input2))',
+                      'SELECT * FROM input1 a, input2 b WHERE st_intersects(a.geometry, b.geometry) OR a.id = 1',
+                      'SELECT * FROM input1 a, input2 b WHERE NOT st_intersects(a.geometry, b.geometry)',
+                      'SELECT * FROM input1 a, other b WHERE st_intersects(a.geometry, b.geometry)',
+                      'SELECT * FROM input1 a, input2 b WHERE st_distance(a.geometry, b.geometry) < 10'):
+            plan = VirtualLayerQueryPlan(query, ['input1', 'input2'])
+            self.assertEqual(plan.frames, [], query)
+            self.assertEqual(plan.rewrittenQuery(), query)
+
+
+class SamplingTest(unittest.TestCase):
+
+    def points(self, batches):
+        return numpy.concatenate(list(batches))
+
+    def testTriangles(self):
+        polygon = QgsGeometry.fromWkt('MultiPolygon(((0 0, 10 0, 10 10, 0 10, 0 0),(2 2, 2 4, 4 4, 4 2, 2 2)),'
+                                      '((20 0, 30 0, 25 7, 20 0)))')
+        triangles = polygonTriangles([polygon])
+        ab = triangles[:, 1] - triangles[:, 0]
+        ac = triangles[:, 2] - triangles[:, 0]
+        self.assertAlmostEqual(numpy.abs(ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0]).sum() / 2, polygon.area())
+
+    def testInPolygons(self):
+        polygon = QgsGeometry.fromWkt('Polygon((0 0, 10 0, 10 10, 0 10, 0 0),(2 2, 2 8, 8 8, 8 2, 2 2))')
+        points = self.points(RandomPointSampler(1).inPolygons([polygon], 1000))
+        self.assertEqual(len(points), 1000)
+        for x, y in points:
+            self.assertTrue(polygon.contains(QgsPointXY(x, y)))
+
+        # sliver polygon, where rejection sampling in the bounding box fails
+        sliver = QgsGeometry.fromWkt('Polygon((0 0, 1000 0.001, 1000 0.002, 0 0))')
+        self.assertEqual(len(self.points(RandomPointSampler(1).inPolygons([sliver], 10000))), 10000)
+
+    def testMinDistance(self):
+        points = self.points(RandomPointSampler(2).inExtent(QgsRectangle(0, 0, 10, 10), 100, 0.5))
+        self.assertEqual(len(points), 100)
+        distances = numpy.hypot(*(points[:, None] - points[None]).transpose(2, 0, 1))
+        numpy.fill_diagonal(distances, 1)
+        self.assertGreaterEqual(distances.min(), 0.5)
+
+        # gives up when there is no room left
+        points = self.points(RandomPointSampler(2).inExtent(QgsRectangle(0, 0, 10, 10), 1000, 3))
+        self.assertLess(len(points), 100)
+
+    def testAlongLines(self):
+        line = QgsGeometry.fromWkt('MultiLineString((0 0, 10 0),(0 0, 0 30))')
+        points = self.points(RandomPointSampler(3).alongLines([line], 10000))
+        self.assertTrue(((points[:, 0] == 0) | (points[:, 1] == 0)).all())
+        # points are distributed by length
+        self.assertAlmostEqual((points[:, 1] > 0).mean(), 0.75, 1)
+
+    def testSeed(self):
+        extent = QgsRectangle(0, 0, 10, 10)
+        self.assertTrue((self.points(RandomPointSampler(5).inExtent(extent, 50)) ==
+                         self.points(RandomPointSampler(5).inExtent(extent, 50))).all())
+        self.assertFalse((self.points(RandomPointSampler(5).inExtent(extent, 50)) ==
+                          self.points(RandomPointSampler(6).inExtent(extent, 50))).all())
+
+
+class StatisticsTest(unittest.TestCase):
+
+    def assertSameStatistics(self, results, group, values):
+        stat = QgsStatisticalSummary()
+        stat.calculate(values)
+        expected = {'count': stat.count(), 'variety': stat.variety(), 'min': stat.min(), 'max': stat.max(),
+                    'range': stat.range(), 'sum': stat.sum(), 'mean': stat.mean(), 'median': stat.median(),
+                    'stddev': stat.stDev(), 'minority': stat.minority(), 'majority': stat.majority(),
+                    'q1': stat.firstQuartile(), 'q3': stat.thirdQuartile(), 'iqr': stat.interQuartileRange()}
+        for key, value in expected.items():
+            if math.isnan(value):
+                self.assertTrue(math.isnan(results[key][group]), key)
+            else:
+                self.assertEqual(results[key][group], value, key)
+
+    def testExact(self):
+        random = numpy.random.RandomState(1)
+        for n in range(1, 12):
+            values = random.randint(0, 5, n) * 0.5
+            groups = random.randint(0, 3, n)
+            statistics = NumericStatistics()
+            # in two chunks, the second one merged
+            statistics.add(values[:n // 2], groups[:n // 2])
+            other = NumericStatistics()
+            other.add(values[n // 2:], groups[n // 2:])
+            statistics.merge(other)
+            results = statistics.results()
+            for group in range(statistics.groups):
+                self.assertSameStatistics(results, group, values[groups == group].tolist())
+
+    def testMissing(self):
+        statistics = NumericStatistics(groups=2)
+        statistics.add(numpy.ma.array([1, 2, 3, 4], mask=[False, True, False, True]), [0, 0, 0, 1])
+        results = statistics.results()
+        self.assertEqual(results['count'], [2, 0])
+        self.assertEqual(results['missing'], [1, 1])
+        self.assertEqual(results['mean'][0], 2)
+        self.assertSameStatistics(results, 1, [])
+
+    def testApproximate(self):
+        random = numpy.random.RandomState(2)
+        values = random.normal(size=100000)
+        groups = random.randint(0, 2, 100000)
+        exact = NumericStatistics()
+        exact.add(values, groups)
+        approximate = NumericStatistics(exact=False)
+        with ThreadPoolExecutor(2) as executor:
+            approximate.addChunks(((values[i:i + 10000], groups[i:i + 10000]) for i in range(0, 100000, 10000)),
+                                  executor)
+        # the size of the digests only depends on the number of groups
+        self.assertLessEqual(len(approximate.digest.means), 2 * (approximate.compression + 1))
+        expected, results = exact.results(), approximate.results()
+        for key in ('count', 'min', 'max'):
+            self.assertEqual(results[key], expected[key], key)
+        for key in ('variety', 'minority', 'majority'):
+            self.assertTrue(numpy.isnan(results[key]).all(), key)
+        for key in ('sum', 'mean', 'stddev'):
+            numpy.testing.assert_allclose(results[key], expected[key], rtol=1e-9, atol=1e-9)
+        for key in ('median', 'q1', 'q3'):
+            numpy.testing.assert_allclose(results[key], expected[key], atol=0.01)
+
 
 if __name__ == '__main__':
     unittest.main()
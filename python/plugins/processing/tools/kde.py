@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    kde.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import math
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+from osgeo import gdal
+
+from qgis.core import QgsProcessingUtils
+from qgis.analysis import QgsKernelDensityEstimation
+
+NO_DATA = -9999
+
+# number of points buffered by addFeature() before they are bucketed
+CHUNK_SIZE = 65536
+
+# maximum number of pixels of the kernels stamped at once
+STAMP_SIZE = 1 << 20
+
+# x, y, weight and radius of the points, as written in the spill file
+POINT_FIELDS = 4
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def radiusSizeInPixels(radius, pixelSize):
+    """Returns the kernel buffers in pixels of an array of radii, as
+    QgsKernelDensityEstimation"""
+    buffer = numpy.trunc(radius / pixelSize)
+    return (buffer + (radius - pixelSize * buffer > 0.5)).astype(numpy.int64)
+
+
+def _spread(first, last):
+    """Returns the indices of items covering the cells first to last (arrays
+    of cell numbers), and the cells they cover, sorted by cell"""
+    counts = last - first + 1
+    items = numpy.repeat(numpy.arange(len(first)), counts)
+    cells = numpy.repeat(first - numpy.cumsum(counts) + counts, counts) + numpy.arange(counts.sum())
+    order = numpy.argsort(cells, kind='stable')
+    return items[order], cells[order]
+
+
+def kernelValues(distance, bandwidth, shape, outputValues, decay=0):
+    """Returns the values of a kernel for arrays of distances and bandwidths,
+    as QgsKernelDensityEstimation"""
+    scaled = outputValues == QgsKernelDensityEstimation.OutputScaled
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        ratio = distance / bandwidth
+        if shape == QgsKernelDensityEstimation.KernelUniform:
+            if scaled:
+                return 2. / (math.pi * bandwidth) * (0.5 / bandwidth) + numpy.zeros_like(ratio)
+            return numpy.ones_like(ratio)
+        if shape == QgsKernelDensityEstimation.KernelQuartic:
+            value = (1. - ratio ** 2) ** 2
+            return 116. / (5. * math.pi * bandwidth ** 2) * (15. / 16.) * value if scaled else value
+        if shape == QgsKernelDensityEstimation.KernelTriweight:
+            value = (1. - ratio ** 2) ** 3
+            return 128. / (35. * math.pi * bandwidth ** 2) * (35. / 32.) * value if scaled else value
+        if shape == QgsKernelDensityEstimation.KernelEpanechnikov:
+            value = 1. - ratio ** 2
+            return 8. / (3. * math.pi * bandwidth ** 2) * (3. / 4.) * value if scaled else value
+        # triangular, with a decay ratio
+        value = 1. - (1. - decay) * ratio
+        if scaled and decay >= 0:
+            return 3. / ((1. + 2. * decay) * math.pi * bandwidth ** 2) * value
+        return value
+
+
+class TiledKernelDensity(object):
+
+    """
+    Kernel density estimation rendered by tiles, with the same parameters
+    and results as QgsKernelDensityEstimation, which writes the kernel of
+    each point to the raster one after the other.
+
+    Points added with addFeature() are bucketed by rows of tiles (with the
+    overlap of their kernel) in a temporary spill file, each chunk of points
+    being written sorted by row of tiles. finalise() then renders
+    the tiles of each row in a pool of threads, stamping the kernels of
+    many points at once with NumPy, and writes them to the output raster
+    as they are done, so the memory used depends on the size of the tiles
+    rather than on the size of the raster. Values are summed in double
+    precision, and may differ from QgsKernelDensityEstimation by rounding.
+    """
+
+    def __init__(self, parameters, outputFile, outputFormat, tileSize, feedback=None, threads=None):
+        self.source = parameters.source
+        self.radius = parameters.radius
+        self.pixelSize = parameters.pixelSize
+        self.shape = parameters.shape
+        self.decay = parameters.decayRatio
+        self.outputValues = parameters.outputValues
+        self.radiusField = self.source.fields().lookupField(parameters.radiusField) if parameters.radiusField else -1
+        self.weightField = self.source.fields().lookupField(parameters.weightField) if parameters.weightField else -1
+        self.outputFile = outputFile
+        self.outputFormat = outputFormat
+        self.tileSize = tileSize
+        self.feedback = feedback
+        self.threads = threads or os.cpu_count() or 1
+        self.points = []
+        # (offset, count) of the segments of the spill file holding the
+        # points of each row of tiles
+        self.buckets = {}
+        self.spill = None
+
+    def prepare(self):
+        self.driver = gdal.GetDriverByName(self.outputFormat)
+        if self.driver is None:
+            return QgsKernelDensityEstimation.DriverError
+
+        bounds = self.source.sourceExtent()
+        if self.radiusField >= 0:
+            radius = _number(self.source.maximumValue(self.radiusField))
+        else:
+            radius = self.radius
+        bounds.setXMinimum(bounds.xMinimum() - radius)
+        bounds.setYMinimum(bounds.yMinimum() - radius)
+        bounds.setXMaximum(bounds.xMaximum() + radius)
+        bounds.setYMaximum(bounds.yMaximum() + radius)
+        if bounds.isNull():
+            return QgsKernelDensityEstimation.InvalidParameters
+        self.bounds = bounds
+
+        self.rows = int(max(math.ceil(bounds.height() / self.pixelSize) + 1, 1))
+        self.columns = int(max(math.ceil(bounds.width() / self.pixelSize) + 1, 1))
+        return QgsKernelDensityEstimation.Success
+
+    def addFeature(self, feature):
+        geometry = feature.geometry()
+        if geometry.isNull():
+            return QgsKernelDensityEstimation.Success
+
+        radius = _number(feature.attribute(self.radiusField)) if self.radiusField >= 0 else self.radius
+        weight = _number(feature.attribute(self.weightField)) if self.weightField >= 0 else 1.0
+        points = geometry.asMultiPoint() if geometry.isMultipart() else [geometry.asPoint()]
+        for point in points:
+            self.points.append((point.x(), point.y(), weight, radius))
+        if len(self.points) >= CHUNK_SIZE:
+            self._bucket()
+        return QgsKernelDensityEstimation.Success
+
+    def _bucket(self):
+        points = numpy.array(self.points, dtype=float).reshape(-1, POINT_FIELDS)
+        self.points = []
+        x, y = points[:, 0], points[:, 1]
+        points = points[(x >= self.bounds.xMinimum()) & (x <= self.bounds.xMaximum()) &
+                        (y >= self.bounds.yMinimum()) & (y <= self.bounds.yMaximum())]
+
+        # rows of tiles covered by the kernel of each point
+        buffer = radiusSizeInPixels(points[:, 3], self.pixelSize)
+        top = numpy.trunc((self.bounds.yMaximum() - points[:, 1]) / self.pixelSize - buffer).astype(numpy.int64)
+        items, rows = _spread(numpy.clip(top, 0, self.rows - 1) // self.tileSize,
+                              numpy.clip(top + 2 * buffer, 0, self.rows - 1) // self.tileSize)
+        if not len(rows):
+            return
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile(dir=QgsProcessingUtils.tempFolder())
+        self.spill.seek(0, os.SEEK_END)
+        offset = self.spill.tell()
+        points[items].tofile(self.spill)
+        # rows are sorted, so the points of each row are contiguous
+        rows, starts, counts = numpy.unique(rows, return_index=True, return_counts=True)
+        for row, start, count in zip(rows.tolist(), starts.tolist(), counts.tolist()):
+            self.buckets.setdefault(row, []).append((offset + start * POINT_FIELDS * points.itemsize, count))
+
+    def renderTile(self, points, row, column, rows, columns):
+        """Returns the tile of rows x columns pixels starting at (row, column)
+        of the raster with the kernels of the points, as a float32 array"""
+        total = numpy.zeros(rows * columns)
+        touched = numpy.zeros(rows * columns, dtype=bool)
+        x0, y0, y1 = self.bounds.xMinimum(), self.bounds.yMinimum(), self.bounds.yMaximum()
+        size = self.pixelSize
+
+        buffers = radiusSizeInPixels(points[:, 3], size)
+        for buffer in numpy.unique(buffers):
+            blockSize = 2 * int(buffer) + 1
+            x, y, weight, radius = points[buffers == buffer].T
+
+            # the pixel positions and centroids of the kernels are computed
+            # as in QgsKernelDensityEstimation
+            xPosition = numpy.trunc((x - x0) / size - buffer)
+            yPosition = numpy.trunc((y - y0) / size - buffer)
+            yPositionIO = numpy.trunc((y1 - y) / size - buffer)
+            firstColumn = xPosition.astype(numpy.int64)
+            firstRow = yPositionIO.astype(numpy.int64)
+
+            # only the offsets of the kernel pixels falling in the tile are
+            # computed, from the first one of each point
+            xStart = numpy.clip(column - firstColumn, 0, blockSize)
+            yStart = numpy.clip(row - firstRow, 0, blockSize)
+            width = int((numpy.clip(column + columns - firstColumn, 0, blockSize) - xStart).max())
+            height = int((numpy.clip(row + rows - firstRow, 0, blockSize) - yStart).max())
+            if width <= 0 or height <= 0:
+                continue
+
+            batch = max(1, STAMP_SIZE // (width * height))
+            for start in range(0, len(x), batch):
+                part = slice(start, start + batch)
+                xOffsets = xStart[part, None] + numpy.arange(width)
+                yOffsets = yStart[part, None] + numpy.arange(height)
+                dx = (xPosition[part, None] + xOffsets + 0.5) * size + x0 - x[part, None]
+                dy = (yPosition[part, None] + yOffsets + 0.5) * size + y0 - y[part, None]
+                distance = numpy.sqrt(dx[:, None, :] ** 2 + dy[:, :, None] ** 2)
+
+                pixelColumns = (firstColumn[part, None] + xOffsets - column)[:, None, :]
+                pixelRows = (firstRow[part, None] + yOffsets - row)[:, :, None]
+                valid = ((distance <= radius[part, None, None]) &
+                         (xOffsets < blockSize)[:, None, :] & (yOffsets < blockSize)[:, :, None] &
+                         (pixelColumns < columns) & (pixelRows < rows))
+
+                values = weight[part, None, None] * kernelValues(distance, radius[part, None, None], self.shape,
+                                                                 self.outputValues, self.decay)
+                index = (pixelRows * columns + pixelColumns)[valid]
+                total += numpy.bincount(index, values[valid], minlength=rows * columns)
+                touched[index] = True
+
+        return numpy.where(touched, total, NO_DATA).astype(numpy.float32).reshape(rows, columns)
+
+    def _tiles(self, row):
+        """Yields the tiles of a row of tiles, with the points they need"""
+        segments = []
+        for offset, count in self.buckets.pop(row, []):
+            self.spill.seek(offset)
+            segments.append(numpy.fromfile(self.spill, dtype=float, count=count * POINT_FIELDS))
+        points = numpy.concatenate(segments).reshape(-1, POINT_FIELDS) if segments else numpy.empty((0, POINT_FIELDS))
+
+        buffer = radiusSizeInPixels(points[:, 3], self.pixelSize)
+        left = numpy.trunc((points[:, 0] - self.bounds.xMinimum()) / self.pixelSize - buffer).astype(numpy.int64)
+        items, tiles = _spread(numpy.clip(left, 0, self.columns - 1) // self.tileSize,
+                               numpy.clip(left + 2 * buffer, 0, self.columns - 1) // self.tileSize)
+        bounds = numpy.searchsorted(tiles, numpy.arange(len(range(0, self.columns, self.tileSize)) + 1))
+        for tile, column in enumerate(range(0, self.columns, self.tileSize)):
+            yield column, min(self.tileSize, self.columns - column), points[items[bounds[tile]:bounds[tile + 1]]]
+
+    def finalise(self):
+        if self.points:
+            self._bucket()
+
+        dataset = self.driver.Create(self.outputFile, self.columns, self.rows, 1, gdal.GDT_Float32)
+        if dataset is None:
+            return QgsKernelDensityEstimation.FileCreationError
+        dataset.SetGeoTransform((self.bounds.xMinimum(), self.pixelSize, 0, self.bounds.yMaximum(), 0, -self.pixelSize))
+        dataset.SetProjection(self.source.sourceCrs().toWkt())
+        band = dataset.GetRasterBand(1)
+        band.SetNoDataValue(NO_DATA)
+
+        result = QgsKernelDensityEstimation.Success
+        tileRows = range(0, self.rows, self.tileSize)
+        with ThreadPoolExecutor(self.threads) as executor:
+            pending = deque()
+            for current, row in enumerate(tileRows):
+                if self.feedback is not None:
+                    if self.feedback.isCanceled():
+                        break
+                    self.feedback.setProgress(50 + int(current * 50.0 / len(tileRows)))
+
+                rows = min(self.tileSize, self.rows - row)
+                for column, columns, points in self._tiles(row // self.tileSize):
+                    if len(points):
+                        tile = executor.submit(self.renderTile, points, row, column, rows, columns)
+                    else:
+                        tile = None
+                    pending.append((tile, row, column, rows, columns))
+                    # bounds the memory used by the rendered tiles waiting to be written
+                    while len(pending) > 2 * self.threads or (pending and pending[0][0] is None):
+                        if not self._write(band, *pending.popleft()):
+                            result = QgsKernelDensityEstimation.RasterIoError
+            while pending:
+                if not self._write(band, *pending.popleft()):
+                    result = QgsKernelDensityEstimation.RasterIoError
+
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+        self.buckets = {}
+        band = None
+        dataset = None
+        return result
+
+    def _write(self, band, tile, row, column, rows, columns):
+        if tile is None:
+            array = numpy.full((rows, columns), NO_DATA, dtype=numpy.float32)
+        else:
+            array = tile.result()
+        return band.WriteArray(array, column, row) == gdal.CE_None
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    sampling.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import math
+
+import numpy
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsPointXY,
+                       QgsWkbTypes)
+
+# maximum number of candidates generated at once
+BATCH_SIZE = 100000
+
+# number of candidates per requested point before giving up, when points
+# are rejected because of the minimum distance between them
+MAX_ATTEMPTS = 200
+
+
+def _segmentized(geometry):
+    if QgsWkbTypes.isCurvedType(geometry.wkbType()):
+        return QgsGeometry(geometry.constGet().segmentize())
+    return geometry
+
+
+def polygonTriangles(geometries):
+    """Decomposes polygon geometries in triangles, returned as an array of
+    shape (n, 3, 2).
+
+    The polygons are cut in horizontal slabs at each vertex, the edges
+    crossing a slab delimiting trapezoids inside and outside the polygons
+    (even-odd rule), which are split in two triangles. Triangles of
+    overlapping polygons overlap.
+    """
+    edges = []
+    for geometry in geometries:
+        geometry = _segmentized(geometry)
+        if QgsWkbTypes.flatType(geometry.wkbType()) == QgsWkbTypes.Polygon:
+            polygons = [geometry.asPolygon()]
+        else:
+            polygons = geometry.asMultiPolygon()
+        for polygon in polygons:
+            rings = [numpy.array([(p.x(), p.y()) for p in ring], dtype=float) for ring in polygon if len(ring) > 3]
+            if not rings:
+                continue
+            # each polygon is decomposed on its own, overlapping polygons
+            # must not cancel each other out
+            edges.append(numpy.concatenate([numpy.stack((ring[:-1], ring[1:]), axis=1) for ring in rings]))
+
+    triangles = [_slabTriangles(e) for e in edges]
+    if not triangles:
+        return numpy.empty((0, 3, 2))
+    return numpy.concatenate(triangles)
+
+
+def _slabTriangles(edges):
+    # orient the edges upwards, horizontal edges do not bound any slab
+    edges = edges[edges[:, 0, 1] != edges[:, 1, 1]]
+    flip = edges[:, 0, 1] > edges[:, 1, 1]
+    edges[flip] = edges[flip][:, ::-1]
+
+    ys = numpy.unique(edges[:, :, 1])
+    first = numpy.searchsorted(ys, edges[:, 0, 1])
+    last = numpy.searchsorted(ys, edges[:, 1, 1])
+
+    # one entry per slab crossed by each edge
+    counts = last - first
+    edge = numpy.repeat(numpy.arange(len(edges)), counts)
+    slab = numpy.repeat(first - numpy.cumsum(counts) + counts, counts) + numpy.arange(counts.sum())
+
+    x0, y0 = edges[edge, 0, 0], edges[edge, 0, 1]
+    dxdy = (edges[edge, 1, 0] - x0) / (edges[edge, 1, 1] - y0)
+    bottom, top = ys[slab], ys[slab + 1]
+    xBottom = x0 + (bottom - y0) * dxdy
+    xTop = x0 + (top - y0) * dxdy
+
+    # each slab is crossed by an even number of edges, pairs of consecutive
+    # edges from left to right bound the inside of the polygon
+    order = numpy.lexsort((xBottom + xTop, slab))
+    left, right = order[0::2], order[1::2]
+
+    bottom, top = bottom[left], top[left]
+    a = numpy.stack((xBottom[left], bottom), axis=1)
+    b = numpy.stack((xBottom[right], bottom), axis=1)
+    c = numpy.stack((xTop[right], top), axis=1)
+    d = numpy.stack((xTop[left], top), axis=1)
+    return numpy.concatenate((numpy.stack((a, b, c), axis=1), numpy.stack((a, c, d), axis=1)))
+
+
+def lineSegments(geometries):
+    """Returns the segments of line geometries, as an array of shape (n, 2, 2)"""
+    segments = []
+    for geometry in geometries:
+        geometry = _segmentized(geometry)
+        if QgsWkbTypes.flatType(geometry.wkbType()) == QgsWkbTypes.LineString:
+            lines = [geometry.asPolyline()]
+        else:
+            lines = geometry.asMultiPolyline()
+        for line in lines:
+            if len(line) > 1:
+                vertices = numpy.array([(p.x(), p.y()) for p in line], dtype=float)
+                segments.append(numpy.stack((vertices[:-1], vertices[1:]), axis=1))
+    if not segments:
+        return numpy.empty((0, 2, 2))
+    return numpy.concatenate(segments)
+
+
+class MinDistanceGrid(object):
+
+    """
+    Accepted points hashed in a grid whose cells are small enough to hold a
+    single point (Poisson disk sampling), so that checking the distance to
+    the accepted points only requires looking at the neighboring cells.
+    """
+
+    def __init__(self, minDistance):
+        self.minDistance = minDistance
+        self.cellSize = minDistance / math.sqrt(2)
+        self.cells = {}
+
+    def insert(self, points, limit):
+        """Adds the points which are far enough from the points added so far,
+        up to limit points. Returns the accepted points"""
+        sqrDistance = self.minDistance * self.minDistance
+        cells = numpy.floor(points / self.cellSize).astype(numpy.int64)
+        accepted = []
+        for (x, y), (i, j) in zip(points.tolist(), cells.tolist()):
+            if (i, j) in self.cells:
+                continue
+            valid = True
+            for ni in range(i - 2, i + 3):
+                for nj in range(j - 2, j + 3):
+                    other = self.cells.get((ni, nj))
+                    if other is not None and (other[0] - x) ** 2 + (other[1] - y) ** 2 < sqrDistance:
+                        valid = False
+                        break
+                if not valid:
+                    break
+            if valid:
+                self.cells[(i, j)] = (x, y)
+                accepted.append((x, y))
+                if len(accepted) == limit:
+                    break
+        return numpy.array(accepted, dtype=float).reshape(-1, 2)
+
+
+class RandomPointSampler(object):
+
+    """
+    Generates random points uniformly distributed in extents, polygons or
+    along lines, in batches. Points are drawn directly in the triangles of
+    the polygons or on the segments of the lines, weighted by their area or
+    length, so no point is rejected unless it is too close to another point.
+
+    Runs with the same seed generate the same points.
+    """
+
+    def __init__(self, seed=None):
+        self.random = numpy.random.RandomState(seed)
+
+    def inExtent(self, extent, count, minDistance=0):
+        origin = numpy.array([extent.xMinimum(), extent.yMinimum()])
+        size = numpy.array([extent.width(), extent.height()])
+
+        def generate(n):
+            return origin + self.random.random_sample((n, 2)) * size
+
+        return self.sample(generate, count, minDistance)
+
+    def inTriangles(self, triangles, count, minDistance=0):
+        a = triangles[:, 0]
+        ab = triangles[:, 1] - a
+        ac = triangles[:, 2] - a
+        areas = numpy.abs(ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0])
+        weights = numpy.cumsum(areas)
+        if not len(weights) or weights[-1] <= 0:
+            return iter(())
+
+        def generate(n):
+            i = numpy.searchsorted(weights, self.random.random_sample(n) * weights[-1], side='right')
+            i = numpy.minimum(i, len(weights) - 1)
+            r = self.random.random_sample((n, 2))
+            # fold the points of the parallelogram back in the triangle
+            outside = r.sum(axis=1) > 1
+            r[outside] = 1 - r[outside]
+            return a[i] + r[:, :1] * ab[i] + r[:, 1:] * ac[i]
+
+        return self.sample(generate, count, minDistance)
+
+    def inPolygons(self, geometries, count, minDistance=0):
+        return self.inTriangles(polygonTriangles(geometries), count, minDistance)
+
+    def onSegments(self, segments, count, minDistance=0):
+        start = segments[:, 0]
+        vectors = segments[:, 1] - start
+        weights = numpy.cumsum(numpy.hypot(vectors[:, 0], vectors[:, 1]))
+        if not len(weights) or weights[-1] <= 0:
+            return iter(())
+
+        def generate(n):
+            i = numpy.searchsorted(weights, self.random.random_sample(n) * weights[-1], side='right')
+            i = numpy.minimum(i, len(weights) - 1)
+            return start[i] + self.random.random_sample((n, 1)) * vectors[i]
+
+        return self.sample(generate, count, minDistance)
+
+    def alongLines(self, geometries, count, minDistance=0):
+        return self.onSegments(lineSegments(geometries), count, minDistance)
+
+    def sample(self, generate, count, minDistance=0):
+        """Yields arrays of points drawn with generate(n) until count points
+        are generated, or too many of them were too close to each other"""
+        grid = MinDistanceGrid(minDistance) if minDistance > 0 else None
+        remaining = count
+        attempts = count * MAX_ATTEMPTS
+        while remaining > 0 and attempts > 0:
+            if grid is None:
+                n = min(remaining, BATCH_SIZE)
+            else:
+                n = min(max(2 * remaining, 64), attempts, BATCH_SIZE)
+            points = generate(n)
+            attempts -= n
+            if grid is not None:
+                points = grid.insert(points, remaining)
+            remaining -= len(points)
+            yield points
+
+
+def pointFeatures(points, fields, firstId=0):
+    """Returns features for an array of points, with consecutive ids (in
+    the id attribute as well) starting from firstId"""
+    features = []
+    for i, (x, y) in enumerate(points.tolist(), firstId):
+        f = QgsFeature(i)
+        f.setFields(fields)
+        f.setAttribute('id', i)
+        f.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        features.append(f)
+    return features
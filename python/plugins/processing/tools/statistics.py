@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    statistics.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+from collections import deque
+
+import numpy
+
+# default compression of the t-digests, i.e. about the maximum number of
+# centroids kept per group
+DIGEST_COMPRESSION = 100
+
+# number of chunks queued in the executor by NumericStatistics.addChunks()
+PENDING_CHUNKS = 4
+
+
+def _starts(sortedGroups):
+    """Returns the positions where the values of a sorted array change"""
+    if not len(sortedGroups):
+        return numpy.empty(0, dtype=numpy.int64)
+    return numpy.flatnonzero(numpy.concatenate(([True], sortedGroups[1:] != sortedGroups[:-1])))
+
+
+def _padded(array, size, fill):
+    if len(array) >= size:
+        return array
+    return numpy.concatenate((array, numpy.full(size - len(array), fill, dtype=array.dtype)))
+
+
+def _valueCounts(groups, values, counts):
+    """Reduces (group, value, count) triplets to one per distinct value of
+    each group, sorted by group and value"""
+    order = numpy.lexsort((values, groups))
+    groups, values, counts = groups[order], values[order], counts[order]
+    new = numpy.ones(len(values), dtype=bool)
+    new[1:] = (groups[1:] != groups[:-1]) | (values[1:] != values[:-1])
+    starts = numpy.flatnonzero(new)
+    return groups[starts], values[starts], numpy.add.reduceat(counts, starts) if len(starts) else counts
+
+
+def _sortedMedians(values, starts, counts):
+    """Returns the medians of the slices [start, start + count) of a sorted
+    array, counts being positive"""
+    low = values[starts + (counts - 1) // 2]
+    high = values[starts + counts // 2]
+    return numpy.where(counts % 2 == 1, low, (low + high) / 2)
+
+
+class TDigest(object):
+
+    """
+    Merging t-digests of the values of several groups, held in arrays of
+    centroids (group, mean, weight) sorted by group and mean.
+
+    The digests are compressed in vectorized form: consecutive centroids of
+    a group are merged when their middle falls in the same unit of the
+    arcsine scale function, which keeps about compression centroids per
+    group, with small centroids in the tails. Digests of different chunks
+    of values are combined with merge().
+    """
+
+    def __init__(self, compression=DIGEST_COMPRESSION):
+        self.compression = compression
+        self.groups = numpy.empty(0, dtype=numpy.int64)
+        self.means = numpy.empty(0)
+        self.weights = numpy.empty(0)
+
+    def add(self, values, groups):
+        self._compress(numpy.concatenate((self.groups, groups)),
+                       numpy.concatenate((self.means, values)),
+                       numpy.concatenate((self.weights, numpy.ones(len(values)))))
+
+    def merge(self, other):
+        self._compress(numpy.concatenate((self.groups, other.groups)),
+                       numpy.concatenate((self.means, other.means)),
+                       numpy.concatenate((self.weights, other.weights)))
+
+    def _compress(self, groups, means, weights):
+        order = numpy.lexsort((means, groups))
+        groups, means, weights = groups[order], means[order], weights[order]
+        if not len(groups):
+            return
+
+        totals = numpy.bincount(groups, weights)
+        before = numpy.cumsum(weights) - weights - (numpy.cumsum(totals) - totals)[groups]
+        q = (before + weights / 2) / totals[groups]
+        k = numpy.floor(self.compression * (numpy.arcsin(2 * q - 1) / numpy.pi + 0.5))
+
+        new = numpy.ones(len(groups), dtype=bool)
+        new[1:] = (groups[1:] != groups[:-1]) | (k[1:] != k[:-1])
+        clusters = numpy.cumsum(new) - 1
+        self.groups = groups[new]
+        self.weights = numpy.bincount(clusters, weights)
+        self.means = numpy.bincount(clusters, weights * means) / self.weights
+
+    def quantiles(self, probabilities, minimums, maximums):
+        """Returns the estimated quantiles of each group as an array of shape
+        (groups, len(probabilities)), interpolated between the centroids and
+        the exact minimum and maximum of the groups. Quantiles of empty
+        groups are NaN"""
+        groupCount = len(minimums)
+        result = numpy.full((groupCount, len(probabilities)), numpy.nan)
+        bounds = numpy.searchsorted(self.groups, numpy.arange(groupCount + 1))
+        for group in range(groupCount):
+            start, end = bounds[group], bounds[group + 1]
+            if start == end:
+                continue
+            weights = self.weights[start:end]
+            total = weights.sum()
+            result[group] = numpy.interp(numpy.asarray(probabilities) * total,
+                                         numpy.concatenate(([0], numpy.cumsum(weights) - weights / 2, [total])),
+                                         numpy.concatenate(([minimums[group]], self.means[start:end],
+                                                            [maximums[group]])))
+        return result
+
+
+class NumericStatistics(object):
+
+    """
+    Statistics of numeric values by group, with the same definitions as
+    QgsStatisticalSummary: count, missing values, sum, mean, (population)
+    standard deviation, minimum, maximum, range, variety, minority,
+    majority, median and quartiles.
+
+    Values are added by chunks with add(), as arrays of values and of group
+    numbers. Statistics of different chunks (e.g. computed in other threads)
+    are combined with merge().
+
+    Exact statistics keep the values as compact arrays until results() is
+    called, and give the same results as QgsStatisticalSummary. With exact
+    set to False, moments, minimum and maximum are merged chunk by chunk,
+    and the median and quartiles are estimated with t-digests, so that the
+    memory used only depends on the number of groups. The variety, minority
+    and majority, which need the counts of all the distinct values, are
+    then NaN.
+    """
+
+    def __init__(self, groups=0, exact=True, compression=DIGEST_COMPRESSION):
+        self.groups = groups
+        self.exact = exact
+        self.compression = compression
+        self.missing = numpy.zeros(groups, dtype=numpy.int64)
+        if exact:
+            self.chunks = []
+        else:
+            self.count = numpy.zeros(groups, dtype=numpy.int64)
+            self.sum = numpy.zeros(groups)
+            self.mean = numpy.zeros(groups)
+            self.m2 = numpy.zeros(groups)
+            self.min = numpy.full(groups, numpy.inf)
+            self.max = numpy.full(groups, -numpy.inf)
+            self.digest = TDigest(compression)
+
+    def _grow(self, groups):
+        if groups <= self.groups:
+            return
+        self.groups = groups
+        self.missing = _padded(self.missing, groups, 0)
+        if not self.exact:
+            self.count = _padded(self.count, groups, 0)
+            self.sum = _padded(self.sum, groups, 0)
+            self.mean = _padded(self.mean, groups, 0)
+            self.m2 = _padded(self.m2, groups, 0)
+            self.min = _padded(self.min, groups, numpy.inf)
+            self.max = _padded(self.max, groups, -numpy.inf)
+
+    def add(self, values, groups=None):
+        """Adds an array of values (masked values are missing) of the groups
+        given by an array of group numbers, all of them in group 0 if groups
+        is None"""
+        values = numpy.ma.asarray(values)
+        if groups is None:
+            groups = numpy.zeros(len(values), dtype=numpy.int64)
+        else:
+            groups = numpy.asarray(groups, dtype=numpy.int64)
+        if len(groups):
+            self._grow(int(groups.max()) + 1)
+
+        missing = numpy.ma.getmaskarray(values)
+        self.missing += numpy.bincount(groups[missing], minlength=self.groups)
+        groups = groups[~missing]
+        values = numpy.ma.getdata(values)[~missing].astype(float)
+
+        if self.exact:
+            self.chunks.append((groups, values))
+            return
+
+        count = numpy.bincount(groups, minlength=self.groups)
+        total = numpy.bincount(groups, values, minlength=self.groups)
+        mean = total / numpy.maximum(count, 1)
+        m2 = numpy.bincount(groups, (values - mean[groups]) ** 2, minlength=self.groups)
+        minimum = numpy.full(self.groups, numpy.inf)
+        maximum = numpy.full(self.groups, -numpy.inf)
+        numpy.minimum.at(minimum, groups, values)
+        numpy.maximum.at(maximum, groups, values)
+        self._mergeMoments(count, total, mean, m2, minimum, maximum)
+        self.digest.add(values, groups)
+
+    def addChunks(self, chunks, executor=None):
+        """Adds (values, groups) chunks. With an executor, the statistics of
+        the chunks are computed in its threads while the next chunks are
+        read, and merged in order"""
+        if executor is None:
+            for values, groups in chunks:
+                self.add(values, groups)
+            return
+
+        def partial(values, groups):
+            statistics = NumericStatistics(exact=self.exact, compression=self.compression)
+            statistics.add(values, groups)
+            return statistics
+
+        pending = deque()
+        for values, groups in chunks:
+            pending.append(executor.submit(partial, values, groups))
+            if len(pending) > PENDING_CHUNKS:
+                self.merge(pending.popleft().result())
+        while pending:
+            self.merge(pending.popleft().result())
+
+    def merge(self, other):
+        """Adds the values of another NumericStatistics, computed in the same
+        mode and with the same group numbers"""
+        self._grow(other.groups)
+        other._grow(self.groups)
+        self.missing += other.missing
+        if self.exact:
+            self.chunks.extend(other.chunks)
+            return
+        self._mergeMoments(other.count, other.sum, other.mean, other.m2, other.min, other.max)
+        self.digest.merge(other.digest)
+
+    def _mergeMoments(self, count, total, mean, m2, minimum, maximum):
+        # pairwise update of Chan et al.
+        n = self.count + count
+        delta = mean - self.mean
+        nonEmpty = numpy.maximum(n, 1)
+        self.mean = self.mean + delta * count / nonEmpty
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / nonEmpty
+        self.count = n
+        self.sum = self.sum + total
+        self.min = numpy.fmin(self.min, minimum)
+        self.max = numpy.fmax(self.max, maximum)
+
+    def results(self):
+        """Returns the statistics of each group as a dict of lists, with the
+        count, missing, variety, min, max, range, sum, mean, median, stddev,
+        minority, majority, q1, q3 and iqr keys. Statistics of groups without
+        values are NaN, except the counts and the sum. The variety, minority
+        and majority are only computed by exact statistics"""
+        if self.exact:
+            if self.chunks:
+                groups = numpy.concatenate([c[0] for c in self.chunks])
+                values = numpy.concatenate([c[1] for c in self.chunks])
+            else:
+                groups, values = numpy.empty(0, dtype=numpy.int64), numpy.empty(0)
+            count = numpy.bincount(groups, minlength=self.groups)
+            # sums in the order of the values, as QgsStatisticalSummary
+            total = numpy.bincount(groups, values, minlength=self.groups)
+            mean = total / numpy.maximum(count, 1)
+            m2 = numpy.bincount(groups, (values - mean[groups]) ** 2, minlength=self.groups)
+
+            order = numpy.lexsort((values, groups))
+            groups, values = groups[order], values[order]
+            starts = numpy.cumsum(count) - count
+            filled = count > 0
+            minimum = numpy.full(self.groups, numpy.nan)
+            maximum = numpy.full(self.groups, numpy.nan)
+            minimum[filled] = values[starts[filled]]
+            maximum[filled] = values[starts[filled] + count[filled] - 1]
+
+            median = numpy.full(self.groups, numpy.nan)
+            q1 = numpy.full(self.groups, numpy.nan)
+            q3 = numpy.full(self.groups, numpy.nan)
+            n, start = count[filled], starts[filled]
+            half = (n + 1) // 2
+            median[filled] = _sortedMedians(values, start, n)
+            q1[filled] = _sortedMedians(values, start, half)
+            q3[filled] = _sortedMedians(values, start + n - half, half)
+
+            valueGroups, distinct, valueCounts = _valueCounts(groups, values, numpy.ones(len(values), dtype=numpy.int64))
+            variety = numpy.bincount(valueGroups, minlength=self.groups)
+
+            # the rarest and most frequent values, the smallest one in case of ties
+            minority = numpy.full(self.groups, numpy.nan)
+            majority = numpy.full(self.groups, numpy.nan)
+            index = numpy.arange(len(distinct))
+            for result, key in ((minority, valueCounts), (majority, -valueCounts)):
+                order = numpy.lexsort((index, key, valueGroups))
+                first = order[_starts(valueGroups[order])]
+                result[valueGroups[first]] = distinct[first]
+        else:
+            count, total, m2 = self.count, self.sum, self.m2
+            filled = count > 0
+            minimum = numpy.where(filled, self.min, numpy.nan)
+            maximum = numpy.where(filled, self.max, numpy.nan)
+            median, q1, q3 = self.digest.quantiles([0.5, 0.25, 0.75], minimum, maximum).T
+            variety = minority = majority = numpy.full(self.groups, numpy.nan)
+
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            mean = numpy.where(filled, total / count, numpy.nan)
+            # pow() rather than sqrt(), as QgsStatisticalSummary
+            stddev = numpy.where(filled, numpy.power(m2 / count, 0.5), numpy.nan)
+
+        return {'count': count.tolist(),
+                'missing': self.missing.tolist(),
+                'variety': variety.tolist(),
+                'min': minimum.tolist(),
+                'max': maximum.tolist(),
+                'range': (maximum - minimum).tolist(),
+                'sum': total.tolist(),
+                'mean': mean.tolist(),
+                'median': median.tolist(),
+                'stddev': stddev.tolist(),
+                'minority': minority.tolist(),
+                'majority': majority.tolist(),
+                'q1': q1.tolist(),
+                'q3': q3.tolist(),
+                'iqr': (q3 - q1).tolist()}
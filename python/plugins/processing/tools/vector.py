@@ -27,9 +27,20 @@ __revision__ = '$Format:%H$'
 
 import csv
 
+import numpy
+
+from qgis.PyQt.QtCore import QVariant
 from qgis.core import (QgsWkbTypes,
                        QgsFeatureRequest)
 
+# number of features read at once by columnChunks()
+CHUNK_SIZE = 65536
+
+# key of the geometry coordinates in the columns returned by columnChunks()
+GEOMETRY_COLUMN = '$geometry'
+
+INTEGER_TYPES = (QVariant.Int, QVariant.UInt, QVariant.LongLong, QVariant.ULongLong)
+
 
 def resolveFieldIndex(source, attr):
     """This method takes an object and returns the index field it
@@ -62,32 +73,183 @@ def values(source, *attributes):
     It assummes fields are numeric or contain values that can be parsed
     to a number.
     """
-    ret = {}
-    indices = []
-    attr_keys = {}
-    for attr in attributes:
-        index = resolveFieldIndex(source, attr)
-        indices.append(index)
-        attr_keys[index] = attr
-
-    # use an optimised feature request
-    request = QgsFeatureRequest().setSubsetOfAttributes(indices).setFlags(QgsFeatureRequest.NoGeometry)
-
-    for feature in source.getFeatures(request):
-        for i in indices:
-
-            # convert attribute value to number
-            try:
-                v = float(feature.attributes()[i])
-            except:
-                v = None
-
-            k = attr_keys[i]
-            if k in ret:
-                ret[k].append(v)
-            else:
-                ret[k] = [v]
-    return ret
+    return dict((k, v.tolist()) for k, v in columns(source, attributes, numeric=True).items())
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _column(values, dtype):
+    """Converts a list of attribute values to a masked array, masking
+    null values (and values which are not numbers for float columns)"""
+    if dtype is float:
+        data = numpy.array([v if type(v) in (int, float) else _number(v) for v in values], dtype=float)
+        return numpy.ma.masked_invalid(data, copy=False)
+    if dtype is int:
+        mask = numpy.fromiter((type(v) is not int for v in values), bool, len(values))
+        data = numpy.array([0 if m else v for v, m in zip(values, mask)], dtype=numpy.int64)
+        return numpy.ma.array(data, mask=mask)
+    mask = numpy.fromiter((v is None or isinstance(v, QVariant) for v in values), bool, len(values))
+    data = numpy.empty(len(values), dtype=object)
+    data[:] = values
+    data[mask] = None
+    return numpy.ma.array(data, mask=mask)
+
+
+def _columnType(field, numeric=False):
+    if numeric or field.type() == QVariant.Double:
+        return float
+    if field.type() in INTEGER_TYPES:
+        return int
+    return object
+
+
+def attributeColumns(features, fields):
+    """Returns the attributes of a list of features as a list of NumPy
+    masked arrays, one per field, typed as in columnChunks()"""
+    values = list(zip(*[f.attributes() for f in features])) if features else [[] for f in fields]
+    return [_column(list(v), _columnType(field)) for v, field in zip(values, fields)]
+
+
+def _coordinates(feature):
+    if not feature.hasGeometry():
+        return numpy.nan, numpy.nan
+    geometry = feature.geometry()
+    if QgsWkbTypes.flatType(geometry.wkbType()) == QgsWkbTypes.Point:
+        point = geometry.asPoint()
+    else:
+        point = geometry.centroid().asPoint()
+    return point.x(), point.y()
+
+
+def pointCoordinates(features):
+    """Returns the coordinates of the points (or of the centroids of other
+    geometries) of a list of features, as a masked array of shape (n, 2).
+    Features without geometry are masked"""
+    return numpy.ma.masked_invalid(numpy.array([_coordinates(f) for f in features], dtype=float).reshape(-1, 2),
+                                   copy=False)
+
+
+def _chunk(attributes, types, rows, coordinates):
+    values = list(zip(*rows)) if rows else [[] for a in attributes]
+    chunk = dict((attr, _column(list(v), t)) for attr, v, t in zip(attributes, values, types))
+    if coordinates is not None:
+        chunk[GEOMETRY_COLUMN] = numpy.ma.masked_invalid(numpy.array(coordinates, dtype=float).reshape(-1, 2),
+                                                         copy=False)
+    return chunk
+
+
+def columnChunks(source, attributes, geometry=False, numeric=False, chunkSize=CHUNK_SIZE, feedback=None):
+    """Yields the values in the attributes table of a feature source by
+    chunks of chunkSize features, as dicts of NumPy masked arrays with the
+    passed field identifiers (names or indices) as keys. Null values are
+    masked.
+
+    Integer and double fields are returned as int64 and float arrays,
+    other fields as object arrays. If numeric is True, all the fields are
+    returned as float arrays, masking values which cannot be parsed to a
+    number.
+
+    If geometry is True, the chunks also contain the coordinates of the
+    points (or of the centroids of other geometries) as an array of shape
+    (n, 2) with the GEOMETRY_COLUMN key.
+    """
+    indices = [resolveFieldIndex(source, attr) for attr in attributes]
+    types = [_columnType(source.fields().at(i), numeric) for i in indices]
+
+    request = QgsFeatureRequest().setSubsetOfAttributes(indices)
+    if not geometry:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+
+    total = 100.0 / source.featureCount() if source.featureCount() > 0 else 0
+    rows = []
+    coordinates = [] if geometry else None
+    for current, feature in enumerate(source.getFeatures(request)):
+        attrs = feature.attributes()
+        rows.append([attrs[i] for i in indices])
+        if geometry:
+            coordinates.append(_coordinates(feature))
+        if len(rows) == chunkSize:
+            if feedback is not None:
+                if feedback.isCanceled():
+                    return
+                feedback.setProgress(int(current * total))
+            yield _chunk(attributes, types, rows, coordinates)
+            rows = []
+            coordinates = [] if geometry else None
+    if rows:
+        yield _chunk(attributes, types, rows, coordinates)
+
+
+def columns(source, attributes, geometry=False, numeric=False, feedback=None):
+    """Returns the values in the attributes table of a feature source as
+    NumPy masked arrays, see columnChunks(). The values are read by chunks,
+    with a single request"""
+    chunks = list(columnChunks(source, attributes, geometry, numeric, feedback=feedback))
+    if not chunks:
+        chunks = [_chunk(attributes, [float if numeric else object] * len(attributes), [],
+                         [] if geometry else None)]
+    return dict((k, numpy.ma.concatenate([c[k] for c in chunks])) for k in chunks[0])
+
+
+def histogram(source, attribute, bins, feedback=None):
+    """Returns the histogram of the numeric values of an attribute, as the
+    counts and bin edges (see numpy.histogram). The values are reduced by
+    chunks, without holding all of them in memory"""
+    minimum = maximum = None
+    for chunk in columnChunks(source, [attribute], numeric=True):
+        if feedback is not None and feedback.isCanceled():
+            break
+        values = chunk[attribute].compressed()
+        if len(values):
+            minimum = values.min() if minimum is None else min(minimum, values.min())
+            maximum = values.max() if maximum is None else max(maximum, values.max())
+
+    if minimum is None:
+        minimum, maximum = 0, 1
+    elif minimum == maximum:
+        minimum, maximum = minimum - 0.5, maximum + 0.5
+    edges = numpy.linspace(minimum, maximum, bins + 1)
+    counts = numpy.zeros(bins, dtype=numpy.int64)
+    for chunk in columnChunks(source, [attribute], numeric=True, feedback=feedback):
+        counts += numpy.histogram(chunk[attribute].compressed(), edges)[0]
+    return counts, edges
+
+
+def _wkb(wkbType, counts, coordinates):
+    fields = [('byteOrder', 'u1'), ('wkbType', '<u4')]
+    fields += [('count{}'.format(i), '<u4') for i in range(len(counts))]
+    fields.append(('coordinates', '<f8', coordinates.shape[1:]))
+    records = numpy.empty(len(coordinates), dtype=fields)
+    records['byteOrder'] = 1
+    records['wkbType'] = wkbType
+    for i, count in enumerate(counts):
+        records['count{}'.format(i)] = count
+    records['coordinates'] = coordinates
+    return records.view(numpy.dtype((numpy.void, records.dtype.itemsize))).tolist()
+
+
+def pointsWkb(points):
+    """Returns the WKB of 2D points, an array of shape (n, 2), as a list of
+    bytes"""
+    return _wkb(QgsWkbTypes.Point, [], points)
+
+
+def lineStringsWkb(lines):
+    """Returns the WKB of 2D line strings with the same number of vertices,
+    an array of shape (n, vertices, 2), as a list of bytes"""
+    return _wkb(QgsWkbTypes.LineString, [lines.shape[1]], lines)
+
+
+def polygonsWkb(rings):
+    """Returns the WKB of 2D polygons without holes, whose closed exterior
+    rings have the same number of vertices, an array of shape (n, vertices,
+    2), as a list of bytes"""
+    return _wkb(QgsWkbTypes.Polygon, [1, rings.shape[1]], rings)
 
 
 def checkMinDistance(point, index, distance, points):
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    virtuallayer.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import re
+
+# spatial predicates which can only be true when the bounding boxes of their arguments intersect
+SPATIAL_PREDICATES = set(prefix + name
+                         for name in ('intersects', 'contains', 'within', 'overlaps', 'touches',
+                                      'crosses', 'equals', 'covers', 'coveredby')
+                         for prefix in ('', 'st_', 'mbr'))
+
+# geometry column of the tables created by the virtual layer provider
+GEOMETRY_COLUMN = 'geometry'
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+|--[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<identifier>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<operator><>|!=|<=|>=|==|\|\||[(),.;=<>+\-*/%])
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+# keywords ending the FROM or WHERE clauses
+_CLAUSE_KEYWORDS = ('where', 'group', 'order', 'limit', 'having', 'window')
+
+# join types which constrain the order of the tables in the query plan
+_UNSUPPORTED_KEYWORDS = ('union', 'intersect', 'except', 'with', 'left', 'right', 'full',
+                         'outer', 'natural', 'cross', 'using', 'indexed')
+
+
+class _Token(object):
+
+    def __init__(self, kind, text):
+        self.kind = kind
+        self.text = text
+
+    def lower(self):
+        return self.text.lower() if self.kind == 'word' else None
+
+
+def _tokenize(sql):
+    return [_Token(m.lastgroup, m.group()) for m in _TOKEN_RE.finditer(sql)]
+
+
+def _words(tokens):
+    return [t for t in tokens if t.kind != 'space']
+
+
+def _unquote(token):
+    if token.kind == 'identifier':
+        return token.text[1:-1].replace('""', '"')
+    return token.text
+
+
+def _split(tokens, separator):
+    """Splits a list of tokens at the top level occurrences of separator,
+    which is a function returning True for separating tokens."""
+    parts = [[]]
+    depth = 0
+    for i, t in enumerate(tokens):
+        if t.text == '(':
+            depth += 1
+        elif t.text == ')':
+            depth -= 1
+        if depth == 0 and separator(i, t):
+            parts.append([])
+        else:
+            parts[-1].append(t)
+    return parts
+
+
+def _splitConjunction(tokens):
+    """Splits a condition in its top level AND terms"""
+    betweens = set()
+
+    def isAnd(i, t):
+        if t.lower() == 'between':
+            betweens.add(i)
+        if t.lower() != 'and':
+            return False
+        if betweens:
+            # the AND of a BETWEEN ... AND ...
+            betweens.pop()
+            return False
+        return True
+
+    return _split(tokens, isAnd)
+
+
+class VirtualLayerQueryPlan(object):
+
+    """
+    Rewrites a virtual layer query so that its spatial predicates use
+    the spatial filtering of the virtual tables.
+
+    Each table of the virtual layer exposes a hidden _search_frame_ column:
+    a "t._search_frame_ = geom" constraint makes the virtual table fetch
+    the features of t with a bounding box filter, which is handled by the
+    spatial index of the source provider, or by a temporary in-memory
+    R-tree when the table is scanned once per row of another table.
+
+    A constraint is added for each bounding box or spatial join predicate
+    of an inner join, at most one per table, and without circular
+    dependencies between tables. The tables are then joined in the order
+    of these dependencies, which SQLite cannot change. Queries which cannot be analysed safely
+    (sub-queries, outer joins, set operations...) are left unchanged.
+    """
+
+    def __init__(self, query, tables):
+        self.query = query
+        self.tables = set(t.lower() for t in tables)
+        # (table reference, geometry expression) of the added constraints
+        self.frames = []
+        # table reference -> table reference its search frame depends on
+        self._dependencies = {}
+        # (alias, text) of the table references of the FROM clause
+        self._references = []
+        self._tokens = _tokenize(query)
+        try:
+            self._plan()
+        except ValueError:
+            self.frames = []
+            self._dependencies = {}
+
+    def rewrittenQuery(self):
+        """Returns the query with the spatial filtering constraints, or the
+        original query when none applies"""
+        if not self.frames:
+            return self.query
+
+        condition = ' AND '.join('{}._search_frame_ = {}'.format(alias, expression)
+                                 for alias, expression in self.frames)
+        after = ''.join(t.text for t in self._tokens[self._whereEnd:])
+        if all(outer is None for outer in self._dependencies.values()):
+            before = ''.join(t.text for t in self._tokens[:self._whereEnd])
+            if self._whereStart is None:
+                return '{} WHERE {} {}'.format(before.rstrip(), condition, after.lstrip()).rstrip()
+
+            where = ''.join(t.text for t in self._tokens[:self._whereStart + 1])
+            clause = ''.join(t.text for t in self._tokens[self._whereStart + 1:self._whereEnd])
+            return '{} ({}) AND {} {}'.format(where, clause.strip(), condition, after.lstrip()).rstrip()
+
+        # a _search_frame_ constraint on a joined geometry is only used when the
+        # other table is in an outer loop: the order of the tables is forced with
+        # CROSS JOIN, the ON conditions of the inner joins moving to the WHERE clause
+        select = ''.join(t.text for t in self._tokens[:self._fromStart + 1])
+        clauses = ['({})'.format(''.join(t.text for t in c).strip()) for c in self._conditions]
+        return '{} {} WHERE {} {}'.format(select, ' CROSS JOIN '.join(self._joinOrder()),
+                                          ' AND '.join(clauses + [condition]), after.lstrip()).rstrip()
+
+    def _joinOrder(self):
+        """Returns the table references sorted so that each table comes after the
+        table its search frame depends on"""
+        remaining = list(self._references)
+        joined = set()
+        references = []
+        while remaining:
+            for alias, reference in remaining:
+                outer = self._dependencies.get(alias)
+                if outer is None or outer in joined:
+                    break
+            remaining.remove((alias, reference))
+            joined.add(alias)
+            references.append(reference)
+        return references
+
+    def _plan(self):
+        lowered = [t.lower() for t in _words(self._tokens)]
+        if lowered.count('select') != 1 or '_search_frame_' in lowered or \
+                any(k in lowered for k in _UNSUPPORTED_KEYWORDS):
+            return
+
+        # top level clauses
+        depth = 0
+        self._fromStart = None
+        self._whereStart = None
+        self._whereEnd = len(self._tokens)
+        for i, t in enumerate(self._tokens):
+            if t.text == '(':
+                depth += 1
+            elif t.text == ')':
+                depth -= 1
+            if depth != 0:
+                continue
+            word = t.lower()
+            if word == 'from' and self._fromStart is None:
+                self._fromStart = i
+            elif word == 'where' and self._fromStart is not None and self._whereStart is None:
+                self._whereStart = i
+            elif (word in _CLAUSE_KEYWORDS[1:] or t.text == ';') and self._fromStart is not None:
+                self._whereEnd = i
+                break
+        if self._fromStart is None:
+            return
+
+        fromEnd = self._whereStart if self._whereStart is not None else self._whereEnd
+        fromTokens = self._tokens[self._fromStart + 1:fromEnd]
+        # the ON conditions, then the WHERE clause
+        self._conditions = []
+        aliases = self._parseFrom(fromTokens, self._conditions)
+        if not aliases:
+            return
+        if self._whereStart is not None:
+            self._conditions.append(self._tokens[self._whereStart + 1:self._whereEnd])
+
+        terms = []
+        for condition in self._conditions:
+            terms.extend(_splitConjunction(condition))
+
+        dependencies = self._dependencies
+        for term in terms:
+            predicate = self._spatialPredicate(term, aliases)
+            if predicate is None:
+                continue
+            first, second = predicate
+            for inner, outer in ((second, first), (first, second)):
+                if inner[0] is None or inner[0] in dependencies:
+                    continue
+                if outer[0] is not None and self._dependsOn(dependencies, outer[0], inner[0]):
+                    continue
+                dependencies[inner[0]] = outer[0]
+                self.frames.append((inner[0], outer[1]))
+                break
+
+    def _parseFrom(self, tokens, conditions):
+        """Returns the table references of a FROM clause made of inner joins
+        of the virtual tables, appending the ON conditions to conditions"""
+        aliases = {}
+        references = _split(tokens, lambda i, t: t.text == ',' or t.lower() in ('join', 'inner'))
+        for reference in references:
+            lowered = [t.lower() for t in reference]
+            if 'on' in lowered:
+                on = lowered.index('on')
+                conditions.append(reference[on + 1:])
+                reference = reference[:on]
+            reference = _words(reference)
+            if not reference:
+                continue
+            if reference[0].text == '(':
+                raise ValueError('sub-query')
+            if reference and reference[-1].lower() == 'as':
+                raise ValueError('invalid table reference')
+            names = [t for t in reference if t.lower() != 'as']
+            if len(names) not in (1, 2) or any(t.kind not in ('word', 'identifier') for t in names):
+                raise ValueError('invalid table reference')
+            alias = names[-1]
+            self._references.append((alias.text, ' '.join(t.text for t in reference)))
+            if _unquote(names[0]).lower() in self.tables:
+                aliases[_unquote(alias).lower()] = alias.text
+        return aliases
+
+    def _spatialPredicate(self, term, aliases):
+        """Returns the (table reference, geometry) pairs of both arguments of
+        a term made of a spatial predicate, None if term is something else.
+        The table reference is None for constant geometries"""
+        spaced = term
+        term = _words(term)
+        if len(term) >= 2 and term[-2].text in ('=', '==') and term[-1].text in ('1', 'true', 'TRUE'):
+            term = term[:-2]
+        if len(term) < 4 or term[0].lower() not in SPATIAL_PREDICATES or \
+                term[1].text != '(' or term[-1].text != ')':
+            return None
+        # the arguments, with their original spacing
+        start = spaced.index(term[1]) + 1
+        end = len(spaced) - spaced[::-1].index(term[-1]) - 1
+        args = _split(spaced[start:end], lambda i, t: t.text == ',')
+        if len(args) != 2:
+            return None
+
+        result = []
+        for arg in args:
+            text = ''.join(t.text for t in arg).strip()
+            arg = _words(arg)
+            if len(arg) == 3 and arg[1].text == '.' and _unquote(arg[2]).lower() == GEOMETRY_COLUMN:
+                alias = _unquote(arg[0]).lower()
+                if alias not in aliases:
+                    return None
+                result.append((aliases[alias], text))
+            elif len(arg) == 1 and _unquote(arg[0]).lower() == GEOMETRY_COLUMN:
+                # unqualified column, only unambiguous with a single table
+                if len(aliases) != 1:
+                    return None
+                result.append((list(aliases.values())[0], text))
+            elif self._isConstant(arg):
+                result.append((None, '({})'.format(text)))
+            else:
+                return None
+
+        if result[0][0] is None and result[1][0] is None:
+            return None
+        if result[0][0] is not None and result[0][0] == result[1][0]:
+            return None
+        return result
+
+    @staticmethod
+    def _isConstant(tokens):
+        """Whether an expression only made of literals and function calls"""
+        for i, t in enumerate(tokens):
+            if t.kind == 'identifier' or t.text == '.' and i > 0 and tokens[i - 1].kind == 'word':
+                return False
+            if t.kind == 'word' and t.lower() != 'null' and (i + 1 >= len(tokens) or tokens[i + 1].text != '('):
+                return False
+        return bool(tokens)
+
+    @staticmethod
+    def _dependsOn(dependencies, table, other):
+        while table is not None:
+            if table == other:
+                return True
+            table = dependencies.get(table)
+        return False
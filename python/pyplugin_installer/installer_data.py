@@ -25,13 +25,11 @@
 
 from qgis.PyQt.QtCore import (pyqtSignal, QObject, QCoreApplication, QFile,
                               QDir, QDirIterator, QDate, QUrl, QFileInfo,
-                              QLocale, QByteArray)
-from qgis.PyQt.QtXml import QDomDocument
+                              QLocale)
 from qgis.PyQt.QtNetwork import QNetworkRequest, QNetworkReply
 from qgis.core import QgsSettings
 import sys
 import os
-import codecs
 import re
 try:
     import configparser
@@ -44,8 +42,9 @@ except ImportError:
 import qgis.utils
 from qgis.core import QgsNetworkAccessManager, QgsApplication
 from qgis.gui import QgsMessageBar
-from qgis.utils import iface, plugin_paths
+from qgis.utils import iface, plugin_paths, plugin_metadata_index
 from .version_compare import pyQgisVersion, compareVersions, normalizeVersion, isCompatible
+from .repository_parser import RepositoryXmlParser, RepositoryCache
 
 
 """
@@ -56,6 +55,7 @@ mRepositories = dict of dicts: {repoName : {"url" unicode,
                                             "Relay" Relay, # Relay object for transmitting signals from QPHttp with adding the repoName information
                                             "Request" QNetworkRequest,
                                             "xmlData" QNetworkReply,
+                                            "xmlParser" RepositoryXmlParser, # parser of the data of the reply
                                             "state" int,   (0 - disabled, 1-loading, 2-loaded ok, 3-error (to be retried), 4-rejected)
                                             "error" unicode}}
 
@@ -342,10 +342,20 @@ class Repositories(QObject):
                 self.mRepositories[key]["QRequest"] = None
                 return
         self.mRepositories[key]["QRequest"].setAttribute(QNetworkRequest.User, key)
+        # revalidate the local copy of the repository rather than the network cache one
+        self.mRepositories[key]["QRequest"].setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.AlwaysNetwork)
+        self.mRepositories[key]["QRequest"].setAttribute(QNetworkRequest.CacheSaveControlAttribute, False)
+        etag, lastModified = repositoryCache.validators(self.mRepositories[key]["url"] + self.urlParams())
+        if etag:
+            self.mRepositories[key]["QRequest"].setRawHeader(b"If-None-Match", etag.encode("latin-1"))
+        if lastModified:
+            self.mRepositories[key]["QRequest"].setRawHeader(b"If-Modified-Since", lastModified.encode("latin-1"))
+        self.mRepositories[key]["xmlParser"] = RepositoryXmlParser(self.mRepositories[key]["url"])
         self.mRepositories[key]["xmlData"] = QgsNetworkAccessManager.instance().get(self.mRepositories[key]["QRequest"])
         self.mRepositories[key]["xmlData"].setProperty('reposName', key)
         self.mRepositories[key]["xmlData"].setProperty('redirectionCounter', redirectionCounter)
         self.mRepositories[key]["xmlData"].downloadProgress.connect(self.mRepositories[key]["Relay"].dataReadProgress)
+        self.mRepositories[key]["xmlData"].readyRead.connect(self.xmlDataAvailable)
         self.mRepositories[key]["xmlData"].finished.connect(self.xmlDownloaded)
 
     # ----------------------------------------- #
@@ -363,6 +373,14 @@ class Repositories(QObject):
             self.mRepositories[key]["xmlData"].finished.disconnect()
             self.mRepositories[key]["xmlData"].abort()
 
+    # ----------------------------------------- #
+    def xmlDataAvailable(self):
+        """ parse the repository data as it arrives """
+        reply = self.sender()
+        if reply.error() != QNetworkReply.NoError or reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) in (301, 304):
+            return
+        self.mRepositories[reply.property('reposName')]["xmlParser"].addData(reply.readAll())
+
     # ----------------------------------------- #
     def xmlDownloaded(self):
         """ populate the plugins object with the fetched data """
@@ -387,90 +405,50 @@ class Repositories(QObject):
                 reply.deleteLater()
                 return
         else:
-            reposXML = QDomDocument()
-            content = reply.readAll()
-            # Fix lonely ampersands in metadata
-            a = QByteArray()
-            a.append("& ")
-            b = QByteArray()
-            b.append("&amp; ")
-            content = content.replace(a, b)
-            reposXML.setContent(content)
-            pluginNodes = reposXML.elementsByTagName("pyqgis_plugin")
-            if pluginNodes.size():
-                for i in range(pluginNodes.size()):
-                    fileName = pluginNodes.item(i).firstChildElement("file_name").text().strip()
-                    if not fileName:
-                        fileName = QFileInfo(pluginNodes.item(i).firstChildElement("download_url").text().strip().split("?")[0]).fileName()
-                    name = fileName.partition(".")[0]
-                    experimental = False
-                    if pluginNodes.item(i).firstChildElement("experimental").text().strip().upper() in ["TRUE", "YES"]:
-                        experimental = True
-                    deprecated = False
-                    if pluginNodes.item(i).firstChildElement("deprecated").text().strip().upper() in ["TRUE", "YES"]:
-                        deprecated = True
-                    trusted = False
-                    if pluginNodes.item(i).firstChildElement("trusted").text().strip().upper() in ["TRUE", "YES"]:
-                        trusted = True
-                    icon = pluginNodes.item(i).firstChildElement("icon").text().strip()
-                    if icon and not icon.startswith("http"):
-                        icon = "http://%s/%s" % (QUrl(self.mRepositories[reposName]["url"]).host(), icon)
-
-                    if pluginNodes.item(i).toElement().hasAttribute("plugin_id"):
-                        plugin_id = pluginNodes.item(i).toElement().attribute("plugin_id")
-                    else:
-                        plugin_id = None
-
-                    plugin = {
-                        "id": name,
-                        "plugin_id": plugin_id,
-                        "name": pluginNodes.item(i).toElement().attribute("name"),
-                        "version_available": pluginNodes.item(i).toElement().attribute("version"),
-                        "description": pluginNodes.item(i).firstChildElement("description").text().strip(),
-                        "about": pluginNodes.item(i).firstChildElement("about").text().strip(),
-                        "author_name": pluginNodes.item(i).firstChildElement("author_name").text().strip(),
-                        "homepage": pluginNodes.item(i).firstChildElement("homepage").text().strip(),
-                        "download_url": pluginNodes.item(i).firstChildElement("download_url").text().strip(),
-                        "category": pluginNodes.item(i).firstChildElement("category").text().strip(),
-                        "tags": pluginNodes.item(i).firstChildElement("tags").text().strip(),
-                        "changelog": pluginNodes.item(i).firstChildElement("changelog").text().strip(),
-                        "author_email": pluginNodes.item(i).firstChildElement("author_email").text().strip(),
-                        "tracker": pluginNodes.item(i).firstChildElement("tracker").text().strip(),
-                        "code_repository": pluginNodes.item(i).firstChildElement("repository").text().strip(),
-                        "downloads": pluginNodes.item(i).firstChildElement("downloads").text().strip(),
-                        "average_vote": pluginNodes.item(i).firstChildElement("average_vote").text().strip(),
-                        "rating_votes": pluginNodes.item(i).firstChildElement("rating_votes").text().strip(),
-                        "icon": icon,
-                        "experimental": experimental,
-                        "deprecated": deprecated,
-                        "trusted": trusted,
-                        "filename": fileName,
-                        "installed": False,
-                        "available": True,
-                        "status": "not installed",
-                        "error": "",
-                        "error_details": "",
-                        "version_installed": "",
-                        "zip_repository": reposName,
-                        "library": "",
-                        "readonly": False
-                    }
-                    qgisMinimumVersion = pluginNodes.item(i).firstChildElement("qgis_minimum_version").text().strip()
+            status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+            cacheKey = self.mRepositories[reposName]["url"] + self.urlParams()
+            records = None
+            parserError = None
+            if status == 304:
+                # unchanged since the cached copy was parsed
+                cached = repositoryCache.load(cacheKey)
+                if cached is not None:
+                    records = cached["records"]
+            else:
+                parser = self.mRepositories[reposName]["xmlParser"]
+                parser.addData(reply.readAll())
+                records = parser.finish()
+                if parser.hasError():
+                    # a truncated or malformed document, neither used nor cached
+                    parserError = parser.errorString()
+                    records = None
+                elif records:
+                    repositoryCache.store(cacheKey,
+                                          bytes(reply.rawHeader(b"ETag")).decode("latin-1"),
+                                          bytes(reply.rawHeader(b"Last-Modified")).decode("latin-1"),
+                                          records)
+            if records:
+                for record in records:
+                    qgisMinimumVersion = record["qgis_minimum_version"]
                     if not qgisMinimumVersion:
                         qgisMinimumVersion = "2"
-                    qgisMaximumVersion = pluginNodes.item(i).firstChildElement("qgis_maximum_version").text().strip()
+                    qgisMaximumVersion = record["qgis_maximum_version"]
                     if not qgisMaximumVersion:
                         qgisMaximumVersion = qgisMinimumVersion[0] + ".99"
                     # if compatible, add the plugin to the list
-                    if not pluginNodes.item(i).firstChildElement("disabled").text().strip().upper() in ["TRUE", "YES"]:
+                    if not record["disabled"]:
                         if isCompatible(pyQgisVersion(), qgisMinimumVersion, qgisMaximumVersion):
                             # add the plugin to the cache
+                            plugin = dict(record["plugin"])
+                            plugin["zip_repository"] = reposName
                             plugins.addFromRepository(plugin)
                 self.mRepositories[reposName]["state"] = 2
             else:
                 # no plugin metadata found
                 self.mRepositories[reposName]["state"] = 3
-                if reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) == 200:
+                if parserError is not None:
+                    self.mRepositories[reposName]["error"] = QCoreApplication.translate("QgsPluginInstaller", "Invalid repository XML:") + " " + parserError
+                elif status == 200:
                     self.mRepositories[reposName]["error"] = QCoreApplication.translate("QgsPluginInstaller", "Server response is 200 OK, but doesn't contain plugin metatada. This is most likely caused by a proxy or a wrong repository URL. You can configure proxy settings in QGIS options.")
                 else:
                     self.mRepositories[reposName]["error"] = QCoreApplication.translate("QgsPluginInstaller", "Status code:") + " %d %s" % (
@@ -568,10 +546,10 @@ class Plugins(QObject):
                 for better control on wchich module is examined
                 in case there is an installed plugin masking a core one """
             global errorDetails
-            cp = configparser.ConfigParser()
+            cp = plugin_metadata_index.parser(path)
             try:
-                with codecs.open(metadataFile, "r", "utf8") as f:
-                    cp.read_file(f)
+                if cp is None:
+                    raise configparser.Error(plugin_metadata_index.parseError(path))
                 return cp.get('general', fct)
             except Exception as e:
                 if not errorDetails:
@@ -716,6 +694,8 @@ class Plugins(QObject):
                 # remove the temporarily added path
                 sys.path.remove(pluginsPath)
 
+        plugin_metadata_index.save()
+
     # ----------------------------------------- #
     def rebuild(self):
         """ build or rebuild the mPlugins from the caches """
@@ -816,3 +796,4 @@ class Plugins(QObject):
 # public instances:
 repositories = Repositories()
 plugins = Plugins()
+repositoryCache = RepositoryCache(os.path.join(QgsApplication.qgisSettingsDirPath(), "cache", "plugin_repositories"))
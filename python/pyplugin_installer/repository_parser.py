@@ -0,0 +1,238 @@
+# -*- coding:utf-8 -*-
+"""
+/***************************************************************************
+                            Plugin Installer module
+                             -------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import hashlib
+import json
+import os
+
+from qgis.PyQt.QtCore import QFileInfo, QUrl, QXmlStreamReader
+
+
+# plugin fields read from the child elements of the pyqgis_plugin elements
+pluginElements = {
+    "description": "description",
+    "about": "about",
+    "author_name": "author_name",
+    "homepage": "homepage",
+    "download_url": "download_url",
+    "category": "category",
+    "tags": "tags",
+    "changelog": "changelog",
+    "author_email": "author_email",
+    "tracker": "tracker",
+    "code_repository": "repository",
+    "downloads": "downloads",
+    "average_vote": "average_vote",
+    "rating_votes": "rating_votes",
+}
+
+
+# --- class RepositoryXmlParser ---------------------------------------------------------- #
+class RepositoryXmlParser(object):
+
+    """ Incremental parser of a plugin repository XML, fed with the data
+    as it is downloaded. Each pyqgis_plugin element is turned into a record:
+    {"plugin": plugin dict (without the repository name),
+     "qgis_minimum_version": unicode, "qgis_maximum_version": unicode,
+     "disabled": bool} """
+
+    def __init__(self, reposUrl):
+        self.reposUrl = reposUrl
+        self.records = []
+        self.reader = QXmlStreamReader()
+        # a trailing ampersand, kept until the next data is available
+        self.pending = b""
+        self.depth = 0
+        self.pluginDepth = None
+        self.attributes = None
+        self.elements = None
+        self.element = None
+        self.text = []
+        self.finished = False
+
+    # ----------------------------------------- #
+    def addData(self, data):
+        """ parse the next block of data """
+        data = self.pending + bytes(data)
+        self.pending = b""
+        if data.endswith(b"&"):
+            self.pending = b"&"
+            data = data[:-1]
+        # fix lonely ampersands in metadata
+        self.reader.addData(data.replace(b"& ", b"&amp; "))
+        self.parse()
+
+    # ----------------------------------------- #
+    def finish(self):
+        """ parse the remaining data, return the records """
+        if self.pending:
+            self.reader.addData(self.pending)
+            self.pending = b""
+            self.parse()
+        self.finished = True
+        return self.records
+
+    # ----------------------------------------- #
+    def hasError(self):
+        """ return true if the data is not a well formed document. Until
+        finish() is called, a premature end only means more data is expected """
+        if not self.reader.hasError():
+            return False
+        return self.finished or self.reader.error() != QXmlStreamReader.PrematureEndOfDocumentError
+
+    # ----------------------------------------- #
+    def errorString(self):
+        """ return the error message of a malformed document """
+        return self.reader.errorString()
+
+    # ----------------------------------------- #
+    def parse(self):
+        reader = self.reader
+        while not reader.atEnd():
+            token = reader.readNext()
+            if token == QXmlStreamReader.StartElement:
+                self.depth += 1
+                if self.pluginDepth is None:
+                    if reader.name() == "pyqgis_plugin":
+                        self.pluginDepth = self.depth
+                        attributes = reader.attributes()
+                        self.attributes = dict((attributes.at(i).name(), attributes.at(i).value())
+                                               for i in range(attributes.size()))
+                        self.elements = {}
+                elif self.depth == self.pluginDepth + 1:
+                    self.element = reader.name()
+                    self.text = []
+            elif token == QXmlStreamReader.EndElement:
+                if self.pluginDepth is not None:
+                    if self.depth == self.pluginDepth + 1:
+                        # as firstChildElement, keep the first element of a given name
+                        self.elements.setdefault(self.element, "".join(self.text))
+                        self.element = None
+                    elif self.depth == self.pluginDepth:
+                        self.records.append(self.record(self.attributes, self.elements))
+                        self.pluginDepth = None
+                self.depth -= 1
+            elif token == QXmlStreamReader.Characters and self.element is not None:
+                self.text.append(reader.text())
+
+    # ----------------------------------------- #
+    def record(self, attributes, elements):
+        """ build the record of a pyqgis_plugin element """
+        def element(name):
+            return elements.get(name, "").strip()
+
+        def flag(name):
+            return element(name).upper() in ["TRUE", "YES"]
+
+        fileName = element("file_name")
+        if not fileName:
+            fileName = QFileInfo(element("download_url").split("?")[0]).fileName()
+        name = fileName.partition(".")[0]
+        icon = element("icon")
+        if icon and not icon.startswith("http"):
+            icon = "http://%s/%s" % (QUrl(self.reposUrl).host(), icon)
+
+        plugin = {
+            "id": name,
+            "plugin_id": attributes.get("plugin_id"),
+            "name": attributes.get("name", ""),
+            "version_available": attributes.get("version", ""),
+            "icon": icon,
+            "experimental": flag("experimental"),
+            "deprecated": flag("deprecated"),
+            "trusted": flag("trusted"),
+            "filename": fileName,
+            "installed": False,
+            "available": True,
+            "status": "not installed",
+            "error": "",
+            "error_details": "",
+            "version_installed": "",
+            "library": "",
+            "readonly": False
+        }
+        for key, elementName in pluginElements.items():
+            plugin[key] = element(elementName)
+
+        return {"plugin": plugin,
+                "qgis_minimum_version": element("qgis_minimum_version"),
+                "qgis_maximum_version": element("qgis_maximum_version"),
+                "disabled": flag("disabled")}
+
+# --- /class RepositoryXmlParser --------------------------------------------------------- #
+
+
+# --- class RepositoryCache -------------------------------------------------------------- #
+class RepositoryCache(object):
+
+    """ Local copy of the parsed repositories, with the ETag and Last-Modified
+    validators of the response they were parsed from """
+
+    def __init__(self, path):
+        self.path = path
+
+    # ----------------------------------------- #
+    def fileName(self, url):
+        return os.path.join(self.path, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    # ----------------------------------------- #
+    def load(self, url):
+        """ return the cached {"etag", "last_modified", "records"} of url, or None """
+        try:
+            with open(self.fileName(url), encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("url") != url:
+            return None
+        return cached
+
+    # ----------------------------------------- #
+    def validators(self, url):
+        """ return the (ETag, Last-Modified) of the cached copy of url, empty if none """
+        cached = self.load(url)
+        if cached is None:
+            return "", ""
+        return cached.get("etag", ""), cached.get("last_modified", "")
+
+    # ----------------------------------------- #
+    def store(self, url, etag, lastModified, records):
+        """ store the records parsed from the repository at url """
+        if not etag and not lastModified:
+            # the repository couldn't be revalidated
+            self.remove(url)
+            return
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fileName = self.fileName(url)
+            with open(fileName + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"url": url, "etag": etag, "last_modified": lastModified, "records": records}, f)
+            os.replace(fileName + ".tmp", fileName)
+        except OSError:
+            pass
+
+    # ----------------------------------------- #
+    def remove(self, url):
+        try:
+            os.remove(self.fileName(url))
+        except OSError:
+            pass
+
+# --- /class RepositoryCache ------------------------------------------------------------- #
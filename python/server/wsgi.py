@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    wsgi.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Python front-ends for QgsServer.
+
+WsgiApplication exposes a QgsServer as a WSGI application, to be run by any
+WSGI server. QgsServer is not thread safe, so each process handles one
+request at a time even with a threaded WSGI server, use several processes
+to handle requests concurrently:
+
+    from qgis.server.wsgi import WsgiApplication
+    application = WsgiApplication()
+
+PooledHttpServer is a standalone asyncio HTTP/1.1 server dispatching the
+requests to a pool of pre-forked worker processes, each running its own
+QgsServer. Requests for the same project (MAP parameter) always go to the
+same worker so that its project cache is reused, requests without project
+go to the least loaded worker. When the queue of a worker is full, or
+there are too many open connections, requests are answered with
+503 Service Unavailable rather than piling up. Workers taking more than
+the request timeout are restarted and the request is answered with
+504 Gateway Timeout.
+
+    python3 -m qgis.server.wsgi --port 8081 --workers 4
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import urllib.parse
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.client import responses
+
+from qgis.core import QgsApplication
+from qgis.server import QgsServer, QgsServerRequest, QgsBufferServerRequest, QgsBufferServerResponse
+
+METHODS = {
+    'GET': QgsServerRequest.GetMethod,
+    'POST': QgsServerRequest.PostMethod,
+    'PUT': QgsServerRequest.PutMethod,
+    'DELETE': QgsServerRequest.DeleteMethod,
+    'HEAD': QgsServerRequest.HeadMethod,
+}
+
+# defaults of PooledHttpServer
+QUEUE_SIZE = 16
+MAX_CONNECTIONS = 512
+KEEP_ALIVE_TIMEOUT = 15
+REQUEST_TIMEOUT = 120
+MAX_BODY_SIZE = 16 << 20
+
+
+class WsgiApplication(object):
+
+    """
+    WSGI application serving requests with a QgsServer, created on first
+    use if not passed. The QgsApplication is created as well if needed.
+    Requests are handled one at a time, QgsServer is not thread safe.
+    """
+
+    def __init__(self, server=None):
+        self._server = server
+        self._app = None
+        self.lock = threading.RLock()
+
+    @property
+    def server(self):
+        with self.lock:
+            if self._server is None:
+                if QgsApplication.instance() is None:
+                    self._app = QgsApplication([], False)
+                self._server = QgsServer()
+            return self._server
+
+    def handle(self, method, url, headers, body=None):
+        """
+        Handles a request, headers being CGI variables (HTTP_*). Returns
+        the HTTP status code, the response headers and body.
+        """
+        request = QgsBufferServerRequest(url, METHODS.get(method, QgsServerRequest.GetMethod), headers,
+                                         body if body else None)
+        response = QgsBufferServerResponse()
+        with self.lock:
+            self.server.handleRequest(request, response)
+
+        headers = dict(response.headers())
+        headers.pop('Status', None)
+        return response.statusCode(), headers, bytes(response.body())
+
+    def __call__(self, environ, start_response):
+        headers = dict((k, v) for k, v in environ.items() if k.startswith('HTTP_'))
+        body = None
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > 0:
+            body = environ['wsgi.input'].read(length)
+
+        status, headers, body = self.handle(environ.get('REQUEST_METHOD', 'GET'), requestUrl(environ), headers, body)
+        start_response('{} {}'.format(status, responses.get(status, '')), list(headers.items()))
+        return [body]
+
+
+def requestUrl(environ):
+    """Rebuilds the URL of a WSGI request, see PEP 3333"""
+    url = environ.get('wsgi.url_scheme', 'http') + '://'
+    if environ.get('HTTP_HOST'):
+        url += environ['HTTP_HOST']
+    else:
+        url += environ['SERVER_NAME'] + ':' + environ['SERVER_PORT']
+    url += urllib.parse.quote(environ.get('SCRIPT_NAME', '')) + urllib.parse.quote(environ.get('PATH_INFO', ''))
+    if environ.get('QUERY_STRING'):
+        url += '?' + environ['QUERY_STRING']
+    return url
+
+
+def projectKey(url):
+    """Returns the MAP parameter of a request URL, or None"""
+    for name, value in urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query):
+        if name.upper() == 'MAP':
+            return value
+    return None
+
+
+def _serveRequests(connection, initializer):
+    # the parent process handles the signals and stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    application = WsgiApplication()
+    if initializer is not None:
+        initializer(application.server)
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        try:
+            result = application.handle(*message)
+        except Exception as e:
+            result = (500, {'Content-Type': 'text/plain'}, str(e).encode('utf-8'))
+        connection.send(result)
+
+
+class Worker(object):
+
+    """
+    A worker process running a QgsServer, receiving requests through a
+    pipe, one at a time. load is the number of queued and running requests.
+    """
+
+    def __init__(self, context, initializer=None, queueSize=QUEUE_SIZE):
+        self.context = context
+        self.initializer = initializer
+        self.queue = asyncio.Queue(queueSize)
+        self.load = 0
+        self.start()
+
+    def start(self):
+        self.connection, child = self.context.Pipe()
+        self.process = self.context.Process(target=_serveRequests, args=(child, self.initializer), daemon=True)
+        self.process.start()
+        child.close()
+
+    def restart(self):
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.start()
+
+    def call(self, message):
+        """Sends a request and waits for the response, blocking"""
+        self.connection.send(message)
+        return self.connection.recv()
+
+    def stop(self, timeout=5):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+
+class PooledHttpServer(object):
+
+    """
+    HTTP/1.1 server (with keep-alive) dispatching the requests to a pool of
+    worker processes, see the module documentation.
+
+    initializer is called with the QgsServer of each worker once started,
+    e.g. to register filters. requestTimeout is the time in seconds after
+    which a worker handling a request is restarted.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8081, workers=None, queueSize=QUEUE_SIZE,
+                 maxConnections=MAX_CONNECTIONS, keepAliveTimeout=KEEP_ALIVE_TIMEOUT, maxBodySize=MAX_BODY_SIZE,
+                 initializer=None, requestTimeout=REQUEST_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.workerCount = workers or os.cpu_count() or 1
+        self.queueSize = queueSize
+        self.maxConnections = maxConnections
+        self.keepAliveTimeout = keepAliveTimeout
+        self.maxBodySize = maxBodySize
+        self.initializer = initializer
+        self.requestTimeout = requestTimeout
+        self.workers = []
+        self.connections = 0
+        self.server = None
+        self.executor = None
+        self.dispatchers = []
+
+    async def start(self):
+        """Starts the workers and listens, port 0 picks a free port"""
+        context = multiprocessing.get_context('fork')
+        self.executor = ThreadPoolExecutor(self.workerCount)
+        self.workers = [Worker(context, self.initializer, self.queueSize) for i in range(self.workerCount)]
+        self.dispatchers = [asyncio.ensure_future(self._dispatch(w)) for w in self.workers]
+        self.server = await asyncio.start_server(self._handleConnection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        for worker in self.workers:
+            worker.stop()
+        self.executor.shutdown()
+
+    def serve_forever(self):
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(self.start())
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+        print('Starting server on http://{}:{} with {} workers, use <Ctrl-C> to stop'.format(
+            self.host, self.port, self.workerCount), flush=True)
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            loop.run_until_complete(self.close())
+
+    def worker(self, url):
+        """Returns the worker for a request URL"""
+        project = projectKey(url)
+        if project:
+            return self.workers[zlib.crc32(project.encode('utf-8')) % len(self.workers)]
+        return min(self.workers, key=lambda w: w.load)
+
+    async def submit(self, method, url, headers, body=None):
+        """Queues a request, returns the status, headers and body"""
+        worker = self.worker(url)
+        if worker.queue.full():
+            return 503, {'Retry-After': '1'}, b'Server busy'
+        future = asyncio.get_event_loop().create_future()
+        worker.load += 1
+        worker.queue.put_nowait(((method, url, headers, body), future))
+        return await future
+
+    async def _dispatch(self, worker):
+        loop = asyncio.get_event_loop()
+        while True:
+            message, future = await worker.queue.get()
+            call = loop.run_in_executor(self.executor, worker.call, message)
+            try:
+                result = await asyncio.wait_for(asyncio.shield(call), self.requestTimeout)
+            except asyncio.TimeoutError:
+                # stop the worker, which ends the call waiting for its response
+                worker.process.terminate()
+                try:
+                    await call
+                except (EOFError, OSError):
+                    pass
+                worker.restart()
+                result = 504, {}, b'Request timed out'
+            except (EOFError, OSError):
+                # the worker crashed, e.g. while rendering
+                worker.restart()
+                result = 502, {}, b'Worker terminated'
+            worker.load -= 1
+            if not future.done():
+                future.set_result(result)
+
+    async def _handleConnection(self, reader, writer):
+        self.connections += 1
+        try:
+            if self.connections > self.maxConnections:
+                await self._respond(writer, (503, {'Retry-After': '1'}, b'Too many connections'), False)
+                return
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.keepAliveTimeout)
+                except asyncio.TimeoutError:
+                    break
+                if not line.strip():
+                    break
+                request = line.decode('latin-1').split()
+                if len(request) != 3:
+                    await self._respond(writer, (400, {}, b'Bad request'), False)
+                    break
+                method, target, version = request
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keepAlive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+                body = None
+                if 'chunked' in headers.get('transfer-encoding', '').lower():
+                    await self._respond(writer, (411, {}, b'Length required'), False)
+                    break
+                length = int(headers.get('content-length') or 0)
+                if length > self.maxBodySize:
+                    await self._respond(writer, (413, {}, b'Request entity too large'), False)
+                    break
+                if length > 0:
+                    body = await reader.readexactly(length)
+
+                url = 'http://{}{}'.format(headers.get('host', '{}:{}'.format(self.host, self.port)), target)
+                cgiHeaders = dict(('HTTP_' + k.upper().replace('-', '_'), v) for k, v in headers.items())
+                result = await self.submit(method.upper(), url, cgiHeaders, body)
+                await self._respond(writer, result, keepAlive, method.upper() == 'HEAD')
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _respond(self, writer, result, keepAlive, head=False):
+        status, headers, body = result
+        lines = ['HTTP/1.1 {} {}'.format(status, responses.get(status, ''))]
+        for name, value in headers.items():
+            if name.lower() not in ('content-length', 'connection'):
+                lines.append('{}: {}'.format(name, value))
+        lines.append('Content-Length: {}'.format(len(body)))
+        lines.append('Connection: {}'.format('keep-alive' if keepAlive else 'close'))
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='QGIS Server HTTP front-end with a pool of worker processes')
+    parser.add_argument('--host', default=os.environ.get('QGIS_SERVER_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('QGIS_SERVER_PORT', '8081')))
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (one per CPU)')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help='maximum number of requests queued per worker')
+    parser.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS)
+    parser.add_argument('--keep-alive-timeout', type=float, default=KEEP_ALIVE_TIMEOUT)
+    parser.add_argument('--request-timeout', type=float, default=REQUEST_TIMEOUT,
+                        help='time in seconds after which a worker handling a request is restarted')
+    args = parser.parse_args()
+    PooledHttpServer(args.host, args.port, args.workers, args.queue_size, args.max_connections,
+                     args.keep_alive_timeout, requestTimeout=args.request_timeout).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
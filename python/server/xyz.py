@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    xyz.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by QGIS Development Team
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Cached XYZ tile service for QGIS Server.
+
+    ?MAP=/path/to/project.qgs&SERVICE=XYZ&X=1&Y=0&Z=1&LAYERS=world
+
+Tiles are in the Web Mercator (EPSG:3857) grid, rendered by the WMS service
+of the server by metatiles of META_SIZE x META_SIZE tiles which are sliced
+and cached in memory (MemoryTileCache) or on disk (DiskTileCache). Cached
+tiles are keyed by project, project modification time, layers, styles,
+format and the cache keys of the access control filters, so that saving a
+project invalidates its tiles.
+
+    from qgis.server.xyz import DiskTileCache, registerXyzService
+    service = registerXyzService(server.serverInterface(), DiskTileCache('/var/cache/qgis'))
+    service.seed('/path/to/project.qgs', 'world', range(0, 6))
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, QGIS Development Team'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import urllib.parse
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from qgis.PyQt.QtCore import QBuffer, QByteArray, QIODevice
+from qgis.PyQt.QtGui import QImage
+from qgis.core import QgsProject
+from qgis.server import QgsBufferServerRequest, QgsBufferServerResponse, QgsServerRequest, QgsService
+
+TILE_SIZE = 256
+META_SIZE = 4
+
+# half the width of the Web Mercator grid
+ORIGIN = 20037508.342789244
+
+FORMATS = {
+    'image/png': 'PNG',
+    'image/jpeg': 'JPG',
+}
+
+
+def tileBounds(x, y, z, count=1):
+    """Returns the Web Mercator bounds (xmin, ymin, xmax, ymax) of count x
+    count tiles, from tile x, y (top left) at zoom level z"""
+    size = 2 * ORIGIN / 2 ** z
+    return (-ORIGIN + x * size, ORIGIN - (y + count) * size,
+            -ORIGIN + (x + count) * size, ORIGIN - y * size)
+
+
+def tileRange(extent, z):
+    """Returns the ranges of tile columns and rows at zoom level z
+    intersecting a Web Mercator extent (xmin, ymin, xmax, ymax)"""
+    size = 2 * ORIGIN / 2 ** z
+    last = 2 ** z - 1
+    xmin, ymin, xmax, ymax = extent
+    columns = range(max(0, int((xmin + ORIGIN) // size)), min(last, int((xmax + ORIGIN) // size)) + 1)
+    rows = range(max(0, int((ORIGIN - ymax) // size)), min(last, int((ORIGIN - ymin) // size)) + 1)
+    return columns, rows
+
+
+class TileSet(namedtuple('TileSet', ['project', 'mtime', 'layers', 'styles', 'format', 'tileSize', 'extra'])):
+
+    """
+    Identifies the tiles rendered for the same project state and request
+    parameters. extra holds the cache keys of the access control filters and
+    the value returned by the cacheKey function of the service, if any.
+    """
+
+    @property
+    def id(self):
+        return hashlib.sha1(json.dumps(list(self)).encode('utf-8')).hexdigest()
+
+    def matches(self, project=None, layers=None):
+        if project is not None and os.path.abspath(project) != os.path.abspath(self.project):
+            return False
+        if layers is not None:
+            if isinstance(layers, str):
+                layers = layers.split(',')
+            return bool(set(layers) & set(self.layers.split(',')))
+        return True
+
+
+class MemoryTileCache(object):
+
+    """
+    Least recently used tiles kept in memory, up to maxSize bytes.
+    """
+
+    def __init__(self, maxSize=64 << 20):
+        self.maxSize = maxSize
+        self.size = 0
+        self.tiles = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, tileset, z, x, y):
+        with self.lock:
+            key = (tileset, z, x, y)
+            data = self.tiles.get(key)
+            if data is not None:
+                self.tiles.move_to_end(key)
+            return data
+
+    def set(self, tileset, z, x, y, data):
+        with self.lock:
+            key = (tileset, z, x, y)
+            previous = self.tiles.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.tiles[key] = data
+            self.size += len(data)
+            while self.size > self.maxSize and self.tiles:
+                self.size -= len(self.tiles.popitem(last=False)[1])
+
+    def invalidate(self, project=None, layers=None):
+        """Removes the tiles of a project and/or layers (all the tiles by
+        default), returns the number of removed tiles"""
+        with self.lock:
+            keys = [k for k in self.tiles if k[0].matches(project, layers)]
+            for k in keys:
+                self.size -= len(self.tiles.pop(k))
+            return len(keys)
+
+
+class DiskTileCache(object):
+
+    """
+    Tiles stored in a directory, as <tileset id>/<z>/<x>/<y> files, the
+    tileset itself being described in <tileset id>/tileset.json.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, tileset, z, x, y):
+        return os.path.join(self.directory, tileset.id, str(z), str(x), str(y))
+
+    def get(self, tileset, z, x, y):
+        try:
+            with open(self.path(tileset, z, x, y), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, tileset, z, x, y, data):
+        path = self.path(tileset, z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        description = os.path.join(self.directory, tileset.id, 'tileset.json')
+        if not os.path.exists(description):
+            with open(description, 'w') as f:
+                json.dump(tileset._asdict(), f)
+        # several processes may write the same tile
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def tilesets(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            try:
+                with open(os.path.join(self.directory, name, 'tileset.json')) as f:
+                    yield name, TileSet(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                continue
+
+    def invalidate(self, project=None, layers=None):
+        """Removes the tiles of a project and/or layers (all the tiles by
+        default), returns the number of removed tiles"""
+        count = 0
+        for name, tileset in list(self.tilesets()):
+            if tileset.matches(project, layers):
+                directory = os.path.join(self.directory, name)
+                count += sum(len(files) for root, dirs, files in os.walk(directory)) - 1
+                shutil.rmtree(directory, ignore_errors=True)
+        return count
+
+
+class MetatileRenderer(object):
+
+    """
+    Renders tiles with the WMS service of a server, by metatiles of
+    metaSize x metaSize tiles rendered at once and then sliced, which saves
+    the fixed costs of each render and labels cut at the tile borders.
+    """
+
+    def __init__(self, serverIface, metaSize=META_SIZE):
+        self.serverIface = serverIface
+        self.metaSize = metaSize
+
+    def metatile(self, z, x, y):
+        """Returns the column, row and size of the metatile of a tile"""
+        count = min(self.metaSize, 2 ** z)
+        return x - x % count, y - y % count, count
+
+    def render(self, tileset, project, z, x, y, headers=None):
+        """Renders the metatile of a tile, returns the tiles as a dict of
+        encoded images keyed by (x, y)"""
+        mx, my, count = self.metatile(z, x, y)
+        size = count * tileset.tileSize
+        url = 'http://localhost/?' + urllib.parse.urlencode({
+            'MAP': tileset.project,
+            'SERVICE': 'WMS',
+            'VERSION': '1.3.0',
+            'REQUEST': 'GetMap',
+            'LAYERS': tileset.layers,
+            'STYLES': tileset.styles,
+            'FORMAT': 'image/png',
+            # JPEG has no alpha channel, transparent pixels would turn black
+            'TRANSPARENT': 'FALSE' if tileset.format == 'image/jpeg' else 'TRUE',
+            'CRS': 'EPSG:3857',
+            'BBOX': ','.join(repr(c) for c in tileBounds(mx, my, z, count)),
+            'WIDTH': size,
+            'HEIGHT': size,
+        })
+        request = QgsBufferServerRequest(url, QgsServerRequest.GetMethod, headers or {})
+        response = QgsBufferServerResponse()
+        self.serverIface.serviceRegistry().getService('WMS').executeRequest(request, response, project)
+
+        body = bytes(response.body())
+        image = QImage.fromData(body)
+        if image.isNull():
+            raise TileRenderError(body.decode('utf-8', 'replace'))
+
+        tiles = {}
+        for i in range(count):
+            for j in range(count):
+                tile = image.copy(i * tileset.tileSize, j * tileset.tileSize, tileset.tileSize, tileset.tileSize)
+                data = QByteArray()
+                buffer = QBuffer(data)
+                buffer.open(QIODevice.WriteOnly)
+                tile.save(buffer, FORMATS[tileset.format])
+                buffer.close()
+                tiles[(mx + i, my + j)] = bytes(data)
+        return tiles
+
+
+class TileRenderError(Exception):
+    pass
+
+
+class XyzService(QgsService):
+
+    """
+    XYZ service (SERVICE=XYZ) serving tiles from a cache, rendering the
+    missing tiles by metatiles.
+
+    Tiles are cached per project, layers, styles and format, by the cache
+    keys of the access control filters and by the value returned by
+    cacheKey(request) if given. When access control filters are registered,
+    tiles are only cached if all of them provide a cache key (see
+    QgsAccessControlFilter.cacheKey()).
+    """
+
+    def __init__(self, serverIface, cache=None, metaSize=META_SIZE, cacheKey=None):
+        QgsService.__init__(self)
+        self.serverIface = serverIface
+        self.cache = cache if cache is not None else MemoryTileCache()
+        self.renderer = MetatileRenderer(serverIface, metaSize)
+        self.cacheKey = cacheKey
+        # locks of the metatiles being rendered, with their number of users
+        self.lock = threading.Lock()
+        self.renderLocks = {}
+
+    def name(self):
+        return 'XYZ'
+
+    def version(self):
+        return '1.0.0'
+
+    def allowMethod(self, method):
+        return method in (QgsServerRequest.GetMethod, QgsServerRequest.HeadMethod)
+
+    def tileset(self, project, layers, styles='', format='image/png', request=None):
+        fileName = project.fileName()
+        try:
+            mtime = os.path.getmtime(fileName)
+        except OSError:
+            mtime = 0
+        extra = []
+        accessControls = self.serverIface.accessControls()
+        if accessControls is not None:
+            cacheable, keys = accessControls.fillCacheKey([])
+            if not cacheable:
+                # the access control filters cannot tell what the tiles depend on
+                return None
+            extra.extend(keys)
+        if self.cacheKey is not None:
+            extra.append(self.cacheKey(request))
+        return TileSet(fileName, mtime, layers, styles, format, TILE_SIZE, tuple(extra) or None)
+
+    @contextmanager
+    def renderLock(self, tileset, z, x, y):
+        """Holds the lock of the metatile of a tile, so that concurrent
+        requests for its tiles render it once while other metatiles are
+        rendered in parallel"""
+        key = (tileset, z) + self.renderer.metatile(z, x, y)[:2]
+        with self.lock:
+            entry = self.renderLocks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.renderLocks[key]
+
+    def tile(self, project, layers, z, x, y, styles='', format='image/png', request=None):
+        """Returns a tile from the cache, rendering its metatile if needed,
+        and whether it was cached"""
+        tileset = self.tileset(project, layers, styles, format, request)
+        headers = request.headers() if request is not None else None
+        if tileset is None:
+            tileset = TileSet(project.fileName(), 0, layers, styles, format, TILE_SIZE, None)
+            return self.renderer.render(tileset, project, z, x, y, headers)[(x, y)], False
+
+        data = self.cache.get(tileset, z, x, y)
+        if data is not None:
+            return data, True
+        with self.renderLock(tileset, z, x, y):
+            data = self.cache.get(tileset, z, x, y)
+            if data is not None:
+                return data, True
+            tiles = self.renderer.render(tileset, project, z, x, y, headers)
+            for (tx, ty), tileData in tiles.items():
+                self.cache.set(tileset, z, tx, ty, tileData)
+        return tiles[(x, y)], False
+
+    def executeRequest(self, request, response, project):
+        parameters = request.parameters()
+        try:
+            x, y, z = int(parameters['X']), int(parameters['Y']), int(parameters['Z'])
+            layers = parameters['LAYERS']
+        except (KeyError, ValueError):
+            response.sendError(400, 'X, Y, Z and LAYERS parameters are required')
+            return
+        format = parameters.get('FORMAT', 'image/png')
+        if format not in FORMATS:
+            response.sendError(400, 'Unsupported format {}'.format(format))
+            return
+        if project is None:
+            response.sendError(400, 'No project')
+            return
+        if not 0 <= z <= 30 or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+            response.sendError(404, 'No such tile')
+            return
+
+        try:
+            data, cached = self.tile(project, layers, z, x, y, parameters.get('STYLES', ''), format, request)
+        except TileRenderError as e:
+            response.sendError(500, str(e))
+            return
+        response.setHeader('Content-Type', format)
+        response.setHeader('X-Tile-Cache', 'HIT' if cached else 'MISS')
+        response.write(QByteArray(data))
+
+    def seed(self, projectPath, layers, zooms, extent=None, styles='', format='image/png', feedback=None,
+             request=None):
+        """
+        Renders the missing tiles of zoom levels in a Web Mercator extent
+        (the whole grid by default). Returns the number of rendered tiles.
+        feedback, if given, is called with the zoom level and the numbers
+        of processed and total metatiles and may return True to cancel.
+        request is the request the tiles are seeded for, it is required by
+        a cacheKey function and its headers are passed to the WMS service.
+        """
+        if self.cacheKey is not None and request is None:
+            raise ValueError('A request is required to seed the tiles of a service with a cacheKey function')
+        project = QgsProject()
+        project.read(projectPath)
+        tileset = self.tileset(project, layers, styles, format, request)
+        if tileset is None:
+            return 0
+        headers = request.headers() if request is not None else None
+        extent = extent or (-ORIGIN, -ORIGIN, ORIGIN, ORIGIN)
+
+        rendered = 0
+        for z in zooms:
+            columns, rows = tileRange(extent, z)
+            metatiles = sorted(set(self.renderer.metatile(z, x, y)[:2] for x in columns for y in rows))
+            for i, (mx, my) in enumerate(metatiles):
+                if feedback is not None and feedback(z, i, len(metatiles)):
+                    return rendered
+                with self.renderLock(tileset, z, mx, my):
+                    if self.cache.get(tileset, z, mx, my) is not None:
+                        continue
+                    tiles = self.renderer.render(tileset, project, z, mx, my, headers)
+                    for (tx, ty), data in tiles.items():
+                        self.cache.set(tileset, z, tx, ty, data)
+                rendered += len(tiles)
+        return rendered
+
+    def invalidate(self, project=None, layers=None):
+        """Removes cached tiles of a project and/or layers, all of them by
+        default. Returns the number of removed tiles"""
+        return self.cache.invalidate(project, layers)
+
+
+def registerXyzService(serverIface, cache=None, metaSize=META_SIZE, cacheKey=None):
+    """Registers the XYZ service on a server, returns it"""
+    service = XyzService(serverIface, cache, metaSize, cacheKey)
+    serverIface.serviceRegistry().registerService(service)
+    return service
@@ -30,20 +30,21 @@ QGIS utilities module
 
 from qgis.PyQt.QtCore import QCoreApplication, QLocale, QThread
 from qgis.PyQt.QtWidgets import QPushButton, QApplication
-from qgis.core import Qgis, QgsExpression, QgsMessageLog, qgsfunction, QgsMessageOutput, QgsWkbTypes
+from qgis.core import Qgis, QgsApplication, QgsExpression, QgsMessageLog, qgsfunction, QgsMessageOutput, QgsWkbTypes
 from qgis.gui import QgsMessageBar
 
 import os
 import sys
 import traceback
-import glob
+import hashlib
+import importlib.abc
+import json
 import os.path
 try:
     import configparser
 except ImportError:
     import ConfigParser as configparser
 import warnings
-import codecs
 import time
 import functools
 
@@ -243,27 +244,168 @@ available_plugins = []
 plugins_metadata_parser = {}
 
 
-def findPlugins(path):
-    """ for internal use: return list of plugins in given path """
-    for plugin in glob.glob(path + "/*"):
-        if not os.path.isdir(plugin):
-            continue
-        if not os.path.exists(os.path.join(plugin, '__init__.py')):
-            continue
+class _RestoredValuesInterpolation(configparser.BasicInterpolation):
 
-        metadataFile = os.path.join(plugin, 'metadata.txt')
-        if not os.path.exists(metadataFile):
-            continue
+    """ interpolation of metadata restored from the index: the raw values
+    are set as read from the file, then interpolated when fetched """
+
+    def before_set(self, parser, section, option, value):
+        return value
+
+
+class PluginMetadataIndex(object):
 
-        cp = configparser.ConfigParser()
+    """ parsed metadata.txt of the plugins found in the plugin paths, persisted
+    between sessions so that plugins are not discovered and parsed again at
+    each startup.
 
+    The content of a plugin path is only listed again when its modification
+    time changed, and a metadata file is only parsed again when its content
+    changed: when the size or modification time of the file changed, its hash
+    is compared to the one of the parsed content. """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = path
+        self._loaded = False
+        self._dirty = False
+        # plugin path -> modification time and sub-directories
+        self._paths = {}
+        # plugin directory -> state of the directory and parsed metadata
+        self._plugins = {}
+        # plugin directory -> config parser
+        self._parsers = {}
+
+    def plugins(self, path):
+        """ return the (plugin name, config parser) of the plugins in path,
+        the parser being None when the metadata could not be parsed """
+        self._load()
+        key = self._key(path)
         try:
-            with codecs.open(metadataFile, "r", "utf8") as f:
-                cp.read_file(f)
-        except:
-            cp = None
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return []
+
+        entry = self._paths.get(key)
+        if entry is None or entry['mtime'] != mtime:
+            try:
+                dirs = sorted(e.name for e in os.scandir(path) if e.is_dir())
+            except OSError:
+                return []
+            entry = {'mtime': mtime, 'dirs': dirs}
+            self._paths[key] = entry
+            self._dirty = True
+
+        plugins = []
+        for pluginName in entry['dirs']:
+            pluginDir = os.path.join(path, pluginName)
+            plugin = self._plugin(pluginDir)
+            if plugin is not None and plugin['package']:
+                plugins.append((pluginName, self.parser(pluginDir)))
+        return plugins
+
+    def parser(self, pluginDir):
+        """ return the config parser of the metadata.txt of a plugin
+        directory, None if missing or invalid """
+        plugin = self._plugin(pluginDir)
+        if plugin is None or plugin['metadata'] is None:
+            return None
+        key = self._key(pluginDir)
+        if key not in self._parsers:
+            cp = configparser.ConfigParser(interpolation=_RestoredValuesInterpolation())
+            cp.read_dict(plugin['metadata'])
+            self._parsers[key] = cp
+        return self._parsers[key]
+
+    def parseError(self, pluginDir):
+        """ return the error raised when parsing the metadata.txt of a plugin
+        directory, an empty string if none """
+        plugin = self._plugin(pluginDir)
+        return plugin['error'] if plugin is not None else ""
+
+    def save(self):
+        """ store the index, if changed """
+        if not self._dirty or not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'paths': self._paths, 'plugins': self._plugins}, f)
+            os.replace(self.path + '.tmp', self.path)
+            self._dirty = False
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _key(self, path):
+        return os.path.normcase(os.path.abspath(path))
 
-        pluginName = os.path.basename(plugin)
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None:
+            self.path = os.path.join(QgsApplication.qgisSettingsDirPath(), 'python', 'plugins_metadata.json')
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == self.VERSION:
+                self._paths = index['paths']
+                self._plugins = index['plugins']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _plugin(self, pluginDir):
+        """ return the up to date index entry of a plugin directory, None if
+        it has no metadata.txt """
+        self._load()
+        key = self._key(pluginDir)
+        metadataFile = os.path.join(pluginDir, 'metadata.txt')
+        try:
+            dirMtime = os.stat(pluginDir).st_mtime
+            st = os.stat(metadataFile)
+        except OSError:
+            if self._plugins.pop(key, None) is not None:
+                self._parsers.pop(key, None)
+                self._dirty = True
+            return None
+
+        plugin = self._plugins.get(key)
+        if plugin is not None and plugin['mtime'] == dirMtime and plugin['stat'] == [st.st_mtime, st.st_size]:
+            return plugin
+
+        try:
+            with open(metadataFile, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        digest = hashlib.sha1(data).hexdigest()
+        if plugin is None or plugin['hash'] != digest:
+            plugin = {'hash': digest, 'metadata': None, 'error': ""}
+            cp = configparser.ConfigParser()
+            try:
+                cp.read_string(data.decode('utf8'), metadataFile)
+                plugin['metadata'] = {section: dict(cp.items(section, raw=True))
+                                      for section in [cp.default_section] + cp.sections()}
+            except Exception as e:
+                plugin['error'] = str(e.args[0]) if e.args else str(e)
+            self._parsers.pop(key, None)
+
+        plugin['mtime'] = dirMtime
+        plugin['stat'] = [st.st_mtime, st.st_size]
+        plugin['package'] = os.path.exists(os.path.join(pluginDir, '__init__.py'))
+        self._plugins[key] = plugin
+        self._dirty = True
+        return plugin
+
+
+# shared by updateAvailablePlugins and the plugin installer
+plugin_metadata_index = PluginMetadataIndex()
+
+
+def findPlugins(path):
+    """ for internal use: return list of plugins in given path """
+    for pluginName, cp in plugin_metadata_index.plugins(path):
         yield (pluginName, cp)
 
 
@@ -279,6 +421,7 @@ def updateAvailablePlugins():
             if pluginName not in plugins:
                 plugins.append(pluginName)
                 metadata_parser[pluginName] = parser
+    plugin_metadata_index.save()
 
     global available_plugins
     available_plugins = plugins
@@ -645,44 +788,22 @@ class OverrideCursor():
 # IMPORT wrapper
 
 
-_uses_builtins = True
-try:
-    import builtins
-    _builtin_import = builtins.__import__
-except AttributeError:
-    _uses_builtins = False
-    import __builtin__
-    _builtin_import = __builtin__.__import__
-
 _plugin_modules = {}
 
 
-def _import(name, globals={}, locals={}, fromlist=[], level=None):
-    """ wrapper around builtin import that keeps track of loaded plugin modules """
-    if level is None:
-        level = 0
-    mod = _builtin_import(name, globals, locals, fromlist, level)
+class _PluginModuleFinder(importlib.abc.MetaPathFinder):
 
-    if mod and '__file__' in mod.__dict__:
-        module_name = mod.__name__ if fromlist else name
-        package_name = module_name.split('.')[0]
+    """ keeps track of the loaded plugin modules, so that plugins can be
+    unloaded. The finder does not find anything itself: it is only asked for
+    modules which are not imported yet, instead of wrapping every import """
+
+    def find_spec(self, fullname, path, target=None):
+        package_name = fullname.partition('.')[0]
         # check whether the module belongs to one of our plugins
         if package_name in available_plugins:
-            if package_name not in _plugin_modules:
-                _plugin_modules[package_name] = set()
-            _plugin_modules[package_name].add(module_name)
-            # check the fromlist for additional modules (from X import Y,Z)
-            if fromlist:
-                for fromitem in fromlist:
-                    frmod = module_name + "." + fromitem
-                    if frmod in sys.modules:
-                        _plugin_modules[package_name].add(frmod)
-
-    return mod
+            _plugin_modules.setdefault(package_name, set()).add(fullname)
+        return None
 
 
 if not os.environ.get('QGIS_NO_OVERRIDE_IMPORT'):
-    if _uses_builtins:
-        builtins.__import__ = _import
-    else:
-        __builtin__.__import__ = _import
+    sys.meta_path.insert(0, _PluginModuleFinder())
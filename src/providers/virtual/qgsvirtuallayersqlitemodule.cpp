@@ -36,6 +36,7 @@ email                : hugo dot mercier at oslandia dot com
 #include "qgsvirtuallayerblob.h"
 #include "qgsslottofunction.h"
 #include "qgsfeatureiterator.h"
+#include "qgsspatialindex.h"
 
 /**
  * Create metadata tables if needed
@@ -259,11 +260,21 @@ struct VTableCursor
   QgsFeatureIterator mIterator;
   bool mEof;
 
+  // number of rtree filters run by this cursor
+  int mRtreeFilterCount = 0;
+  // temporary spatial index, built when the cursor is used as the inner side of a spatial join
+  std::unique_ptr<QgsSpatialIndex> mSpatialIndex;
+
   explicit VTableCursor( VTable *vtab )
     : mVtab( vtab )
     , mEof( true )
   {}
 
+  QgsFeatureIterator features( const QgsFeatureRequest &request )
+  {
+    return mVtab->layer() ? mVtab->layer()->getFeatures( request ) : mVtab->provider()->getFeatures( request );
+  }
+
   void filter( const QgsFeatureRequest &request )
   {
     if ( !mVtab->valid() )
@@ -272,12 +283,42 @@ struct VTableCursor
       return;
     }
 
-    mIterator = mVtab->layer() ? mVtab->layer()->getFeatures( request ) : mVtab->provider()->getFeatures( request );
+    mIterator = features( request );
     // get on the first record
     mEof = false;
     next();
   }
 
+  void filterNone()
+  {
+    mIterator = QgsFeatureIterator();
+    mEof = true;
+  }
+
+  /**
+   * Sets up \a request for returning the features whose bounding box intersects \a rect.
+   * The first lookup is left to the provider. The cursor being filtered again
+   * means it is scanned once per row of an outer table (a spatial join), so the
+   * feature bounding boxes are then loaded once in an in-memory R-tree, which
+   * avoids a full scan per row for providers without a spatial index.
+   */
+  void setRtreeFilter( QgsFeatureRequest &request, const QgsRectangle &rect )
+  {
+    if ( ++mRtreeFilterCount < 2 || !mVtab->valid() )
+    {
+      request.setFilterRect( rect );
+      return;
+    }
+
+    if ( !mSpatialIndex )
+    {
+      QgsFeatureRequest indexRequest;
+      indexRequest.setSubsetOfAttributes( QgsAttributeList() );
+      mSpatialIndex.reset( new QgsSpatialIndex( features( indexRequest ) ) );
+    }
+    request.setFilterFids( mSpatialIndex->intersects( rect ).toSet() );
+  }
+
   void next()
   {
     if ( !mEof )
@@ -470,6 +511,14 @@ int vtableRename( sqlite3_vtab *vtab, const char *newName )
   return SQLITE_OK;
 }
 
+// idxNum flags of the filters pushed down to the provider
+#define VTABLE_PK_FILTER 1
+#define VTABLE_RTREE_FILTER 2
+#define VTABLE_EXPRESSION_FILTER 4
+
+// separator of the comparisons encoded in idxStr
+#define VTABLE_EXPRESSION_SEPARATOR '\x1f'
+
 int vtableBestIndex( sqlite3_vtab *pvtab, sqlite3_index_info *indexInfo )
 {
   VTable *vtab = reinterpret_cast< VTable * >( pvtab );
@@ -482,36 +531,54 @@ int vtableBestIndex( sqlite3_vtab *pvtab, sqlite3_index_info *indexInfo )
     {
       indexInfo->aConstraintUsage[i].argvIndex = 1;
       indexInfo->aConstraintUsage[i].omit = 1;
-      indexInfo->idxNum = 1; // PK filter
+      // a _search_frame_ constraint must never be checked by SQLite, since the column is always null.
+      // It is only a bounding box filter, which is not needed for a single feature
+      for ( int j = 0; j < indexInfo->nConstraint; j++ )
+      {
+        if ( ( indexInfo->aConstraint[j].usable ) &&
+             ( 0 == indexInfo->aConstraint[j].iColumn ) &&
+             ( indexInfo->aConstraint[j].op == SQLITE_INDEX_CONSTRAINT_EQ ) )
+        {
+          indexInfo->aConstraintUsage[j].argvIndex = 2;
+          indexInfo->aConstraintUsage[j].omit = 1;
+          break;
+        }
+      }
+      indexInfo->idxNum = VTABLE_PK_FILTER;
       indexInfo->estimatedCost = 1.0;
       indexInfo->idxStr = nullptr;
       indexInfo->needToFreeIdxStr = 0;
       return SQLITE_OK;
     }
+  }
 
-    // request for filter with a comparison operator
-    if ( ( indexInfo->aConstraint[i].usable ) &&
-         ( indexInfo->aConstraint[i].iColumn > 0 ) &&
-         ( indexInfo->aConstraint[i].iColumn <= vtab->fields().count() ) &&
-         ( ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_EQ ) || // if no PK
-           ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_GT ) ||
-           ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_LE ) ||
-           ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_LT ) ||
-           ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_GE )
-#ifdef SQLITE_INDEX_CONSTRAINT_LIKE
-           || ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_LIKE )
-#endif
-         ) )
+  // the rtree filter and every comparison are pushed down together to the provider,
+  // so that both its spatial index and its expression compiler are used
+  int rtreeConstraint = -1;
+  QList<int> comparisonConstraints;
+  QStringList comparisons;
+  for ( int i = 0; i < indexInfo->nConstraint; i++ )
+  {
+    if ( !indexInfo->aConstraint[i].usable )
+      continue;
+
+    // request for rtree filtering
+    if ( ( 0 == indexInfo->aConstraint[i].iColumn ) &&
+         ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_EQ ) )
     {
-      indexInfo->aConstraintUsage[i].argvIndex = 1;
-      indexInfo->aConstraintUsage[i].omit = 1;
-      indexInfo->idxNum = 3; // expression filter
-      indexInfo->estimatedCost = 2.0; // probably better than no index
+      if ( rtreeConstraint == -1 )
+        rtreeConstraint = i;
+      continue;
+    }
 
+    // request for filter with a comparison operator
+    if ( ( indexInfo->aConstraint[i].iColumn > 0 ) &&
+         ( indexInfo->aConstraint[i].iColumn <= vtab->fields().count() ) )
+    {
       QString expr = QgsExpression::quotedColumnRef( vtab->fields().at( indexInfo->aConstraint[i].iColumn - 1 ).name() );
       switch ( indexInfo->aConstraint[i].op )
       {
-        case SQLITE_INDEX_CONSTRAINT_EQ:
+        case SQLITE_INDEX_CONSTRAINT_EQ: // if no PK
           expr += QLatin1String( " = " );
           break;
         case SQLITE_INDEX_CONSTRAINT_GT:
@@ -532,37 +599,48 @@ int vtableBestIndex( sqlite3_vtab *pvtab, sqlite3_index_info *indexInfo )
           break;
 #endif
         default:
-          break;
+          continue;
       }
+      comparisonConstraints << i;
+      comparisons << expr;
+    }
+  }
 
-      QByteArray ba = expr.toUtf8();
-      char *cp = ( char * )sqlite3_malloc( ba.size() + 1 );
-      memcpy( cp, ba.constData(), ba.size() + 1 );
+  indexInfo->idxNum = 0;
+  indexInfo->estimatedCost = 10.0;
+  indexInfo->idxStr = nullptr;
+  indexInfo->needToFreeIdxStr = 0;
 
-      indexInfo->idxStr = cp;
-      indexInfo->needToFreeIdxStr = 1;
-      return SQLITE_OK;
-    }
+  int argvIndex = 1;
+  if ( rtreeConstraint != -1 )
+  {
+    indexInfo->aConstraintUsage[rtreeConstraint].argvIndex = argvIndex++;
+    // do not test for equality, since it is used for filtering, not to return an actual value
+    indexInfo->aConstraintUsage[rtreeConstraint].omit = 1;
+    indexInfo->idxNum |= VTABLE_RTREE_FILTER;
+    indexInfo->estimatedCost = 1.0;
+  }
 
-    // request for rtree filtering
-    if ( ( indexInfo->aConstraint[i].usable ) &&
-         ( 0 == indexInfo->aConstraint[i].iColumn ) &&
-         ( indexInfo->aConstraint[i].op == SQLITE_INDEX_CONSTRAINT_EQ ) )
+  if ( !comparisons.isEmpty() )
+  {
+    Q_FOREACH ( int i, comparisonConstraints )
     {
-      indexInfo->aConstraintUsage[i].argvIndex = 1;
-      // do not test for equality, since it is used for filtering, not to return an actual value
+      indexInfo->aConstraintUsage[i].argvIndex = argvIndex++;
       indexInfo->aConstraintUsage[i].omit = 1;
-      indexInfo->idxNum = 2; // RTree filter
-      indexInfo->estimatedCost = 1.0;
-      indexInfo->idxStr = nullptr;
-      indexInfo->needToFreeIdxStr = 0;
-      return SQLITE_OK;
     }
+    indexInfo->idxNum |= VTABLE_EXPRESSION_FILTER;
+    // probably better than no index, and better with each pushed comparison.
+    // A plan with the rtree filter must stay cheaper than the same plan without it,
+    // otherwise SQLite may leave the _search_frame_ constraint to be checked against a null column
+    indexInfo->estimatedCost /= 1 + comparisons.size();
+
+    QByteArray ba = comparisons.join( QChar( VTABLE_EXPRESSION_SEPARATOR ) ).toUtf8();
+    char *cp = ( char * )sqlite3_malloc( ba.size() + 1 );
+    memcpy( cp, ba.constData(), ba.size() + 1 );
+
+    indexInfo->idxStr = cp;
+    indexInfo->needToFreeIdxStr = 1;
   }
-  indexInfo->idxNum = 0;
-  indexInfo->estimatedCost = 10.0;
-  indexInfo->idxStr = nullptr;
-  indexInfo->needToFreeIdxStr = 0;
   return SQLITE_OK;
 }
 
@@ -584,52 +662,77 @@ int vtableClose( sqlite3_vtab_cursor *cursor )
 
 int vtableFilter( sqlite3_vtab_cursor *cursor, int idxNum, const char *idxStr, int argc, sqlite3_value **argv )
 {
-  Q_UNUSED( argc );
+  VTableCursor *c = reinterpret_cast<VTableCursor *>( cursor );
 
   QgsFeatureRequest request;
-  if ( idxNum == 1 )
+  int arg = 0;
+  if ( idxNum & VTABLE_PK_FILTER )
   {
     // id filter
     request.setFilterFid( sqlite3_value_int( argv[0] ) );
   }
-  else if ( idxNum == 2 )
+
+  QgsRectangle rect;
+  if ( idxNum & VTABLE_RTREE_FILTER )
   {
     // rtree filter
-    const char *blob = reinterpret_cast< const char * >( sqlite3_value_blob( argv[0] ) );
-    int bytes = sqlite3_value_bytes( argv[0] );
-    QgsRectangle r( spatialiteBlobBbox( blob, bytes ) );
-    request.setFilterRect( r );
+    if ( sqlite3_value_type( argv[arg] ) != SQLITE_BLOB )
+    {
+      // a null geometry does not intersect anything
+      c->filterNone();
+      return SQLITE_OK;
+    }
+    const char *blob = reinterpret_cast< const char * >( sqlite3_value_blob( argv[arg] ) );
+    int bytes = sqlite3_value_bytes( argv[arg] );
+    rect = spatialiteBlobBbox( blob, bytes );
+    arg++;
   }
-  else if ( idxNum == 3 )
+
+  if ( idxNum & VTABLE_EXPRESSION_FILTER )
   {
-    // comparison operator filter
+    // comparison operator filters
     // build an expression filter and rely on expression compiler if available
-    QString expr = idxStr;
-    switch ( sqlite3_value_type( argv[0] ) )
+    QStringList exprs;
+    const QStringList comparisons = QString::fromUtf8( idxStr ).split( QChar( VTABLE_EXPRESSION_SEPARATOR ) );
+    for ( int i = 0; i < comparisons.size() && arg < argc; i++, arg++ )
     {
-      case SQLITE_INTEGER:
-        expr += QString::number( sqlite3_value_int64( argv[0] ) );
-        break;
-      case SQLITE_FLOAT:
-        expr += QString::number( sqlite3_value_double( argv[0] ) );
-        break;
-      case SQLITE_TEXT:
+      QString expr = comparisons.at( i );
+      switch ( sqlite3_value_type( argv[arg] ) )
       {
-        int n = sqlite3_value_bytes( argv[0] );
-        const char *t = reinterpret_cast<const char *>( sqlite3_value_text( argv[0] ) );
-        QString str = QString::fromUtf8( t, n );
-        expr += QgsExpression::quotedString( str );
-        break;
+        case SQLITE_INTEGER:
+          expr += QString::number( sqlite3_value_int64( argv[arg] ) );
+          break;
+        case SQLITE_FLOAT:
+          expr += QString::number( sqlite3_value_double( argv[arg] ) );
+          break;
+        case SQLITE_TEXT:
+        {
+          int n = sqlite3_value_bytes( argv[arg] );
+          const char *t = reinterpret_cast<const char *>( sqlite3_value_text( argv[arg] ) );
+          QString str = QString::fromUtf8( t, n );
+          expr += QgsExpression::quotedString( str );
+          break;
+        }
+        case SQLITE_NULL:
+          // a comparison to null is never true
+          c->filterNone();
+          return SQLITE_OK;
+        case SQLITE_BLOB: // comparison to blob ignored
+        default:
+          expr += QLatin1String( " is null" );
+          break;
       }
-      case SQLITE_NULL:
-      case SQLITE_BLOB: // comparison to blob ignored
-      default:
-        expr += QLatin1String( " is null" );
-        break;
+      exprs << expr;
     }
-    request.setFilterExpression( expr );
+    request.setFilterExpression( exprs.size() == 1 ? exprs.at( 0 ) : QStringLiteral( "(" ) + exprs.join( QStringLiteral( ") AND (" ) ) + QStringLiteral( ")" ) );
+    if ( idxNum & VTABLE_RTREE_FILTER )
+      request.setFilterRect( rect );
   }
-  VTableCursor *c = reinterpret_cast<VTableCursor *>( cursor );
+  else if ( idxNum & VTABLE_RTREE_FILTER )
+  {
+    c->setRtreeFilter( request, rect );
+  }
+
   c->filter( request );
   return SQLITE_OK;
 }
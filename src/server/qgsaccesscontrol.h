@@ -139,7 +139,7 @@ class SERVER_EXPORT QgsAccessControl : public QgsFeatureFilterProvider
      * \param cacheKey the list to fill with a cache variant
      * \returns false if we can't create a cache
      */
-    bool fillCacheKey( QStringList &cacheKey ) const;
+    bool fillCacheKey( QStringList &cacheKey SIP_INOUT ) const;
 
     /**
      * Register an access control filter
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+QGIS Server load test
+
+Drives a QGIS Server HTTP front-end with concurrent WMS GetMap requests on
+random extents and reports the throughput and latencies. Unless --url is
+given, the pooled server of qgis.server.wsgi is started for the duration of
+the test.
+
+ Sample run:
+
+python3 tests/src/python/qgis_server_load_test.py --workers 4 --concurrency 16 --requests 2000
+
+ Against another server (e.g. qgis_wrapped_server.py with MULTITHREADING=1):
+
+python3 tests/src/python/qgis_server_load_test.py --url http://127.0.0.1:8081/
+
+Several --project options spread the requests over several projects, to
+check the routing of the requests by project.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+__revision__ = '$Format:%H$'
+
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PROJECT = os.path.join(os.path.dirname(__file__), '..', '..', 'testdata', 'qgis_server_accesscontrol',
+                               'project.qgs')
+DEFAULT_LAYERS = 'Country'
+DEFAULT_CRS = 'EPSG:3857'
+DEFAULT_EXTENT = (-16817707, -4710778, 5696513, 14587125)
+
+
+def getMapQuery(project, layers, crs, extent, size, rng):
+    """Returns the query string of a GetMap request on a random part of extent"""
+    xmin, ymin, xmax, ymax = extent
+    scale = rng.uniform(0.05, 1)
+    width, height = (xmax - xmin) * scale, (ymax - ymin) * scale
+    x = rng.uniform(xmin, xmax - width)
+    y = rng.uniform(ymin, ymax - height)
+    return urllib.parse.urlencode({
+        'MAP': project,
+        'SERVICE': 'WMS',
+        'VERSION': '1.3.0',
+        'REQUEST': 'GetMap',
+        'LAYERS': layers,
+        'STYLES': '',
+        'FORMAT': 'image/png',
+        'CRS': crs,
+        'BBOX': '{},{},{},{}'.format(x, y, x + width, y + height),
+        'WIDTH': size,
+        'HEIGHT': size,
+    })
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def freePort():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def waitForPort(host, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), 1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('Server did not start on {}:{}'.format(host, port))
+
+
+def run(url, queries, concurrency, timeout=60):
+    """Sends the queries with concurrency connections (kept alive), returns
+    the report as a dict"""
+    parts = urllib.parse.urlsplit(url)
+    local = threading.local()
+    statuses = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def send(query):
+        if getattr(local, 'connection', None) is None:
+            local.connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+        started = time.perf_counter()
+        try:
+            local.connection.request('GET', (parts.path or '/') + '?' + query)
+            response = local.connection.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close':
+                local.connection.close()
+                local.connection = None
+        except (OSError, http.client.HTTPException):
+            status = 'error'
+            local.connection.close()
+            local.connection = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(send, queries))
+    wall = time.perf_counter() - started
+
+    return {
+        'requests': len(queries),
+        'concurrency': concurrency,
+        'wall': wall,
+        'requests_per_second': len(queries) / wall if wall > 0 else None,
+        'statuses': dict((str(k), v) for k, v in statuses.items()),
+        'latency': dict(('p{}'.format(p), percentile(latencies, p)) for p in (50, 90, 99, 100)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test of QGIS Server with concurrent WMS GetMap requests')
+    parser.add_argument('--url', help='URL of a running server, by default a pooled server is started')
+    parser.add_argument('--workers', type=int, default=None, help='workers of the started server')
+    parser.add_argument('--queue-size', type=int, default=None, help='queue size of the started server')
+    parser.add_argument('--project', action='append', help='project file (repeat for several projects)')
+    parser.add_argument('--layers', default=DEFAULT_LAYERS)
+    parser.add_argument('--crs', default=DEFAULT_CRS)
+    parser.add_argument('--extent', type=float, nargs=4, default=DEFAULT_EXTENT,
+                        metavar=('XMIN', 'YMIN', 'XMAX', 'YMAX'))
+    parser.add_argument('--size', type=int, default=256, help='width and height of the images')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    args = parser.parse_args()
+
+    projects = [os.path.abspath(p) for p in args.project or [DEFAULT_PROJECT]]
+    rng = random.Random(args.seed)
+    queries = [getMapQuery(projects[i % len(projects)], args.layers, args.crs, args.extent, args.size, rng)
+               for i in range(args.requests)]
+
+    process = None
+    url = args.url
+    if url is None:
+        port = freePort()
+        command = [sys.executable, '-m', 'qgis.server.wsgi', '--port', str(port)]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        if args.queue_size:
+            command += ['--queue-size', str(args.queue_size)]
+        process = subprocess.Popen(command)
+        waitForPort('127.0.0.1', port)
+        url = 'http://127.0.0.1:{}/'.format(port)
+
+    try:
+        # warm up the project caches
+        run(url, queries[:args.concurrency], args.concurrency)
+        report = run(url, queries, args.concurrency)
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGINT)
+            process.wait()
+
+    report['url'] = url
+    report['projects'] = projects
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
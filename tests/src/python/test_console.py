@@ -16,7 +16,7 @@ import qgis  # NOQA
 import os
 
 from qgis.testing import unittest, start_app
-from console import console
+from console import console, console_output
 from qgis.core import QgsSettings
 from qgis.PyQt.QtCore import QCoreApplication
 
@@ -37,6 +37,26 @@ class TestConsole(unittest.TestCase):
         my_console = console.show_console()
         my_console_widget = my_console.console
 
+    def test_buffered_output(self):
+        output = console.show_console().console.shellOut
+        output.flushOutput()
+        output.maxLines = 100
+        lines = output.lines()
+
+        for i in range(1000):
+            output.bufferOutput('line {}\n'.format(i))
+        # nothing is written until the output is flushed
+        self.assertEqual(output.lines(), lines)
+        output.flushOutput()
+        # only the last lines are kept
+        self.assertEqual(output.lines(), 100)
+        self.assertEqual(output.text(98), 'line 999\n')
+
+        # large writes are flushed at once
+        output.bufferOutput('x' * console_output.FLUSH_SIZE + '\n')
+        self.assertEqual(output.pendingOutput, [])
+        self.assertEqual(output.text(98), 'x' * console_output.FLUSH_SIZE + '\n')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the background tasks of DBManager
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import qgis  # NOQA
+
+import threading
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.testing import start_app, unittest
+
+from plugins.db_manager.db_plugins.plugin import DbError, runConnectorTask
+
+start_app()
+
+
+class FakeConnector(object):
+
+    """ Records the threads its factory and methods are called from """
+
+    def __init__(self, threads):
+        self.threads = threads
+
+    def connectorFactory(self):
+        self.threads['factory'] = threading.current_thread()
+
+        def create():
+            self.threads['create'] = threading.current_thread()
+            return FakeConnector(self.threads)
+        return create
+
+    def getTables(self, schema):
+        self.threads['getTables'] = threading.current_thread()
+        return ['{}.table'.format(schema)]
+
+    def failing(self):
+        raise DbError('failed', 'SELECT 1')
+
+    def cancel(self):
+        pass
+
+
+class TestPyQgsDBManagerConnectorTask(unittest.TestCase):
+
+    def run_task(self, owner, key, connector, method, args):
+        done = []
+        runConnectorTask(owner, key, connector, method, args, done.append)
+        while not done:
+            QCoreApplication.processEvents()
+        return done[0]
+
+    def testThreads(self):
+        threads = {}
+        task = self.run_task(type('Owner', (), {})(), 'tables', FakeConnector(threads), 'getTables', ('public',))
+        self.assertEqual(task.result, ['public.table'])
+        self.assertIsNone(task.error)
+        # the connector is created on the main thread, used in the task thread
+        self.assertIs(threads['factory'], threading.main_thread())
+        self.assertIsNot(threads['create'], threading.main_thread())
+        self.assertIs(threads['getTables'], threads['create'])
+
+    def testError(self):
+        owner = type('Owner', (), {})()
+        task = self.run_task(owner, 'failing', FakeConnector({}), 'failing', ())
+        self.assertIsInstance(task.error, DbError)
+        self.assertEqual(owner._connectorTasks, {})
+
+    def testStaleResults(self):
+        owner = type('Owner', (), {})()
+        done = []
+        runConnectorTask(owner, 'tables', FakeConnector({}), 'getTables', ('a',), done.append)
+        runConnectorTask(owner, 'tables', FakeConnector({}), 'getTables', ('b',), done.append)
+        while 'tables' in owner._connectorTasks:
+            QCoreApplication.processEvents()
+        # only the result of the last request is delivered
+        self.assertEqual([task.result for task in done], [['b.table']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the DBManager metadata cache
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+__author__ = 'QGIS Development Team'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, QGIS Development Team'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import qgis  # NOQA
+
+import datetime
+import decimal
+import os
+import tempfile
+import shutil
+
+from qgis.testing import start_app, unittest
+
+from plugins.db_manager.db_plugins.metadata_cache import DBMetadataCache, cachedMetadata
+
+start_app()
+
+
+class FakeConnector(object):
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = 0
+
+    def metadataCache(self):
+        return self.cache
+
+    @cachedMetadata
+    def getTables(self, schema=None):
+        self.calls += 1
+        return [[0, 'table_%d' % self.calls, schema]]
+
+    @cachedMetadata
+    def getTableRows(self, table):
+        self.calls += 1
+        return [(1, decimal.Decimal('1.5'), datetime.date(2026, 10, 19), None, 2.5)]
+
+
+class TestPyQgsDBManagerMetadataCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.basetestpath = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.basetestpath, True)
+
+    def testCachedUntilTokenChanges(self):
+        token = [1]
+        cache = DBMetadataCache('conn', lambda: token[0], path=os.path.join(self.basetestpath, 'token.db'))
+        connector = FakeConnector(cache)
+
+        self.assertEqual(connector.getTables('public'), [[0, 'table_1', 'public']])
+        self.assertEqual(connector.getTables('public'), [[0, 'table_1', 'public']])
+        self.assertEqual(connector.calls, 1)
+
+        # different arguments are cached separately
+        self.assertEqual(connector.getTables('other'), [[0, 'table_2', 'other']])
+        self.assertEqual(connector.calls, 2)
+
+        # catalog changed
+        token[0] = 2
+        self.assertEqual(connector.getTables('public'), [[0, 'table_3', 'public']])
+        self.assertEqual(connector.calls, 3)
+
+        # results are persisted for new connections with the same key
+        other = FakeConnector(DBMetadataCache('conn', lambda: token[0], path=cache.path))
+        self.assertEqual(other.getTables('public'), [[0, 'table_3', 'public']])
+        self.assertEqual(other.calls, 0)
+
+    def testNoToken(self):
+        cache = DBMetadataCache('conn', lambda: None, path=os.path.join(self.basetestpath, 'notoken.db'))
+        connector = FakeConnector(cache)
+        connector.getTables()
+        connector.getTables()
+        self.assertEqual(connector.calls, 2)
+
+    def testTokenMaxAge(self):
+        token = [1]
+        cache = DBMetadataCache('conn', lambda: token[0], tokenMaxAge=3600, path=os.path.join(self.basetestpath, 'maxage.db'))
+        connector = FakeConnector(cache)
+        connector.getTables()
+        token[0] = 2
+        connector.getTables()
+        self.assertEqual(connector.calls, 1)
+
+        cache.expireToken()
+        connector.getTables()
+        self.assertEqual(connector.calls, 2)
+
+    def testClear(self):
+        cache = DBMetadataCache('conn', lambda: 1, path=os.path.join(self.basetestpath, 'clear.db'))
+        connector = FakeConnector(cache)
+        connector.getTables()
+        cache.clear()
+        connector.getTables()
+        self.assertEqual(connector.calls, 2)
+
+    def testTypesPreserved(self):
+        cache = DBMetadataCache('conn', lambda: 1, path=os.path.join(self.basetestpath, 'types.db'))
+        connector = FakeConnector(cache)
+        expected = connector.getTableRows('t')
+        result = connector.getTableRows('t')
+        self.assertEqual(connector.calls, 1)
+        self.assertEqual(result, expected)
+        self.assertEqual([type(v) for v in result[0]], [type(v) for v in expected[0]])
+        self.assertIsInstance(result[0], tuple)
+
+
+if __name__ == '__main__':
+    unittest.main()
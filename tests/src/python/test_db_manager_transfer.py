@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the table transfers of DBManager
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import qgis  # NOQA
+
+import os
+import tempfile
+import shutil
+from types import SimpleNamespace
+from osgeo import ogr
+
+from qgis.core import QgsVectorLayer, QgsWkbTypes
+from qgis.testing import start_app, unittest
+
+from plugins.db_manager.db_transfer import SchemaTransferTask, TableTransfer, tableSource
+
+
+class TestPyQgsDBManagerTransfer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Run before all tests"""
+        start_app()
+        cls.basetestpath = tempfile.mkdtemp()
+
+        cls.source = os.path.join(cls.basetestpath, 'source.gpkg')
+        ds = ogr.GetDriverByName('GPKG').CreateDataSource(cls.source)
+        for name, count in (('lines', 25), ('points', 7)):
+            lyr = ds.CreateLayer(name, geom_type=ogr.wkbLineString if name == 'lines' else ogr.wkbPoint)
+            lyr.CreateField(ogr.FieldDefn('text_field', ogr.OFTString))
+            for i in range(count):
+                f = ogr.Feature(lyr.GetLayerDefn())
+                f['text_field'] = 'feature {}'.format(i)
+                if name == 'lines':
+                    f.SetGeometry(ogr.CreateGeometryFromWkt('LINESTRING({0} 2,3 {0})'.format(i)))
+                else:
+                    f.SetGeometry(ogr.CreateGeometryFromWkt('POINT({0} 2)'.format(i)))
+                lyr.CreateFeature(f)
+        lyr = ds.CreateLayer('multilines', geom_type=ogr.wkbMultiLineString)
+        for i in range(3):
+            f = ogr.Feature(lyr.GetLayerDefn())
+            f.SetGeometry(ogr.CreateGeometryFromWkt('MULTILINESTRING(({0} 2,3 {0}),(5 5,6 6))'.format(i)))
+            lyr.CreateFeature(f)
+        ds = None
+
+    @classmethod
+    def tearDownClass(cls):
+        """Run after all tests"""
+        shutil.rmtree(cls.basetestpath, True)
+
+    def testTableSource(self):
+        table = SimpleNamespace(name='a:b', mimeUri=lambda: 'vector:postgres:a:b:dbname=\'x\' table="s"."a:b"')
+        self.assertEqual(tableSource(table), ('dbname=\'x\' table="s"."a:b"', 'postgres'))
+
+    def testTransferToGeoPackage(self):
+        destination = os.path.join(self.basetestpath, 'destination.gpkg')
+        ogr.GetDriverByName('GPKG').CreateDataSource(destination)
+        transfers = [TableTransfer(name, '{}|layername={}'.format(self.source, name), 'ogr', destination, 'ogr',
+                                   {'update': True, 'driverName': 'GPKG', 'layerName': name})
+                     for name in ('lines', 'points')]
+
+        task = SchemaTransferTask(transfers, maxWorkers=4, batchSize=10)
+        # a GeoPackage allows a single writer
+        self.assertEqual(task.maxWorkers, 1)
+        self.assertTrue(task.run())
+
+        for transfer, count in zip(transfers, (25, 7)):
+            self.assertEqual(transfer.status, TableTransfer.Done)
+            self.assertEqual(transfer.attempts, 1)
+            self.assertEqual(transfer.written, count)
+            layer = QgsVectorLayer('{}|layername={}'.format(destination, transfer.name), 'test', 'ogr')
+            self.assertTrue(layer.isValid())
+            self.assertEqual(layer.featureCount(), count)
+            self.assertEqual(sorted(f['text_field'] for f in layer.getFeatures()),
+                             sorted('feature {}'.format(i) for i in range(count)))
+
+    def testForceSinglePart(self):
+        destination = os.path.join(self.basetestpath, 'singlepart.gpkg')
+        ogr.GetDriverByName('GPKG').CreateDataSource(destination)
+        transfer = TableTransfer('multilines', '{}|layername=multilines'.format(self.source), 'ogr', destination, 'ogr',
+                                 {'update': True, 'driverName': 'GPKG', 'layerName': 'multilines',
+                                  'forceSinglePartGeometryType': True})
+        self.assertTrue(SchemaTransferTask([transfer]).run())
+
+        layer = QgsVectorLayer('{}|layername=multilines'.format(destination), 'test', 'ogr')
+        self.assertTrue(layer.isValid())
+        self.assertEqual(layer.wkbType(), QgsWkbTypes.LineString)
+        self.assertEqual(sorted(f.geometry().asWkt() for f in layer.getFeatures()),
+                         ['LineString ({0} 2, 3 {0})'.format(i) for i in range(3)])
+
+    def testMaxWorkers(self):
+        transfers = [TableTransfer('t', '', 'ogr', 'dbname=\'x\'', 'postgres')]
+        self.assertEqual(SchemaTransferTask(transfers, maxWorkers=4).maxWorkers, 4)
+        self.assertEqual(SchemaTransferTask(transfers, maxWorkers=0).maxWorkers, 1)
+        transfers.append(TableTransfer('t', '', 'ogr', '/tmp/db.sqlite', 'spatialite'))
+        self.assertEqual(SchemaTransferTask(transfers, maxWorkers=4).maxWorkers, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
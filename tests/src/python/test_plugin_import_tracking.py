@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the tracking of the modules imported by the plugins.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+__author__ = 'QGIS Development Team'
+__date__ = '19/10/2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import types
+from unittest import mock
+
+import qgis.utils
+from qgis.testing import start_app, unittest
+
+start_app()
+
+
+class TestPluginImportTracking(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.mkdtemp()
+        plugin = os.path.join(cls.dir, 'trackedplugin')
+        os.makedirs(os.path.join(plugin, 'sub'))
+        with open(os.path.join(plugin, '__init__.py'), 'w') as f:
+            f.write('from . import tools\n')
+        with open(os.path.join(plugin, 'tools.py'), 'w') as f:
+            f.write('def lazy():\n    from .sub import helper\n    return helper.VALUE\n')
+        open(os.path.join(plugin, 'sub', '__init__.py'), 'w').close()
+        with open(os.path.join(plugin, 'sub', 'helper.py'), 'w') as f:
+            f.write('VALUE = 42\n')
+        sys.path.insert(0, cls.dir)
+        qgis.utils.available_plugins.append('trackedplugin')
+
+    @classmethod
+    def tearDownClass(cls):
+        qgis.utils.available_plugins.remove('trackedplugin')
+        sys.path.remove(cls.dir)
+        shutil.rmtree(cls.dir)
+
+    def testTracking(self):
+        # the builtin import is not wrapped anymore
+        self.assertIsNone(getattr(qgis.utils, '_import', None))
+
+        import trackedplugin
+        self.assertEqual(trackedplugin.tools.lazy(), 42)
+        self.assertEqual(qgis.utils._plugin_modules['trackedplugin'],
+                         {'trackedplugin', 'trackedplugin.tools', 'trackedplugin.sub', 'trackedplugin.sub.helper'})
+
+        qgis.utils._unloadPluginModules('trackedplugin')
+        self.assertNotIn('trackedplugin', sys.modules)
+        self.assertNotIn('trackedplugin.sub.helper', sys.modules)
+
+        # modules imported again are tracked again
+        import trackedplugin  # NOQA
+        self.assertIn('trackedplugin.tools', qgis.utils._plugin_modules['trackedplugin'])
+        qgis.utils._unloadPluginModules('trackedplugin')
+
+    def testLoadedModules(self):
+        """ imports of already loaded modules, the most frequent case for
+        imports done in functions, don't go through the tracking """
+        self.assertIsInstance(builtins.__import__, types.BuiltinFunctionType)
+
+        calls = []
+        find_spec = qgis.utils._PluginModuleFinder.find_spec
+
+        def tracked_find_spec(finder, fullname, path, target=None):
+            calls.append(fullname)
+            return find_spec(finder, fullname, path, target)
+
+        import trackedplugin
+        trackedplugin.tools.lazy()
+        with mock.patch.object(qgis.utils._PluginModuleFinder, 'find_spec', tracked_find_spec):
+            self.assertEqual(trackedplugin.tools.lazy(), 42)
+            __import__('os.path', fromlist=['join'])
+            import trackedplugin.sub.helper  # NOQA
+            self.assertEqual(calls, [])
+
+            # only modules which are not loaded yet are looked up
+            qgis.utils._unloadPluginModules('trackedplugin')
+            import trackedplugin  # NOQA
+            self.assertEqual(calls, ['trackedplugin', 'trackedplugin.tools'])
+        qgis.utils._unloadPluginModules('trackedplugin')
+
+    def testImportTime(self):
+        """ imports done in functions are not slower with the tracking """
+        import trackedplugin
+        statement = 'trackedplugin.tools.lazy(); __import__("os.path", fromlist=["join"])'
+        tracked = min(timeit.repeat(statement, number=20000, repeat=7, globals={'trackedplugin': trackedplugin}))
+        untracked_path = [f for f in sys.meta_path if not isinstance(f, qgis.utils._PluginModuleFinder)]
+        with mock.patch.object(sys, 'meta_path', untracked_path):
+            untracked = min(timeit.repeat(statement, number=20000, repeat=7, globals={'trackedplugin': trackedplugin}))
+        # wrapping the builtin import made this about 1.6 times slower, leave room for timing noise
+        self.assertLess(tracked, untracked * 1.35, 'tracked: {:.3f}s, untracked: {:.3f}s'.format(tracked, untracked))
+        qgis.utils._unloadPluginModules('trackedplugin')
+
+
+if __name__ == '__main__':
+    unittest.main()
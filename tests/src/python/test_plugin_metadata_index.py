@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the plugin metadata index of qgis.utils.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+__author__ = 'QGIS Development Team'
+__date__ = '19/10/2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+import time
+
+from qgis.testing import start_app, unittest
+from qgis.utils import PluginMetadataIndex
+
+start_app()
+
+
+class TestPluginMetadataIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.pluginsPath = os.path.join(self.dir, 'plugins')
+        self.indexPath = os.path.join(self.dir, 'index.json')
+        self.writePlugin('first', '[general]\nname=First\nversion=1.0\n')
+        self.writePlugin('broken', 'not a metadata file')
+        self.writePlugin('notapackage', '[general]\nname=Not a package\n', package=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def writePlugin(self, name, metadata, package=True):
+        path = os.path.join(self.pluginsPath, name)
+        os.makedirs(path, exist_ok=True)
+        if package:
+            open(os.path.join(path, '__init__.py'), 'w').close()
+        with open(os.path.join(path, 'metadata.txt'), 'w') as f:
+            f.write(metadata)
+
+    def plugins(self, index):
+        return dict((name, cp.get('general', 'name') if cp is not None else None)
+                    for name, cp in index.plugins(self.pluginsPath))
+
+    def testPlugins(self):
+        index = PluginMetadataIndex(self.indexPath)
+        self.assertEqual(self.plugins(index), {'first': 'First', 'broken': None})
+        self.assertTrue(index.parseError(os.path.join(self.pluginsPath, 'broken')))
+        self.assertEqual(index.parser(os.path.join(self.pluginsPath, 'notapackage')).get('general', 'name'),
+                         'Not a package')
+
+    def testPersistence(self):
+        index = PluginMetadataIndex(self.indexPath)
+        self.plugins(index)
+        index.save()
+        self.assertTrue(os.path.exists(self.indexPath))
+
+        # nothing changed, the index is used as is
+        index = PluginMetadataIndex(self.indexPath)
+        self.assertEqual(self.plugins(index), {'first': 'First', 'broken': None})
+        self.assertFalse(index._dirty)
+
+        # only the changes are read
+        time.sleep(0.01)
+        self.writePlugin('first', '[general]\nname=First again\nversion=1.1\n')
+        self.writePlugin('second', '[general]\nname=Second\n')
+        shutil.rmtree(os.path.join(self.pluginsPath, 'broken'))
+        self.assertEqual(self.plugins(index), {'first': 'First again', 'second': 'Second'})
+
+    def testInterpolation(self):
+        # values are interpolated when fetched, as when read from the file
+        self.writePlugin('first', '[general]\nname=%(version)s\nversion=1.0\nabout=50% done\n')
+        index = PluginMetadataIndex(self.indexPath)
+        self.plugins(index)
+        index.save()
+
+        cp = PluginMetadataIndex(self.indexPath).parser(os.path.join(self.pluginsPath, 'first'))
+        self.assertEqual(cp.get('general', 'name'), '1.0')
+        self.assertEqual(cp.get('general', 'about', raw=True), '50% done')
+
+
+if __name__ == '__main__':
+    unittest.main()
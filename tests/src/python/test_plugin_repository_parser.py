@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the plugin repository parser of the plugin installer.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+__author__ = 'QGIS Development Team'
+__date__ = '19/10/2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import qgis  # NOQA
+
+import http.server
+import shutil
+import socketserver
+import tempfile
+import threading
+
+from qgis.testing import start_app, unittest
+
+from pyplugin_installer import installer_data
+from pyplugin_installer.installer_data import Relay, Repositories, plugins
+from pyplugin_installer.repository_parser import RepositoryCache, RepositoryXmlParser
+
+app = start_app()
+
+PLUGIN = """
+<pyqgis_plugin name="{name}" version="1.{index}" plugin_id="{index}">
+    <description><![CDATA[Plugin {index}]]></description>
+    <about>Tools & utilities</about>
+    <qgis_minimum_version>{minimum}</qgis_minimum_version>
+    <homepage>http://example.com/{name}</homepage>
+    <file_name>{name}.1.{index}.zip</file_name>
+    <icon>icons/{name}.png</icon>
+    <author_name>Author {index}</author_name>
+    <download_url>http://example.com/{name}.1.{index}.zip</download_url>
+    <experimental>{experimental}</experimental>
+    <deprecated>False</deprecated>
+    <tags>a,b</tags>
+</pyqgis_plugin>"""
+
+
+def repositoryXml(count, minimum="3.0"):
+    plugins = "".join(PLUGIN.format(name="plugin%d" % i, index=i, minimum=minimum,
+                                    experimental="True" if i % 2 else "False")
+                      for i in range(count))
+    return ("<?xml version='1.0' encoding='UTF-8'?>\n<plugins>%s\n</plugins>\n" % plugins).encode("utf-8")
+
+
+class RepositoryHandler(http.server.BaseHTTPRequestHandler):
+
+    """ serves the repository XML, answering 304 to requests with its ETag """
+
+    etag = '"1"'
+    content = repositoryXml(50)
+    requests = []
+
+    def do_GET(self):
+        RepositoryHandler.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.content)))
+        self.end_headers()
+        # in several blocks, as a slow repository would
+        for i in range(0, len(self.content), 1000):
+            self.wfile.write(self.content[i:i + 1000])
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestRepositoryXmlParser(unittest.TestCase):
+
+    def parse(self, content, blockSize):
+        parser = RepositoryXmlParser("http://plugins.example.com/plugins.xml")
+        for i in range(0, len(content), blockSize):
+            parser.addData(content[i:i + blockSize])
+        records = parser.finish()
+        self.assertFalse(parser.hasError())
+        return records
+
+    def testRecords(self):
+        records = self.parse(repositoryXml(3), 1 << 20)
+        self.assertEqual(len(records), 3)
+        plugin = records[1]["plugin"]
+        self.assertEqual(plugin["id"], "plugin1")
+        self.assertEqual(plugin["plugin_id"], "1")
+        self.assertEqual(plugin["name"], "plugin1")
+        self.assertEqual(plugin["version_available"], "1.1")
+        self.assertEqual(plugin["description"], "Plugin 1")
+        self.assertEqual(plugin["about"], "Tools & utilities")
+        self.assertEqual(plugin["icon"], "http://plugins.example.com/icons/plugin1.png")
+        self.assertEqual(plugin["filename"], "plugin1.1.1.zip")
+        self.assertEqual(plugin["code_repository"], "")
+        self.assertTrue(plugin["experimental"])
+        self.assertFalse(records[0]["plugin"]["experimental"])
+        self.assertEqual(records[1]["qgis_minimum_version"], "3.0")
+        self.assertEqual(records[1]["qgis_maximum_version"], "")
+        self.assertFalse(records[1]["disabled"])
+
+    def testBlocks(self):
+        content = repositoryXml(10)
+        expected = self.parse(content, len(content))
+        # blocks splitting elements, CDATA sections and lonely ampersands
+        for blockSize in (1, 7, 64, 1000):
+            self.assertEqual(self.parse(content, blockSize), expected)
+
+    def testMalformed(self):
+        parser = RepositoryXmlParser("http://plugins.example.com/plugins.xml")
+        parser.addData(b"<html><body>Proxy error</p></body></html>")
+        self.assertEqual(parser.finish(), [])
+        self.assertTrue(parser.hasError())
+
+    def testTruncated(self):
+        parser = RepositoryXmlParser("http://plugins.example.com/plugins.xml")
+        parser.addData(repositoryXml(3)[:-100])
+        # more data may come
+        self.assertFalse(parser.hasError())
+        parser.finish()
+        self.assertTrue(parser.hasError())
+        self.assertTrue(parser.errorString())
+
+
+class TestRepositoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = RepositoryCache(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def testStore(self):
+        url = "http://plugins.example.com/plugins.xml?qgis=3.0"
+        self.assertIsNone(self.cache.load(url))
+        self.assertEqual(self.cache.validators(url), ("", ""))
+
+        records = [{"plugin": {"id": "a"}, "qgis_minimum_version": "3.0",
+                    "qgis_maximum_version": "", "disabled": False}]
+        self.cache.store(url, '"1"', "Mon, 19 Oct 2026 00:00:00 GMT", records)
+        self.assertEqual(self.cache.validators(url), ('"1"', "Mon, 19 Oct 2026 00:00:00 GMT"))
+        self.assertEqual(self.cache.load(url)["records"], records)
+        self.assertIsNone(self.cache.load(url + "1"))
+
+        # a response without validators can't be revalidated later
+        self.cache.store(url, "", "", records)
+        self.assertIsNone(self.cache.load(url))
+
+
+class TestRepositoryFetching(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.httpd = socketserver.TCPServer(('localhost', 0), RepositoryHandler)
+        cls.port = cls.httpd.server_address[1]
+        cls.httpd_thread = threading.Thread(target=cls.httpd.serve_forever)
+        cls.httpd_thread.setDaemon(True)
+        cls.httpd_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = installer_data.repositoryCache
+        installer_data.repositoryCache = RepositoryCache(self.dir)
+        RepositoryHandler.requests = []
+
+    def tearDown(self):
+        installer_data.repositoryCache = self.cache
+        shutil.rmtree(self.dir)
+
+    def fetch(self, state=2):
+        repositories = Repositories()
+        repositories.mRepositories["test"] = {"url": "http://localhost:%d/plugins.xml" % self.port,
+                                              "authcfg": "",
+                                              "enabled": True,
+                                              "valid": True,
+                                              "Relay": Relay("test"),
+                                              "xmlData": None,
+                                              "state": 0,
+                                              "error": ""}
+        plugins.clearRepoCache()
+        repositories.requestFetching("test")
+        while repositories.mRepositories["test"]["state"] == 1:
+            app.processEvents()
+        self.assertEqual(repositories.mRepositories["test"]["state"], state,
+                         repositories.mRepositories["test"]["error"])
+        return plugins.repoCache.get("test", [])
+
+    def testRevalidation(self):
+        fetched = self.fetch()
+        self.assertEqual(len(fetched), 50)
+        self.assertEqual(fetched[0]["zip_repository"], "test")
+        self.assertNotIn("If-None-Match", RepositoryHandler.requests[-1])
+
+        # the unchanged repository is not downloaded nor parsed again
+        self.assertEqual(self.fetch(), fetched)
+        self.assertEqual(RepositoryHandler.requests[-1]["If-None-Match"], RepositoryHandler.etag)
+
+    def testIncompatiblePlugins(self):
+        RepositoryHandler.content = repositoryXml(5, minimum="99.0")
+        try:
+            self.assertEqual(self.fetch(), [])
+        finally:
+            RepositoryHandler.content = repositoryXml(50)
+
+    def testTruncatedRepository(self):
+        RepositoryHandler.content = repositoryXml(50)[:-100]
+        try:
+            self.assertEqual(self.fetch(state=3), [])
+        finally:
+            RepositoryHandler.content = repositoryXml(50)
+        # nothing is cached, so that the next request downloads the whole repository
+        self.assertEqual(installer_data.repositoryCache.validators(
+            "http://localhost:%d/plugins.xml" % self.port + Repositories().urlParams()), ("", ""))
+
+
+if __name__ == '__main__':
+    unittest.main()
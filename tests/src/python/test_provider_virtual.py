@@ -362,6 +362,58 @@ class TestQgsVirtualLayerProvider(unittest.TestCase, ProviderTestCase):
         a = [fit.attributes()[4] for fit in l2.getFeatures()]
         self.assertEqual(a, ["Basse-Normandie"])
 
+    def test_filter_rect_and_attributes(self):
+        source = toPercent(os.path.join(self.testDataDir, "france_parts.shp"))
+
+        # rtree filter and comparisons pushed down together
+        query = toPercent("select * from vtab where _search_frame_=BuildMbr(-6,46,3,51,4326) and objectid >= 2 and objectid < 4")
+        l2 = QgsVectorLayer("?layer=ogr:%s:vtab&query=%s&uid=objectid" % (source, query), "vtab2", "virtual", QgsVectorLayer.LayerOptions(False))
+        self.assertEqual(l2.isValid(), True)
+        ref = [f['objectid'] for f in QgsVectorLayer(os.path.join(self.testDataDir, "france_parts.shp"), "ref", "ogr").getFeatures()
+               if 2 <= f['objectid'] < 4]
+        self.assertEqual(sorted(f['objectid'] for f in l2.getFeatures()), sorted(ref))
+
+        # a comparison to null never matches
+        query = toPercent("select * from vtab where objectid = null")
+        l3 = QgsVectorLayer("?layer=ogr:%s:vtab&query=%s&uid=objectid" % (source, query), "vtab3", "virtual", QgsVectorLayer.LayerOptions(False))
+        self.assertEqual(l3.isValid(), True)
+        self.assertEqual(l3.featureCount(), 0)
+
+    def test_spatial_join_search_frame(self):
+        l1 = QgsVectorLayer(os.path.join(self.testDataDir, "points.shp"), "points", "ogr", QgsVectorLayer.LayerOptions(False))
+        self.assertEqual(l1.isValid(), True)
+        QgsProject.instance().addMapLayer(l1)
+        l2 = QgsVectorLayer(os.path.join(self.testDataDir, "points_relations.shp"), "points_relations", "ogr", QgsVectorLayer.LayerOptions(False))
+        self.assertEqual(l2.isValid(), True)
+        QgsProject.instance().addMapLayer(l2)
+
+        # the inner table is scanned once per row of the outer one, through a temporary spatial index
+        ids = []
+        for where in ("intersects(vtab1.geometry,vtab2.geometry)",
+                      "intersects(vtab1.geometry,vtab2.geometry) and vtab2._search_frame_=vtab1.geometry"):
+            query = toPercent("select id, Pilots from vtab1,vtab2 where " + where)
+            l3 = QgsVectorLayer("?layer_ref=%s&layer_ref=%s&query=%s&nogeometry" % (l1.id(), l2.id(), query), "vtab", "virtual", QgsVectorLayer.LayerOptions(False))
+            self.assertEqual(l3.isValid(), True)
+            ids.append(sorted(f.attributes() for f in l3.getFeatures()))
+        self.assertTrue(ids[0])
+        self.assertEqual(ids[0], ids[1])
+
+        # comparisons on vtab2 favor it as the outer table, where its _search_frame_ constraint cannot be used:
+        # the join order is forced with a cross join
+        ids = []
+        for query in ("select id, Pilots from vtab2, vtab1 where intersects(vtab1.geometry,vtab2.geometry) "
+                      "and vtab2.id >= 1 and vtab2.id <= 3 and vtab2.Class > ''",
+                      "select id, Pilots from vtab1 cross join vtab2 where intersects(vtab1.geometry,vtab2.geometry) "
+                      "and vtab2.id >= 1 and vtab2.id <= 3 and vtab2.Class > '' and vtab2._search_frame_=vtab1.geometry"):
+            l3 = QgsVectorLayer("?layer_ref=%s&layer_ref=%s&query=%s&nogeometry" % (l1.id(), l2.id(), toPercent(query)), "vtab", "virtual", QgsVectorLayer.LayerOptions(False))
+            self.assertEqual(l3.isValid(), True)
+            ids.append(sorted(f.attributes() for f in l3.getFeatures()))
+        self.assertTrue(ids[0])
+        self.assertEqual(ids[0], ids[1])
+
+        QgsProject.instance().removeMapLayer(l1)
+        QgsProject.instance().removeMapLayer(l2)
+
     def test_recursiveLayer(self):
         source = toPercent(os.path.join(self.testDataDir, "france_parts.shp"))
         l = QgsVectorLayer("?layer=ogr:%s" % source, "vtab", "virtual", QgsVectorLayer.LayerOptions(False))
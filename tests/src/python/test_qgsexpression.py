@@ -14,10 +14,18 @@ __revision__ = '$Format:%H$'
 
 import qgis  # NOQA
 
-from qgis.PyQt.QtCore import QVariant
+from qgis.PyQt.QtCore import QVariant, NULL
 from qgis.testing import unittest
 from qgis.utils import qgsfunction
-from qgis.core import QgsExpression, QgsFeatureRequest
+from qgis.core import (QgsExpression,
+                       QgsExpressionContext,
+                       QgsExpressionContextScope,
+                       QgsFeature,
+                       QgsFeatureRequest,
+                       QgsField,
+                       QgsFields,
+                       evaluate_expression_batch,
+                       expression_batch_function)
 
 
 class TestQgsExpressionCustomFunctions(unittest.TestCase):
@@ -67,8 +75,23 @@ class TestQgsExpressionCustomFunctions(unittest.TestCase):
     def referenced_columns_set(values, feature, parent):
         return 2
 
+    @qgsfunction(1, 'testing', register=False)
+    def valueswithcontext(values, feature, parent, context):
+        return context.variable('offset') + values[0]
+
+    batch_calls = []
+
+    @qgsfunction(args='auto', group='testing', register=False, batch=True)
+    def batchadd(value1, value2, features, parent):
+        TestQgsExpressionCustomFunctions.batch_calls.append(len(features))
+        if any(v < 0 for v in value1):
+            raise ValueError('negative value')
+        return [a + b for a, b in zip(value1, value2)]
+
     def tearDown(self):
         QgsExpression.unregisterFunction('testfun')
+        QgsExpression.unregisterFunction('valueswithcontext')
+        QgsExpression.unregisterFunction('batchadd')
 
     def testCanBeRegistered(self):
         QgsExpression.registerFunction(self.testfun)
@@ -102,6 +125,62 @@ class TestQgsExpressionCustomFunctions(unittest.TestCase):
         self.assertEqual(exp.evalErrorString(), "")
         self.assertEqual(result, (1, 2, 3))
 
+    def testContextArgument(self):
+        QgsExpression.registerFunction(self.valueswithcontext)
+        context = QgsExpressionContext()
+        scope = QgsExpressionContextScope()
+        scope.setVariable('offset', 10)
+        context.appendScope(scope)
+        exp = QgsExpression('valueswithcontext(1)')
+        self.assertEqual(exp.evaluate(context), 11)
+        self.assertFalse(exp.hasEvalError())
+
+    def testBatchFunction(self):
+        function = self.batchadd
+        self.assertEqual(function.params(), 2)
+        exp = QgsExpression("")
+        # evaluated for a single feature, as a block of one
+        self.assertEqual(function.func([1, 2], None, exp, None), 3)
+        self.assertEqual(exp.evalErrorString(), "")
+
+    def testEvaluateBatch(self):
+        QgsExpression.registerFunction(self.batchadd)
+        fields = QgsFields()
+        fields.append(QgsField('a', QVariant.Int))
+        features = []
+        for value in [1, 2, NULL, 4]:
+            f = QgsFeature(fields)
+            f.setAttributes([value])
+            features.append(f)
+        context = QgsExpressionContext()
+        context.setFields(fields)
+
+        exp = QgsExpression('batchadd("a", 10)')
+        exp.prepare(context)
+        self.assertIsNotNone(expression_batch_function(exp))
+        del self.batch_calls[:]
+        self.assertEqual(evaluate_expression_batch(exp, context, features), [11, 12, NULL, 14])
+        self.assertFalse(exp.hasEvalError())
+        # called once for the block, without the NULL row
+        self.assertEqual(self.batch_calls, [3])
+
+        # other expressions are evaluated feature by feature
+        exp = QgsExpression('"a" * 2')
+        exp.prepare(context)
+        self.assertIsNone(expression_batch_function(exp))
+        self.assertEqual(evaluate_expression_batch(exp, context, features), [2, 4, NULL, 8])
+
+        features[0].setAttributes([-1])
+        exp = QgsExpression('batchadd("a", 10)')
+        exp.prepare(context)
+        self.assertEqual(evaluate_expression_batch(exp, context, features), [None] * 4)
+        self.assertEqual(exp.evalErrorString(), 'negative value')
+
+        # the error of the previous evaluation is cleared
+        features[0].setAttributes([1])
+        self.assertEqual(evaluate_expression_batch(exp, context, features), [11, 12, NULL, 14])
+        self.assertFalse(exp.hasEvalError())
+
     def testCanUnregisterFunction(self):
         QgsExpression.registerFunction(self.testfun)
         index = QgsExpression.functionIndex('testfun')
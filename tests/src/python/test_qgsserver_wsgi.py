@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the Python front-ends of QgsServer.
+
+From build dir, run: ctest -R PyQgsServerWsgi -V
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+"""
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+
+# Needed on Qt 5 so that the serialization of XML is consistent among all executions
+os.environ['QT_HASH_SEED'] = '1'
+
+import asyncio
+import time
+import urllib.parse
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from wsgiref.util import setup_testing_defaults
+
+from qgis.server import QgsServerFilter
+from qgis.server.wsgi import PooledHttpServer, WsgiApplication, projectKey
+from utilities import unitTestDataPath
+
+PROJECT = os.path.join(unitTestDataPath('qgis_server_accesscontrol'), 'project.qgs')
+QUERY = 'MAP={}&SERVICE=WMS&VERSION=1.3.0&REQUEST=GetCapabilities'.format(urllib.parse.quote(PROJECT))
+
+
+class SleepFilter(QgsServerFilter):
+
+    """ Blocks the requests with a SLEEP parameter """
+
+    def requestReady(self):
+        sleep = self.serverInterface().requestHandler().parameterMap().get('SLEEP')
+        if sleep:
+            time.sleep(float(sleep))
+
+
+def registerSleepFilter(server):
+    server.serverInterface().registerFilter(SleepFilter(server.serverInterface()), 100)
+
+
+class TestQgsServerWsgi(unittest.TestCase):
+
+    def testWsgiApplication(self):
+        environ = {'QUERY_STRING': QUERY}
+        setup_testing_defaults(environ)
+        started = []
+
+        body = b''.join(WsgiApplication()(environ, lambda status, headers: started.append((status, headers))))
+        self.assertEqual(started[0][0], '200 OK')
+        self.assertIn('Content-Type', dict(started[0][1]))
+        self.assertIn(b'<WMS_Capabilities', body)
+
+    def testErrorStatus(self):
+        environ = {'QUERY_STRING': 'SERVICE=WMS&REQUEST=GetCapabilities&MAP=/no/such/project.qgs'}
+        setup_testing_defaults(environ)
+        started = []
+
+        body = b''.join(WsgiApplication()(environ, lambda status, headers: started.append((status, headers))))
+        self.assertEqual(started[0][0], '500 Internal Server Error')
+        self.assertIn(b'ServerException', body)
+
+    def testThreadedRequests(self):
+        application = WsgiApplication()
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda i: application.handle('GET', 'http://localhost/?' + QUERY, {}),
+                                        range(8)))
+        self.assertEqual([r[0] for r in results], [200] * 8)
+        self.assertTrue(all(b'<WMS_Capabilities' in r[2] for r in results))
+
+    def testRouting(self):
+        self.assertEqual(projectKey('http://localhost/?map=/a.qgs&SERVICE=WMS'), '/a.qgs')
+        self.assertIsNone(projectKey('http://localhost/?SERVICE=WMS'))
+
+        server = PooledHttpServer()
+        server.workers = [SimpleNamespace(load=2), SimpleNamespace(load=1), SimpleNamespace(load=3)]
+        # requests for a project always go to the same worker
+        self.assertEqual(len(set(id(server.worker('http://localhost/?MAP=/a.qgs&BBOX={}'.format(i)))
+                                 for i in range(10))), 1)
+        # other requests go to the least loaded worker
+        self.assertIs(server.worker('http://localhost/?SERVICE=WMS'), server.workers[1])
+
+    def testPooledServer(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = PooledHttpServer(port=0, workers=2, queueSize=1)
+
+        async def get(reader, writer, query, keepAlive=True):
+            writer.write('GET /?{} HTTP/1.1\r\nHost: localhost\r\n{}\r\n'.format(
+                query, '' if keepAlive else 'Connection: close\r\n').encode())
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.lower()] = value.strip()
+            body = await reader.readexactly(int(headers['content-length']))
+            return status, headers, body
+
+        async def run():
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                # several requests on the same connection
+                for i in range(3):
+                    status, headers, body = await get(reader, writer, QUERY)
+                    self.assertEqual(status, 200)
+                    self.assertEqual(headers['connection'], 'keep-alive')
+                    self.assertIn(b'<WMS_Capabilities', body)
+                status, headers, body = await get(reader, writer, QUERY, False)
+                self.assertEqual(headers['connection'], 'close')
+                self.assertEqual(await reader.read(), b'')
+                writer.close()
+
+                # requests beyond the queue of the worker are rejected
+                results = await asyncio.gather(*[server.submit('GET', 'http://localhost/?' + QUERY, {})
+                                                 for i in range(5)])
+                statuses = [r[0] for r in results]
+                self.assertIn(200, statuses)
+                self.assertIn(503, statuses)
+            finally:
+                await server.close()
+
+        loop.run_until_complete(run())
+        loop.close()
+
+    def testRequestTimeout(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = PooledHttpServer(port=0, workers=1, initializer=registerSleepFilter, requestTimeout=1)
+
+        async def run():
+            await server.start()
+            try:
+                status, headers, body = await server.submit('GET', 'http://localhost/?SLEEP=60&' + QUERY, {})
+                self.assertEqual(status, 504)
+                # the worker was restarted
+                status, headers, body = await server.submit('GET', 'http://localhost/?' + QUERY, {})
+                self.assertEqual(status, 200)
+            finally:
+                await server.close()
+
+        loop.run_until_complete(run())
+        loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
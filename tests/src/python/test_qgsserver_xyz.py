@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""QGIS Unit tests for the cached XYZ service of QGIS Server.
+
+From build dir, run: ctest -R PyQgsServerXYZ -V
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+"""
+__author__ = 'QGIS Development Team'
+__date__ = 'October 2026'
+__copyright__ = 'Copyright 2026, The QGIS Project'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+
+# Needed on Qt 5 so that the serialization of XML is consistent among all executions
+os.environ['QT_HASH_SEED'] = '1'
+
+import shutil
+import tempfile
+import urllib.parse
+
+from qgis.PyQt.QtGui import QColor, QImage
+from qgis.server import (QgsAccessControlFilter,
+                         QgsServer,
+                         QgsServerRequest,
+                         QgsBufferServerRequest,
+                         QgsBufferServerResponse)
+from qgis.server.xyz import (ORIGIN,
+                             DiskTileCache,
+                             MemoryTileCache,
+                             TileSet,
+                             registerXyzService,
+                             tileBounds,
+                             tileRange)
+from qgis.testing import unittest
+from utilities import unitTestDataPath
+
+PROJECT = os.path.join(unitTestDataPath('qgis_server_accesscontrol'), 'project.qgs')
+
+
+def tileset(project=PROJECT, layers='Country'):
+    return TileSet(project, 0, layers, '', 'image/png', 256, None)
+
+
+class UserAccessControl(QgsAccessControlFilter):
+
+    """ Access control depending on the current user """
+
+    user = 'alice'
+
+    def cacheKey(self):
+        return UserAccessControl.user
+
+
+class TestQgsServerXYZ(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = QgsServer()
+        cls.accessControl = UserAccessControl(cls.server.serverInterface())
+        cls.server.serverInterface().registerAccessControl(cls.accessControl, 100)
+        cls.cache = MemoryTileCache()
+        cls.service = registerXyzService(cls.server.serverInterface(), cls.cache, metaSize=2)
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache.invalidate()
+        UserAccessControl.user = 'alice'
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def tile(self, x, y, z, layers='Country', format='image/png'):
+        qs = urllib.parse.urlencode({'MAP': PROJECT, 'SERVICE': 'XYZ', 'X': x, 'Y': y, 'Z': z, 'LAYERS': layers,
+                                     'FORMAT': format})
+        request = QgsBufferServerRequest('http://server/?' + qs, QgsServerRequest.GetMethod)
+        response = QgsBufferServerResponse()
+        self.server.handleRequest(request, response)
+        return response.headers(), bytes(response.body())
+
+    def testGrid(self):
+        self.assertEqual(tileBounds(0, 0, 0), (-ORIGIN, -ORIGIN, ORIGIN, ORIGIN))
+        self.assertEqual(tileBounds(1, 0, 1), (0, 0, ORIGIN, ORIGIN))
+        self.assertEqual(tileBounds(0, 0, 1, 2), (-ORIGIN, -ORIGIN, ORIGIN, ORIGIN))
+        columns, rows = tileRange((1, -ORIGIN, ORIGIN, -1), 2)
+        self.assertEqual((list(columns), list(rows)), ([2, 3], [2, 3]))
+
+    def testMemoryCache(self):
+        cache = MemoryTileCache(maxSize=10)
+        cache.set(tileset(), 0, 0, 0, b'12345')
+        cache.set(tileset(), 1, 0, 0, b'12345')
+        self.assertEqual(cache.get(tileset(), 0, 0, 0), b'12345')
+        # least recently used tiles are dropped first
+        cache.set(tileset(), 1, 1, 0, b'12345')
+        self.assertIsNone(cache.get(tileset(), 1, 0, 0))
+        self.assertEqual(cache.get(tileset(), 0, 0, 0), b'12345')
+        self.assertIsNone(cache.get(tileset(layers='Hello'), 0, 0, 0))
+
+        self.assertEqual(cache.invalidate(layers='Hello'), 0)
+        self.assertEqual(cache.invalidate(PROJECT, 'Country,Hello'), 2)
+        self.assertIsNone(cache.get(tileset(), 0, 0, 0))
+
+    def testDiskCache(self):
+        cache = DiskTileCache(self.dir)
+        cache.set(tileset(), 0, 0, 0, b'tile')
+        cache.set(tileset(), 1, 1, 0, b'tile')
+        cache.set(tileset('/other.qgs'), 0, 0, 0, b'other')
+        self.assertEqual(DiskTileCache(self.dir).get(tileset(), 1, 1, 0), b'tile')
+        self.assertIsNone(cache.get(tileset(), 1, 0, 0))
+
+        self.assertEqual(cache.invalidate(PROJECT), 2)
+        self.assertIsNone(cache.get(tileset(), 0, 0, 0))
+        self.assertEqual(cache.get(tileset('/other.qgs'), 0, 0, 0), b'other')
+        self.assertEqual(cache.invalidate(), 1)
+
+    def testService(self):
+        headers, body = self.tile(0, 0, 1)
+        self.assertEqual(headers['Content-Type'], 'image/png')
+        self.assertEqual(headers['X-Tile-Cache'], 'MISS')
+        image = QImage.fromData(body)
+        self.assertEqual((image.width(), image.height()), (256, 256))
+
+        # the other tiles of the metatile were rendered as well
+        headers, body = self.tile(1, 1, 1)
+        self.assertEqual(headers['X-Tile-Cache'], 'HIT')
+        self.assertEqual(len(self.cache.tiles), 4)
+
+        headers, body = self.tile(0, 2, 1)
+        self.assertNotEqual(headers.get('X-Tile-Cache'), 'HIT')
+        self.assertNotEqual(headers.get('Content-Type'), 'image/png')
+
+        self.assertEqual(self.service.invalidate(PROJECT), 4)
+        self.assertEqual(self.tile(1, 1, 1)[0]['X-Tile-Cache'], 'MISS')
+
+    def testAccessControlCacheKey(self):
+        self.assertEqual(self.tile(0, 0, 1)[0]['X-Tile-Cache'], 'MISS')
+        self.assertEqual(self.tile(0, 0, 1)[0]['X-Tile-Cache'], 'HIT')
+        # the tiles of a user are not served to other users
+        UserAccessControl.user = 'bob'
+        self.assertEqual(self.tile(0, 0, 1)[0]['X-Tile-Cache'], 'MISS')
+        self.assertEqual(len(self.cache.tiles), 8)
+        self.assertEqual(set(t[0].extra for t in self.cache.tiles), {('alice',), ('bob',)})
+
+    def testJpeg(self):
+        headers, body = self.tile(0, 0, 1, format='image/jpeg')
+        self.assertEqual(headers['Content-Type'], 'image/jpeg')
+        image = QImage.fromData(body)
+        self.assertEqual((image.width(), image.height()), (256, 256))
+        # the transparent parts are not rendered black
+        self.assertGreater(QColor(image.pixel(0, 0)).lightness(), 200)
+
+    def testRenderLocks(self):
+        tiles = tileset()
+        with self.service.renderLock(tiles, 2, 0, 0):
+            # the tiles of other metatiles have their own lock
+            with self.service.renderLock(tiles, 2, 2, 0):
+                self.assertEqual(sorted(self.service.renderLocks), [(tiles, 2, 0, 0), (tiles, 2, 2, 0)])
+            self.assertTrue(self.service.renderLocks[(tiles, 2, 0, 0)][0].locked())
+            self.assertFalse(self.service.renderLocks[(tiles, 2, 0, 0)][0].acquire(False))
+        self.assertEqual(self.service.renderLocks, {})
+
+    def testSeed(self):
+        progress = []
+        count = self.service.seed(PROJECT, 'Country', [0, 1, 2], (1, -ORIGIN, ORIGIN, -1),
+                                  feedback=lambda z, i, total: progress.append((z, i, total)))
+        self.assertEqual(count, 1 + 4 + 4)
+        self.assertEqual(progress, [(0, 0, 1), (1, 0, 1), (2, 0, 1)])
+        self.assertEqual(self.tile(3, 3, 2)[0]['X-Tile-Cache'], 'HIT')
+        # already cached tiles are not rendered again
+        self.assertEqual(self.service.seed(PROJECT, 'Country', [2], (1, -ORIGIN, ORIGIN, -1)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()